@@ -3,15 +3,63 @@ Background Job Endpoints - Non-blocking analysis with status polling
 Solves the 500 timeout error by returning job_id immediately
 """
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, BackgroundTasks
-from typing import Optional
+from typing import Dict, List, Optional
+import asyncio
 import logging
+from pathlib import Path
 
+from app.core.config import settings
+from app.services.batch_api import BatchStore, offline_run_key, run_offline_bulk
+from app.services.bulk_analysis import BulkItem, parse_bulk_items, run_bulk_analysis
+from app.services.cancellation import (
+    CancellationToken,
+    JobCancelled,
+    cancel_job,
+    cancellation_scope,
+    register_job,
+    unregister_job,
+)
 from app.services.job_manager import JobManager
+from app.services.metrics import jobs_in_progress
+from app.services.progressive import ResultPublisher, publishing_scope
 from app.api.v1.endpoints.test_research_keywords import amazon_sales_intelligence_pipeline
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# How often a running job re-reads its stored status for a cancel request
+CANCEL_POLL_SECONDS = 1.0
+FINISHED_STATUSES = ("complete", "failed", "cancelled")
+# Job progress shown with each partial result
+PHASE_PROGRESS = {"preview": 30, "categorized": 55, "scored": 80}
+
+
+async def _watch_for_cancel(job_id: str, token: CancellationToken):
+    """
+    Cancel ``token`` once the job store holds a cancel request for the job.
+    
+    The cancel endpoint cancels jobs running in its own process directly; this
+    covers jobs running in another worker that share the job store.
+    """
+    while not token.cancelled:
+        await asyncio.sleep(CANCEL_POLL_SECONDS)
+        try:
+            requested = await asyncio.to_thread(JobManager.is_cancel_requested, job_id)
+        except Exception as e:
+            logger.warning(f"⚠️  [BACKGROUND JOB] Cancel check failed for {job_id}: {e}")
+            continue
+        if requested:
+            token.cancel("Cancelled by user")
+
+
+def _partial_result_saver(job_id: str, token: CancellationToken):
+    """``on_publish`` callback storing a job's partial results (may run on a worker thread)."""
+    def save(phase: str, result: Dict):
+        if token.cancelled:
+            return
+        JobManager.save_partial_results(job_id, result, phase, progress=PHASE_PROGRESS.get(phase))
+    return save
+
 
 async def run_pipeline_in_background(
     job_id: str,
@@ -21,7 +69,8 @@ async def run_pipeline_in_background(
     revenue_csv_content: bytes,
     revenue_csv_filename: str,
     design_csv_content: bytes,
-    design_csv_filename: str
+    design_csv_filename: str,
+    deadline_seconds: Optional[float] = None
 ):
     """
     Run the pipeline in background and save results.
@@ -35,7 +84,11 @@ async def run_pipeline_in_background(
         revenue_csv_filename: Revenue CSV filename
         design_csv_content: Design CSV file content
         design_csv_filename: Design CSV filename
+        deadline_seconds: Optional deadline for deadline ("anytime") mode
     """
+    token = register_job(job_id)
+    publisher = ResultPublisher(on_publish=_partial_result_saver(job_id, token))
+    watcher = asyncio.create_task(_watch_for_cancel(job_id, token))
     try:
         logger.info(f"🚀 [BACKGROUND JOB] Starting job: {job_id}")
         JobManager.update_status(job_id, "processing", progress=5, message="Starting pipeline...")
@@ -64,14 +117,18 @@ async def run_pipeline_in_background(
         # Update status
         JobManager.update_status(job_id, "processing", progress=10, message="Scraping product...")
         
-        # Run the actual pipeline
-        result = await amazon_sales_intelligence_pipeline(
-            asin_or_url=asin_or_url,
-            marketplace=marketplace,
-            main_keyword=main_keyword,
-            revenue_csv=revenue_csv,
-            design_csv=design_csv
-        )
+        # Run the actual pipeline; partial results are saved as its stages finish
+        with cancellation_scope(token), publishing_scope(publisher):
+            result = await amazon_sales_intelligence_pipeline(
+                asin_or_url=asin_or_url,
+                marketplace=marketplace,
+                main_keyword=main_keyword,
+                revenue_csv=revenue_csv,
+                design_csv=design_csv,
+                deadline_seconds=deadline_seconds
+            )
+        
+        publisher.finish(result)
         
         # Save results
         try:
@@ -89,9 +146,16 @@ async def run_pipeline_in_background(
         
         logger.info(f"✅ [BACKGROUND JOB] Job completed: {job_id}")
         
+    except JobCancelled as e:
+        logger.warning(f"🛑 [BACKGROUND JOB] Job cancelled: {job_id} - {e}")
+        JobManager.mark_cancelled(job_id, str(e))
     except Exception as e:
         logger.error(f"❌ [BACKGROUND JOB] Job failed: {job_id} - {str(e)}", exc_info=True)
         JobManager.mark_failed(job_id, str(e))
+    finally:
+        watcher.cancel()
+        unregister_job(job_id)
+        jobs_in_progress.dec()
 
 
 @router.post("/start-analysis")
@@ -102,12 +166,16 @@ async def start_analysis(
     main_keyword: Optional[str] = Form(None),
     revenue_csv: Optional[UploadFile] = File(None),
     design_csv: Optional[UploadFile] = File(None),
+    deadline_seconds: Optional[float] = Form(None),
 ):
     """
     Start analysis in background and return job_id immediately.
     
     This endpoint returns instantly (~1 second) and processes the pipeline in background.
     Use /job-status/{job_id} to check progress and /job-results/{job_id} to get results.
+    A deterministic preview result is available from /job-results/{job_id} seconds after
+    the start and is refined as the LLM stages finish (see ``progress`` in the result).
+    ``deadline_seconds`` is passed to the pipeline (see /amazon-sales-intelligence).
     
     Returns:
         {
@@ -124,6 +192,9 @@ async def start_analysis(
         if not revenue_csv or not design_csv:
             raise HTTPException(status_code=400, detail="Both revenue_csv and design_csv are required")
         
+        if deadline_seconds is not None and deadline_seconds <= 0:
+            raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+        
         # Create job
         job_id = JobManager.create_job()
         
@@ -132,6 +203,7 @@ async def start_analysis(
         design_content = await design_csv.read()
         
         # Schedule background task
+        jobs_in_progress.inc()
         background_tasks.add_task(
             run_pipeline_in_background,
             job_id=job_id,
@@ -141,7 +213,8 @@ async def start_analysis(
             revenue_csv_content=revenue_content,
             revenue_csv_filename=revenue_csv.filename,
             design_csv_content=design_content,
-            design_csv_filename=design_csv.filename
+            design_csv_filename=design_csv.filename,
+            deadline_seconds=deadline_seconds
         )
         
         logger.info(f"✅ [API] Job started: {job_id}")
@@ -159,6 +232,136 @@ async def start_analysis(
         raise HTTPException(status_code=500, detail=f"Failed to start job: {str(e)}")
 
 
+async def run_bulk_pipeline_in_background(job_id: str, items: List[BulkItem], files: Dict[str, bytes], offline: bool = False):
+    """
+    Run a bulk analysis in background and save the combined results.
+    
+    Args:
+        job_id: Unique job identifier
+        items: Parsed bulk items
+        files: Uploaded CSV contents by filename
+        offline: Send the LLM batches through the OpenAI Batch API (slower, cheaper)
+    """
+    token = register_job(job_id)
+    watcher = asyncio.create_task(_watch_for_cancel(job_id, token))
+    store = None
+    try:
+        logger.info(f"🚀 [BULK JOB] Starting job: {job_id} ({len(items)} products)")
+        JobManager.update_status(job_id, "processing", progress=5, message=f"Starting bulk analysis of {len(items)} products...")
+        
+        def report_progress(done: int, total: int):
+            JobManager.update_status(
+                job_id, "processing",
+                progress=5 + int(90 * done / total),
+                message=f"{done}/{total} pipeline runs finished"
+            )
+        
+        with cancellation_scope(token):
+            if offline:
+                # Keyed by content, so re-posting an interrupted job resumes its batches
+                run_key = offline_run_key(items, files)
+                store = BatchStore.load(Path(settings.BATCH_API_STATE_DIR) / f"{run_key}.json")
+                if store.answers or store.in_flight:
+                    logger.info(f"🔁 [BULK JOB] Resuming offline run {run_key} ({len(store.answers)} stored answers)")
+                result = await run_offline_bulk(
+                    items,
+                    files,
+                    store=store,
+                    max_concurrency=settings.BULK_MAX_CONCURRENCY,
+                    progress=report_progress,
+                )
+            else:
+                result = await run_bulk_analysis(
+                    items,
+                    files,
+                    max_concurrency=settings.BULK_MAX_CONCURRENCY,
+                    progress=report_progress,
+                )
+        
+        JobManager.save_results(job_id, result)
+        stats = result["stats"]
+        JobManager.update_status(
+            job_id, "complete", progress=100,
+            message=f"Bulk analysis complete: {stats['completed']}/{stats['items']} products succeeded"
+        )
+        logger.info(f"✅ [BULK JOB] Job completed: {job_id}")
+        if store is not None:
+            store.delete()
+        
+    except JobCancelled as e:
+        logger.warning(f"🛑 [BULK JOB] Job cancelled: {job_id} - {e}")
+        JobManager.mark_cancelled(job_id, str(e))
+        if store is not None:
+            store.delete()
+    except Exception as e:
+        # An offline run's saved store is kept: posting the job again resumes it
+        logger.error(f"❌ [BULK JOB] Job failed: {job_id} - {str(e)}", exc_info=True)
+        JobManager.mark_failed(job_id, str(e))
+    finally:
+        watcher.cancel()
+        unregister_job(job_id)
+        jobs_in_progress.dec()
+
+
+@router.post("/start-bulk-analysis")
+async def start_bulk_analysis(
+    background_tasks: BackgroundTasks,
+    items: str = Form(...),
+    files: List[UploadFile] = File(...),
+    offline: bool = Form(False),
+):
+    """
+    Start one background job analyzing many products.
+    
+    ``items`` is a JSON list; each entry names its CSVs by uploaded filename so
+    products can share CSVs:
+    
+        [{"asin_or_url": "B08KT2Z93D", "revenue_csv": "rev.csv", "design_csv": "design.csv",
+          "marketplace": "US", "main_keyword": null}, ...]
+    
+    Identical items run once, and competitor scrapes shared between products
+    are done once for the whole batch. Results (GET /job-results/{job_id}) list
+    every item in request order; GET /job-results/{job_id}/items/{index}
+    returns a single product's pipeline result.
+    
+    With ``offline=true`` the keyword, intent and root relevance batches go
+    through the OpenAI Batch API instead (half the price, answered within
+    ``BATCH_API_COMPLETION_WINDOW``): for overnight catalog refreshes. If an
+    offline job is interrupted (restart, failure), posting the same items and
+    files again resumes it from the batches already answered.
+    
+    Returns:
+        {"job_id": "...", "status": "processing", "items": N, "message": "..."}
+    """
+    try:
+        uploaded = {f.filename: await f.read() for f in files}
+        try:
+            bulk_items = parse_bulk_items(items, uploaded, settings.BULK_MAX_ITEMS)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        job_id = JobManager.create_job()
+        jobs_in_progress.inc()
+        background_tasks.add_task(
+            run_bulk_pipeline_in_background, job_id=job_id, items=bulk_items, files=uploaded, offline=offline
+        )
+        
+        logger.info(f"✅ [API] Bulk job started: {job_id} ({len(bulk_items)} products)")
+        
+        return {
+            "job_id": job_id,
+            "status": "processing",
+            "items": len(bulk_items),
+            "message": f"Bulk job started successfully. Use GET /job-status/{job_id} to check progress."
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"❌ [API] Failed to start bulk job: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to start bulk job: {str(e)}")
+
+
 @router.get("/job-status/{job_id}")
 async def get_job_status(job_id: str):
     """
@@ -167,7 +370,7 @@ async def get_job_status(job_id: str):
     Returns:
         {
             "job_id": "abc-123-def",
-            "status": "processing" | "complete" | "failed",
+            "status": "processing" | "complete" | "failed" | "cancelled",
             "progress": 0-100,
             "message": "Current status message",
             "created_at": "2025-01-01T12:00:00",
@@ -181,13 +384,53 @@ async def get_job_status(job_id: str):
     if not job_data:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
+    if job_data["status"] not in FINISHED_STATUSES and JobManager.is_cancel_requested(job_id):
+        job_data["cancel_requested"] = True
+        job_data["message"] = "Cancellation requested"
+    
     return job_data
 
 
+@router.post("/cancel-job/{job_id}")
+async def cancel_background_job(job_id: str):
+    """
+    Cancel a running background job.
+    
+    The job stops at its next checkpoint (between pipeline stages and LLM
+    batches); running scraper subprocesses are killed and rate-limiter waits
+    are abandoned. Poll /job-status/{job_id} until the status is "cancelled".
+    
+    Returns:
+        {"job_id": "abc-123-def", "status": "cancelling", "message": "..."}
+    """
+    job_data = JobManager.get_job(job_id)
+    
+    if not job_data:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    if job_data["status"] in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job_data['status']}")
+    
+    JobManager.request_cancel(job_id)
+    cancelled_here = cancel_job(job_id)
+    logger.info(f"🛑 [API] Cancel requested for job {job_id} (running in this worker: {cancelled_here})")
+    
+    return {
+        "job_id": job_id,
+        "status": "cancelling",
+        "message": f"Cancellation requested. Use GET /job-status/{job_id} to confirm."
+    }
+
+
 @router.get("/job-results/{job_id}")
 async def get_job_results(job_id: str):
     """
-    Get results of a completed background job.
+    Get results of a background job.
+    
+    While the job is processing this returns its latest partial result, if
+    any: ``progress.phase`` is "preview" (keyword categories are provisional),
+    "categorized" or "scored", and ``progress.pending_sections`` lists what
+    is still to be refined. Without a partial result yet it answers 202.
     
     Returns:
         Full pipeline results (same format as /amazon-sales-intelligence endpoint)
@@ -199,6 +442,10 @@ async def get_job_results(job_id: str):
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
     if job_data["status"] == "processing":
+        if job_data.get("result_phase"):
+            partial = JobManager.get_results(job_id)
+            if partial:
+                return partial
         raise HTTPException(
             status_code=202,  # Accepted but not ready
             detail="Job is still processing. Check /job-status/{job_id} for progress."
@@ -210,6 +457,9 @@ async def get_job_results(job_id: str):
             detail=f"Job failed: {job_data.get('error', 'Unknown error')}"
         )
     
+    if job_data["status"] == "cancelled":
+        raise HTTPException(status_code=409, detail=f"Job was cancelled: {job_data.get('message')}")
+    
     # Get results
     results = JobManager.get_results(job_id)
     
@@ -218,3 +468,23 @@ async def get_job_results(job_id: str):
     
     return results
 
+
+@router.get("/job-results/{job_id}/items/{index}")
+async def get_bulk_item_results(job_id: str, index: int):
+    """
+    Get one product's result from a completed bulk job.
+    
+    Returns:
+        Pipeline result for item ``index`` (same format as /amazon-sales-intelligence)
+    """
+    results = await get_job_results(job_id)
+    bulk_items = results.get("items") if isinstance(results, dict) else None
+    if not isinstance(bulk_items, list):
+        raise HTTPException(status_code=400, detail=f"Job {job_id} is not a bulk job")
+    if not 0 <= index < len(bulk_items):
+        raise HTTPException(status_code=404, detail=f"Item {index} not found in job {job_id}")
+    
+    item = bulk_items[index]
+    if item["status"] != "complete":
+        raise HTTPException(status_code=500, detail=f"Item {index} failed: {item.get('error', 'Unknown error')}")
+    return item["result"]
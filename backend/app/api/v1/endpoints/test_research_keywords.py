@@ -6,20 +6,35 @@ and finally generates SEO optimization analysis.
 """
 
 from fastapi import APIRouter, HTTPException, Query, UploadFile, File, Form
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import logging
 import time
 
 from app.core.config import settings
-from app.services.keyword_processing.root_extraction import get_priority_roots_for_search
-from app.local_agents.keyword.subagents.root_extraction_agent import apply_root_extraction_ai
+from app.services.batch_api import BatchPending, current_batch_job
+from app.services.cancellation import JobCancelled, checkpoint
+from app.services.deadline import (
+    Deadline,
+    DegradedSections,
+    current_deadline,
+    current_degraded_sections,
+    deadline_scope,
+    degradation_scope,
+    run_stage,
+)
 from app.services.openai_monitor import monitor
+from app.services.progressive import publish_result
+from app.services.metrics import install_agent_metrics, keyword_near_duplicates, pipeline_requests, stage_duration
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+# Relative share of a deadline's time for each stage's LLM work
+PIPELINE_STAGE_WEIGHTS = {"research": 1.0, "keyword_categorization": 2.0, "scoring": 2.0, "seo": 2.0}
+
+
 @router.post("/amazon-sales-intelligence")
 async def amazon_sales_intelligence_pipeline(
     asin_or_url: str = Form(...),
@@ -27,6 +42,7 @@ async def amazon_sales_intelligence_pipeline(
     main_keyword: Optional[str] = Form(None),
     revenue_csv: Optional[UploadFile] = File(None),
     design_csv: Optional[UploadFile] = File(None),
+    deadline_seconds: Optional[float] = Form(None),
 ):
     """
     Amazon Sales Intelligence Pipeline - Complete AI-powered product analysis and optimization.
@@ -52,8 +68,58 @@ async def amazon_sales_intelligence_pipeline(
     - Market research and competitive analysis  
     - SEO optimization with compliance assurance
     - Data-driven decision making for product strategy
+    
+    ⏱️ **Deadline mode** (``deadline_seconds``):
+    - Answers within the deadline with the best complete result available
+    - Work that would not finish in time switches to the deterministic paths
+      (rule-based categories, default intent, rule-based roots and SEO)
+    - ``deadline`` in the response lists every degraded section and why
+
+    Without a deadline, sections that fell back to their deterministic path
+    (e.g. while the LLM circuit breaker is open) are listed in
+    ``degraded_sections``.
     """
+    deadline = None
+    if deadline_seconds is not None:
+        if deadline_seconds <= 0:
+            pipeline_requests.inc(outcome="rejected")
+            raise HTTPException(status_code=400, detail="deadline_seconds must be positive")
+        deadline = Deadline(
+            deadline_seconds,
+            reserve_seconds=settings.DEADLINE_RESERVE_SECONDS,
+            stage_weights=PIPELINE_STAGE_WEIGHTS,
+        )
+    degraded = deadline.degraded_sections if deadline is not None else DegradedSections()
+    with deadline_scope(deadline), degradation_scope(degraded):
+        return await _run_pipeline(asin_or_url, marketplace, main_keyword, revenue_csv, design_csv)
+
 
+async def _run_pipeline(
+    asin_or_url: str,
+    marketplace: str,
+    main_keyword: Optional[str],
+    revenue_csv: Optional[UploadFile],
+    design_csv: Optional[UploadFile],
+):
+
+    pipeline_start = time.perf_counter()
+    # Agents SDK is imported lazily with the agents; hook its tracing on first run
+    install_agent_metrics()
+    if settings.LLM_CASCADE_ENABLED:
+        from app.services.model_cascade import install_model_cascade
+        install_model_cascade()
+    if settings.LLM_HEDGING_ENABLED:
+        from app.services.hedging import install_hedging
+        install_hedging()
+    if settings.LLM_ADAPTIVE_CONCURRENCY:
+        from app.services.adaptive_concurrency import install_adaptive_concurrency
+        install_adaptive_concurrency()
+    if settings.LLM_CIRCUIT_BREAKER:
+        from app.services.circuit_breaker import install_circuit_breaker
+        install_circuit_breaker()
+    if current_batch_job() is not None:
+        from app.services.batch_model import install_batch_mode
+        install_batch_mode()
     try:
         logger.info("="*80)
         logger.info("🚀 [REQUEST RECEIVED] Amazon Sales Intelligence Pipeline")
@@ -139,19 +205,28 @@ async def amazon_sales_intelligence_pipeline(
             if main_keyword:
                 logger.info(f"🎯 [AUTO-DETECT] Main keyword: {main_keyword}")
 
+        checkpoint("before research")
         # Scrape and run Research Agent
         logger.info("")
         logger.info("📊 [STEP 1/4] RESEARCH AGENT - Product Analysis")
         logger.info(f"   Scraping Amazon listing: {asin_or_url}")
 
         from app.local_agents.research.helper_methods import scrape_amazon_listing
-
-        scrape_result = scrape_amazon_listing(asin_or_url)
+        from app.services.shared_work import shared_call
+
+        # Shared within a bulk job: offline (Batch API) rounds replay the item on the same page
+        scrape_result = shared_call(
+            "scrape",
+            (asin_or_url.strip(), "US", "full"),
+            lambda: scrape_amazon_listing(asin_or_url),
+            cache_if=lambda r: bool(r.get("success")),
+        )
         if not scrape_result.get("success"):
             raise HTTPException(
                 status_code=500, detail=f"Scraping failed: {scrape_result.get('error')}"
             )
         scraped_data = scrape_result.get("data", {})
+        asin = scraped_data.get("asin", asin_or_url)
         logger.info("   ✅ Product scraped successfully")
 
         from app.local_agents.research.runner import ResearchRunner
@@ -160,6 +235,16 @@ async def amazon_sales_intelligence_pipeline(
 
         import asyncio
 
+        def publish_preview(research_math: Dict[str, Any]):
+            """Deterministic preview: every keyword provisionally Relevant, with CSV metrics."""
+            from app.local_agents.keyword.runner import KeywordRunner
+
+            publish_result("preview", lambda: _partial_result(
+                asin, marketplace, research_math["scraped_product"],
+                KeywordRunner.rule_based_items(research_math["base_relevancy_scores"]), {},
+                research_math, revenue_data, design_data,
+            ))
+
         def run_research_agent():
             loop = asyncio.new_event_loop()
             asyncio.set_event_loop(loop)
@@ -170,15 +255,16 @@ async def amazon_sales_intelligence_pipeline(
                     main_keyword=main_keyword,
                     revenue_csv=revenue_data,
                     design_csv=design_data,
+                    on_relevancy_ready=publish_preview,
                 )
             finally:
                 loop.close()
 
-        loop = asyncio.get_event_loop()
-        research_ai_result = await loop.run_in_executor(None, run_research_agent)
+        with stage_duration.time(stage="research"):
+            # Research is required for any result; past its budget it only skips optional LLM calls
+            _, research_ai_result = await run_stage("research", run_research_agent, abandonable=False)
 
         # Extract keyword root analysis from research results
-        keyword_root_analysis = (research_ai_result or {}).get("keyword_root_analysis", {})
         priority_roots = (research_ai_result or {}).get("priority_roots", [])
         total_unique_keywords = (research_ai_result or {}).get("total_unique_keywords", 0)
 
@@ -206,6 +292,26 @@ async def amazon_sales_intelligence_pipeline(
         logger.info(f"   - Product scraped: ✅")
         logger.info("="*80)
 
+        # Near-duplicate variants are labelled from one representative per cluster
+        near_duplicates = None
+        agent_relevancy_scores = base_relevancy_scores
+        if settings.KEYWORD_NEAR_DUP_ENABLED and base_relevancy_scores:
+            from app.local_agents.scoring.subagents import collect_metrics_from_csv
+            from app.services.keyword_processing.near_duplicates import cluster_near_duplicates
+
+            csv_metrics = collect_metrics_from_csv(base_relevancy_scores, revenue_data, design_data)
+            near_duplicates = cluster_near_duplicates(
+                list(base_relevancy_scores),
+                {kw: m.get("search_volume", 0) for kw, m in csv_metrics.items()},
+                threshold=settings.KEYWORD_NEAR_DUP_THRESHOLD,
+            )
+            agent_relevancy_scores = near_duplicates.representative_scores(base_relevancy_scores)
+            logger.info(
+                f"🧬 [NEAR-DUPLICATES] {len(agent_relevancy_scores)} of {len(base_relevancy_scores)} keywords "
+                f"go to the agents ({near_duplicates.removed} labelled from their cluster)"
+            )
+
+        checkpoint("before keyword categorization")
         # Run Keyword Agent
         logger.info("")
         logger.info("="*80)
@@ -218,29 +324,32 @@ async def amazon_sales_intelligence_pipeline(
         logger.info("="*80)
         
         from app.local_agents.keyword.runner import KeywordRunner
+        from app.services.circuit_breaker import CircuitOpenError, llm_circuit_open
         import openai
-        import time
 
         kw_runner = KeywordRunner()
 
         def run_keyword_agent_with_retry(max_retries=3):
             """Run keyword agent with retry on connection errors"""
-            for attempt in range(max_retries):
+            # One extra run, without the LLM, once the circuit breaker opens
+            for attempt in range(max_retries + 1):
                 try:
                     agent_loop = asyncio.new_event_loop()
                     asyncio.set_event_loop(agent_loop)
                     try:
                         result = kw_runner.run_keyword_categorization(
                             scraped_product=scraped_product,
-                            base_relevancy_scores=base_relevancy_scores,
+                            base_relevancy_scores=agent_relevancy_scores,
                             marketplace=marketplace,
                             asin_or_url=asin_or_url,
                         )
                         return result
                     finally:
                         agent_loop.close()
-                except openai.APIConnectionError as e:
-                    if attempt < max_retries - 1:
+                except (openai.APIConnectionError, CircuitOpenError) as e:
+                    if llm_circuit_open() and attempt < max_retries:
+                        logger.warning(f"🔌 OpenAI unavailable (circuit open) - categorizing keywords by rule: {e}")
+                    elif attempt < max_retries - 1:
                         wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
                         logger.warning(f"⚠️ OpenAI connection error (attempt {attempt + 1}/{max_retries}): {e}")
                         logger.info(f"   Retrying in {wait_time}s...")
@@ -252,7 +361,16 @@ async def amazon_sales_intelligence_pipeline(
                     logger.error(f"❌ Keyword agent error: {type(e).__name__}: {e}")
                     raise
 
-        keyword_ai_result = await loop.run_in_executor(None, run_keyword_agent_with_retry)
+        with stage_duration.time(stage="keyword"):
+            _, keyword_ai_result = await run_stage("keyword_categorization", run_keyword_agent_with_retry)
+
+        if near_duplicates is not None and isinstance(keyword_ai_result, dict):
+            structured = keyword_ai_result.setdefault("structured_data", {})
+            structured["items"] = near_duplicates.expand_items(
+                structured.get("items") or [], base_relevancy_scores, structured.setdefault("stats", {})
+            )
+            keyword_ai_result["near_duplicates"] = near_duplicates.summary()
+            keyword_near_duplicates.inc(near_duplicates.removed)
         
         # Extract stats
         if isinstance(keyword_ai_result, dict):
@@ -281,7 +399,13 @@ async def amazon_sales_intelligence_pipeline(
                     logger.info(f"   - ✅ relevancy_score present: {sample_item.get('relevancy_score')}/10")
                 else:
                     logger.warning(f"   - ❌ relevancy_score MISSING!")
+            
+            publish_result("categorized", lambda: _partial_result(
+                asin, marketplace, scraped_product, items, stats,
+                research_ai_result or {}, revenue_data, design_data,
+            ))
 
+        checkpoint("before scoring")
         # Enrich: append intent_score then merge CSV metrics into keyword items
         logger.info("")
         logger.info("📈 [STEP 3/4] SCORING AGENT - Intent & Metrics")
@@ -298,22 +422,27 @@ async def amazon_sales_intelligence_pipeline(
                 # Run scoring/LLM enrichment in a background thread to avoid event loop conflicts
                 def run_scoring_enrichment_with_retry(max_retries=3):
                     """Run scoring enrichment with retry on connection errors"""
-                    for attempt in range(max_retries):
+                    for attempt in range(max_retries + 1):
                         try:
                             loop_inner = asyncio.new_event_loop()
                             asyncio.set_event_loop(loop_inner)
                             try:
+                                # Under a deadline this stage may be abandoned while its thread
+                                # still writes to the items, so each run scores its own copies
+                                stage_items = [dict(it) for it in items] if current_deadline() else items
                                 return ScoringRunner.score_and_enrich(
-                                    items,
+                                    stage_items,
                                     scraped_product=scraped_product,
                                     revenue_csv=revenue_data,
                                     design_csv=design_data,
-                                    base_relevancy_scores=base_relevancy_scores,
+                                    base_relevancy_scores=agent_relevancy_scores,
                                 )
                             finally:
                                 loop_inner.close()
-                        except openai.APIConnectionError as e:
-                            if attempt < max_retries - 1:
+                        except (openai.APIConnectionError, CircuitOpenError) as e:
+                            if llm_circuit_open() and attempt < max_retries:
+                                logger.warning(f"🔌 OpenAI unavailable (circuit open) - scoring with defaults: {e}")
+                            elif attempt < max_retries - 1:
                                 wait_time = 2 ** attempt
                                 logger.warning(f"⚠️ OpenAI connection error in scoring (attempt {attempt + 1}/{max_retries}): {e}")
                                 logger.info(f"   Retrying in {wait_time}s...")
@@ -325,7 +454,8 @@ async def amazon_sales_intelligence_pipeline(
                             logger.error(f"❌ Scoring error: {type(e).__name__}: {e}")
                             raise
 
-                enriched = await loop.run_in_executor(None, run_scoring_enrichment_with_retry)
+                with stage_duration.time(stage="scoring"):
+                    _, enriched = await run_stage("scoring", run_scoring_enrichment_with_retry)
                 # Replace items inside structured_data
                 if isinstance(keyword_ai_result, dict):
                     keyword_ai_result.setdefault("structured_data", {})["items"] = enriched
@@ -341,6 +471,13 @@ async def amazon_sales_intelligence_pipeline(
                         else:
                             logger.error(f"   - ❌ relevancy_score MISSING in final output!")
                             logger.error(f"   - Sample item: {sample_enriched}")
+                    
+                    publish_result("scored", lambda: _partial_result(
+                        asin, marketplace, scraped_product, enriched,
+                        keyword_ai_result["structured_data"].get("stats") or {},
+                        research_ai_result or {}, revenue_data, design_data,
+                        merge_csv_metrics=False,
+                    ))
         except Exception as _enrich_err:
             # Non-fatal: continue with original keyword result if enrichment fails
             logger.warning(f"⚠️  [STEP 3/4] Keyword enrichment skipped: {_enrich_err!s}")
@@ -374,6 +511,7 @@ async def amazon_sales_intelligence_pipeline(
             pass
 
         # Step 4: Run SEO Analysis
+        checkpoint("before seo")
         logger.info("")
         logger.info("🏆 [STEP 4/4] SEO AGENT - Optimization")
         logger.info("   Analyzing current SEO state...")
@@ -394,7 +532,8 @@ async def amazon_sales_intelligence_pipeline(
             try:
                 if keyword_items:
                     from app.local_agents.scoring.subagents.root_relevance_agent import apply_root_filtering_ai
-                    filtered_root_volumes = apply_root_filtering_ai(keyword_items)
+                    with stage_duration.time(stage="root_filtering"):
+                        filtered_root_volumes = apply_root_filtering_ai(keyword_items)
             except Exception as _rr_err:
                 logger.debug(f"Root relevance filtering skipped: {_rr_err!s}")
                 filtered_root_volumes = None
@@ -404,7 +543,7 @@ async def amazon_sales_intelligence_pipeline(
                 
                 def run_seo_analysis_with_retry(max_retries=3):
                     """Run SEO analysis with retry on connection errors"""
-                    for attempt in range(max_retries):
+                    for attempt in range(max_retries + 1):
                         try:
                             loop_inner = asyncio.new_event_loop()
                             asyncio.set_event_loop(loop_inner)
@@ -442,8 +581,10 @@ async def amazon_sales_intelligence_pipeline(
                                 )
                             finally:
                                 loop_inner.close()
-                        except openai.APIConnectionError as e:
-                            if attempt < max_retries - 1:
+                        except (openai.APIConnectionError, CircuitOpenError) as e:
+                            if llm_circuit_open() and attempt < max_retries:
+                                logger.warning(f"🔌 OpenAI unavailable (circuit open) - rule-based SEO: {e}")
+                            elif attempt < max_retries - 1:
                                 wait_time = 2 ** attempt
                                 logger.warning(f"⚠️ OpenAI connection error in SEO (attempt {attempt + 1}/{max_retries}): {e}")
                                 logger.info(f"   Retrying in {wait_time}s...")
@@ -455,7 +596,8 @@ async def amazon_sales_intelligence_pipeline(
                             logger.error(f"❌ SEO error: {type(e).__name__}: {e}")
                             raise
 
-                seo_result = await loop.run_in_executor(None, run_seo_analysis_with_retry)
+                with stage_duration.time(stage="seo"):
+                    _, seo_result = await run_stage("seo", run_seo_analysis_with_retry)
                 
                 if seo_result and seo_result.get("success"):
                     seo_analysis_result = seo_result
@@ -507,55 +649,23 @@ async def amazon_sales_intelligence_pipeline(
                 }
             }
 
-        # Calculate keyword efficiency metrics
-        original_keyword_count = total_unique_keywords
-        priority_roots_count = len(priority_roots)
-        meaningful_roots_count = keyword_root_analysis.get('meaningful_roots', 0)
-        
-        efficiency_metrics = {}
-        if original_keyword_count > 0:
-            efficiency_metrics = {
-                'original_keywords': original_keyword_count,
-                'meaningful_roots': meaningful_roots_count,
-                'priority_roots': priority_roots_count,
-                'reduction_percentage': round((1 - priority_roots_count / original_keyword_count) * 100, 1),
-                'efficiency_gain': f"{round((1 - priority_roots_count / original_keyword_count) * 100, 1)}%",
-                'memory_optimization': f"~{round((1 - priority_roots_count / original_keyword_count) * 100)}% reduction in contextual memory usage",
-                'api_optimization': f"Reduced Amazon search calls from {original_keyword_count} to {priority_roots_count}"
-            }
-
         # Add scraped_product to keyword_ai_result for frontend (contains images)
         if isinstance(keyword_ai_result, dict) and scraped_product:
             keyword_ai_result["scraped_product"] = scraped_product
 
         # Compile the final response with all 4 agent outputs + keyword root analysis
-        response = {
-            "success": True,
-            "asin": scraped_data.get("asin", asin_or_url),
-            "marketplace": marketplace,
-            "ai_analysis_keywords": keyword_ai_result,
-            "seo_analysis": seo_analysis_result,
-            "keyword_root_optimization": {
-                "analysis_summary": {
-                    "total_keywords_processed": original_keyword_count,
-                    "total_roots_identified": keyword_root_analysis.get('total_roots', 0),
-                    "meaningful_roots": meaningful_roots_count,
-                    "priority_roots_selected": priority_roots_count
-                },
-                "efficiency_metrics": efficiency_metrics,
-                "priority_roots": priority_roots,
-                "keyword_categorization": keyword_root_analysis.get('summary', {}),
-                "recommendations": {
-                    "amazon_search_terms": priority_roots[:10],
-                    "optimization_notes": [
-                        f"Process {priority_roots_count} root terms instead of {original_keyword_count} individual keywords",
-                        f"Focus Amazon searches on: {', '.join(priority_roots[:5])}",
-                        f"Achieved {efficiency_metrics.get('reduction_percentage', 0)}% reduction in keyword complexity"
-                    ] if efficiency_metrics else []
-                }
-            },
-            "source": "amazon_sales_intelligence_pipeline",
-        }
+        response = _assemble_response(asin, marketplace, keyword_ai_result, seo_analysis_result, research_ai_result or {})
+        original_keyword_count = total_unique_keywords
+        priority_roots_count = len(priority_roots)
+        efficiency_metrics = response["keyword_root_optimization"]["efficiency_metrics"]
+        
+        deadline = current_deadline()
+        if deadline is not None:
+            response["deadline"] = deadline.report()
+        else:
+            degraded = current_degraded_sections()
+            if degraded is not None and degraded.as_dict():
+                response["degraded_sections"] = degraded.report()
         
         # Final success log with detailed output summary
         logger.info("")
@@ -612,11 +722,21 @@ async def amazon_sales_intelligence_pipeline(
         except Exception as save_err:
             logger.warning(f"Failed to save output file: {save_err}")
 
+        stage_duration.observe(time.perf_counter() - pipeline_start, stage="total")
+        pipeline_requests.inc(outcome="success")
         return response
 
     except HTTPException:
+        pipeline_requests.inc(outcome="rejected")
+        raise
+    except JobCancelled:
+        pipeline_requests.inc(outcome="cancelled")
+        raise
+    except BatchPending:
+        pipeline_requests.inc(outcome="batch_pending")
         raise
     except Exception as e:
+        pipeline_requests.inc(outcome="error")
         logger.error("="*80)
         logger.error("❌ [PIPELINE ERROR] Request failed")
         logger.error(f"   Error type: {type(e).__name__}")
@@ -624,3 +744,101 @@ async def amazon_sales_intelligence_pipeline(
         logger.error("="*80)
         logger.error(f"Full error details: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+def _assemble_response(
+    asin: str,
+    marketplace: str,
+    keyword_ai_result: Any,
+    seo_analysis_result: Optional[Dict[str, Any]],
+    research: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Build the pipeline response body (shared by the final and the partial results).
+
+    Args:
+        asin: Product ASIN
+        marketplace: Marketplace code
+        keyword_ai_result: Keyword categorization result (with scored items)
+        seo_analysis_result: SEO analysis result
+        research: Research result (root analysis, priority roots, keyword count)
+    """
+    keyword_root_analysis = research.get("keyword_root_analysis") or {}
+    priority_roots = research.get("priority_roots") or []
+
+    # Calculate keyword efficiency metrics
+    original_keyword_count = research.get("total_unique_keywords", 0)
+    priority_roots_count = len(priority_roots)
+    meaningful_roots_count = keyword_root_analysis.get('meaningful_roots', 0)
+    
+    efficiency_metrics = {}
+    if original_keyword_count > 0:
+        efficiency_metrics = {
+            'original_keywords': original_keyword_count,
+            'meaningful_roots': meaningful_roots_count,
+            'priority_roots': priority_roots_count,
+            'reduction_percentage': round((1 - priority_roots_count / original_keyword_count) * 100, 1),
+            'efficiency_gain': f"{round((1 - priority_roots_count / original_keyword_count) * 100, 1)}%",
+            'memory_optimization': f"~{round((1 - priority_roots_count / original_keyword_count) * 100)}% reduction in contextual memory usage",
+            'api_optimization': f"Reduced Amazon search calls from {original_keyword_count} to {priority_roots_count}"
+        }
+
+    return {
+        "success": True,
+        "asin": asin,
+        "marketplace": marketplace,
+        "ai_analysis_keywords": keyword_ai_result,
+        "seo_analysis": seo_analysis_result,
+        "keyword_root_optimization": {
+            "analysis_summary": {
+                "total_keywords_processed": original_keyword_count,
+                "total_roots_identified": keyword_root_analysis.get('total_roots', 0),
+                "meaningful_roots": meaningful_roots_count,
+                "priority_roots_selected": priority_roots_count
+            },
+            "efficiency_metrics": efficiency_metrics,
+            "priority_roots": priority_roots,
+            "keyword_categorization": keyword_root_analysis.get('summary', {}),
+            "recommendations": {
+                "amazon_search_terms": priority_roots[:10],
+                "optimization_notes": [
+                    f"Process {priority_roots_count} root terms instead of {original_keyword_count} individual keywords",
+                    f"Focus Amazon searches on: {', '.join(priority_roots[:5])}",
+                    f"Achieved {efficiency_metrics.get('reduction_percentage', 0)}% reduction in keyword complexity"
+                ] if efficiency_metrics else []
+            }
+        },
+        "source": "amazon_sales_intelligence_pipeline",
+    }
+
+
+def _partial_result(
+    asin: str,
+    marketplace: str,
+    scraped_product: Dict[str, Any],
+    items: List[Dict[str, Any]],
+    stats: Dict[str, Any],
+    research: Dict[str, Any],
+    revenue_data: list,
+    design_data: list,
+    merge_csv_metrics: bool = True,
+) -> Dict[str, Any]:
+    """
+    Response-shaped partial result for progressive publishing.
+
+    ``items`` are copied (the pipeline keeps refining them) and get their CSV
+    metrics merged unless they already carry them; SEO holds the deterministic
+    current-listing analysis only.
+    """
+    from app.local_agents.scoring.runner import ScoringRunner
+    from app.local_agents.seo import SEORunner
+
+    items = [dict(it) for it in items]
+    if merge_csv_metrics:
+        items = ScoringRunner.merge_metrics(items, revenue_data, design_data)
+    keyword_result = {
+        "structured_data": {"items": items, "stats": stats},
+        "scraped_product": scraped_product,
+    }
+    seo_result = SEORunner().analyze_current_listing(scraped_product, items)
+    return _assemble_response(asin, marketplace, keyword_result, seo_result, research)
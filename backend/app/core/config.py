@@ -38,7 +38,7 @@ class Settings:
         
         # Multi-Batch Processing Configuration
         self.BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "25"))  # Small batches to prevent timeouts
-        self.MAX_CONCURRENT_BATCHES: int = int(os.getenv("MAX_CONCURRENT_BATCHES", "3"))  # Limit concurrent processing
+        self.MAX_CONCURRENT_BATCHES: int = int(os.getenv("MAX_CONCURRENT_BATCHES", "3"))  # Starting LLM concurrency (adapted by AIMD)
         self.BATCH_TIMEOUT: int = int(os.getenv("BATCH_TIMEOUT", "120"))  # 2 minutes per batch
         self.ENABLE_FALLBACK_PROCESSING: bool = os.getenv("ENABLE_FALLBACK_PROCESSING", "true").lower() == "true"
         
@@ -47,6 +47,9 @@ class Settings:
         self.OPENAI_REQUESTS_PER_SECOND: int = int(os.getenv("OPENAI_REQUESTS_PER_SECOND", "2"))
         self.OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
         self.OPENAI_BASE_RETRY_DELAY: float = float(os.getenv("OPENAI_BASE_RETRY_DELAY", "1.0"))
+        self.OPENAI_TOKENS_PER_MINUTE: int = int(os.getenv("OPENAI_TOKENS_PER_MINUTE", "0"))  # 0 = no token budget
+        # Where the budget is shared: auto (Redis if configured, else file), redis, file (one host), memory (per process)
+        self.RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "auto")
         
         # Monitoring Configuration
         self.ENABLE_OPENAI_MONITORING: bool = os.getenv("ENABLE_OPENAI_MONITORING", "true").lower() == "true"
@@ -58,6 +61,55 @@ class Settings:
         # Recommended: 500-1000 for optimal balance
         self.KEYWORD_BATCH_SIZE: int = int(os.getenv("KEYWORD_BATCH_SIZE", "500"))
 
+        # Near-duplicate clustering (off by default): only one keyword per cluster of
+        # word-order/plural/filler variants goes to the categorization and intent agents
+        self.KEYWORD_NEAR_DUP_ENABLED: bool = os.getenv("KEYWORD_NEAR_DUP_ENABLED", "false").lower() == "true"
+        self.KEYWORD_NEAR_DUP_THRESHOLD: float = float(os.getenv("KEYWORD_NEAR_DUP_THRESHOLD", "0.8"))
+
+        # Keyword pre-classification: own-brand, Spanish and title-phrase keywords
+        # are categorized by rule; only the rest go to the keyword agent
+        self.KEYWORD_PRECLASSIFY_ENABLED: bool = os.getenv("KEYWORD_PRECLASSIFY_ENABLED", "true").lower() == "true"
+
+        # Opportunity detection (scoring step 4): off by default, title_density covers it.
+        # When on, eligible keywords go to the model in concurrent chunks of compact rows.
+        self.ENABLE_OPPORTUNITY_DETECTION: bool = os.getenv("ENABLE_OPPORTUNITY_DETECTION", "false").lower() == "true"
+        self.OPPORTUNITY_CHUNK_SIZE: int = int(os.getenv("OPPORTUNITY_CHUNK_SIZE", "150"))
+        self.OPPORTUNITY_MAX_CONCURRENCY: int = int(os.getenv("OPPORTUNITY_MAX_CONCURRENCY", "8"))
+
+        # Deadline ("anytime") mode: seconds kept back from a request's deadline
+        # for the deterministic fallbacks and response assembly
+        self.DEADLINE_RESERVE_SECONDS: float = float(os.getenv("DEADLINE_RESERVE_SECONDS", "2.0"))
+
+        # Hedged LLM requests (off by default): batch-loop calls slower than the agent's
+        # observed latency quantile are sent again, first answer wins
+        self.LLM_HEDGING_ENABLED: bool = os.getenv("LLM_HEDGING_ENABLED", "false").lower() == "true"
+        self.LLM_HEDGE_QUANTILE: float = float(os.getenv("LLM_HEDGE_QUANTILE", "0.95"))
+        self.LLM_HEDGE_MIN_SAMPLES: int = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.LLM_HEDGE_MIN_DELAY_SECONDS: float = float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "2.0"))
+        self.LLM_HEDGE_BUDGET_RATIO: float = float(os.getenv("LLM_HEDGE_BUDGET_RATIO", "0.1"))  # Hedges per call
+
+        # Adaptive (AIMD) LLM concurrency - starts at MAX_CONCURRENT_BATCHES
+        self.LLM_ADAPTIVE_CONCURRENCY: bool = os.getenv("LLM_ADAPTIVE_CONCURRENCY", "true").lower() == "true"
+        self.LLM_CONCURRENCY_MIN: int = int(os.getenv("LLM_CONCURRENCY_MIN", "1"))
+        self.LLM_CONCURRENCY_MAX: int = int(os.getenv("LLM_CONCURRENCY_MAX", "16"))
+        self.LLM_OVERLOAD_RETRIES: int = int(os.getenv("LLM_OVERLOAD_RETRIES", "0"))  # Limiter retries of a 429/timeout; for clients with max_retries=0
+
+        # LLM circuit breaker - fail fast to deterministic paths during an outage
+        self.LLM_CIRCUIT_BREAKER: bool = os.getenv("LLM_CIRCUIT_BREAKER", "true").lower() == "true"
+        self.LLM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))  # Outage errors in a row
+        self.LLM_CIRCUIT_RESET_SECONDS: float = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))  # Open time before a probe
+
+        # Model cascade (off by default): classification agents answer with the fast model
+        # first and escalate unsure or schema-breaking output to their own model
+        self.LLM_CASCADE_ENABLED: bool = os.getenv("LLM_CASCADE_ENABLED", "false").lower() == "true"
+        self.LLM_CASCADE_FAST_MODEL: str = os.getenv("LLM_CASCADE_FAST_MODEL", "gpt-5-nano-2025-08-07")
+        self.LLM_CASCADE_MIN_CONFIDENCE: float = float(os.getenv("LLM_CASCADE_MIN_CONFIDENCE", "0.7"))
+
+        # SEO compliance optimizer: title and each bullet are generated by concurrent
+        # calls and reconciled locally (false: one call writes the whole listing)
+        self.SEO_PARALLEL_SECTIONS: bool = os.getenv("SEO_PARALLEL_SECTIONS", "true").lower() == "true"
+        self.SEO_SECTION_CONCURRENCY: int = int(os.getenv("SEO_SECTION_CONCURRENCY", "6"))  # Section calls at once
+
         # Logging Configuration
         self.LOG_LEVEL: str = os.getenv("LOG_LEVEL", "WARNING")  # Changed from INFO to WARNING
         self.DEBUG_MODE: bool = os.getenv("DEBUG_MODE", "false").lower() == "true"
@@ -74,6 +126,17 @@ class Settings:
         self.USE_REDIS_FOR_JOBS: bool = os.getenv("USE_REDIS_FOR_JOBS", "true").lower() == "true"
         self.JOB_TTL_HOURS: int = int(os.getenv("JOB_TTL_HOURS", "24"))  # Job data expires after 24 hours
 
+        # Bulk Analysis Configuration
+        self.BULK_MAX_ITEMS: int = int(os.getenv("BULK_MAX_ITEMS", "50"))  # Products per bulk job
+        self.BULK_MAX_CONCURRENCY: int = int(os.getenv("BULK_MAX_CONCURRENCY", "2"))  # Pipeline runs at once per bulk job
+
+        # Offline bulk mode: keyword, intent and root relevance calls of a bulk job are
+        # sent through the OpenAI Batch API in rounds instead of synchronously
+        self.BATCH_API_COMPLETION_WINDOW: str = os.getenv("BATCH_API_COMPLETION_WINDOW", "24h")
+        self.BATCH_API_POLL_SECONDS: float = float(os.getenv("BATCH_API_POLL_SECONDS", "60"))
+        self.BATCH_API_MAX_ROUNDS: int = int(os.getenv("BATCH_API_MAX_ROUNDS", "6"))  # Batches per bulk job
+        self.BATCH_API_STATE_DIR: str = os.getenv("BATCH_API_STATE_DIR", "batch_runs")  # Saved answers, to resume a run
+
     def reload(self) -> None:
         """Reload settings from environment (and .env if changed)."""
         load_dotenv(find_dotenv(), override=True)
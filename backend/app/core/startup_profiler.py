@@ -0,0 +1,144 @@
+"""
+Startup profiler - import and lazy-initialization timings for the API process.
+
+Import cost is measured with ``python -X importtime`` in a clean subprocess;
+lazy components (Redis connections, rate-limiter backends, agents) record
+their first-use init time through ``startup_profiler.record``.
+
+Usage:
+    python -m app.core.startup_profiler            # import breakdown for app.main
+    python -m app.core.startup_profiler --warm     # plus lazy init timings
+"""
+
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ImportTiming:
+    """One line of ``-X importtime`` output (times in seconds)."""
+    module: str
+    self_time: float
+    cumulative: float
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse ``python -X importtime`` stderr into ImportTiming rows."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append(ImportTiming(
+                module=name.strip(),
+                self_time=int(self_us) / 1e6,
+                cumulative=int(cumulative_us) / 1e6,
+                depth=(len(name) - len(name.lstrip())) // 2,
+            ))
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_imports(target: str = "app.main", env: Dict[str, str] = None) -> List[ImportTiming]:
+    """Import ``target`` in a fresh interpreter and return per-module import timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **(env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+class StartupProfiler:
+    """Records how long lazily created components take to initialize."""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.ready_after: float = None
+        self.init_times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def record(self, component: str) -> Iterator[None]:
+        """Time the initialization of ``component`` (first use only is expected)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.init_times[component] = self.init_times.get(component, 0.0) + elapsed
+            logger.info(f"⏱️ [STARTUP] {component} initialized in {elapsed * 1000:.0f}ms")
+
+    def mark_ready(self) -> float:
+        """Note that the app is serving; returns seconds since this module was imported."""
+        self.ready_after = time.perf_counter() - self.started_at
+        logger.info(f"🚀 [STARTUP] API ready in {self.ready_after:.2f}s")
+        return self.ready_after
+
+    def summary(self) -> Dict[str, object]:
+        with self._lock:
+            return {"ready_after": self.ready_after, "init_times": dict(self.init_times)}
+
+
+# Global profiler instance
+startup_profiler = StartupProfiler()
+
+
+def _warm_up() -> Dict[str, float]:
+    """Trigger the lazy components the first pipeline request would create."""
+    # Use the app's profiler instance (this file may be running as __main__)
+    from app.core.startup_profiler import startup_profiler as profiler
+    from app.services.job_manager import JobManager
+    from app.services.openai_rate_limiter import rate_limiter
+
+    JobManager.storage_backend()
+    rate_limiter.backend
+    with profiler.record("agents_sdk"):
+        import app.local_agents.research.agent  # noqa: F401
+    return profiler.summary()["init_times"]
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Report import and init time of the API process")
+    parser.add_argument("--target", default="app.main", help="Module to import")
+    parser.add_argument("--top", type=int, default=20, help="Number of modules to show")
+    parser.add_argument("--warm", action="store_true", help="Also time lazy components (Redis, agents)")
+    args = parser.parse_args(argv)
+
+    rows = profile_imports(args.target)
+    total = max((r.cumulative for r in rows if r.depth == 0 and r.module == args.target), default=0.0)
+    print(f"import {args.target}: {total:.3f}s ({len(rows)} modules)")
+    print(f"{'cumulative':>10} {'self':>8}  module")
+    for row in sorted(rows, key=lambda r: r.cumulative, reverse=True)[:args.top]:
+        print(f"{row.cumulative:>9.3f}s {row.self_time:>7.3f}s  {row.module}")
+
+    if args.warm:
+        sys.path.insert(0, str(BACKEND_DIR))
+        init_times = _warm_up()
+        print("\nlazy init:")
+        for component, seconds in sorted(init_times.items(), key=lambda kv: -kv[1]):
+            print(f"{seconds:>9.3f}s  {component}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
 """Agent orchestration system for keyword research."""
 
-from .research import research_agent, ResearchRunner
-
 __all__ = [
     "research_agent",
     "ResearchRunner"
 ]
+
+
+def __getattr__(name):
+    # Agents import the Agents SDK (slow); load them on first access only
+    if name in __all__:
+        from . import research
+        return getattr(research, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
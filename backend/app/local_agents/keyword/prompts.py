@@ -443,3 +443,41 @@ BASE RELEVANCY (1-10) — keyword->score:
 Return a KeywordAnalysisResult with proper categorization.
 """
 
+
+
+# KeywordRunner batch prompt. Laid out for provider prompt caching: rules that
+# are the same for every job come first, then the job's product context (the
+# same for all its batches); each batch only appends its keywords.
+KEYWORD_BATCH_PROMPT_PREFIX = """
+CRITICAL INSTRUCTIONS:
+1. The product is in the Base Product Form given in PRODUCT CONTEXT below
+2. Keywords describing DIFFERENT forms (powder/slices/whole/liquid) must be marked IRRELEVANT
+3. Keywords describing ATTRIBUTES of the base form can be Design-Specific or Relevant
+4. The product's Brand is given in PRODUCT CONTEXT below - check for it and other brand names
+
+BRAND DETECTION (HIGHEST PRIORITY):
+- Product's own brand: the Brand in PRODUCT CONTEXT
+- ALSO check for competitor brands using these patterns:
+  ✅ Possessive forms: word's (e.g., "levi's", "anthony's")
+  ✅ Multi-word capitalized: "Sunplus Trade", "Fresh Bellies"
+  ✅ Single capitalized proper noun: "Levis", "Nike" (if not first word)
+- When in doubt about whether something is a brand, mark as BRANDED
+- Better to over-detect brands than under-detect
+
+Return a KeywordAnalysisResult with strict categorization following the algorithm in your instructions.
+
+PRODUCT CONTEXT (for categorization):
+- Title: {title}
+- Brand: {brand}
+- Base Product Form: {base_form}
+- Marketplace: {marketplace}
+- ASIN/URL: {asin_or_url}
+
+SCRAPED PRODUCT (full details):
+{scraped_product}
+"""
+
+KEYWORD_BATCH_PROMPT_KEYWORDS = """
+BASE RELEVANCY (1-10) — keyword->score (filtered to exclude score 0):
+{batch_scores}
+"""
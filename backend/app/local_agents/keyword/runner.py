@@ -5,7 +5,15 @@ import logging
 import json
 
 from agents import Runner
+from app.core.config import settings
 from app.local_agents.keyword.agent import keyword_agent
+from app.local_agents.keyword.prompts import KEYWORD_BATCH_PROMPT_KEYWORDS, KEYWORD_BATCH_PROMPT_PREFIX
+from app.services.batch_api import BatchRequestQueued, batch_barrier
+from app.services.cancellation import checkpoint
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+from app.services.metrics import keyword_pre_classified
+from app.services.multi_batch_processor import multi_batch_processor
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,14 @@ class KeywordRunner:
 	  - KeywordAnalysisResult with items (phrase, category, relevancy_score)
 	"""
 
+	@staticmethod
+	def rule_based_items(relevancy_scores: Dict[str, int]) -> List[Dict[str, Any]]:
+		"""Deterministic categorization: every keyword Relevant with its base relevancy."""
+		return [
+			{"phrase": keyword, "category": "Relevant", "relevancy_score": score}
+			for keyword, score in relevancy_scores.items()
+		]
+
 	def run_keyword_categorization(
 		self,
 		scraped_product: Dict[str, Any],
@@ -74,6 +90,7 @@ class KeywordRunner:
 		# Try location 2: Direct brand field
 		if not brand:
 			brand = scraped_product.get("brand", "")
+		metadata_brand = brand  # Not guessed from the title
 		
 		# Try location 3: Extract from title (look for possessive or capitalized words)
 		if not brand:
@@ -143,10 +160,35 @@ class KeywordRunner:
 		logger.info(f"   🗑️  Filtered: {len(base_relevancy_scores) - len(filtered_relevancy_scores)} keywords (score 0)")
 
 		# ========================================================================
-		# BATCH PROCESSING: Split keywords into chunks to prevent truncation
+		# PRE-CLASSIFICATION: Confident cases are labelled without the model
 		# ========================================================================
 		BATCH_SIZE = 75  # Max keywords per AI request (prevents JSON truncation)
-		keyword_list = list(filtered_relevancy_scores.items())
+		agent_relevancy_scores = filtered_relevancy_scores
+		pre_items: List[Dict[str, Any]] = []
+		pre_stats: Dict[str, Dict[str, Any]] = {}
+		pre_by_rule: Dict[str, int] = {}
+		if settings.KEYWORD_PRECLASSIFY_ENABLED:
+			from app.services.keyword_processing.intent import extract_brand_tokens
+			from app.services.keyword_processing.pre_classification import pre_classify_keywords
+
+			pre = pre_classify_keywords(
+				filtered_relevancy_scores,
+				title=title,
+				brand_tokens=extract_brand_tokens(scraped_product),
+				brand=metadata_brand if isinstance(metadata_brand, str) else "",
+			)
+			agent_relevancy_scores = pre.ambiguous
+			pre_items, pre_stats, pre_by_rule = pre.items, pre.stats(), pre.by_rule
+			for rule, count in pre_by_rule.items():
+				keyword_pre_classified.inc(count, rule=rule)
+			logger.info(f"")
+			logger.info(f"🧮 [PRE-CLASSIFICATION] {len(pre_items)} keywords labelled by rule {pre_by_rule}")
+			logger.info(f"   🤖 Left for the AI: {len(agent_relevancy_scores)} keywords")
+
+		# ========================================================================
+		# BATCH PROCESSING: Split keywords into chunks to prevent truncation
+		# ========================================================================
+		keyword_list = list(agent_relevancy_scores.items())
 		total_keywords = len(keyword_list)
 		
 		if total_keywords > BATCH_SIZE:
@@ -156,52 +198,40 @@ class KeywordRunner:
 			logger.info(f"   📦 Batch size: {BATCH_SIZE}")
 			logger.info(f"   🔢 Number of batches: {(total_keywords + BATCH_SIZE - 1) // BATCH_SIZE}")
 		
-		all_items = []
-		combined_stats = {}
+		all_items = list(pre_items)
+		combined_stats = pre_stats
+		# Identical for every batch, so the provider's prompt cache serves it after the first
+		prompt_prefix = KEYWORD_BATCH_PROMPT_PREFIX.format(
+			title=title,
+			brand=brand or "NOT FOUND",
+			base_form=base_form,
+			marketplace=marketplace,
+			asin_or_url=asin_or_url,
+			scraped_product=json.dumps(scraped_product or {}, separators=(',', ':')),
+		)
+		
+		batches = [keyword_list[i:i + BATCH_SIZE] for i in range(0, total_keywords, BATCH_SIZE)]
+		total_batches = len(batches)
 		
-		for batch_idx in range(0, total_keywords, BATCH_SIZE):
-			batch_keywords = dict(keyword_list[batch_idx:batch_idx + BATCH_SIZE])
-			batch_num = (batch_idx // BATCH_SIZE) + 1
-			total_batches = (total_keywords + BATCH_SIZE - 1) // BATCH_SIZE
+		def run_batch(batch_idx: int, batch: List[Any]):
+			"""One KeywordAgent call: (structured output, raw output), or None when the batch is left to the rules."""
+			batch_num = batch_idx + 1
+			checkpoint(f"KeywordAgent batch {batch_num}")
+			if deadline_reached() or llm_circuit_open():
+				return None
 			
 			if total_keywords > BATCH_SIZE:
 				logger.info(f"")
-				logger.info(f"🔄 [BATCH {batch_num}/{total_batches}] Processing {len(batch_keywords)} keywords...")
+				logger.info(f"🔄 [BATCH {batch_num}/{total_batches}] Processing {len(batch)} keywords...")
 			
-			# Build enhanced prompt with explicit product context
-			prompt = f"""
-PRODUCT CONTEXT (for categorization):
-- Title: {title}
-- Brand: {brand or "NOT FOUND"}
-- Base Product Form: {base_form}
-- Marketplace: {marketplace}
-- ASIN/URL: {asin_or_url}
-
-CRITICAL INSTRUCTIONS:
-1. The product is in "{base_form}" form
-2. Keywords describing DIFFERENT forms (powder/slices/whole/liquid) must be marked IRRELEVANT
-3. Keywords describing ATTRIBUTES of "{base_form}" can be Design-Specific or Relevant
-4. Brand is "{brand or 'UNKNOWN'}" - check for this and other brand names
-
-BRAND DETECTION (HIGHEST PRIORITY):
-- Product's own brand: "{brand or 'NOT FOUND'}"
-- ALSO check for competitor brands using these patterns:
-  ✅ Possessive forms: word's (e.g., "levi's", "anthony's")
-  ✅ Multi-word capitalized: "Sunplus Trade", "Fresh Bellies"
-  ✅ Single capitalized proper noun: "Levis", "Nike" (if not first word)
-- When in doubt about whether something is a brand, mark as BRANDED
-- Better to over-detect brands than under-detect
-
-SCRAPED PRODUCT (full details):
-{json.dumps(scraped_product or {}, separators=(',', ':'))}
+			prompt = prompt_prefix + KEYWORD_BATCH_PROMPT_KEYWORDS.format(
+				batch_scores=json.dumps(dict(batch), separators=(',', ':')),
+			)
 
-BASE RELEVANCY (1-10) — keyword->score (filtered to exclude score 0):
-{json.dumps(batch_keywords, separators=(',', ':'))}
-
-Return a KeywordAnalysisResult with strict categorization following the algorithm in your instructions.
-"""
-
-			result = Runner.run_sync(keyword_agent, prompt)
+			try:
+				result = Runner.run_sync(keyword_agent, prompt)
+			except BatchRequestQueued:
+				return {}, None  # Offline run: queue the remaining batches too
 			raw_output = getattr(result, "final_output", None)
 
 			# If SDK returned a Pydantic model
@@ -215,6 +245,24 @@ Return a KeywordAnalysisResult with strict categorization following the algorith
 			if not batch_structured and isinstance(raw_output, dict):
 				batch_structured = raw_output
 			
+			if total_keywords > BATCH_SIZE:
+				logger.info(f"   ✅ Batch {batch_num}/{total_batches} complete ({len(batch_structured.get('items', []))} keywords categorized)")
+			return batch_structured, raw_output
+		
+		# Batches run concurrently on the shared pool (the AIMD limiter decides how many
+		# calls are in flight); results are merged in batch order
+		raw_output = None
+		rule_categorized = 0
+		for batch, outcome in zip(batches, multi_batch_processor.map_batches(batches, run_batch)):
+			if outcome is None:
+				# Started after the deadline or while the LLM circuit was open
+				rule_items = self.rule_based_items(dict(batch))
+				all_items.extend(rule_items)
+				combined_stats.setdefault("Relevant", {"count": 0, "examples": []})["count"] += len(rule_items)
+				rule_categorized += len(rule_items)
+				continue
+			batch_structured, raw_output = outcome
+			
 			# Collect items from this batch
 			if batch_structured and "items" in batch_structured:
 				all_items.extend(batch_structured["items"])
@@ -226,11 +274,19 @@ Return a KeywordAnalysisResult with strict categorization following the algorith
 							combined_stats[category] = {"count": 0, "examples": []}
 						combined_stats[category]["count"] += data.get("count", 0)
 						combined_stats[category]["examples"].extend(data.get("examples", [])[:2])
-			
-			if total_keywords > BATCH_SIZE:
-				logger.info(f"   ✅ Batch {batch_num}/{total_batches} complete ({len(batch_structured.get('items', []))} keywords categorized)")
 		
-		# Combine all batch results
+		if rule_categorized:
+			mark_degraded(
+				"keyword_categorization",
+				f"{rule_categorized}/{total_keywords} keywords categorized by rule (Relevant, base relevancy)",
+			)
+		
+		batch_barrier("KeywordAgent")
+		
+		# Combine all batch results, in input order
+		if pre_items:
+			position = {kw: i for i, kw in enumerate(filtered_relevancy_scores)}
+			all_items.sort(key=lambda it: position.get(str(it.get("phrase") or "").strip().lower(), len(position)))
 		structured = {
 			"product_context": scraped_product,
 			"items": all_items,
@@ -298,14 +354,7 @@ Return a KeywordAnalysisResult with strict categorization following the algorith
 		if not structured or "items" not in structured:
 			logger.warning("Keyword agent output not in expected format, creating fallback")
 			structured = {
-				"items": [
-					{
-						"phrase": keyword,
-						"category": "Relevant",
-						"relevancy_score": score
-					}
-					for keyword, score in filtered_relevancy_scores.items()
-				],
+				"items": self.rule_based_items(filtered_relevancy_scores),
 				"stats": {
 					"Relevant": {"count": len(filtered_relevancy_scores)},
 					"Design-Specific": {"count": 0},
@@ -324,5 +373,12 @@ Return a KeywordAnalysisResult with strict categorization following the algorith
 		return {
 			"structured_data": structured,
 			"source": "keyword_agent",
-			"total_keywords": len(filtered_relevancy_scores)
+			"total_keywords": len(filtered_relevancy_scores),
+			"pre_classification": {
+				"resolved": len(pre_items),
+				"by_rule": pre_by_rule,
+				"llm_keywords": total_keywords,
+				"llm_batches": (total_keywords + BATCH_SIZE - 1) // BATCH_SIZE,
+				"llm_batches_without": (len(filtered_relevancy_scores) + BATCH_SIZE - 1) // BATCH_SIZE,
+			},
 		}
\ No newline at end of file
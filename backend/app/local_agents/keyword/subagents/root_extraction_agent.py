@@ -11,6 +11,10 @@ from openai.types.shared.reasoning import Reasoning
 import json
 import logging
 from dataclasses import dataclass, asdict
+from app.services.cancellation import checkpoint
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+from app.services.multi_batch_processor import multi_batch_processor
 
 logger = logging.getLogger(__name__)
 
@@ -265,21 +269,20 @@ def extract_roots_ai(
     combined_category_breakdown = {}
     total_processed = 0
     
-    for batch_idx in range(num_batches):
-        start_idx = batch_idx * BATCH_SIZE
-        end_idx = min(start_idx + BATCH_SIZE, total_keywords)
-        batch_keywords = keyword_list[start_idx:end_idx]
+    batches = [keyword_list[i:i + BATCH_SIZE] for i in range(0, total_keywords, BATCH_SIZE)]
+    
+    def extract_batch(batch_idx: int, batch_keywords: List[str]):
+        """(AI root analysis of one batch or None when it failed, whether the batch was skipped)."""
+        checkpoint(f"RootExtractionAgent batch {batch_idx + 1}")
         batch_label = f"Batch {batch_idx + 1}/{num_batches}"
         
+        if deadline_reached() or llm_circuit_open():
+            return None, True
+        
         if total_keywords > BATCH_SIZE:
             logger.info(f"[RootExtractionAgent] 🔄 {batch_label}: Processing {len(batch_keywords)} keywords")
         
         try:
-            # Rate limiting between batches
-            if batch_idx > 0:
-                import time
-                time.sleep(1)
-            
             # Prepare prompt for this batch
             keywords_json = json.dumps(batch_keywords, indent=2)
             prompt = USER_PROMPT_TEMPLATE.format(
@@ -306,60 +309,80 @@ def extract_roots_ai(
             else:
                 raise Exception("Unexpected AI output format")
             
-            # Merge batch results into combined results
-            if batch_result:
-                # Merge keyword roots
-                batch_roots = batch_result.get("keyword_roots", {})
-                for root_name, root_data in batch_roots.items():
-                    if root_name in combined_keyword_roots:
-                        # Merge existing root - combine variants and update frequency
-                        existing = combined_keyword_roots[root_name]
-                        existing_variants = set(existing.get("variants", []))
-                        new_variants = set(root_data.get("variants", []))
-                        combined_variants = list(existing_variants | new_variants)
-                        
-                        existing["variants"] = combined_variants
-                        existing["frequency"] = existing.get("frequency", 0) + root_data.get("frequency", 0)
-                        existing["consolidation_potential"] = len(combined_variants)
-                        # Keep higher semantic strength
-                        existing["semantic_strength"] = max(
-                            existing.get("semantic_strength", 0),
-                            root_data.get("semantic_strength", 0)
-                        )
-                    else:
-                        # New root
-                        combined_keyword_roots[root_name] = root_data
-                
-                # Merge category breakdown
-                batch_categories = batch_result.get("category_breakdown", {})
-                for category, roots in batch_categories.items():
-                    if category not in combined_category_breakdown:
-                        combined_category_breakdown[category] = []
-                    # Add new roots, avoiding duplicates
-                    existing_roots = set(combined_category_breakdown[category])
-                    for root in roots:
-                        if root not in existing_roots:
-                            combined_category_breakdown[category].append(root)
-                            existing_roots.add(root)
-                
-                total_processed += len(batch_keywords)
-                
-                if total_keywords > BATCH_SIZE:
-                    logger.info(f"[RootExtractionAgent] ✅ {batch_label} complete ({len(batch_roots)} roots extracted)")
-            else:
+            if not batch_result:
                 raise ValueError("Batch parsing failed")
+            return batch_result, False
         
         except Exception as e:
             logger.error(f"[RootExtractionAgent] ❌ {batch_label} failed: {e}")
-            # Fallback: Use programmatic extraction for failed batch
             logger.warning(f"[RootExtractionAgent] ⚠️  {batch_label} using fallback extraction")
+            return None, False
+    
+    # Batches run concurrently on the shared pool (the AIMD limiter decides how many
+    # calls are in flight); results are merged in batch order
+    rule_keywords: List[str] = []
+    for batch_idx, (batch_keywords, (batch_result, skipped)) in enumerate(zip(batches, multi_batch_processor.map_batches(batches, extract_batch))):
+        batch_label = f"Batch {batch_idx + 1}/{num_batches}"
+        if skipped:
+            # Started after the deadline or while the LLM circuit was open
+            rule_keywords.extend(batch_keywords)
+            continue
+        
+        if batch_result is None:
+            # Fallback: Use programmatic extraction for failed batch
             fallback_result = _create_fallback_root_analysis(batch_keywords)
             fallback_roots = fallback_result.get("keyword_roots", {})
             for root_name, root_data in fallback_roots.items():
                 if root_name not in combined_keyword_roots:
                     combined_keyword_roots[root_name] = root_data
             total_processed += len(batch_keywords)
+            continue
+        
+        # Merge keyword roots
+        batch_roots = batch_result.get("keyword_roots", {})
+        for root_name, root_data in batch_roots.items():
+            if root_name in combined_keyword_roots:
+                # Merge existing root - combine variants and update frequency
+                existing = combined_keyword_roots[root_name]
+                existing_variants = set(existing.get("variants", []))
+                new_variants = set(root_data.get("variants", []))
+                combined_variants = list(existing_variants | new_variants)
+        
+                existing["variants"] = combined_variants
+                existing["frequency"] = existing.get("frequency", 0) + root_data.get("frequency", 0)
+                existing["consolidation_potential"] = len(combined_variants)
+                # Keep higher semantic strength
+                existing["semantic_strength"] = max(
+                    existing.get("semantic_strength", 0),
+                    root_data.get("semantic_strength", 0)
+                )
+            else:
+                # New root
+                combined_keyword_roots[root_name] = root_data
+        
+        # Merge category breakdown
+        batch_categories = batch_result.get("category_breakdown", {})
+        for category, roots in batch_categories.items():
+            if category not in combined_category_breakdown:
+                combined_category_breakdown[category] = []
+            # Add new roots, avoiding duplicates
+            existing_roots = set(combined_category_breakdown[category])
+            for root in roots:
+                if root not in existing_roots:
+                    combined_category_breakdown[category].append(root)
+                    existing_roots.add(root)
+        
+        total_processed += len(batch_keywords)
+        
+        if total_keywords > BATCH_SIZE:
+            logger.info(f"[RootExtractionAgent] ✅ {batch_label} complete ({len(batch_roots)} roots extracted)")
     
+    if rule_keywords:
+        for root_name, root_data in _create_fallback_root_analysis(rule_keywords).get("keyword_roots", {}).items():
+            combined_keyword_roots.setdefault(root_name, root_data)
+        total_processed += len(rule_keywords)
+        mark_degraded("root_extraction", f"{len(rule_keywords)}/{total_keywords} keywords grouped by rule")
+        
     # Build final combined result
     meaningful_roots = sum(1 for root in combined_keyword_roots.values() if root.get("is_meaningful", False))
     reduction_percentage = ((total_keywords - meaningful_roots) / total_keywords * 100) if total_keywords > 0 else 0
@@ -13,10 +13,13 @@ import traceback
 from typing import Dict, Any, List, Tuple, Optional
 from dotenv import load_dotenv, find_dotenv
 
+from app.services.cancellation import run_subprocess
+from app.services.shared_work import shared_call
+
 load_dotenv(find_dotenv())  # Load environment variables from .env file
 
 
-def scrape_amazon_listing(asin_or_url: str, marketplace: str = "US") -> Dict[str, Any]:
+def scrape_amazon_listing(asin_or_url: str, marketplace: str = "US", profile: str = "full") -> Dict[str, Any]:
     """
     Scrape an Amazon product listing using the standalone scraper
     via a separate subprocess to avoid reactor/event loop conflicts.
@@ -24,6 +27,7 @@ def scrape_amazon_listing(asin_or_url: str, marketplace: str = "US") -> Dict[str
     Args:
         asin_or_url: Either an ASIN (e.g., B08KT2Z93D) or full Amazon URL
         marketplace: Target marketplace code (e.g., "US", "UK", "DE")
+        profile: Extraction profile ("full" or "competitor", see extractor.EXTRACTION_PROFILES)
 
     Returns:
         Dict containing scraped data (title, images, A+ content excerpts, reviews, Q&A, price)
@@ -42,10 +46,8 @@ def scrape_amazon_listing(asin_or_url: str, marketplace: str = "US") -> Dict[str
         backend_dir = app_dir.parent
         scraper_script = app_dir / "services" / "amazon" / "standalone_scraper.py"
 
-        result = subprocess.run(
-            [sys.executable, str(scraper_script), url],
-            capture_output=True,
-            text=True,
+        result = run_subprocess(
+            [sys.executable, str(scraper_script), url, profile],
             timeout=120,
             cwd=str(backend_dir),
         )
@@ -223,7 +225,14 @@ def _parse_rating_info(scraped: Dict[str, Any]) -> Tuple[Optional[float], Option
 def scrape_competitors(asins: List[str], *, max_items: int = 10, marketplace: str = "US") -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
     for asin in asins[:max_items]:
-        res = scrape_amazon_listing(asin, marketplace)
+        # Competitors only need title/bullets/price/rating, so skip images, A+ and Q&A.
+        # Inside a bulk job, ASINs shared between products are scraped once.
+        res = shared_call(
+            "scrape",
+            (asin, marketplace, "competitor"),
+            lambda asin=asin: scrape_amazon_listing(asin, marketplace, profile="competitor"),
+            cache_if=lambda r: bool(r.get("success")),
+        )
         item: Dict[str, Any] = {"asin": asin, "success": bool(res.get("success"))}
         if res.get("success"):
             data = res.get("data", {}) or {}
@@ -1,5 +1,5 @@
 from agents import Runner
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 from .agent import research_agent
 from .helper_methods import (
     scrape_amazon_listing, 
@@ -10,6 +10,9 @@ from .helper_methods import (
     deduplicate_keywords_with_scores      # NEW: Deduplicate keywords with scores
 )
 from app.core.config import settings
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+from app.services.shared_work import shared_call
 from app.local_agents.scoring.subagents.intent_agent import USER_PROMPT_TEMPLATE
 from app.services.keyword_processing.root_extraction import get_priority_roots_for_search
 from app.services.keyword_processing.batch_processor import (
@@ -32,6 +35,7 @@ class ResearchRunner:
         main_keyword: Optional[str] = None,
         revenue_csv: Optional[List[Dict[str, Any]]] = None,
         design_csv: Optional[List[Dict[str, Any]]] = None,
+        on_relevancy_ready: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """
         Scrape the Amazon listing and analyze the 5 MVP sources using the agent.
@@ -40,13 +44,20 @@ class ResearchRunner:
             asin_or_url: Amazon ASIN or full product URL
             marketplace: Target marketplace code
             main_keyword: Optional main keyword context
+            on_relevancy_ready: Called with the deterministic results (scraped
+                product, relevancy scores, root analysis) before any model call
 
         Returns:
             Dict with success flag, analysis text, and raw scraped data
         """
 
         # 1) Fetch scraped data via helper with marketplace support
-        scraped_result = scrape_amazon_listing(asin_or_url, marketplace)
+        scraped_result = shared_call(
+            "scrape",
+            (asin_or_url.strip(), marketplace, "full"),
+            lambda: scrape_amazon_listing(asin_or_url, marketplace),
+            cache_if=lambda r: bool(r.get("success")),
+        )
         if not scraped_result.get("success"):
             return {
                 "success": False,
@@ -366,6 +377,15 @@ class ResearchRunner:
         # END OF FILTERING AND DEDUPLICATION
         # ==================================================================================
 
+        if on_relevancy_ready is not None:
+            on_relevancy_ready({
+                "scraped_product": scraped_data,
+                "base_relevancy_scores": base_relevancy,
+                "keyword_root_analysis": keyword_root_analysis,
+                "priority_roots": priority_roots,
+                "total_unique_keywords": len(unique_keywords),
+            })
+
         # Perform AI-powered root extraction for richer analysis context (non-blocking if fails)
         ai_keyword_root_analysis: Dict[str, Any] = {}
         try:
@@ -441,10 +461,15 @@ class ResearchRunner:
             "Do not include any keyword relevancy scoring in your response; the system will attach it.\n"
         )
 
-        # 4) Single agent call
+        # 4) Single agent call (skipped once the request's deadline has passed;
+        #    relevancy and competitor data above do not depend on it)
         try:
-            result = Runner.run_sync(research_agent, prompt)
-            raw_output = getattr(result, "final_output", None)
+            if deadline_reached() or llm_circuit_open():
+                mark_degraded("research_analysis", "listing quality analysis skipped")
+                raw_output = None
+            else:
+                result = Runner.run_sync(research_agent, prompt)
+                raw_output = getattr(result, "final_output", None)
 
             structured: Dict[str, Any] = {}
             final_output_text: Optional[str] = None
@@ -2,6 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 import logging
+from app.services.batch_api import BatchRequestQueued, batch_barrier
+from app.services.cancellation import checkpoint
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+from app.services.multi_batch_processor import multi_batch_processor
 
 logger = logging.getLogger(__name__)
 
@@ -121,24 +126,28 @@ class ScoringRunner:
 			USER_PROMPT_TEMPLATE,
 		)
 		import json as _json
-		import time
 		
-		for batch_idx in range(num_batches):
-			start_idx = batch_idx * BATCH_SIZE
-			end_idx = min(start_idx + BATCH_SIZE, total_items)
-			batch_items = items[start_idx:end_idx]
+		# Serialized once: every batch then starts with the same bytes (provider prompt cache)
+		scraped_json = _json.dumps(scraped_product or {}, separators=(",", ":"))
+		relevancy_json = _json.dumps(base_relevancy_scores or {}, separators=(",", ":"))
+		
+		batches = [items[i:i + BATCH_SIZE] for i in range(0, total_items, BATCH_SIZE)]
+		
+		def score_batch(batch_idx: int, batch_items: List[Dict[str, Any]]):
+			"""Scored items of one batch, or None when the batch is left to the default scores."""
+			checkpoint(f"IntentScoring batch {batch_idx + 1}")
 			batch_label = f"Batch {batch_idx + 1}/{num_batches}"
 			
+			if deadline_reached() or llm_circuit_open():
+				return None
+			
 			logger.info(f"[ScoringRunner] 🔄 {batch_label}: Processing {len(batch_items)} items")
 			
 			try:
-				# Simple rate limiting
-				time.sleep(1)
-				
 				# Run AI intent scoring for this batch
 				prompt = USER_PROMPT_TEMPLATE.format(
-					scraped_product=_json.dumps(scraped_product or {}, separators=(",", ":")),
-					base_relevancy_scores=_json.dumps(base_relevancy_scores or {}, separators=(",", ":")),
+					scraped_product=scraped_json,
+					base_relevancy_scores=relevancy_json,
 					items=_json.dumps(batch_items or [], separators=(",", ":")),
 				)
 				
@@ -182,30 +191,55 @@ class ScoringRunner:
 							else:
 								item["relevancy_score"] = 5
 					
-					all_results.extend(scored)
 					logger.info(f"[ScoringRunner] ✅ {batch_label} complete ({len(scored)} items)")
+					return scored
 				else:
 					# Fallback: Use original items with default scores
 					raise ValueError("Parsing failed")
 					
+			except BatchRequestQueued:
+				return []  # Offline run: answered by the Batch API
 			except Exception as e:
 				logger.error(f"[ScoringRunner] ❌ {batch_label} failed: {e}")
 				# Fallback: Add default scores to failed batch items
-				for item in batch_items:
-					item["intent_score"] = 1  # Default moderate intent
-					if base_relevancy_scores:
-						phrase = item.get("phrase", "").lower().strip()
-						item["relevancy_score"] = base_relevancy_scores.get(phrase, 5)
-					else:
-						item["relevancy_score"] = 5
-				all_results.extend(batch_items)
+				if llm_circuit_open():
+					mark_degraded("intent_scoring", f"{batch_label} got default intent scores (LLM unavailable)")
 				logger.warning(f"[ScoringRunner] ⚠️  {batch_label} used fallback scores")
+				return ScoringRunner._apply_default_intent(batch_items, base_relevancy_scores)
 		
+		# Batches run concurrently on the shared pool (the AIMD limiter decides how many
+		# calls are in flight); results are merged in batch order
+		defaulted = 0
+		for batch_items, scored in zip(batches, multi_batch_processor.map_batches(batches, score_batch)):
+			if scored is None:
+				# Started after the deadline or while the LLM circuit was open
+				scored = ScoringRunner._apply_default_intent(batch_items, base_relevancy_scores)
+				defaulted += len(scored)
+			all_results.extend(scored)
+		if defaulted:
+			mark_degraded("intent_scoring", f"{defaulted}/{total_items} keywords got default intent scores")
+		
+		batch_barrier("IntentScoringSubagent")
 		logger.info(f"[ScoringRunner] ✅ All batches complete: {len(all_results)}/{total_items} items processed")
 		
 		return all_results
 	
 	
+	@staticmethod
+	def _apply_default_intent(
+		items: List[Dict[str, Any]],
+		base_relevancy_scores: Dict[str, int] | None = None,
+	) -> List[Dict[str, Any]]:
+		"""Default scores used when a batch is not scored by the model (moderate intent, base relevancy)."""
+		for item in items:
+			item["intent_score"] = 1  # Default moderate intent
+			if base_relevancy_scores:
+				phrase = item.get("phrase", "").lower().strip()
+				item["relevancy_score"] = base_relevancy_scores.get(phrase, 5)
+			else:
+				item["relevancy_score"] = 5
+		return items
+
 	@staticmethod
 	def _parse_intent_output(output: Any, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
 		"""Parse intent scoring output from LLM."""
@@ -307,7 +341,16 @@ class ScoringRunner:
 		# 	logger.debug(f"[ScoringRunner] Variant optimization skipped: {e}")
 		logger.info(f"[ScoringRunner] Processing all {len(items)} keywords (variant optimization disabled)")
 		# Step 1: Add intent scores and apply alignment
-		aligned_items = ScoringRunner.append_intent_scores(items, scraped_product, base_relevancy_scores)
+		# Near-duplicate members (see keyword_processing.near_duplicates) take their representative's score
+		members = [it for it in items if it.get("near_duplicate_of")]
+		if members:
+			from app.services.keyword_processing.near_duplicates import propagate_intent
+
+			representatives = [it for it in items if not it.get("near_duplicate_of")]
+			scored = ScoringRunner.append_intent_scores(representatives, scraped_product, base_relevancy_scores)
+			aligned_items = propagate_intent(scored, members)
+		else:
+			aligned_items = ScoringRunner.append_intent_scores(items, scraped_product, base_relevancy_scores)
 		
 		# Step 2: Merge CSV metrics (using aligned items)
 		enriched_items = ScoringRunner.merge_metrics(aligned_items, revenue_csv, design_csv)
@@ -315,107 +358,54 @@ class ScoringRunner:
 		# Step 3: Add broad volume calculation if requested
 		if include_broad_volume:
 			try:
-				from app.local_agents.scoring.subagents.broad_volume_agent import calculate_broad_volume
+				from app.local_agents.scoring.subagents.broad_volume_agent import (
+					calculate_broad_volume,
+					calculate_broad_volume_deterministic,
+				)
 				from app.services.keyword_processing.intent import extract_brand_tokens
 				
 				brand_tokens = extract_brand_tokens(scraped_product)
-				broad_volume_result = calculate_broad_volume(
-					enriched_items, 
-					brand_tokens=brand_tokens, 
-					use_llm=True  # Use AI analysis only - no deterministic fallback
-				)
+				if deadline_reached() or llm_circuit_open():
+					broad_volume_result = calculate_broad_volume_deterministic(enriched_items, brand_tokens=brand_tokens)
+					mark_degraded("broad_volume", "roots extracted by rule")
+				else:
+					broad_volume_result = calculate_broad_volume(
+						enriched_items, 
+						brand_tokens=brand_tokens, 
+						use_llm=True  # Use AI analysis only - no deterministic fallback
+					)
 				enriched_items = broad_volume_result.get("items", enriched_items)
 				# Note: filtered root volumes will be computed where they are consumed (API/SEO stage)
 			except Exception as e:
 				logger.warning(f"[ScoringRunner] Broad volume calculation failed in score_and_enrich: {e}")
 		
-		# Step 4: Opportunity detection (AI rules) - DISABLED
-		# REASON: Redundant with existing metrics (title_density already in data)
-		# - Spanish keywords already filtered by category
-		# - Title density metric already shows competitor usage
-		# - Relevancy scoring already ranks quality
-		# - SEO agent makes final inclusion decisions
-		# BENEFIT: Saves 5+ API calls per run, faster processing
-		# To re-enable: Uncomment this block and fix output format ("Yes" -> "Opportunity")
-		logger.info("[OpportunityAgent] ⏭️  Skipped (disabled - title_density metric used instead)")
-		
-		# try:
-		# 	from agents import Runner as _Runner
-		# 	from app.local_agents.scoring.subagents.opportunity_agent import opportunity_agent
-		# 	import json as _json
-		# 	import time
-		# 	
-		# 	# BATCHING: Process in chunks to prevent token limits
-		# 	BATCH_SIZE = 100  # Opportunity detection is lightweight
-		# 	total_items = len(enriched_items)
-		# 	num_batches = (total_items + BATCH_SIZE - 1) // BATCH_SIZE
-		# 	
-		# 	if total_items > BATCH_SIZE:
-		# 		logger.info(f"[OpportunityAgent] 📦 Processing {total_items} items in {num_batches} batch(es) (size: {BATCH_SIZE})")
-		# 	
-		# 	all_updates = []
-		# 	
-		# 	for batch_idx in range(num_batches):
-		# 		start_idx = batch_idx * BATCH_SIZE
-		# 		end_idx = min(start_idx + BATCH_SIZE, total_items)
-		# 		batch_items = enriched_items[start_idx:end_idx]
-		# 		batch_label = f"Batch {batch_idx + 1}/{num_batches}"
-		# 		
-		# 		if total_items > BATCH_SIZE:
-		# 			logger.info(f"[OpportunityAgent] 🔄 {batch_label}: Processing {len(batch_items)} items")
-		# 		
-		# 		try:
-		# 			# Rate limiting between batches
-		# 			if batch_idx > 0:
-		# 				time.sleep(1)
-		# 			
-		# 			opp_prompt = _json.dumps({"items": batch_items}, separators=(",", ":"))
-		# 			opp_res = _Runner.run_sync(opportunity_agent, opp_prompt)
-		# 			opp_out = getattr(opp_res, "final_output", None)
-		# 			
-		# 			batch_updates = None
-		# 			if isinstance(opp_out, str):
-		# 				try:
-		# 					parsed = _json.loads(opp_out.strip())
-		# 					batch_updates = parsed.get("items", parsed if isinstance(parsed, list) else None)
-		# 				except Exception:
-		# 					batch_updates = None
-		# 			elif hasattr(opp_out, "model_dump"):
-		# 				try:
-		# 					parsed = opp_out.model_dump()
-		# 					batch_updates = parsed.get("items", parsed if isinstance(parsed, list) else None)
-		# 				except Exception:
-		# 					batch_updates = None
-		# 			
-		# 			if isinstance(batch_updates, list):
-		# 				all_updates.extend(batch_updates)
-		# 				if total_items > BATCH_SIZE:
-		# 					logger.info(f"[OpportunityAgent] ✅ {batch_label} complete ({len(batch_updates)} items)")
-		# 			else:
-		# 				# No updates for this batch - items will use defaults
-		# 				if total_items > BATCH_SIZE:
-		# 					logger.warning(f"[OpportunityAgent] ⚠️  {batch_label} returned no updates")
-		# 		
-		# 		except Exception as e:
-		# 			logger.error(f"[OpportunityAgent] ❌ {batch_label} failed: {e}")
-		# 			# Continue with other batches
-		# 	
-		# 	# Apply updates by phrase match if available
-		# 	if all_updates:
-		# 		by_phrase = {str((u or {}).get("phrase", "")).strip().lower(): u for u in all_updates}
-		# 		for it in enriched_items:
-		# 			p = str(it.get("phrase", "")).strip().lower()
-		# 			upd = by_phrase.get(p)
-		# 			if isinstance(upd, dict):
-		# 				for k in ("opportunity_decision", "opportunity_reason"):
-		# 					if k in upd:
-		# 						it[k] = upd[k]
-		# 		logger.info(f"[OpportunityAgent] ✅ All batches complete: Annotations applied to {len(by_phrase)} items")
-		# 	else:
-		# 		logger.warning("[OpportunityAgent] No updates received from any batch")
-		# except Exception as e:
-		# 	logger.debug(f"[ScoringRunner] Opportunity subagent skipped: {e}")
-		
+		# Step 4: Opportunity detection (AI rules) - off by default
+		# title_density already covers most of this; when enabled, only compact
+		# projections of eligible items are sent, in concurrent chunks, and the
+		# model returns just the flagged phrases.
+		from app.core.config import settings
+
+		if settings.ENABLE_OPPORTUNITY_DETECTION and (deadline_reached() or llm_circuit_open()):
+			mark_degraded("opportunity_detection", "skipped; title_density covers it")
+		elif settings.ENABLE_OPPORTUNITY_DETECTION:
+			try:
+				from app.local_agents.scoring.subagents.opportunity_agent import (
+					apply_opportunity_flags,
+					detect_opportunities,
+				)
+
+				flags = detect_opportunities(
+					enriched_items,
+					chunk_size=settings.OPPORTUNITY_CHUNK_SIZE,
+					max_concurrency=settings.OPPORTUNITY_MAX_CONCURRENCY,
+				)
+				applied = apply_opportunity_flags(enriched_items, flags)
+				logger.info(f"[OpportunityAgent] ✅ Flagged {applied}/{len(enriched_items)} keywords as opportunities")
+			except Exception as e:
+				logger.warning(f"[ScoringRunner] Opportunity detection skipped: {e}")
+		else:
+			logger.info("[OpportunityAgent] ⏭️  Skipped (disabled - title_density metric used instead)")
+
 		return enriched_items
 
 	def run_full_scoring_analysis(
@@ -578,170 +568,20 @@ class ScoringRunner:
 			keyword_items: List of keyword dictionaries with relevancy_score, intent_score, category
 			
 		Returns:
-			List of keyword dictionaries with aligned scores
+			The same list, with scores aligned in place (changed items get ``_alignment_applied``)
 		"""
 		if not keyword_items:
 			return keyword_items
-			
-		aligned_items = []
-		alignment_count = 0
 		
-		for keyword in keyword_items:
-			# Get current scores
-			original_relevancy = keyword.get('relevancy_score', 0)
-			original_intent = keyword.get('intent_score', 0)
-			category = keyword.get('category', '')
-			phrase = keyword.get('phrase', '')
-			
-			# Create working copy
-			aligned_keyword = keyword.copy()
-			
-			# Rule 1: Category-based alignment
-			# If category is Irrelevant/Branded/Spanish → Force both scores low
-			if category in ['Irrelevant', 'Branded', 'Spanish']:
-				if original_relevancy > 2 or original_intent > 0:
-					aligned_keyword['relevancy_score'] = min(2, original_relevancy)  # Cap at 2/10
-					aligned_keyword['intent_score'] = 0  # Force to 0
-					aligned_keyword['_alignment_applied'] = f"Category {category}: relevancy {original_relevancy}→{aligned_keyword['relevancy_score']}, intent {original_intent}→0"
-					alignment_count += 1
-					
-			# Rule 2: High relevancy but zero intent
-			# If relevancy is very high (8-10) but intent is 0 → Boost intent
-			elif original_relevancy >= 8 and original_intent == 0:
-				aligned_keyword['intent_score'] = 1  # Boost to minimum viable intent
-				aligned_keyword['_alignment_applied'] = f"High market performance: intent {original_intent}→1 (relevancy {original_relevancy})"
-				alignment_count += 1
-				
-			# Rule 3: High intent but very low relevancy  
-			# If intent is high (2-3) but relevancy is very low (0-2) → Boost relevancy
-			elif original_intent >= 2 and original_relevancy <= 2:
-				aligned_keyword['relevancy_score'] = 4  # Boost to moderate relevancy
-				aligned_keyword['_alignment_applied'] = f"High semantic relevance: relevancy {original_relevancy}→4 (intent {original_intent})"
-				alignment_count += 1
-				
-			# Rule 4: Moderate misalignment
-			# If relevancy is high (6-7) but intent is 0 → Small intent boost
-			elif original_relevancy >= 6 and original_intent == 0:
-				aligned_keyword['intent_score'] = 1  # Small boost
-				aligned_keyword['_alignment_applied'] = f"Moderate market performance: intent {original_intent}→1 (relevancy {original_relevancy})"
-				alignment_count += 1
-				
-			aligned_items.append(aligned_keyword)
+		from app.services.keyword_processing.rules import KeywordTable, apply_keyword_rules
 		
-		if alignment_count > 0:
-			logger.info(f"[ScoringRunner] Applied score alignment to {alignment_count}/{len(keyword_items)} keywords")
-			
-		return aligned_items
-
-
-
-		# Step 3: Add broad volume calculation if requested
-
-		if include_broad_volume:
-
-			try:
-
-				from app.local_agents.scoring.subagents.broad_volume_agent import calculate_broad_volume
-
-				from app.services.keyword_processing.intent import extract_brand_tokens
-
-				
-
-				brand_tokens = extract_brand_tokens(scraped_product)
-
-				broad_volume_result = calculate_broad_volume(
-
-					enriched_items, 
-
-					brand_tokens=brand_tokens, 
-
-					use_llm=True  # Use AI analysis only - no deterministic fallback
-
-				)
-
-				enriched_items = broad_volume_result.get("items", enriched_items)
-
-				# Note: filtered root volumes will be computed where they are consumed (API/SEO stage)
-
-			except Exception as e:
-
-				logger.warning(f"[ScoringRunner] Broad volume calculation failed in score_and_enrich: {e}")
-
-		
-
-		# Step 4: Opportunity detection (AI rules) after metrics and (optionally) root assignment
-
-		try:
-
-			from agents import Runner as _Runner
-
-			from app.local_agents.scoring.subagents.opportunity_agent import opportunity_agent
-
-			import json as _json
-
-			opp_prompt = _json.dumps({"items": enriched_items}, separators=(",", ":"))
-
-			opp_res = _Runner.run_sync(opportunity_agent, opp_prompt)
-
-			opp_out = getattr(opp_res, "final_output", None)
-
-			updates = None
-
-			if isinstance(opp_out, str):
-
-				try:
-
-					parsed = _json.loads(opp_out.strip())
-
-					updates = parsed.get("items", parsed if isinstance(parsed, list) else None)
-
-				except Exception:
-
-					updates = None
-
-			elif hasattr(opp_out, "model_dump"):
-
-				try:
-
-					parsed = opp_out.model_dump()
-
-					updates = parsed.get("items", parsed if isinstance(parsed, list) else None)
-
-				except Exception:
-
-					updates = None
-
-			# Apply updates by phrase match if available
-
-			if isinstance(updates, list):
-
-				by_phrase = {str((u or {}).get("phrase", "")).strip().lower(): u for u in updates}
-
-				for it in enriched_items:
-
-					p = str(it.get("phrase", "")).strip().lower()
-
-					upd = by_phrase.get(p)
-
-					if isinstance(upd, dict):
-
-						for k in ("opportunity_decision", "opportunity_reason"):
-
-							if k in upd:
-
-								it[k] = upd[k]
-
-				logger.info("[ScoringRunner] Opportunity annotations applied to items")
-
-		except Exception as e:
-
-			logger.debug(f"[ScoringRunner] Opportunity subagent skipped: {e}")
-
+		# One fused pass over the keyword columns; changed rows are updated in place
+		result = apply_keyword_rules(KeywordTable.from_items(keyword_items), align_scores=True)
 		
-
-		return enriched_items
-
-
+		if result.aligned_count > 0:
+			logger.info(f"[ScoringRunner] Applied score alignment to {result.aligned_count}/{len(keyword_items)} keywords")
+			
+		return keyword_items
 
 	def run_full_scoring_analysis(
 
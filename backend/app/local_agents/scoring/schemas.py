@@ -41,3 +41,16 @@ class ScoringResult(BaseModel):
 	model_config = ConfigDict(extra="forbid")
 	product_context: Dict[str, Any] = Field(default_factory=dict)
 	intent_view: IntentView
+
+
+class OpportunityFlag(BaseModel):
+	model_config = ConfigDict(extra="forbid")
+	phrase: str
+	opportunity_decision: str = Field(..., description="Opportunity or Ignore")
+	opportunity_reason: str
+
+
+class OpportunityFlags(BaseModel):
+	"""Delta-only opportunity output: flagged phrases only."""
+	model_config = ConfigDict(extra="forbid")
+	items: List[OpportunityFlag]
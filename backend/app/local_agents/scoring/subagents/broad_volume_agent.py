@@ -3,6 +3,8 @@ from typing import Any, Dict, List, Set, Optional
 from openai.types.shared.reasoning import Reasoning
 import re
 import logging
+from app.services.cancellation import checkpoint
+from app.services.model_wrappers import model_name
 
 logger = logging.getLogger(__name__)
 
@@ -258,6 +260,7 @@ def _process_broad_volume_batched(
     combined_root_volumes = {}
     
     for batch_idx in range(num_batches):
+        checkpoint(f"BroadVolumeAgent batch {batch_idx + 1}")
         start_idx = batch_idx * batch_size
         end_idx = min(start_idx + batch_size, total_items)
         batch_items = items[start_idx:end_idx]
@@ -495,7 +498,7 @@ def _calculate_broad_volume_direct(
     
     try:
         # Start monitoring
-        monitor.log_request_start("BroadVolumeAgent", request_id, len(items))
+        monitor.log_request_start("BroadVolumeAgent", request_id, len(items), model=model_name(broad_volume_agent.model))
         
         # Apply rate limiting
         import asyncio
@@ -534,7 +537,8 @@ def _calculate_broad_volume_direct(
         parsed_result = _parse_broad_volume_output(output, items)
         
         # Log success
-        monitor.log_success("BroadVolumeAgent", request_id, len(items))
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        monitor.log_success("BroadVolumeAgent", request_id, len(items), tokens=getattr(usage, "total_tokens", None))
         rate_limiter.reset_retry_count(request_id)
         
         logger.info(f"[BroadVolumeAgent] LLM successfully processed {len(parsed_result['items'])} items")
@@ -1,11 +1,27 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
 from agents import Agent
 
+from app.local_agents.scoring.schemas import OpportunityFlags
+
+logger = logging.getLogger(__name__)
+
+# Keywords used in more competitor titles than this are never opportunities
+LOW_TITLE_DENSITY_THRESHOLD = 2
+
+# Categories the rules always ignore, so they are never sent to the model
+IGNORED_CATEGORIES = {"Irrelevant", "Branded", "Spanish"}
+
 
 OPPORTUNITY_INSTRUCTIONS = """
 Role: Apply zero-title-density opportunity rules.
+Input: {"low_threshold": int, "items": [{"phrase", "category", "search_volume", "title_density", "root"}]}
 - If title_density == 0: ignore if irrelevant or derivative/misspelling; else mark as opportunity if volume is decent and root is distinct.
 - If 0 < title_density <= low_threshold and volume is decent: mark as opportunity.
-Return: original items with `opportunity_decision` and `opportunity_reason`.
+Return: ONLY the phrases you mark as opportunity, as {"items": [{"phrase", "opportunity_decision": "Opportunity", "opportunity_reason"}]}.
+Copy each phrase exactly. Do not echo ignored items; return {"items": []} if none qualify.
 """
 
 
@@ -13,4 +29,98 @@ opportunity_agent = Agent(
     name="OpportunitySubagent",
     instructions=OPPORTUNITY_INSTRUCTIONS,
     model="gpt-5-mini-2025-08-07",
+    output_type=OpportunityFlags,
 )
+
+
+def project_for_opportunity(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Compact view of a keyword item with only the fields the rules read.
+
+    Returns None when the rules would ignore the item regardless of the model
+    (ignored category, or title density above the low threshold).
+    """
+    phrase = str(item.get("phrase", "")).strip()
+    if not phrase or item.get("category") in IGNORED_CATEGORIES:
+        return None
+    title_density = item.get("title_density")
+    if title_density is not None and title_density > LOW_TITLE_DENSITY_THRESHOLD:
+        return None
+    return {
+        "phrase": phrase,
+        "category": item.get("category"),
+        "search_volume": item.get("search_volume"),
+        "title_density": title_density,
+        "root": item.get("root"),
+    }
+
+
+def detect_opportunities(
+    items: List[Dict[str, Any]],
+    chunk_size: int = 150,
+    max_concurrency: int = 8,
+) -> Dict[str, Dict[str, str]]:
+    """
+    Run the opportunity rules over compact projections in concurrent chunks.
+
+    Args:
+        items: Enriched keyword items (intent, metrics and root merged)
+        chunk_size: Projected items per model call
+        max_concurrency: Chunks in flight at once
+
+    Returns:
+        Flagged phrases only, keyed by lowercased phrase, each with
+        ``opportunity_decision`` and ``opportunity_reason``
+    """
+    from agents import Runner
+    from app.services.multi_batch_processor import BatchConfig, MultiBatchProcessor
+
+    candidates = [p for p in (project_for_opportunity(it) for it in items) if p is not None]
+    logger.info(f"[OpportunityAgent] {len(candidates)}/{len(items)} keywords eligible after local rules")
+    if not candidates:
+        return {}
+
+    def process_chunk(chunk: List[Dict[str, Any]], batch_id: str) -> List[Dict[str, Any]]:
+        prompt = json.dumps({"low_threshold": LOW_TITLE_DENSITY_THRESHOLD, "items": chunk}, separators=(",", ":"))
+        result = Runner.run_sync(opportunity_agent, prompt)
+        output = getattr(result, "final_output", None)
+        if hasattr(output, "model_dump"):
+            return output.model_dump().get("items", [])
+        if isinstance(output, str):
+            parsed = json.loads(output.strip())
+            return parsed.get("items", []) if isinstance(parsed, dict) else []
+        return []
+
+    def combine(results: List[List[Dict[str, Any]]]) -> Dict[str, Dict[str, str]]:
+        eligible = {c["phrase"].lower() for c in candidates}
+        flags: Dict[str, Dict[str, str]] = {}
+        for chunk_flags in results:
+            for flag in chunk_flags or []:
+                key = str(flag.get("phrase", "")).strip().lower()
+                # Drop phrases the model invented or rewrote
+                if key in eligible:
+                    flags[key] = {
+                        "opportunity_decision": flag.get("opportunity_decision", "Opportunity"),
+                        "opportunity_reason": flag.get("opportunity_reason", ""),
+                    }
+        return flags
+
+    processor = MultiBatchProcessor(BatchConfig(
+        batch_size=max(1, chunk_size),
+        max_concurrent_batches=max(1, max_concurrency),
+    ))
+    try:
+        return processor.process_batches(candidates, process_chunk, combine, "OpportunityAgent", "keywords")
+    finally:
+        processor.executor.shutdown(wait=False)
+
+
+def apply_opportunity_flags(items: List[Dict[str, Any]], flags: Dict[str, Dict[str, str]]) -> int:
+    """Merge flags into matching items in place; returns the number of items flagged."""
+    applied = 0
+    for item in items:
+        flag = flags.get(str(item.get("phrase", "")).strip().lower())
+        if flag:
+            item.update(flag)
+            applied += 1
+    return applied
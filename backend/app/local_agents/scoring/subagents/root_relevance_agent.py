@@ -10,6 +10,11 @@ from typing import Dict, List, Any, Optional
 from openai.types.shared.reasoning import Reasoning
 import json
 import logging
+from app.services.batch_api import BatchRequestQueued, batch_barrier
+from app.services.cancellation import checkpoint
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+from app.services.multi_batch_processor import multi_batch_processor
 
 logger = logging.getLogger(__name__)
 
@@ -199,7 +204,6 @@ def analyze_root_relevance_ai(keywords: List[Dict[str, Any]]) -> Dict[str, Any]:
     # Import dependencies
     from agents import Runner as _Runner
     import asyncio
-    import time
     from collections import defaultdict
     
     # Check if event loop exists
@@ -226,20 +230,20 @@ def analyze_root_relevance_ai(keywords: List[Dict[str, Any]]) -> Dict[str, Any]:
     total_volume_before = 0
     total_volume_after = 0
     
-    for batch_idx in range(num_batches):
-        start_idx = batch_idx * BATCH_SIZE
-        end_idx = min(start_idx + BATCH_SIZE, total_keywords)
-        batch_keywords = keywords[start_idx:end_idx]
+    batches = [keywords[i:i + BATCH_SIZE] for i in range(0, total_keywords, BATCH_SIZE)]
+    
+    def analyze_batch(batch_idx: int, batch_keywords: List[Dict[str, Any]]):
+        """(AI analysis of one batch, {} when queued or None when it failed, whether the batch was skipped)."""
+        checkpoint(f"RootRelevanceAgent batch {batch_idx + 1}")
         batch_label = f"Batch {batch_idx + 1}/{num_batches}"
         
+        if deadline_reached() or llm_circuit_open():
+            return None, True
+        
         if total_keywords > BATCH_SIZE:
             logger.info(f"[RootRelevanceAgent] 🔄 {batch_label}: Processing {len(batch_keywords)} keywords")
         
         try:
-            # Rate limiting between batches
-            if batch_idx > 0:
-                time.sleep(1)
-            
             # Prepare prompt for this batch
             keywords_json = json.dumps(batch_keywords, indent=2)
             prompt = USER_PROMPT_TEMPLATE.format(keywords_json=keywords_json)
@@ -262,48 +266,76 @@ def analyze_root_relevance_ai(keywords: List[Dict[str, Any]]) -> Dict[str, Any]:
             else:
                 raise Exception("Unexpected AI output format")
             
-            # Merge batch results into combined results
-            if batch_result:
-                # Merge filtered root volumes
-                batch_volumes = batch_result.get("filtered_root_volumes", {})
-                for root, volume in batch_volumes.items():
-                    combined_root_volumes[root] += volume
-                
-                # Merge root analysis (for detailed breakdown)
-                batch_analysis = batch_result.get("root_volume_analysis", {})
-                for root, analysis in batch_analysis.items():
-                    if root not in combined_root_analysis:
-                        combined_root_analysis[root] = analysis
-                    else:
-                        # Merge analysis for same root from different batches
-                        existing = combined_root_analysis[root]
-                        existing["total_keywords"] = existing.get("total_keywords", 0) + analysis.get("total_keywords", 0)
-                        existing["included_volume"] = existing.get("included_volume", 0) + analysis.get("included_volume", 0)
-                        existing["excluded_volume"] = existing.get("excluded_volume", 0) + analysis.get("excluded_volume", 0)
-                        existing["final_volume"] = existing.get("final_volume", 0) + analysis.get("final_volume", 0)
-                        existing.setdefault("relevant_keywords", []).extend(analysis.get("relevant_keywords", []))
-                        existing.setdefault("irrelevant_keywords", []).extend(analysis.get("irrelevant_keywords", []))
-                
-                # Aggregate summary stats
-                batch_summary = batch_result.get("summary", {})
-                total_volume_before += batch_summary.get("total_volume_before", 0)
-                total_volume_after += batch_summary.get("total_volume_after", 0)
-                
-                if total_keywords > BATCH_SIZE:
-                    logger.info(f"[RootRelevanceAgent] ✅ {batch_label} complete ({len(batch_volumes)} roots analyzed)")
-            else:
+            if not batch_result:
                 raise ValueError("Batch parsing failed")
+            return batch_result, False
         
+        except BatchRequestQueued:
+            return {}, False  # Offline run: answered by the Batch API
         except Exception as e:
             logger.error(f"[RootRelevanceAgent] ❌ {batch_label} failed: {e}")
-            # Fallback: Use programmatic filtering for failed batch
             logger.warning(f"[RootRelevanceAgent] ⚠️  {batch_label} using fallback filtering")
+            return None, False
+    
+    # Batches run concurrently on the shared pool (the AIMD limiter decides how many
+    # calls are in flight); results are merged in batch order
+    rule_keywords: List[Dict[str, Any]] = []
+    for batch_idx, (batch_keywords, (batch_result, skipped)) in enumerate(zip(batches, multi_batch_processor.map_batches(batches, analyze_batch))):
+        batch_label = f"Batch {batch_idx + 1}/{num_batches}"
+        if skipped:
+            # Started after the deadline or while the LLM circuit was open
+            rule_keywords.extend(batch_keywords)
+            continue
+        
+        if batch_result is None:
+            # Fallback: Use programmatic filtering for failed batch
             fallback_result = _create_fallback_analysis(batch_keywords)
             fallback_volumes = fallback_result.get("filtered_root_volumes", {})
             for root, volume in fallback_volumes.items():
                 combined_root_volumes[root] += volume
             total_volume_before += fallback_result.get("summary", {}).get("total_volume_before", 0)
             total_volume_after += fallback_result.get("summary", {}).get("total_volume_after", 0)
+            continue
+        if not batch_result:
+            continue  # Queued for the Batch API
+        
+        # Merge filtered root volumes
+        batch_volumes = batch_result.get("filtered_root_volumes", {})
+        for root, volume in batch_volumes.items():
+            combined_root_volumes[root] += volume
+        
+        # Merge root analysis (for detailed breakdown)
+        batch_analysis = batch_result.get("root_volume_analysis", {})
+        for root, analysis in batch_analysis.items():
+            if root not in combined_root_analysis:
+                combined_root_analysis[root] = analysis
+            else:
+                # Merge analysis for same root from different batches
+                existing = combined_root_analysis[root]
+                existing["total_keywords"] = existing.get("total_keywords", 0) + analysis.get("total_keywords", 0)
+                existing["included_volume"] = existing.get("included_volume", 0) + analysis.get("included_volume", 0)
+                existing["excluded_volume"] = existing.get("excluded_volume", 0) + analysis.get("excluded_volume", 0)
+                existing["final_volume"] = existing.get("final_volume", 0) + analysis.get("final_volume", 0)
+                existing.setdefault("relevant_keywords", []).extend(analysis.get("relevant_keywords", []))
+                existing.setdefault("irrelevant_keywords", []).extend(analysis.get("irrelevant_keywords", []))
+        
+        # Aggregate summary stats
+        batch_summary = batch_result.get("summary", {})
+        total_volume_before += batch_summary.get("total_volume_before", 0)
+        total_volume_after += batch_summary.get("total_volume_after", 0)
+        
+        if total_keywords > BATCH_SIZE:
+            logger.info(f"[RootRelevanceAgent] ✅ {batch_label} complete ({len(batch_volumes)} roots analyzed)")
+    
+    if rule_keywords:
+        fallback_result = _create_fallback_analysis(rule_keywords)
+        for root, volume in fallback_result["filtered_root_volumes"].items():
+            combined_root_volumes[root] += volume
+        total_volume_before += fallback_result["summary"]["total_volume_before"]
+        total_volume_after += fallback_result["summary"]["total_volume_after"]
+        mark_degraded("root_filtering", f"{len(rule_keywords)}/{total_keywords} keywords filtered by rule (Relevant/Design-Specific roots)")
+    
+    batch_barrier("RootRelevanceAgent")
     
     # Build final combined result
     final_result = {
@@ -0,0 +1,183 @@
+"""
+SEO Comparison Engine
+
+Before/after keyword metrics for the SEO stage in linear time.
+
+Each content version is tokenized once into a ``ContentIndex`` (word -> positions,
+plus which neighbouring words are separated only by whitespace). Keywords are
+compiled once into their plural/singular variants, so checking a keyword is a
+few dict lookups instead of a regex scan of the whole listing. Matches are
+identical to ``extract_keywords_from_content``; keywords whose tokens are not
+plain words (hyphens, apostrophes, ...) fall back to its regex matcher.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .helper_methods import match_keyword, plural_variants
+from .schemas import SEOComparison
+
+_WORD_RE = re.compile(r"\w+")
+
+TITLE_LIMIT = 200
+BACKEND_LIMIT = 249
+
+
+class ContentIndex:
+    """One tokenization of a content version."""
+
+    def __init__(self, content: str):
+        self.text = (content or "").lower().strip()
+        self.words: List[str] = []
+        self.runs: List[int] = []  # Words share a run when only whitespace separates them
+        self.positions: Dict[str, List[int]] = {}
+
+        run, last_end = 0, None
+        for m in _WORD_RE.finditer(self.text):
+            if last_end is not None and not self.text[last_end:m.start()].isspace():
+                run += 1
+            self.positions.setdefault(m.group(), []).append(len(self.words))
+            self.words.append(m.group())
+            self.runs.append(run)
+            last_end = m.end()
+
+    def contains(self, keyword: "CompiledKeyword") -> bool:
+        if keyword.tokens is None:
+            return match_keyword(keyword.lower, self.text) is not None
+        if len(keyword.tokens) == 1:
+            return keyword.lower in self.positions
+
+        # Multi-word: any adjacent run of words that are variants of each token
+        first, rest = keyword.tokens[0], keyword.tokens[1:]
+        for variant in first:
+            for start in self.positions.get(variant, ()):
+                end = start + len(rest)
+                if end >= len(self.words) or self.runs[end] != self.runs[start]:
+                    continue
+                if all(self.words[start + i + 1] in options for i, options in enumerate(rest)):
+                    return True
+        return False
+
+
+@dataclass
+class CompiledKeyword:
+    phrase: str
+    lower: str
+    tokens: Optional[Tuple[FrozenSet[str], ...]]  # None -> regex fallback
+
+
+def compile_keywords(phrases: Iterable[str]) -> List[CompiledKeyword]:
+    """
+    Prepare keywords for repeated lookups, in ``extract_keywords_from_content`` order.
+
+    Keywords are sorted longest first and deduplicated case-insensitively, so
+    the same phrase is reported for duplicates as before.
+    """
+    compiled, seen = [], set()
+    for phrase in sorted(phrases, key=len, reverse=True):
+        if not phrase:
+            continue
+        lower = phrase.lower().strip()
+        if lower in seen:
+            continue
+        seen.add(lower)
+        words = lower.split()
+        plain = bool(words) and " ".join(words) == lower and all(_WORD_RE.fullmatch(w) for w in words)
+        if not plain:
+            tokens = None
+        elif len(words) == 1:
+            tokens = (frozenset(words),)
+        else:
+            tokens = tuple(frozenset(plural_variants(w)) for w in words)
+        compiled.append(CompiledKeyword(phrase=phrase, lower=lower, tokens=tokens))
+    return compiled
+
+
+def find_keywords(index: ContentIndex, keywords: List[CompiledKeyword]) -> List[str]:
+    """Phrases present in the indexed content."""
+    if not index.text:
+        return []
+    return [kw.phrase for kw in keywords if index.contains(kw)]
+
+
+def _joined(title: str, bullets: List[str], backend: List[str]) -> str:
+    return " ".join([title] + bullets + [" ".join(backend)])
+
+
+def calculate_comparison_metrics(
+    current: Tuple[str, List[str], List[str]],
+    optimized: Tuple[str, List[str], List[str]],
+    keyword_data: Dict[str, Any],
+) -> SEOComparison:
+    """
+    Before/after coverage, intent coverage, volume capture and character efficiency.
+
+    Args:
+        current: (title, bullets, backend keywords) of the live listing
+        optimized: (title, bullets, backend keywords) of the suggestion
+        keyword_data: Output of ``prepare_keyword_data_for_analysis``
+    """
+    all_keywords = keyword_data.get("relevant_keywords", []) + keyword_data.get("design_keywords", [])
+    phrases = [kw.get("phrase", "") for kw in all_keywords if kw.get("phrase")]
+    phrase_to_volume = {kw.get("phrase", ""): (kw.get("search_volume") or 0) for kw in all_keywords}
+    high_intent_phrases = [kw.get("phrase", "") for kw in keyword_data.get("high_intent_keywords", []) if kw.get("phrase")]
+
+    compiled = compile_keywords(phrases)
+    current_found: Set[str] = set(find_keywords(ContentIndex(_joined(*current)), compiled))
+    opt_found: Set[str] = set(find_keywords(ContentIndex(_joined(*optimized)), compiled))
+
+    total_kw = len(phrases)
+    before_cov = len(current_found)
+    after_cov = len(opt_found)
+    before_pct = round((before_cov / total_kw * 100), 2) if total_kw else 0.0
+    after_pct = round((after_cov / total_kw * 100), 2) if total_kw else 0.0
+    new_added = opt_found - current_found
+
+    before_hi_intent = sum(1 for p in high_intent_phrases if p in current_found)
+    after_hi_intent = sum(1 for p in high_intent_phrases if p in opt_found)
+
+    before_vol = sum(phrase_to_volume.get(p, 0) for p in current_found)
+    after_vol = sum(phrase_to_volume.get(p, 0) for p in opt_found)
+
+    current_title, _, current_backend = current
+    opt_title, _, opt_backend = optimized
+    title_before = len(current_title or "")
+    title_after = len(opt_title or "")
+
+    return SEOComparison(
+        coverage_improvement={
+            "total_keywords": total_kw,
+            "before_covered": before_cov,
+            "after_covered": after_cov,
+            "before_coverage_pct": before_pct,
+            "after_coverage_pct": after_pct,
+            "delta_pct_points": round(after_pct - before_pct, 2),
+            "new_keywords_added": sorted(new_added)[:20],
+        },
+        intent_improvement={
+            "high_intent_total": len(high_intent_phrases),
+            "before_covered": before_hi_intent,
+            "after_covered": after_hi_intent,
+            "delta": max(0, after_hi_intent - before_hi_intent),
+        },
+        volume_improvement={
+            "estimated_volume_before": before_vol,
+            "estimated_volume_after": after_vol,
+            "delta_volume": max(0, after_vol - before_vol),
+        },
+        character_efficiency={
+            "title_limit": TITLE_LIMIT,
+            "title_before": title_before,
+            "title_after": title_after,
+            "title_utilization_before_pct": round((title_before / TITLE_LIMIT) * 100, 1),
+            "title_utilization_after_pct": round((title_after / TITLE_LIMIT) * 100, 1),
+            "backend_limit": BACKEND_LIMIT,
+            "backend_before": len(" ".join(current_backend) if current_backend else ""),
+            "backend_after": len(" ".join(opt_backend) if opt_backend else ""),
+        },
+        summary_metrics={
+            "overall_improvement_score": round(min(10.0, (after_pct - before_pct) / 10 + (after_hi_intent - before_hi_intent) / 2), 2),
+            "priority_recommendations": max(1, min(5, len(new_added) // 4)),
+        },
+    )
@@ -6,12 +6,89 @@ Utility functions for SEO analysis and optimization.
 
 import re
 import logging
-from typing import Dict, List, Any, Tuple, Set
-from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple, Set
 
 logger = logging.getLogger(__name__)
 
 
+def plural_variants(token: str) -> List[str]:
+    """
+    Singular/plural spellings accepted for one keyword token (token first).
+
+    Example: "sponge" -> ["sponge", "sponges", "spongees"], "brushes" -> ["brushes", "brush"]
+    """
+    variants = [token]
+    
+    # Add singular variants
+    if token.endswith('ies') and len(token) > 4:
+        variants.append(token[:-3] + 'y')
+    elif token.endswith('es') and len(token) > 3:
+        variants.append(token[:-2])
+    elif token.endswith('s') and len(token) > 2:
+        variants.append(token[:-1])
+    
+    # Add plural variants
+    if token.endswith('y') and len(token) > 2:
+        variants.append(token[:-1] + 'ies')
+    if not token.endswith('s'):
+        variants.append(token + 's')
+        variants.append(token + 'es')
+    return variants
+
+
+def match_keyword(keyword_lower: str, content_lower: str) -> Optional[str]:
+    """
+    Check one lowercased keyword against lowercased content.
+    
+    Returns:
+        Name of the matching method, or None if the keyword is not present
+    """
+    # ================================================================
+    # METHOD 1: Word-Boundary Match (Fixed - Issue #1)
+    # Use regex word boundaries to prevent false substring matches
+    # Example: "make up sponges foundation" will NOT match "make up blending sponges for foundation"
+    # ================================================================
+    # Use word-boundary regex to match whole phrases only
+    pattern = r'\b' + re.escape(keyword_lower) + r'\b'
+    if re.search(pattern, content_lower):
+        return "Word-boundary match"
+    
+    # ================================================================
+    # METHOD 2: Adjacent Plural/Singular Variations (STRICT)
+    # ================================================================
+    # ONLY match if tokens are DIRECTLY ADJACENT (no words in between)
+    # Example: "makeup sponge" MATCHES "makeup sponges" (adjacent plural) ✅
+    # Example: "beauty sponges" DOES NOT MATCH "beauty blender sponges" (word in between) ❌
+    # ================================================================
+    keyword_tokens = keyword_lower.split()
+    
+    if len(keyword_tokens) > 1:
+        # Build a regex pattern that requires direct adjacency
+        pattern_parts = []
+        
+        for token in keyword_tokens:
+            # Create pattern for this token with plural/singular variants, joined with OR
+            variants = [re.escape(v) for v in plural_variants(token)]
+            pattern_parts.append(f"(?:{'|'.join(variants)})")
+        
+        # Pattern requires tokens to be directly adjacent (only whitespace/punctuation between)
+        # \s+ = one or more whitespace characters
+        adjacent_pattern = r'\b' + r'\s+'.join(pattern_parts) + r'\b'
+        
+        if re.search(adjacent_pattern, content_lower):
+            return "Adjacent variant match"
+            
+    # ================================================================
+    # METHOD 3: Hyphen Variations
+    # ================================================================
+    if '-' in keyword_lower:
+        keyword_no_hyphen = keyword_lower.replace('-', ' ')
+        if keyword_no_hyphen in content_lower and keyword_lower not in content_lower:
+            return "Hyphen variant"
+    
+    return None
+
+
 def extract_keywords_from_content(content: str, keywords_list: List[str], keyword_volumes: Dict[str, int] = None) -> Tuple[List[str], int]:
     """
     Enhanced keyword extraction that finds all keywords present in content.
@@ -53,96 +130,21 @@ def extract_keywords_from_content(content: str, keywords_list: List[str], keywor
         if keyword_lower in found_keywords_set:
             continue
         
-        # ================================================================
-        # METHOD 1: Word-Boundary Match (Fixed - Issue #1)
-        # Use regex word boundaries to prevent false substring matches
-        # Example: "make up sponges foundation" will NOT match "make up blending sponges for foundation"
-        # ================================================================
-        # Use word-boundary regex to match whole phrases only
-        pattern = r'\b' + re.escape(keyword_lower) + r'\b'
-        if re.search(pattern, content_lower):
-            found_keywords.append(keyword)
-            found_keywords_set.add(keyword_lower)
-            
-            # Add volume if available
-            if keyword_volumes and keyword in keyword_volumes:
-                volume = keyword_volumes[keyword]
-                total_volume += volume
-                logger.debug(f"[KEYWORD_EXTRACTION] ✅ Word-boundary match: '{keyword}' (volume: {volume})")
-            else:
-                logger.debug(f"[KEYWORD_EXTRACTION] ✅ Word-boundary match: '{keyword}'")
+        method = match_keyword(keyword_lower, content_lower)
+        if method is None:
+            logger.debug(f"[KEYWORD_EXTRACTION] ❌ Not found: '{keyword}'")
             continue
         
-        # ================================================================
-        # METHOD 2: Adjacent Plural/Singular Variations (STRICT)
-        # ================================================================
-        # ONLY match if tokens are DIRECTLY ADJACENT (no words in between)
-        # Example: "makeup sponge" MATCHES "makeup sponges" (adjacent plural) ✅
-        # Example: "beauty sponges" DOES NOT MATCH "beauty blender sponges" (word in between) ❌
-        # ================================================================
-        keyword_tokens = keyword_lower.split()
+        found_keywords.append(keyword)
+        found_keywords_set.add(keyword_lower)
         
-        if len(keyword_tokens) > 1:
-            # Build a regex pattern that requires direct adjacency
-            pattern_parts = []
-            
-            for token in keyword_tokens:
-                # Create pattern for this token with plural/singular variants
-                variants = [re.escape(token)]
-                
-                # Add singular variants
-                if token.endswith('ies') and len(token) > 4:
-                    variants.append(re.escape(token[:-3] + 'y'))
-                elif token.endswith('es') and len(token) > 3:
-                    variants.append(re.escape(token[:-2]))
-                elif token.endswith('s') and len(token) > 2:
-                    variants.append(re.escape(token[:-1]))
-                
-                # Add plural variants
-                if token.endswith('y') and len(token) > 2:
-                    variants.append(re.escape(token[:-1] + 'ies'))
-                if not token.endswith('s'):
-                    variants.append(re.escape(token + 's'))
-                    variants.append(re.escape(token + 'es'))
-                
-                # Join variants with OR
-                pattern_parts.append(f"(?:{'|'.join(variants)})")
-            
-            # Pattern requires tokens to be directly adjacent (only whitespace/punctuation between)
-            # \s+ = one or more whitespace characters
-            adjacent_pattern = r'\b' + r'\s+'.join(pattern_parts) + r'\b'
-            
-            if re.search(adjacent_pattern, content_lower):
-                found_keywords.append(keyword)
-                found_keywords_set.add(keyword_lower)
-                
-                if keyword_volumes and keyword in keyword_volumes:
-                    volume = keyword_volumes[keyword]
-                    total_volume += volume
-                    logger.debug(f"[KEYWORD_EXTRACTION] ✅ Adjacent variant match: '{keyword}' (volume: {volume})")
-                else:
-                    logger.debug(f"[KEYWORD_EXTRACTION] ✅ Adjacent variant match: '{keyword}'")
-                continue
-                
-        # ================================================================
-        # METHOD 3: Hyphen Variations
-        # ================================================================
-        if '-' in keyword_lower:
-            keyword_no_hyphen = keyword_lower.replace('-', ' ')
-            if keyword_no_hyphen in content_lower and keyword_lower not in content_lower:
-                found_keywords.append(keyword)
-                found_keywords_set.add(keyword_lower)
-                
-                if keyword_volumes and keyword in keyword_volumes:
-                    volume = keyword_volumes[keyword]
-                    total_volume += volume
-                    logger.debug(f"[KEYWORD_EXTRACTION] ✅ Hyphen variant: '{keyword}' (volume: {volume})")
-                else:
-                    logger.debug(f"[KEYWORD_EXTRACTION] ✅ Hyphen variant: '{keyword}'")
-                continue
-        
-        # Not found
-        logger.debug(f"[KEYWORD_EXTRACTION] ❌ Not found: '{keyword}'")
+        # Add volume if available
+        if keyword_volumes and keyword in keyword_volumes:
+            volume = keyword_volumes[keyword]
+            total_volume += volume
+            logger.debug(f"[KEYWORD_EXTRACTION] ✅ {method}: '{keyword}' (volume: {volume})")
+        else:
+            logger.debug(f"[KEYWORD_EXTRACTION] ✅ {method}: '{keyword}'")
     
     logger.info(f"[KEYWORD_EXTRACTION] Found {len(found_keywords)} keywords (volume: {total_volume:,})")
     logger.info(f"[KEYWORD_EXTRACTION] Keywords: {found_keywords[:5]}{'...' if len(found_keywords) > 5 else ''}")
@@ -374,49 +376,11 @@ def prepare_keyword_data_for_analysis(keyword_items: List[Dict[str, Any]]) -> Di
     Returns:
         Organized keyword data for analysis
     """
-    relevant_keywords = []
-    design_keywords = []
-    branded_keywords = []
-    high_intent_keywords = []
-    high_volume_keywords = []
-    
-    # Collect root volumes
-    root_volumes = defaultdict(int)
-    
-    for item in keyword_items:
-        category = item.get("category", "")
-        intent_score = item.get("intent_score", 0)
-        search_volume = item.get("search_volume", 0)
-        root = item.get("root", "")
-        phrase = item.get("phrase", "")
-        
-        # Handle None values safely
-        if search_volume is None:
-            search_volume = 0
-        if intent_score is None:
-            intent_score = 0
-        
-        # FILTER: Only process keywords with actual search volume
-        if search_volume > 0:
-            # Categorize keywords
-            if category == "Relevant":
-                relevant_keywords.append(item)
-            elif category == "Design-Specific":
-                design_keywords.append(item)
-            elif category == "Branded":
-                branded_keywords.append(item)
-                
-            # High intent keywords (score 2-3)
-            if intent_score >= 2:
-                high_intent_keywords.append(item)
-                
-            # High volume keywords (>500 searches)
-            if search_volume > 500:
-                high_volume_keywords.append(item)
-                
-            # Task 13: Use AI agent for root relevance filtering (with programmatic fallback)
-            if root:
-                root_volumes[root] += search_volume  # Collect all volumes first
+    from app.services.keyword_processing.rules import KeywordTable, apply_keyword_rules
+    
+    # FILTER: Only keywords with actual search volume are bucketed (one pass, no copies)
+    rules = apply_keyword_rules(KeywordTable.from_items(keyword_items), align_scores=False)
+    root_volumes = rules.root_volumes
     
     # Apply AI-powered Task 13 filtering after collecting all data
     try:
@@ -426,25 +390,15 @@ def prepare_keyword_data_for_analysis(keyword_items: List[Dict[str, Any]]) -> Di
         logger.info(f"[Task13-AI] Applied AI root filtering: {len(root_volumes)} -> {len(filtered_root_volumes)} roots")
     except Exception as e:
         logger.warning(f"[Task13-AI] AI filtering failed, using programmatic fallback: {e}")
-        # Fallback to programmatic filtering
-        filtered_root_volumes = {}
-        for item in keyword_items:
-            root = item.get("root", "")
-            category = item.get("category", "")
-            search_volume = item.get("search_volume", 0)
-            # Handle None values safely
-            if search_volume is None:
-                search_volume = 0
-            # FILTER: Only process keywords with actual search volume
-            if search_volume > 0 and root and category in ["Relevant", "Design-Specific"]:
-                filtered_root_volumes[root] = filtered_root_volumes.get(root, 0) + search_volume
+        # Fallback to programmatic filtering (computed in the same rules pass)
+        filtered_root_volumes = rules.relevant_root_volumes
     
     return {
-        "relevant_keywords": relevant_keywords,
-        "design_keywords": design_keywords,
-        "branded_keywords": branded_keywords,
-        "high_intent_keywords": high_intent_keywords,
-        "high_volume_keywords": high_volume_keywords,
+        "relevant_keywords": rules.relevant_keywords,
+        "design_keywords": rules.design_keywords,
+        "branded_keywords": rules.branded_keywords,
+        "high_intent_keywords": rules.high_intent_keywords,
+        "high_volume_keywords": rules.high_volume_keywords,
         "root_volumes": filtered_root_volumes,  # Use AI-filtered volumes
         "total_keywords": len(keyword_items)
     }
@@ -0,0 +1,357 @@
+"""
+Amazon Listing Validator
+
+Checks an optimized listing (title, bullets, backend keywords) against the
+Amazon listing rules in a single pass and repairs locally whatever a text
+edit can fix: length overruns, prohibited characters, promotional terms,
+a missing brand or top keyword, duplicated keyword roots, unsupported
+keywords_included claims and the backend byte budget. Violations that need
+new copy are reported as unresolved so that only those sections go back to
+the compliance agent.
+"""
+
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from .helper_methods import extract_keywords_from_content, match_keyword
+
+logger = logging.getLogger(__name__)
+
+TITLE_MAX_CHARS = 200
+BULLET_MAX_CHARS = 256
+BACKEND_MAX_BYTES = 249
+MIN_BULLET_KEYWORDS = 2
+MIN_TITLE_DESIGN_KEYWORDS = 2
+
+# From the title guidelines in the compliance prompt (the characters apply to titles only)
+PROHIBITED_CHARACTERS = "!$?_{}^¬¦"
+PROMOTIONAL_TERMS = ("free shipping", "best seller", "bestseller", "top quality", "best", "sale", "amazing", "great")
+
+_PROHIBITED_RE = re.compile("[" + re.escape(PROHIBITED_CHARACTERS) + "]")
+_PROMOTIONAL_RE = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in PROMOTIONAL_TERMS) + r")\b", re.IGNORECASE)
+_SEPARATORS = " ,-|;:&/"
+
+
+@dataclass
+class ListingViolation:
+    """One broken rule. ``index`` is the bullet number (0-based) for bullet violations."""
+    section: str
+    rule: str
+    detail: str
+    index: Optional[int] = None
+    repaired: bool = False
+
+
+@dataclass
+class ListingReport:
+    """Everything one validation pass found, repaired or left for a rewrite."""
+    violations: List[ListingViolation] = field(default_factory=list)
+
+    def add(self, section: str, rule: str, detail: str, index: Optional[int] = None, repaired: bool = False):
+        self.violations.append(ListingViolation(section, rule, detail, index, repaired))
+
+    @property
+    def repaired(self) -> List[ListingViolation]:
+        return [v for v in self.violations if v.repaired]
+
+    @property
+    def unresolved(self) -> List[ListingViolation]:
+        return [v for v in self.violations if not v.repaired]
+
+    def title_needs_rewrite(self) -> bool:
+        return any(v.section == "title" for v in self.unresolved)
+
+    def bullets_needing_rewrite(self) -> List[int]:
+        return sorted({v.index for v in self.unresolved if v.section == "bullet"})
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "violations": len(self.violations),
+            "repaired_locally": len(self.repaired),
+            "unresolved": [f"{v.section}{'' if v.index is None else f' {v.index + 1}'}: {v.rule}" for v in self.unresolved],
+        }
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _tidy(text: str) -> str:
+    """Collapse the gaps and dangling separators left behind by removals."""
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s+([,;:])", r"\1", text)
+    text = re.sub(r"([,\-|])(\s*[,\-|])+", r"\1", text)
+    return text.strip(_SEPARATORS + " ").strip()
+
+
+def _trim(text: str, limit: int) -> str:
+    """Cut ``text`` to ``limit`` characters at a sentence end, else at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentence_end = cut.rfind(". ")
+    if sentence_end >= limit // 2:
+        return cut[:sentence_end + 1]
+    space = cut.rfind(" ")
+    if space > 0:
+        cut = cut[:space]
+    return _tidy(cut)
+
+
+def _protected_spans(text: str, phrases: List[str]) -> List[Tuple[int, int]]:
+    spans = []
+    for phrase in phrases:
+        if phrase:
+            spans.extend(m.span() for m in re.finditer(r"\b" + re.escape(phrase) + r"\b", text, re.IGNORECASE))
+    return spans
+
+
+def _strip_promotional(text: str, protected: List[str]) -> Tuple[str, List[str]]:
+    """Remove promotional terms, except inside the brand or a research keyword."""
+    spans = _protected_spans(text, protected)
+    removed = []
+
+    def replace(match):
+        if any(start <= match.start() and match.end() <= end for start, end in spans):
+            return match.group(0)
+        removed.append(match.group(0))
+        return ""
+
+    cleaned = _PROMOTIONAL_RE.sub(replace, text)
+    return (_tidy(cleaned), removed) if removed else (text, removed)
+
+
+def _phrases(keywords: Optional[List[Dict[str, Any]]]) -> List[str]:
+    return [kw.get("phrase", "") for kw in keywords or [] if isinstance(kw, dict) and kw.get("phrase")]
+
+
+class ListingValidator:
+    """
+    Validates and repairs a compliance listing in place.
+
+    Args:
+        brand: Brand the title must carry (empty when unknown)
+        title_keywords: Keywords allocated to the title
+        bullet_keywords: Keywords allocated to the bullets
+        backend_keywords: Keywords allocated to the backend
+        design_keywords: Design-specific keywords (two are added to the title when it has room)
+        bullet_count: Number of bullets the listing must have
+    """
+
+    def __init__(
+        self,
+        brand: str = "",
+        title_keywords: Optional[List[Dict[str, Any]]] = None,
+        bullet_keywords: Optional[List[Dict[str, Any]]] = None,
+        backend_keywords: Optional[List[Dict[str, Any]]] = None,
+        design_keywords: Optional[List[Dict[str, Any]]] = None,
+        bullet_count: int = 4,
+    ):
+        self.brand = (brand or "").strip()
+        self.title_keywords = sorted(title_keywords or [], key=lambda x: (x.get("search_volume", 0) or 0), reverse=True)
+        self.design_phrases = _phrases(sorted(design_keywords or [], key=lambda x: (x.get("search_volume", 0) or 0), reverse=True))
+        self.bullet_count = bullet_count
+        # Root deduplication pads a short title from the title's own allocation only
+        self.title_padding = sorted(
+            [kw for kw in (title_keywords or []) + (design_keywords or []) if isinstance(kw, dict)],
+            key=lambda x: (x.get("search_volume", 0) or 0), reverse=True,
+        )
+        self.research_phrases: List[str] = []
+        for phrase in _phrases(title_keywords) + _phrases(bullet_keywords) + _phrases(backend_keywords) + self.design_phrases:
+            if phrase.lower() not in {p.lower() for p in self.research_phrases}:
+                self.research_phrases.append(phrase)
+        self._research_lower: Set[str] = {p.lower() for p in self.research_phrases}
+
+    def validate_and_repair(self, listing: Dict[str, Any]) -> ListingReport:
+        """
+        Check every rule once, repairing in place what can be fixed locally.
+
+        Args:
+            listing: Dict with ``optimized_title``, ``optimized_bullets`` and optionally ``backend_keywords``
+
+        Returns:
+            ListingReport; its unresolved violations need new copy from the model
+        """
+        report = ListingReport()
+        self._check_title(listing, report)
+        self._check_bullets(listing, report)
+        if "backend_keywords" in listing:
+            self._check_backend(listing, report)
+
+        if report.violations:
+            logger.info(
+                f"🧰 [LISTING VALIDATOR] {len(report.violations)} violations: "
+                f"{len(report.repaired)} repaired locally, {len(report.unresolved)} need a rewrite"
+            )
+            for violation in report.unresolved:
+                logger.warning(f"   ⚠️  {violation.section} {'' if violation.index is None else violation.index + 1} {violation.rule}: {violation.detail}")
+        return report
+
+    # ------------------------------------------------------------------ title
+
+    def _check_title(self, listing: Dict[str, Any], report: ListingReport):
+        title = listing.get("optimized_title")
+        if not isinstance(title, dict) or not title.get("content", "").strip():
+            listing["optimized_title"] = title if isinstance(title, dict) else {}
+            report.add("title", "missing", "No title content")
+            return
+
+        content = self._clean_text(title["content"], "title", None, report)
+
+        if self.brand and self.brand.lower() not in content.lower():
+            content = f"{self.brand} {content}"
+            report.add("title", "brand_missing", f"Brand '{self.brand}' prepended", repaired=True)
+
+        if self.title_keywords:
+            top = self.title_keywords[0].get("phrase", "")
+            if top and not match_keyword(top.lower(), content.lower()):
+                content = self._insert_after_brand(content, top.title())
+                report.add("title", "top_keyword_missing", f"'{top}' inserted after the brand", repaired=True)
+
+        deduplicated = self._remove_duplicate_roots(content)
+        if deduplicated != content:
+            report.add("title", "duplicate_roots", f"Redundant keyword phrases removed ({len(content)} → {len(deduplicated)} chars)", repaired=True)
+            content = deduplicated
+
+        # Best effort: design keywords are appended while there is room, they never cost a rewrite
+        if len(self.design_phrases) >= MIN_TITLE_DESIGN_KEYWORDS:
+            appended = self._append_design_keywords(content)
+            if appended != content:
+                report.add("title", "design_keywords_missing", f"Design keywords appended ({len(content)} → {len(appended)} chars)", repaired=True)
+                content = appended
+
+        if len(content) > TITLE_MAX_CHARS:
+            trimmed = _trim(content, TITLE_MAX_CHARS)
+            report.add("title", "too_long", f"{len(content)} → {len(trimmed)} chars", repaired=True)
+            content = trimmed
+
+        missing_top = [p for p in _phrases(self.title_keywords[:5]) if not match_keyword(p.lower(), content.lower())]
+        if len(missing_top) >= 3:
+            report.add("title", "top_keywords_missing", f"{len(missing_top)} of the top 5 title keywords missing: {missing_top}")
+
+        self._set_content(title, content, "title", None, report)
+        title["first_80_chars"] = content[:80]
+
+    def _insert_after_brand(self, content: str, phrase: str) -> str:
+        if self.brand and content.lower().startswith(self.brand.lower()):
+            rest = content[len(self.brand):].strip(_SEPARATORS)
+            return f"{content[:len(self.brand)]} {phrase} - {rest}" if rest else f"{content[:len(self.brand)]} {phrase}"
+        return f"{phrase} - {content}"
+
+    def _append_design_keywords(self, content: str) -> str:
+        """Append missing design keywords (highest volume first) while the title has room for them."""
+        found, _ = extract_keywords_from_content(content, self.design_phrases)
+        for phrase in self.design_phrases:
+            if len(found) >= MIN_TITLE_DESIGN_KEYWORDS:
+                break
+            if phrase in found or len(content) + len(phrase) + 3 > TITLE_MAX_CHARS:
+                continue
+            content = f"{content} | {phrase.title()}"
+            found.append(phrase)
+        return content
+
+    def _remove_duplicate_roots(self, content: str) -> str:
+        from .subagents.amazon_compliance_agent import _remove_duplicate_keyword_roots
+
+        found, _ = extract_keywords_from_content(content, self.research_phrases)
+        try:
+            fixed, _ = _remove_duplicate_keyword_roots(content, found, self.title_padding, self.brand)
+        except Exception as e:
+            logger.error(f"❌ [LISTING VALIDATOR] Root deduplication failed: {e}")
+            return content
+        return fixed
+
+    # ---------------------------------------------------------------- bullets
+
+    def _check_bullets(self, listing: Dict[str, Any], report: ListingReport):
+        bullets = [b for b in listing.get("optimized_bullets") or [] if isinstance(b, dict)]
+        if len(bullets) > self.bullet_count:
+            report.add("bullets", "too_many", f"{len(bullets)} bullets, {self.bullet_count} kept", repaired=True)
+            bullets = bullets[:self.bullet_count]
+        for i in range(len(bullets), self.bullet_count):
+            bullets.append({})
+            report.add("bullet", "missing", f"Bullet {i + 1} of {self.bullet_count} not written", index=i)
+        listing["optimized_bullets"] = bullets
+
+        seen = {}
+        for i, bullet in enumerate(bullets):
+            if not bullet.get("content", "").strip():
+                if bullet:
+                    report.add("bullet", "missing", "Empty bullet content", index=i)
+                continue
+
+            content = self._clean_text(bullet["content"], "bullet", i, report, characters=False)
+            if len(content) > BULLET_MAX_CHARS:
+                trimmed = _trim(content, BULLET_MAX_CHARS)
+                report.add("bullet", "too_long", f"{len(content)} → {len(trimmed)} chars", index=i, repaired=True)
+                content = trimmed
+
+            key = _normalize(content)
+            if key in seen:
+                report.add("bullet", "repeated", f"Repeats bullet {seen[key] + 1}", index=i)
+            seen.setdefault(key, i)
+
+            self._set_content(bullet, content, "bullet", i, report)
+            if len(bullet["keywords_included"]) < MIN_BULLET_KEYWORDS:
+                report.add("bullet", "too_few_keywords", f"{len(bullet['keywords_included'])} keywords (minimum {MIN_BULLET_KEYWORDS})", index=i)
+
+    # ---------------------------------------------------------------- backend
+
+    def _check_backend(self, listing: Dict[str, Any], report: ListingReport):
+        used_text = " ".join(
+            [listing.get("optimized_title", {}).get("content", "")]
+            + [b.get("content", "") for b in listing.get("optimized_bullets", [])]
+        ).lower()
+
+        kept, seen, dropped = [], set(), {"unsupported": [], "in_copy": [], "duplicate": []}
+        for phrase in listing.get("backend_keywords") or []:
+            lower = str(phrase).lower().strip()
+            if lower in seen:
+                dropped["duplicate"].append(phrase)
+            elif self._research_lower and lower not in self._research_lower:
+                dropped["unsupported"].append(phrase)
+            elif lower in used_text:
+                dropped["in_copy"].append(phrase)
+            else:
+                kept.append(phrase)
+                seen.add(lower)
+        for rule, phrases in (("unsupported_keywords", dropped["unsupported"]), ("already_in_copy", dropped["in_copy"]), ("duplicates", dropped["duplicate"])):
+            if phrases:
+                report.add("backend", rule, f"Removed {phrases}", repaired=True)
+
+        within_budget, size = [], 0
+        for phrase in kept:
+            cost = len(phrase.encode("utf-8")) + (1 if within_budget else 0)
+            if size + cost > BACKEND_MAX_BYTES:
+                continue
+            within_budget.append(phrase)
+            size += cost
+        if len(within_budget) < len(kept):
+            report.add("backend", "too_long", f"{len(kept) - len(within_budget)} keywords over the {BACKEND_MAX_BYTES}-byte limit dropped", repaired=True)
+        listing["backend_keywords"] = within_budget
+
+    # ----------------------------------------------------------------- shared
+
+    def _clean_text(self, content: str, section: str, index: Optional[int], report: ListingReport, characters: bool = True) -> str:
+        found = sorted(set(_PROHIBITED_RE.findall(content))) if characters else []
+        if found:
+            content = _tidy(_PROHIBITED_RE.sub(" ", content))
+            report.add(section, "prohibited_characters", f"Removed {''.join(found)}", index=index, repaired=True)
+
+        content, removed = _strip_promotional(content, [self.brand] + self.research_phrases)
+        if removed:
+            report.add(section, "promotional_language", f"Removed {removed}", index=index, repaired=True)
+        return content
+
+    def _set_content(self, item: Dict[str, Any], content: str, section: str, index: Optional[int], report: ListingReport):
+        """Store repaired content with keywords_included and counts taken from the text itself."""
+        claimed = item.get("keywords_included") or []
+        found, _ = extract_keywords_from_content(content, self.research_phrases) if self.research_phrases else (claimed, 0)
+        unsupported = [kw for kw in claimed if kw.lower() not in {f.lower() for f in found}]
+        if unsupported:
+            report.add(section, "unsupported_keywords", f"Not in the text or the research: {unsupported}", index=index, repaired=True)
+        item["content"] = content
+        item["keywords_included"] = found
+        item["character_count"] = len(content)
@@ -19,8 +19,11 @@ from .helper_methods import (
     prepare_keyword_data_for_analysis,
     format_keywords_for_prompt,
     calculate_character_usage,
-    extract_keywords_from_content
 )
+from app.services.circuit_breaker import llm_circuit_open
+from app.services.deadline import deadline_reached, mark_degraded
+
+from .comparison_engine import calculate_comparison_metrics
 from .keyword_validator import SEOKeywordValidator, validate_seo_output_keywords
 from .seo_keyword_filter import validate_and_correct_keywords_included
 from .schemas import (
@@ -110,7 +113,9 @@ class SEORunner:
             
             # Step 4: Task 6 - Analyze competitor titles for benefit-focused optimization
             competitor_analysis = None
-            if competitor_data and len(competitor_data) > 0:
+            if competitor_data and (deadline_reached() or llm_circuit_open()):
+                mark_degraded("competitor_title_analysis", "skipped")
+            elif competitor_data and len(competitor_data) > 0:
                 try:
                     from .subagents.competitor_title_analysis_agent import apply_competitor_title_optimization_ai
                     competitor_analysis = apply_competitor_title_optimization_ai(
@@ -141,12 +146,20 @@ class SEORunner:
             logger.info(f"   ✅ Allocated {len(title_keywords)} title, {len(bullet_keywords)} bullet, {len(backend_keywords)} backend keywords")
             
             # Step 6: Generate AI-powered optimization suggestions
-            logger.info(f"🤖 Generating AI optimization suggestions...")
-            optimized_seo = self._generate_ai_optimizations(
-                current_content, keyword_data, scraped_product, competitor_analysis, keyword_validator,
-                title_keywords, bullet_keywords, backend_keywords, actual_bullet_count
-            )
-            logger.info("🤖 AI optimization suggestions generated")
+            optimization_method = "ai" if self._should_use_ai_optimization() else "rule_based"
+            if deadline_reached() or llm_circuit_open():
+                optimization_method = "rule_based"
+                mark_degraded("seo_optimization", "rule-based title, bullets and backend keywords")
+            if optimization_method == "ai":
+                logger.info(f"🤖 Generating AI optimization suggestions...")
+                optimized_seo = self._generate_ai_optimizations(
+                    current_content, keyword_data, scraped_product, competitor_analysis, keyword_validator,
+                    title_keywords, bullet_keywords, backend_keywords, actual_bullet_count
+                )
+                logger.info("🤖 AI optimization suggestions generated")
+            else:
+                optimized_seo = self._generate_rule_based_optimizations(current_content, keyword_data)
+                logger.info("📐 Rule-based optimization suggestions generated")
             
             # Step 5.5: Validate SEO output to prevent keyword hallucination
             validation_report = validate_seo_output_keywords(optimized_seo.model_dump(), keyword_validator)
@@ -186,7 +199,7 @@ class SEORunner:
                     "total_keywords_analyzed": len(keyword_items),
                     "relevant_keywords_count": len(keyword_data["relevant_keywords"]),
                     "high_intent_keywords_count": len(keyword_data["high_intent_keywords"]),
-                    "optimization_method": "ai" if self._should_use_ai_optimization() else "rule_based"
+                    "optimization_method": optimization_method
                 }
             )
             
@@ -244,7 +257,7 @@ class SEORunner:
                 "summary": {
                     "current_coverage": f"{current_seo.keyword_coverage.coverage_percentage}%",
                     "optimization_opportunities": len(current_seo.keyword_coverage.missing_high_intent),
-                    "method": "ai" if self._should_use_ai_optimization() else "rule_based"
+                    "method": optimization_method
                 }
             }
             
@@ -255,6 +268,52 @@ class SEORunner:
                 "error": f"SEO analysis failed: {str(e)}"
             }
     
+    def analyze_current_listing(
+        self,
+        scraped_product: Dict[str, Any],
+        keyword_items: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        Deterministic current-listing analysis only (no model calls).
+        
+        Used for progressive previews before categorization and optimization
+        finish. Roots are aggregated by the rules pass instead of the AI root filter.
+        
+        Args:
+            scraped_product: Product data from research agent
+            keyword_items: Keywords (provisional categories are fine)
+        
+        Returns:
+            Result shaped like ``run_seo_analysis`` with ``current_seo`` only
+        """
+        from app.services.keyword_processing.rules import KeywordTable, apply_keyword_rules
+        
+        current_content = self._extract_current_content(scraped_product)
+        rules = apply_keyword_rules(KeywordTable.from_items(keyword_items), align_scores=False)
+        keyword_data = {
+            "relevant_keywords": rules.relevant_keywords,
+            "design_keywords": rules.design_keywords,
+            "branded_keywords": rules.branded_keywords,
+            "root_volumes": rules.relevant_root_volumes,
+        }
+        current_seo = self._analyze_current_seo(current_content, keyword_data)
+        return {
+            "success": True,
+            "analysis": {
+                "current_seo": current_seo.model_dump(),
+                "product_context": {
+                    "title": scraped_product.get("title", ""),
+                    "brand": current_content.get("brand", ""),
+                    "category": "Unknown"
+                },
+            },
+            "summary": {
+                "current_coverage": f"{current_seo.keyword_coverage.coverage_percentage}%",
+                "optimization_opportunities": len(current_seo.keyword_coverage.missing_high_intent),
+                "method": "pending"
+            }
+        }
+    
     def _extract_current_content(self, scraped_product: Dict[str, Any]) -> Dict[str, Any]:
         """Extract current listing content from scraped product data."""
         
@@ -591,11 +650,12 @@ class SEORunner:
         title_content = title_data.get("content", "").lower()
         bullet_content = " ".join([b.get("content", "") for b in bullets_data]).lower()
         
-        backend_keywords = []
-        for kw in all_keywords[:15]:  # Top 15
-            phrase = kw.get("phrase", "")
-            if phrase.lower() not in title_content and phrase.lower() not in bullet_content:
-                backend_keywords.append(phrase)
+        backend_keywords = list(compliance_result.get("backend_keywords") or [])  # Reconciled per-section output
+        if not backend_keywords:
+            for kw in all_keywords[:15]:  # Top 15
+                phrase = kw.get("phrase", "")
+                if phrase.lower() not in title_content and phrase.lower() not in bullet_content:
+                    backend_keywords.append(phrase)
         
         # Build strategy explanation
         strategy = compliance_result.get("strategy", {})
@@ -608,7 +668,8 @@ class SEORunner:
                 "amazon_compliance": "ENFORCED",
                 "first_80_optimization": strategy.get("first_80_optimization", "Applied"),
                 "keyword_integration": strategy.get("keyword_integration", "Optimized"),
-                "guideline_compliance": "STRICT"
+                "guideline_compliance": "STRICT",
+                "listing_validation": compliance_result.get("listing_validation", {})
             },
             rationale=(
                 f"Task 7 Amazon Guidelines Compliance Applied: "
@@ -760,9 +821,13 @@ class SEORunner:
         # Task 11: Apply AI-powered variant optimization before generating variations
         try:
             from app.local_agents.scoring.subagents.keyword_variant_agent import apply_variant_optimization_ai
-            # Use AI to remove redundant singular/plural variants from good keywords
-            optimized_keywords = apply_variant_optimization_ai(all_good_keywords)
-            logger.info(f"[Task11-AI] Applied AI variant optimization: {len(all_good_keywords)} -> {len(optimized_keywords)} keywords")
+            if deadline_reached() or llm_circuit_open():
+                mark_degraded("variant_optimization", "skipped; original keywords used")
+                optimized_keywords = all_good_keywords
+            else:
+                # Use AI to remove redundant singular/plural variants from good keywords
+                optimized_keywords = apply_variant_optimization_ai(all_good_keywords)
+                logger.info(f"[Task11-AI] Applied AI variant optimization: {len(all_good_keywords)} -> {len(optimized_keywords)} keywords")
         except Exception as e:
             logger.warning(f"[Task11-AI] AI variant optimization failed, using original keywords: {e}")
             optimized_keywords = all_good_keywords
@@ -852,110 +917,6 @@ class SEORunner:
             rationale=rationale
         )
     
-    def _calculate_comparison_metrics(
-        self, 
-        current_seo: CurrentSEO, 
-        optimized_seo: OptimizedSEO,
-        keyword_data: Dict[str, Any]
-    ) -> SEOComparison:
-        """Calculate before/after comparison metrics from actual content."""
-
-        # Build phrase lists and maps
-        all_keywords = keyword_data.get("relevant_keywords", []) + keyword_data.get("design_keywords", [])
-        phrases = [kw.get("phrase", "") for kw in all_keywords if kw.get("phrase")]
-        phrase_to_volume = {kw.get("phrase", ""): (kw.get("search_volume") or 0) for kw in all_keywords}
-        high_intent_phrases = [kw.get("phrase", "") for kw in keyword_data.get("high_intent_keywords", []) if kw.get("phrase")]
-
-        # Debug logging
-        logger.info(f"📊 [METRICS] Comparison data:")
-        logger.info(f"   Total keywords for comparison: {len(phrases)}")
-        logger.info(f"   High-intent keywords: {len(high_intent_phrases)}")
-
-        # Current content strings
-        current_title = current_seo.title_analysis.content
-        current_bullets = [b.content for b in current_seo.bullets_analysis]
-        current_backend = current_seo.backend_keywords
-        current_text = " ".join([current_title] + current_bullets + [" ".join(current_backend)])
-
-        # Optimized content strings
-        opt_title = optimized_seo.optimized_title.content
-        opt_bullets = [b.content for b in optimized_seo.optimized_bullets]
-        opt_backend = optimized_seo.optimized_backend_keywords
-        opt_text = " ".join([opt_title] + opt_bullets + [" ".join(opt_backend)])
-
-        # Coverage details
-        current_found, _ = extract_keywords_from_content(current_text, phrases)
-        opt_found, _ = extract_keywords_from_content(opt_text, phrases)
-        
-        logger.info(f"   Current content keywords found: {len(current_found)}/{len(phrases)}")
-        logger.info(f"   Optimized content keywords found: {len(opt_found)}/{len(phrases)}")
-
-        total_kw = len(phrases)
-        before_cov = len(set(current_found))
-        after_cov = len(set(opt_found))
-        before_pct = round((before_cov / total_kw * 100), 2) if total_kw else 0.0
-        after_pct = round((after_cov / total_kw * 100), 2) if total_kw else 0.0
-        new_added = [p for p in set(opt_found) if p not in set(current_found)]
-
-        coverage_improvement = {
-            "total_keywords": total_kw,
-            "before_covered": before_cov,
-            "after_covered": after_cov,
-            "before_coverage_pct": before_pct,
-            "after_coverage_pct": after_pct,
-            "delta_pct_points": round(after_pct - before_pct, 2),
-            "new_keywords_added": sorted(new_added)[:20]
-        }
-
-        # Intent coverage
-        before_hi_intent = len([p for p in high_intent_phrases if p in set(current_found)])
-        after_hi_intent = len([p for p in high_intent_phrases if p in set(opt_found)])
-        intent_improvement = {
-            "high_intent_total": len(high_intent_phrases),
-            "before_covered": before_hi_intent,
-            "after_covered": after_hi_intent,
-            "delta": max(0, after_hi_intent - before_hi_intent)
-        }
-
-        # Volume capture (approximate)
-        before_vol = sum(phrase_to_volume.get(p, 0) for p in set(current_found))
-        after_vol = sum(phrase_to_volume.get(p, 0) for p in set(opt_found))
-        volume_improvement = {
-            "estimated_volume_before": before_vol,
-            "estimated_volume_after": after_vol,
-            "delta_volume": max(0, after_vol - before_vol)
-        }
-
-        # Character efficiency
-        title_before = len(current_title or "")
-        title_after = len(opt_title or "")
-        backend_before = len(" ".join(current_backend) if current_backend else "")
-        backend_after = len(" ".join(opt_backend) if opt_backend else "")
-        char_efficiency = {
-            "title_limit": 200,
-            "title_before": title_before,
-            "title_after": title_after,
-            "title_utilization_before_pct": round((title_before / 200) * 100, 1) if 200 else 0,
-            "title_utilization_after_pct": round((title_after / 200) * 100, 1) if 200 else 0,
-            "backend_limit": 249,
-            "backend_before": backend_before,
-            "backend_after": backend_after,
-        }
-
-        # Summary metrics (simple heuristic)
-        summary_metrics = {
-            "overall_improvement_score": round(min(10.0, (after_pct - before_pct) / 10 + (after_hi_intent - before_hi_intent) / 2), 2),
-            "priority_recommendations": max(1, min(5, len(new_added) // 4)),
-        }
-
-        return SEOComparison(
-            coverage_improvement=coverage_improvement,
-            intent_improvement=intent_improvement,
-            volume_improvement=volume_improvement,
-            character_efficiency=char_efficiency,
-            summary_metrics=summary_metrics
-        )
-    
     def _should_use_ai_optimization(self) -> bool:
         """Always use AI optimization (no rule-based fallback)."""
         return True
@@ -1298,9 +1259,13 @@ class SEORunner:
         # Task 11: Apply AI-powered variant optimization before generating variations
         try:
             from app.local_agents.scoring.subagents.keyword_variant_agent import apply_variant_optimization_ai
-            # Use AI to remove redundant singular/plural variants from good keywords
-            optimized_keywords = apply_variant_optimization_ai(all_good_keywords)
-            logger.info(f"[Task11-AI] Applied AI variant optimization: {len(all_good_keywords)} -> {len(optimized_keywords)} keywords")
+            if deadline_reached() or llm_circuit_open():
+                mark_degraded("variant_optimization", "skipped; original keywords used")
+                optimized_keywords = all_good_keywords
+            else:
+                # Use AI to remove redundant singular/plural variants from good keywords
+                optimized_keywords = apply_variant_optimization_ai(all_good_keywords)
+                logger.info(f"[Task11-AI] Applied AI variant optimization: {len(all_good_keywords)} -> {len(optimized_keywords)} keywords")
         except Exception as e:
             logger.warning(f"[Task11-AI] AI variant optimization failed, using original keywords: {e}")
             optimized_keywords = all_good_keywords
@@ -1443,195 +1408,31 @@ class SEORunner:
     
     
     def _calculate_comparison_metrics(
-
         self, 
-
         current_seo: CurrentSEO, 
-
         optimized_seo: OptimizedSEO,
-
         keyword_data: Dict[str, Any]
-
     ) -> SEOComparison:
-
         """Calculate before/after comparison metrics from actual content."""
-
-
-
-        # Build phrase lists and maps
-
-        all_keywords = keyword_data.get("relevant_keywords", []) + keyword_data.get("design_keywords", [])
-
-        phrases = [kw.get("phrase", "") for kw in all_keywords if kw.get("phrase")]
-
-        phrase_to_volume = {kw.get("phrase", ""): (kw.get("search_volume") or 0) for kw in all_keywords}
-        high_intent_phrases = [kw.get("phrase", "") for kw in keyword_data.get("high_intent_keywords", []) if kw.get("phrase")]
-
-
-
-        # Current content strings
-
-        current_title = current_seo.title_analysis.content
-
-        current_bullets = [b.content for b in current_seo.bullets_analysis]
-
-        current_backend = current_seo.backend_keywords
-
-        current_text = " ".join([current_title] + current_bullets + [" ".join(current_backend)])
-
-
-
-        # Optimized content strings
-
-        opt_title = optimized_seo.optimized_title.content
-
-        opt_bullets = [b.content for b in optimized_seo.optimized_bullets]
-
-        opt_backend = optimized_seo.optimized_backend_keywords
-
-        opt_text = " ".join([opt_title] + opt_bullets + [" ".join(opt_backend)])
-
-
-
-        # Coverage details
-
-        current_found, _ = extract_keywords_from_content(current_text, phrases)
-
-        opt_found, _ = extract_keywords_from_content(opt_text, phrases)
-
-
-
-        total_kw = len(phrases)
-
-        before_cov = len(set(current_found))
-
-        after_cov = len(set(opt_found))
-
-        before_pct = round((before_cov / total_kw * 100), 2) if total_kw else 0.0
-
-        after_pct = round((after_cov / total_kw * 100), 2) if total_kw else 0.0
-
-        new_added = [p for p in set(opt_found) if p not in set(current_found)]
-
-
-
-        coverage_improvement = {
-
-            "total_keywords": total_kw,
-
-            "before_covered": before_cov,
-
-            "after_covered": after_cov,
-
-            "before_coverage_pct": before_pct,
-
-            "after_coverage_pct": after_pct,
-
-            "delta_pct_points": round(after_pct - before_pct, 2),
-
-            "new_keywords_added": sorted(new_added)[:20]
-
-        }
-
-
-
-        # Intent coverage
-
-        before_hi_intent = len([p for p in high_intent_phrases if p in set(current_found)])
-
-        after_hi_intent = len([p for p in high_intent_phrases if p in set(opt_found)])
-
-        intent_improvement = {
-
-            "high_intent_total": len(high_intent_phrases),
-
-            "before_covered": before_hi_intent,
-
-            "after_covered": after_hi_intent,
-
-            "delta": max(0, after_hi_intent - before_hi_intent)
-
-        }
-
-
-
-        # Volume capture (approximate)
-
-        before_vol = sum(phrase_to_volume.get(p, 0) for p in set(current_found))
-
-        after_vol = sum(phrase_to_volume.get(p, 0) for p in set(opt_found))
-
-        volume_improvement = {
-
-            "estimated_volume_before": before_vol,
-
-            "estimated_volume_after": after_vol,
-
-            "delta_volume": max(0, after_vol - before_vol)
-
-        }
-
-
-
-        # Character efficiency
-
-        title_before = len(current_title or "")
-
-        title_after = len(opt_title or "")
-
-        backend_before = len(" ".join(current_backend) if current_backend else "")
-
-        backend_after = len(" ".join(opt_backend) if opt_backend else "")
-
-        char_efficiency = {
-
-            "title_limit": 200,
-
-            "title_before": title_before,
-
-            "title_after": title_after,
-
-            "title_utilization_before_pct": round((title_before / 200) * 100, 1) if 200 else 0,
-
-            "title_utilization_after_pct": round((title_after / 200) * 100, 1) if 200 else 0,
-
-            "backend_limit": 249,
-
-            "backend_before": backend_before,
-
-            "backend_after": backend_after,
-
-        }
-
-
-
-        # Summary metrics (simple heuristic)
-
-        summary_metrics = {
-
-            "overall_improvement_score": round(min(10.0, (after_pct - before_pct) / 10 + (after_hi_intent - before_hi_intent) / 2), 2),
-
-            "priority_recommendations": max(1, min(5, len(new_added) // 4)),
-
-        }
-
-
-
-        return SEOComparison(
-
-            coverage_improvement=coverage_improvement,
-
-            intent_improvement=intent_improvement,
-
-            volume_improvement=volume_improvement,
-
-            character_efficiency=char_efficiency,
-
-            summary_metrics=summary_metrics
-
+        current = (
+            current_seo.title_analysis.content,
+            [b.content for b in current_seo.bullets_analysis],
+            current_seo.backend_keywords,
         )
-    
-    
+        optimized = (
+            optimized_seo.optimized_title.content,
+            [b.content for b in optimized_seo.optimized_bullets],
+            optimized_seo.optimized_backend_keywords,
+        )
+        comparison = calculate_comparison_metrics(current, optimized, keyword_data)
+
+        coverage = comparison.coverage_improvement
+        logger.info(f"📊 [METRICS] Comparison data:")
+        logger.info(f"   Total keywords for comparison: {coverage['total_keywords']}")
+        logger.info(f"   High-intent keywords: {comparison.intent_improvement['high_intent_total']}")
+        logger.info(f"   Current content keywords found: {coverage['before_covered']}/{coverage['total_keywords']}")
+        logger.info(f"   Optimized content keywords found: {coverage['after_covered']}/{coverage['total_keywords']}")
+        return comparison
     
     def _should_use_ai_optimization(self) -> bool:
 
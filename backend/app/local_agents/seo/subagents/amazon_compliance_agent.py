@@ -521,18 +521,10 @@ For EVERY bullet point you create:
 - **Brand Integration**: Include brand naturally if provided
 """
 
-USER_PROMPT_TEMPLATE = """
-Create Amazon-compliant title and bullet points following ALL Task 3 rules.
-
-PRODUCT INFORMATION:
-{product_json}
-
-CURRENT TITLE: {current_title}
-OFFICIAL BRAND NAME: {brand}
-CURRENT TITLE LENGTH: {current_length} characters (yours should be 155-200)
-
+# Rule blocks shared by the whole-listing prompt and the per-section prompts below
+_BRAND_PRESERVATION_RULES = """
 ⚠️ BRAND PRESERVATION RULE (CRITICAL):
-- Look at the CURRENT TITLE above
+- Look at the CURRENT TITLE given at the end
 - Use the EXACT brand form as it appears at the START of the current title
 - DO NOT change abbreviations to full names or vice versa
 - DO NOT change capitalization or format
@@ -541,7 +533,9 @@ CURRENT TITLE LENGTH: {current_length} characters (yours should be 155-200)
   * Current: "so coll Premium..." + Official: "So Coll" → Use "so coll" ✅
   * Current: "ACME Corp Widget..." + Official: "ACME Corporation" → Use "ACME Corp" ✅
 - If no clear brand at start of current title, use the official brand name
+"""
 
+_TITLE_RULES = """
 TASK 3 - CRITICAL TITLE RULES (ALL MANDATORY):
 
 ### RULE 1: CHARACTER COUNT
@@ -555,7 +549,7 @@ TASK 3 - CRITICAL TITLE RULES (ALL MANDATORY):
 - Brand MUST be included at the beginning of your optimized title
 
 ### RULE 3: TOP KEYWORDS (Sorted by Value)
-- Use top 3-4 keywords from the list provided below
+- Use top 3-4 keywords from KEYWORD DATA
 - Keywords are sorted by relevancy × volume (highest first)
 - MUST use the highest value keywords
 
@@ -566,8 +560,8 @@ TASK 3 - CRITICAL TITLE RULES (ALL MANDATORY):
 
 ### RULE 5: FIRST 80 CHARACTERS
 - Must contain: Brand + Main keyword + Design keyword + Pack/size info
-- Main keyword root: "{main_root}"
-- Design-specific root: "{design_root}"
+- Main keyword root: MAIN KEYWORD ROOT
+- Design-specific root: DESIGN KEYWORD ROOT
 - Pack/size info: Look for quantity/weight in product data
 
 ### RULE 6: GRAMMAR & READABILITY
@@ -575,16 +569,17 @@ TASK 3 - CRITICAL TITLE RULES (ALL MANDATORY):
 - Natural sentence structure
 - Professional tone
 - Use separators: - | ,
+"""
 
+_COMPETITOR_RULES = """
 TASK 6 INTEGRATION - Competitor Benefits:
 - Analyze competitor_insights if provided
 - Prioritize benefits that top competitors highlight
 - Focus on CONVERSION over keyword stuffing
+"""
 
-KEYWORD DATA (PRE-ALLOCATED TO PREVENT DUPLICATION):
-{keywords_json}
-
-**CRITICAL INSTRUCTIONS:**
+_ALLOCATION_RULES = """
+**CRITICAL INSTRUCTIONS (KEYWORD DATA IS PRE-ALLOCATED TO PREVENT DUPLICATION):**
 - Use ONLY the pre-allocated keywords for each content type
 - TITLE: Use only keywords from "title_keywords" array
 - BULLETS: Use only keywords from "bullet_keywords" array  
@@ -592,10 +587,12 @@ KEYWORD DATA (PRE-ALLOCATED TO PREVENT DUPLICATION):
 - DO NOT use any keywords not in the provided lists
 - DO NOT use the same keyword in multiple content types
 - Each keyword can only be used ONCE across all content
+"""
 
+_ROOT_DEDUP_RULES = """
 **TASK 3 - RULE 4 ENFORCEMENT (NO ROOT DUPLICATION)**:
 When building your title, use this process:
-1. Start with highest value keyword: "{keywords_json[0]}"
+1. Start with the highest value keyword (the first one in KEYWORD DATA)
 2. For each additional keyword:
    - Extract its tokens
    - Check if ALL tokens already exist in title
@@ -606,10 +603,12 @@ When building your title, use this process:
    - Next keyword: "dried strawberries" → tokens: [dried, strawberries]
    - Check: dried ✗ (already present), strawberries ✗ (already present)
    - Decision: SKIP "dried strawberries" - use different keyword like "organic" or "no sugar"
+"""
 
+_KEYWORD_USAGE_RULES = """
 **MANDATORY KEYWORD USAGE:**
 - You MUST use at least 2 keywords from the allocated arrays in EACH bullet point (REQUIRED)
-- You MUST create exactly {bullet_count} bullet points, each with minimum 2 keywords
+- You MUST create exactly BULLET COUNT bullet points, each with minimum 2 keywords
 - You MUST list the exact keywords used in the "keywords_included" field for each bullet
 - FAILURE TO USE AT LEAST 2 KEYWORDS PER BULLET WILL RESULT IN REJECTION
 
@@ -618,12 +617,14 @@ When building your title, use this process:
 - Use 2-3 keywords in title for optimal Amazon SEO
 
 **STRICT REQUIREMENT - BULLETS:**
-- Create exactly {bullet_count} bullet points (MANDATORY)
+- Create exactly BULLET COUNT bullet points (MANDATORY)
 - EVERY bullet point MUST contain at least 2 keywords from bullet_keywords array
-- Distribute keywords evenly: 10 bullet keywords = 2-3 per bullet across {bullet_count} bullets
+- Distribute keywords evenly: 10 bullet keywords = 2-3 per bullet across BULLET COUNT bullets
 - You MUST naturally integrate the keywords into the bullet text
-- Each of the {bullet_count} bullets must have minimum 2 keywords for Amazon SEO effectiveness
+- Each of the BULLET COUNT bullets must have minimum 2 keywords for Amazon SEO effectiveness
+"""
 
+_BULLET_RULES = """
 **TASK 4 - BULLET POINT RULES (MANDATORY):**
 
 ### RULE 1: NO TITLE REDUNDANCY (CRITICAL - PREVENTS EMPTY BULLETS!)
@@ -669,7 +670,7 @@ Write benefit-focused sentences, NOT keyword lists:
 ❌ BAD: "healthy snack natural fruit snack organic snack"
 
 ### RULE 3: EVEN DISTRIBUTION
-Spread bullet_keywords evenly across all {bullet_count} bullets (2-4 per bullet)
+Spread bullet_keywords evenly across all BULLET COUNT bullets (2-4 per bullet)
 
 ### ⚠️ RULE 4: COMPLETE KEYWORD PHRASES REQUIRED (CRITICAL!)
 
@@ -709,20 +710,120 @@ Result: Keyword detected ✅
 - Break with commas: "...strawberries, freeze dried for freshness..."
 - But NEVER remove words from the allocated phrase!
 
-**EXAMPLE OF CORRECT USAGE ({bullet_count} BULLETS WITH 2 KEYWORDS EACH, AVOIDING TITLE KEYWORDS):**
+**EXAMPLE OF CORRECT USAGE (4 BULLETS WITH 2 KEYWORDS EACH, AVOIDING TITLE KEYWORDS):**
 If bullet_keywords = [{{"phrase": "freeze dried strawberries"}}, {{"phrase": "organic strawberries"}}, {{"phrase": "bulk strawberries"}}, {{"phrase": "strawberry snack"}}, {{"phrase": "dried fruit"}}, {{"phrase": "healthy snack"}}, {{"phrase": "natural fruit"}}, {{"phrase": "no sugar"}}]
 
-You MUST create exactly {bullet_count} bullets, each with at least 2 keywords:
+You MUST create exactly 4 bullets, each with at least 2 keywords:
 - Bullet 1: "Our organic strawberries are freeze dried strawberries perfect for healthy snacking" → keywords_included: ["organic strawberries", "freeze dried strawberries"]
 - Bullet 2: "Convenient bulk strawberries make this strawberry snack ideal for families" → keywords_included: ["bulk strawberries", "strawberry snack"]
 - Bullet 3: "Pure dried fruit with no sugar added for guilt-free enjoyment" → keywords_included: ["dried fruit", "no sugar"]
 - Bullet 4: "A healthy snack made from natural fruit with no additives" → keywords_included: ["healthy snack", "natural fruit"]
+"""
+
+# Rules first and the listing last: every call shares the same long prefix,
+# which the provider can serve from its prompt cache.
+USER_PROMPT_TEMPLATE = (
+    """
+Create Amazon-compliant title and bullet points following ALL Task 3 rules.
+The listing to optimize (PRODUCT INFORMATION, CURRENT TITLE, OFFICIAL BRAND NAME,
+roots, BULLET COUNT and KEYWORD DATA) is given at the end.
+"""
+    + _BRAND_PRESERVATION_RULES
+    + _TITLE_RULES
+    + _COMPETITOR_RULES
+    + _ALLOCATION_RULES
+    + _ROOT_DEDUP_RULES
+    + _KEYWORD_USAGE_RULES
+    + _BULLET_RULES
+    + """
+PRODUCT INFORMATION:
+{product_json}
+
+CURRENT TITLE: {current_title}
+OFFICIAL BRAND NAME: {brand}
+CURRENT TITLE LENGTH: {current_length} characters (yours should be 155-200)
+MAIN KEYWORD ROOT: "{main_root}"
+DESIGN KEYWORD ROOT: "{design_root}"
+BULLET COUNT: {bullet_count}
+
+KEYWORD DATA (PRE-ALLOCATED TO PREVENT DUPLICATION):
+{keywords_json}
 
 Create optimized content that maximizes CONVERSION while strictly following Amazon guidelines.
 Focus especially on the first 80 characters for mobile optimization with benefit-first approach.
 
 Return ONLY the JSON response in the exact format specified.
 """
+)
+
+# Per-section prompts: the title and every bullet are written by separate,
+# concurrent calls (see optimize_amazon_compliance_sections)
+TITLE_PROMPT_TEMPLATE = (
+    """
+Create ONLY the Amazon-compliant TITLE for this listing following ALL Task 3 rules.
+The bullet points are written separately; do not return them.
+The listing (PRODUCT INFORMATION, CURRENT TITLE, OFFICIAL BRAND NAME, roots and
+KEYWORD DATA with the title keywords) is given at the end.
+"""
+    + _BRAND_PRESERVATION_RULES
+    + _TITLE_RULES
+    + _COMPETITOR_RULES
+    + _ROOT_DEDUP_RULES
+    + """
+**STRICT REQUIREMENT - TITLE:**
+- Use ONLY keywords from KEYWORD DATA (the pre-allocated title keywords)
+- Title MUST contain at least 2 of them; 2-3 is optimal for Amazon SEO
+
+Return ONLY a JSON object with the "optimized_title" part of the output format:
+{{"optimized_title": {{"content": "...", "first_80_chars": "...", "character_count": 0,
+  "brand_included": true, "main_root_included": true, "design_root_included": true,
+  "keywords_included": ["..."]}}}}
+
+PRODUCT INFORMATION:
+{product_json}
+
+CURRENT TITLE: {current_title}
+OFFICIAL BRAND NAME: {brand}
+CURRENT TITLE LENGTH: {current_length} characters (yours should be 155-200)
+MAIN KEYWORD ROOT: "{main_root}"
+DESIGN KEYWORD ROOT: "{design_root}"
+
+KEYWORD DATA (TITLE KEYWORDS, SORTED BY VOLUME):
+{keywords_json}
+"""
+)
+
+BULLET_PROMPT_TEMPLATE = (
+    """
+Create ONE Amazon-compliant bullet point for this listing following ALL Task 4 rules.
+The title and the other bullets are written separately, each from its own keywords.
+The listing (PRODUCT INFORMATION, roots, BULLET NUMBER, BULLET FOCUS and KEYWORD DATA
+with this bullet's keywords) is given at the end.
+"""
+    + _COMPETITOR_RULES
+    + _BULLET_RULES
+    + """
+**STRICT REQUIREMENT - THIS BULLET:**
+- Use EVERY keyword phrase from KEYWORD DATA, complete and unshortened (at least 2)
+- Lead with the BULLET FOCUS benefit in a short CAPITALIZED opening phrase
+- 155-250 characters of natural, benefit-focused language
+
+Return ONLY a JSON object with one entry of the "optimized_bullets" output format:
+{{"content": "...", "character_count": 0, "primary_benefit": "...", "keywords_included": ["..."],
+  "guideline_compliance": "PASS"}}
+
+PRODUCT INFORMATION:
+{product_json}
+
+MAIN KEYWORD ROOT: "{main_root}"
+DESIGN KEYWORD ROOT: "{design_root}"
+BULLET NUMBER: {bullet_number} of {bullet_count}
+BULLET FOCUS: {benefit}
+
+KEYWORD DATA (THIS BULLET'S KEYWORDS):
+{keywords_json}
+"""
+)
 
 amazon_compliance_agent = Agent(
     name="AmazonComplianceAgent",
@@ -748,7 +849,8 @@ def optimize_amazon_compliance_ai(
     target_bullet_count: Optional[int] = None,
     brand: str = "",
     current_length: int = 0,
-    current_title: str = ""
+    current_title: str = "",
+    design_keywords: Optional[List[Dict[str, Any]]] = None
 ) -> Dict[str, Any]:
     """
     Use AI to create Amazon-compliant titles and bullets optimized for first 80 characters.
@@ -765,6 +867,7 @@ def optimize_amazon_compliance_ai(
         target_bullet_count: Number of bullet points to create (dynamic)
         brand: Task 3 - Brand name to include in title
         current_length: Task 3 - Current title length for reference
+        design_keywords: Design-specific keywords (added to the title when it has room)
         
     Returns:
         Optimized content with Amazon compliance and Task 3 validation
@@ -831,6 +934,36 @@ def optimize_amazon_compliance_ai(
     bullet_count = target_bullet_count if target_bullet_count and target_bullet_count > 0 else 4
     logger.info(f"🎯 Optimizing for {bullet_count} bullet points (dynamic based on current listing)")
     
+    from app.core.config import settings
+    from ..listing_validator import ListingValidator
+    allocated = bool(title_keywords or bullet_keywords or backend_keywords)
+    sections = _ComplianceSections(
+        product_json=product_json,
+        main_root=main_keyword_root,
+        design_root=design_keyword_root,
+        key_benefits=key_benefits,
+        title_keywords=(title_keywords or []) if allocated else safe_keywords,
+        bullet_keywords=(bullet_keywords or []) if allocated else safe_keywords,
+        backend_keywords=(backend_keywords or []) if allocated else [],
+        bullet_count=bullet_count,
+        brand=brand,
+        current_length=current_length,
+        current_title=current_title or current_content.get("title", ""),
+        current_content=current_content,
+        relevant_keywords=relevant_keywords,
+    )
+    validator = ListingValidator(
+        brand=brand,
+        title_keywords=sections.title_keywords,
+        bullet_keywords=sections.bullet_keywords,
+        backend_keywords=sections.backend_keywords,
+        design_keywords=design_keywords,
+        bullet_count=bullet_count,
+    )
+    
+    if settings.SEO_PARALLEL_SECTIONS:
+        return optimize_amazon_compliance_sections(sections, validator)
+    
     try:
         prompt = USER_PROMPT_TEMPLATE.format(
             product_json=product_json,
@@ -860,14 +993,14 @@ def optimize_amazon_compliance_ai(
             try:
                 # Strip markdown code fences (GPT-4o compatibility)
                 clean_output = strip_markdown_code_fences(output)
-                parsed = json.loads(clean_output)
+                result = json.loads(clean_output)
                 logger.info(f"[AmazonComplianceAgent] AI successfully optimized content for {bullet_count} bullets")
-                return parsed
             except json.JSONDecodeError as e:
                 logger.error(f"[AmazonComplianceAgent] Failed to parse AI output: {output[:200]}...")
                 logger.error(f"[AmazonComplianceAgent] JSON decode error: {e}")
                 # Fallback to programmatic optimization
-                return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand)
+                fallback = _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand)
+                return _validate_and_repair_listing(fallback, validator, sections, recall=False)
         
         elif hasattr(output, 'model_dump'):
             result = output.model_dump()
@@ -875,137 +1008,316 @@ def optimize_amazon_compliance_ai(
         else:
             raise Exception("Unexpected AI output format")
         
-        # POST-GENERATION VALIDATION: Check for brand and high-volume keywords
-        optimized_title = result.get("optimized_title", {}).get("content", "")
-        
-        # Validate brand is present (if brand exists)
-        if brand and brand.strip():
-            if brand.lower() not in optimized_title.lower():
-                logger.error(f"❌ VALIDATION FAILED: Brand '{brand}' NOT found in optimized title: '{optimized_title}'")
-                logger.error(f"❌ AI ignored MANDATORY brand requirement - using fallback")
-                return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, relevant_keywords)
-            else:
-                logger.info(f"✅ Brand validation PASSED: '{brand}' found in title")
-        
-        # Validate top keywords are present (STRICTER: Top allocated keywords MUST be in title)
-        # Use title_keywords if provided (pre-allocated by volume), otherwise use relevant_keywords
-        keywords_to_validate = title_keywords if title_keywords else relevant_keywords
-        
-        if keywords_to_validate:
-            # Sort by volume to ensure we're checking the absolute top keywords
-            sorted_keywords = sorted(keywords_to_validate, key=lambda x: (x.get("search_volume", 0) or 0), reverse=True)
-            top_5_keywords = sorted_keywords[:5]  # Check top 5 by volume
-            missing_keywords = []
-            
-            for i, kw in enumerate(top_5_keywords, 1):
-                kw_phrase = kw.get("phrase", "")
-                kw_volume = kw.get("search_volume", 0) or 0
-                # Check if keyword is in title (case-insensitive, handle hyphens/spaces)
-                kw_normalized = kw_phrase.lower().replace("-", " ")
-                title_normalized = optimized_title.lower().replace("-", " ")
-                if kw_normalized not in title_normalized:
-                    missing_keywords.append(f"#{i} {kw_phrase} (vol: {kw_volume:,})")
-                    logger.warning(f"⚠️  Missing: #{i} '{kw_phrase}' (vol: {kw_volume:,})")
-                else:
-                    logger.info(f"✅  Found: #{i} '{kw_phrase}' (vol: {kw_volume:,})")
-            
-            if missing_keywords:
-                logger.warning(f"⚠️ VALIDATION WARNING: {len(missing_keywords)} top keywords missing from title")
-                
-                # CRITICAL: Check if top 2 keywords (highest volumes) are missing
-                top_2_missing = sum(1 for m in missing_keywords if m.startswith("#1") or m.startswith("#2"))
-                
-                if top_2_missing >= 2:
-                    logger.error(f"❌ VALIDATION FAILED: TOP 2 KEYWORDS (HIGHEST VOLUMES) missing from title!")
-                    logger.error(f"   Missing: {', '.join([m for m in missing_keywords if m.startswith('#1') or m.startswith('#2')])}")
-                    logger.error(f"❌ This is CRITICAL for SEO - using fallback")
-                    return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, sorted_keywords)
-                elif "#1" in missing_keywords[0]:
-                    logger.error(f"❌ VALIDATION FAILED: #1 keyword (ABSOLUTE HIGHEST VOLUME) missing from title!")
-                    logger.error(f"❌ This is MANDATORY for SEO - using fallback")
-                    return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, sorted_keywords)
-                elif len(missing_keywords) >= 3:
-                    logger.error(f"❌ VALIDATION FAILED: 3+ high-volume keywords missing - using fallback")
-                    return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, sorted_keywords)
-                else:
-                    logger.warning(f"⚠️  Acceptable: Only {len(missing_keywords)} keyword(s) missing from top 5")
-            else:
-                logger.info(f"✅ Top keywords validation PASSED - All top 5 keywords found in title!")
-        
-        # NEW VALIDATION: Check each bullet has at least 2 keywords
-        optimized_bullets = result.get("optimized_bullets", [])
-        if optimized_bullets:
-            all_keywords = (relevant_keywords or []) + (design_keywords or [])
-            is_valid, insufficient_bullets = _validate_bullet_keyword_count(optimized_bullets, all_keywords, min_keywords=2)
-            
-            if not is_valid:
-                logger.error(f"❌ VALIDATION FAILED: {len(insufficient_bullets)} bullets have <2 keywords: {insufficient_bullets}")
-                logger.error(f"❌ AI ignored MANDATORY keyword inclusion requirement - using fallback")
-                return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, relevant_keywords)
-            else:
-                logger.info(f"✅ Bullet keyword count validation PASSED: All {len(optimized_bullets)} bullets have ≥2 keywords")
-        
-        # NEW VALIDATION: Check title has 2-3 design-specific keywords
-        if design_keywords:
-            design_count, found_design_kws = _count_design_keywords_in_title(optimized_title, design_keywords)
-            
-            if design_count < 2:
-                logger.error(f"❌ VALIDATION FAILED: Title has only {design_count} design-specific keywords (minimum: 2)")
-                logger.error(f"   Title: {optimized_title}")
-                logger.error(f"   Found design keywords: {found_design_kws}")
-                logger.error(f"   Available design keywords: {[kw.get('phrase', '') for kw in design_keywords[:5]]}")
-                logger.error(f"❌ AI ignored MANDATORY design keyword requirement - using fallback")
-                return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, relevant_keywords)
-            else:
-                logger.info(f"✅ Design keyword validation PASSED: Title has {design_count} design keywords: {found_design_kws}")
-        
-        return result
+        # POST-GENERATION VALIDATION: brand, top keywords, bullet keywords, design keywords,
+        # lengths and wording are checked in one pass; only what can't be repaired is re-written
+        return _validate_and_repair_listing(result, validator, sections)
             
     except Exception as e:
         logger.error(f"[AmazonComplianceAgent] AI optimization failed: {e}")
         # Graceful fallback - return programmatic optimization
-        return _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, relevant_keywords)
+        fallback = _create_fallback_optimization(current_content, main_keyword_root, design_keyword_root, key_benefits, brand, relevant_keywords)
+        return _validate_and_repair_listing(fallback, validator, sections, recall=False)
 
-def _validate_bullet_keyword_count(
-    bullets: List[Dict[str, Any]], 
-    all_keywords: List[Dict[str, Any]],
-    min_keywords: int = 2
-) -> tuple:
-    """
-    Validate that each bullet has at least min_keywords.
-    Returns (is_valid, list_of_bullet_numbers_with_insufficient_keywords).
+def _run_section(prompt: str, label: str) -> Optional[Any]:
+    """One section call of the compliance agent; parsed JSON, or None when it fails."""
+    from agents import Runner
+    
+    try:
+        result = Runner.run_sync(amazon_compliance_agent, prompt)
+        output = getattr(result, "final_output", None)
+        if hasattr(output, "model_dump"):
+            return output.model_dump()
+        return json.loads(strip_markdown_code_fences(output or ""))
+    except Exception as e:
+        logger.error(f"[AmazonComplianceAgent] {label} failed: {e}")
+        return None
+
+
+def _split_bullet_keywords(keywords: List[Dict[str, Any]], bullet_count: int) -> List[List[Dict[str, Any]]]:
+    """Deal keywords (highest volume first) round-robin, so every bullet gets a fair share."""
+    ranked = sorted(keywords, key=lambda x: (x.get("search_volume", 0) or 0), reverse=True)
+    return [ranked[i::bullet_count] for i in range(bullet_count)]
+
+
+def _fallback_bullet(benefit: str, keywords: List[Dict[str, Any]], main_root: str, design_root: str) -> Dict[str, Any]:
+    """Programmatic bullet for a section whose call failed, built from its own keywords."""
+    phrases = [kw.get("phrase", "") for kw in keywords if kw.get("phrase")][:3]
+    content = f"{benefit.upper()}: {', '.join(phrases) if phrases else f'{main_root} {design_root}'} for optimal results"
+    return {
+        "content": content,
+        "character_count": len(content),
+        "primary_benefit": benefit,
+        "keywords_included": phrases or [main_root, design_root],
+        "guideline_compliance": "PASS",
+    }
+
+
+class _ComplianceSections:
     """
-    from ..helper_methods import extract_keywords_from_content
+    Section prompts (title, one per bullet) and their programmatic fallbacks.
     
-    all_keyword_phrases = [kw.get("phrase", "") for kw in all_keywords if kw.get("phrase")]
-    insufficient_bullets = []
+    Pre-allocated keywords make the sections independent: the title uses the
+    title keywords and each bullet its own share of the bullet keywords.
+    """
     
-    for i, bullet in enumerate(bullets, 1):
-        content = bullet.get("content", "")
-        found_keywords, _ = extract_keywords_from_content(content, all_keyword_phrases)
+    def __init__(
+        self,
+        product_json: str,
+        main_root: str,
+        design_root: str,
+        key_benefits: List[str],
+        title_keywords: List[Dict[str, Any]],
+        bullet_keywords: List[Dict[str, Any]],
+        backend_keywords: List[Dict[str, Any]],
+        bullet_count: int,
+        brand: str,
+        current_length: int,
+        current_title: str,
+        current_content: Dict[str, Any],
+        relevant_keywords: List[Dict[str, Any]],
+    ):
+        self.main_root = main_root
+        self.design_root = design_root
+        self.key_benefits = key_benefits
+        self.title_keywords = title_keywords
+        self.bullet_keywords = bullet_keywords
+        self.backend_keywords = backend_keywords
+        self.bullet_count = bullet_count
+        self.brand = brand
+        self.current_content = current_content
+        self.relevant_keywords = relevant_keywords
         
-        if len(found_keywords) < min_keywords:
-            insufficient_bullets.append(i)
-            logger.error(f"❌ VALIDATION FAILED: Bullet {i} has only {len(found_keywords)} keywords (minimum: {min_keywords})")
-            logger.error(f"   Content: {content[:100]}...")
-            logger.error(f"   Keywords found: {found_keywords}")
-    
-    return len(insufficient_bullets) == 0, insufficient_bullets
-
-def _count_design_keywords_in_title(
-    title: str, 
-    design_keywords: List[Dict[str, Any]]
-) -> tuple:
+        self.title_prompt = TITLE_PROMPT_TEMPLATE.format(
+            product_json=product_json,
+            current_title=current_title,
+            brand=brand or "NOT FOUND",
+            current_length=current_length,
+            main_root=main_root,
+            design_root=design_root,
+            keywords_json=json.dumps(title_keywords, indent=2),
+        )
+        self.bullet_shares = _split_bullet_keywords(bullet_keywords, bullet_count)
+        self.benefits = [key_benefits[i % len(key_benefits)] if key_benefits else "Premium quality" for i in range(bullet_count)]
+        self.bullet_prompts = [
+            BULLET_PROMPT_TEMPLATE.format(
+                product_json=product_json,
+                main_root=main_root,
+                design_root=design_root,
+                bullet_number=i + 1,
+                bullet_count=bullet_count,
+                benefit=self.benefits[i],
+                keywords_json=json.dumps(share, indent=2),
+            )
+            for i, share in enumerate(self.bullet_shares)
+        ]
+    
+    def fallback_title(self) -> Dict[str, Any]:
+        fallback = _create_fallback_optimization(
+            self.current_content, self.main_root, self.design_root, self.key_benefits, self.brand, self.relevant_keywords
+        )
+        return fallback["optimized_title"]
+    
+    def fallback_bullet(self, index: int) -> Dict[str, Any]:
+        return _fallback_bullet(self.benefits[index], self.bullet_shares[index], self.main_root, self.design_root)
+
+
+def _run_sections(prompts: Dict[Any, str]) -> Dict[Any, Optional[Any]]:
+    """Run section prompts concurrently. Keys are "title" or a bullet index."""
+    import asyncio
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+    from app.core.config import settings
+    
+    loops = []
+    
+    def own_loop():
+        # Runner.run_sync needs a current loop; each worker owns one for the pool's lifetime
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loops.append(loop)
+    
+    workers = max(1, min(settings.SEO_SECTION_CONCURRENCY, len(prompts)))
+    try:
+        with ThreadPoolExecutor(max_workers=workers, initializer=own_loop) as pool:
+            # Copied contexts carry the job's cancellation token and deadline into the workers
+            futures = {
+                key: pool.submit(contextvars.copy_context().run, _run_section, prompt, "Title" if key == "title" else f"Bullet {key + 1}")
+                for key, prompt in prompts.items()
+            }
+            return {key: future.result() for key, future in futures.items()}
+    finally:
+        # The pool has joined its workers; nothing runs on these loops any more
+        for loop in loops:
+            loop.close()
+
+
+def _section_title(output: Any) -> Optional[Dict[str, Any]]:
+    title = output.get("optimized_title") if isinstance(output, dict) else None
+    return title if isinstance(title, dict) and title.get("content") else None
+
+
+def _section_bullet(output: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(output, dict) and isinstance(output.get("optimized_bullets"), list) and output["optimized_bullets"]:
+        output = output["optimized_bullets"][0]
+    return output if isinstance(output, dict) and output.get("content") else None
+
+
+def optimize_amazon_compliance_sections(sections: _ComplianceSections, validator: Any) -> Dict[str, Any]:
+    """
+    Write the title and each bullet with concurrent calls, then reconcile them.
+    
+    The stage takes about as long as its slowest call. A section whose call
+    fails gets a programmatic fallback on its own; the others keep their AI output.
+    
+    Returns:
+        Same structure as the single-call optimization, plus ``backend_keywords``
+    """
+    logger.info(f"🧵 [AmazonComplianceAgent] Writing title + {sections.bullet_count} bullets concurrently")
+    prompts = {"title": sections.title_prompt}
+    prompts.update(enumerate(sections.bullet_prompts))
+    outputs = _run_sections(prompts)
+    
+    title = _section_title(outputs["title"])
+    if title is None:
+        logger.warning("[AmazonComplianceAgent] ⚠️  Title section using fallback")
+        title = sections.fallback_title()
+    
+    bullets = []
+    for i in range(sections.bullet_count):
+        bullet = _section_bullet(outputs[i])
+        if bullet is None:
+            logger.warning(f"[AmazonComplianceAgent] ⚠️  Bullet {i + 1} using fallback")
+            bullet = sections.fallback_bullet(i)
+        bullets.append(bullet)
+    
+    listing = _reconcile_sections(title, bullets, sections.title_keywords, sections.bullet_keywords, sections.backend_keywords)
+    return _validate_and_repair_listing(listing, validator, sections)
+
+
+def _reconcile_sections(
+    title: Dict[str, Any],
+    bullets: List[Dict[str, Any]],
+    title_keywords: List[Dict[str, Any]],
+    bullet_keywords: List[Dict[str, Any]],
+    backend_keywords: List[Dict[str, Any]],
+) -> Dict[str, Any]:
     """
-    Count how many design-specific keywords are present in the title.
-    Returns (count, list_of_found_design_keywords).
+    Deterministic cross-section pass over independently written sections.
+    
+    - keywords_included and character counts are taken from the text itself
+    - backend keywords: the allocated ones plus allocated title/bullet keywords
+      no section used, minus anything already in the title or bullets
     """
     from ..helper_methods import extract_keywords_from_content
     
-    design_phrases = [kw.get("phrase", "") for kw in design_keywords if kw.get("phrase")]
-    found_keywords, _ = extract_keywords_from_content(title, design_phrases)
+    def phrases(keywords: List[Dict[str, Any]]) -> List[str]:
+        return [kw.get("phrase", "") for kw in keywords if kw.get("phrase")]
+    
+    title_content = title.get("content", "")
+    title["keywords_included"], _ = extract_keywords_from_content(title_content, phrases(title_keywords))
+    title["character_count"] = len(title_content)
+    title["first_80_chars"] = title_content[:80]
+    
+    for bullet in bullets:
+        bullet["keywords_included"], _ = extract_keywords_from_content(bullet.get("content", ""), phrases(bullet_keywords))
+        bullet["character_count"] = len(bullet.get("content", ""))
     
-    return len(found_keywords), found_keywords
+    used_text = " ".join([title_content] + [b.get("content", "") for b in bullets]).lower()
+    backend = []
+    for phrase in phrases(backend_keywords) + phrases(title_keywords) + phrases(bullet_keywords):
+        if phrase.lower() not in used_text and phrase not in backend:
+            backend.append(phrase)
+    
+    logger.info(
+        f"✅ [AmazonComplianceAgent] Reconciled sections: title {len(title['keywords_included'])} keywords, "
+        f"{len(bullets)} bullets, {len(backend)} backend keywords"
+    )
+    return {
+        "optimized_title": title,
+        "optimized_bullets": bullets,
+        "backend_keywords": backend,
+        "strategy": {
+            "first_80_optimization": title.get("first_80_chars", ""),
+            "keyword_integration": "Title and each bullet written from their own pre-allocated keywords",
+            "compliance_approach": "Concurrent section generation with deterministic cross-section reconciliation",
+        },
+    }
+
+
+def _with_violations(prompt: str, violations: List[Any]) -> str:
+    """Section prompt with the rules its previous answer broke appended (the cached prefix is unchanged)."""
+    broken = "\n".join(f"- {v.rule.replace('_', ' ')}: {v.detail}" for v in violations)
+    return f"{prompt}\n\nA PREVIOUS ANSWER FOR THIS SECTION BROKE THESE RULES - FIX THEM:\n{broken}\n"
+
+
+def _validate_and_repair_listing(
+    listing: Dict[str, Any],
+    validator: Any,
+    sections: _ComplianceSections,
+    recall: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run the listing validator and re-call the model only for what it could not repair.
+    
+    Sections with unresolved violations are rewritten once, concurrently, with
+    the broken rules appended to their prompt; a section still failing after
+    that gets its programmatic fallback. ``recall=False`` (the listing already
+    is the fallback) and an open circuit or a passed deadline skip the rewrite.
+    """
+    from app.services.circuit_breaker import llm_circuit_open
+    from app.services.deadline import deadline_reached
+    from app.services.metrics import seo_listing_violations
+    
+    first = validator.validate_and_repair(listing)
+    report = first
+    rewritten, fallen_back = set(), set()
+    
+    if first.unresolved and recall and not (deadline_reached() or llm_circuit_open()):
+        prompts = {}
+        if first.title_needs_rewrite():
+            prompts["title"] = _with_violations(sections.title_prompt, [v for v in first.unresolved if v.section == "title"])
+        for i in first.bullets_needing_rewrite():
+            prompts[i] = _with_violations(sections.bullet_prompts[i], [v for v in first.unresolved if v.section == "bullet" and v.index == i])
+        logger.info(f"🔁 [AmazonComplianceAgent] Re-writing {len(prompts)} section(s) the validator could not repair")
+        
+        for key, output in _run_sections(prompts).items():
+            section = _section_title(output) if key == "title" else _section_bullet(output)
+            if section is None:
+                continue
+            if key == "title":
+                listing["optimized_title"] = section
+            else:
+                listing["optimized_bullets"][key] = section
+            rewritten.add(key)
+        report = validator.validate_and_repair(listing)
+    
+    if report.unresolved:
+        if report.title_needs_rewrite():
+            listing["optimized_title"] = sections.fallback_title()
+            fallen_back.add("title")
+        for i in report.bullets_needing_rewrite():
+            listing["optimized_bullets"][i] = sections.fallback_bullet(i)
+            fallen_back.add(i)
+        logger.warning(f"[AmazonComplianceAgent] ⚠️  {len(fallen_back)} section(s) using fallback after validation")
+        validator.validate_and_repair(listing)
+    
+    for violation in first.violations:
+        key = "title" if violation.section == "title" else violation.index
+        if violation.repaired:
+            resolution = "local"
+        elif key in fallen_back:
+            resolution = "fallback"
+        else:
+            resolution = "model"
+        seo_listing_violations.inc(rule=violation.rule, resolution=resolution)
+    
+    listing["listing_validation"] = {
+        **first.summary(),
+        "rewritten_by_model": len(rewritten - fallen_back),
+        "fallback_sections": len(fallen_back),
+    }
+    return listing
+
 
 def _create_fallback_optimization(
     current_content: Dict[str, Any],
@@ -1418,7 +1730,8 @@ def apply_amazon_compliance_ai(
             target_bullet_count=target_bullet_count,
             brand=brand,  # Task 3: Pass brand explicitly
             current_length=current_length,  # Task 3: Pass current title length
-            current_title=current_title  # Brand preservation: Pass current title
+            current_title=current_title,  # Brand preservation: Pass current title
+            design_keywords=design_keywords
         )
     else:
         # Fallback to combined keywords
@@ -1439,56 +1752,12 @@ def apply_amazon_compliance_ai(
             target_bullet_count=target_bullet_count,
             brand=brand,  # Task 3: Pass brand explicitly
             current_length=current_length,  # Task 3: Pass current title length
-            current_title=current_title  # Brand preservation: Pass current title
+            current_title=current_title,  # Brand preservation: Pass current title
+            design_keywords=design_keywords
         )
     
-    # TASK 3 RULE 4: Post-process to remove root duplication
-    logger.info(f"🔍 [TASK 3] Checking if deduplication needed...")
-    logger.info(f"   Result exists: {result is not None}")
-    logger.info(f"   Has optimized_title: {'optimized_title' in result if result else False}")
-    
-    if result and "optimized_title" in result:
-        optimized_title = result.get("optimized_title", {})
-        title_content = optimized_title.get("content", "")
-        keywords_included = optimized_title.get("keywords_included", [])
-        
-        logger.info(f"   Title: '{title_content[:80]}...'")
-        logger.info(f"   Keywords included: {keywords_included}")
-        
-        # Get all keywords for deduplication reference
-        all_keywords = relevant_keywords + design_keywords
-        
-        logger.info(f"   Calling deduplication function...")
-        
-        # Apply deduplication
-        try:
-            fixed_title, fixed_keywords = _remove_duplicate_keyword_roots(
-                title_content,
-                keywords_included,
-                all_keywords,
-                brand
-            )
-            
-            logger.info(f"   Deduplication returned: modified={fixed_title != title_content}")
-            
-            # Update result if title was modified
-            if fixed_title != title_content:
-                logger.info(f"🔧 [TASK 3] Applied automatic deduplication to title")
-                logger.info(f"   Before: {title_content}")
-                logger.info(f"   After: {fixed_title}")
-                result["optimized_title"]["content"] = fixed_title
-                result["optimized_title"]["keywords_included"] = fixed_keywords
-                result["optimized_title"]["character_count"] = len(fixed_title)
-                result["optimized_title"]["first_80_chars"] = fixed_title[:80]
-                result["optimized_title"]["has_root_duplication"] = False
-            else:
-                logger.info(f"✅ [TASK 3] No changes made - title unchanged")
-        except Exception as e:
-            logger.error(f"❌ [TASK 3] Deduplication failed: {e}")
-            import traceback
-            traceback.print_exc()
-    else:
-        logger.warning(f"⚠️  [TASK 3] Cannot run deduplication - result missing optimized_title")
+    # TASK 3 RULE 4 (root duplication) and the other listing rules are applied by the
+    # listing validator inside optimize_amazon_compliance_ai
     
     # SAFETY CHECK: Ensure no bullets have empty keywords_included
     logger.info(f"🔍 [SAFETY CHECK] Validating all bullets have keywords...")
@@ -176,14 +176,9 @@ Return ONLY a JSON object:
 Focus on creating titles that CONVERT, not just rank. The first 80 characters should make customers want to click and buy.
 """
 
+# Static requirements before the product data, so calls share a cacheable prefix
 USER_PROMPT_TEMPLATE = """
-Analyze these competitor titles to identify key benefits and optimize our title's first 80 characters for conversion.
-
-CURRENT PRODUCT:
-{product_json}
-
-COMPETITOR ANALYSIS DATA:
-{competitor_data_json}
+Analyze the competitor titles below to identify key benefits and optimize our title's first 80 characters for conversion.
 
 TASK 6 REQUIREMENTS:
 1. Analyze competitor titles for benefit patterns and positioning
@@ -195,6 +190,12 @@ TASK 6 REQUIREMENTS:
 Focus on CONVERSION over pure SEO. What makes customers click and buy?
 
 Return ONLY the JSON response in the exact format specified.
+
+CURRENT PRODUCT:
+{product_json}
+
+COMPETITOR ANALYSIS DATA:
+{competitor_data_json}
 """
 
 competitor_title_analysis_agent = Agent(
@@ -1,7 +1,11 @@
+from app.core.startup_profiler import startup_profiler  # first, so ready time covers imports
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1.endpoints import upload, test_research_keywords, background_jobs
 from app.core.config import settings
+from app.services.metrics import CONTENT_TYPE, render_metrics
 import logging
 
 # Configure logging to show INFO level logs with timestamps
@@ -16,7 +20,15 @@ logging.basicConfig(
 # Set httpx to WARNING to reduce noise from API calls
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
+# Redis, rate-limiter backends, agents and the Agents SDK are created on first
+# use; run `python -m app.core.startup_profiler` for an import/init breakdown.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup_profiler.mark_ready()
+    yield
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Amazon Sales Intelligence API",
     description="AI-powered Amazon product analysis and optimization platform. Complete pipeline for research, keyword analysis, scoring, and SEO optimization.",
     version="1.0"
@@ -39,3 +51,9 @@ app.include_router(background_jobs.router, prefix="/api/v1", tags=["background-j
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Amazon Sales Agent API"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus text exposition of pipeline, LLM, rate-limiter and job-store metrics."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
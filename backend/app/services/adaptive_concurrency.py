@@ -0,0 +1,238 @@
+"""
+Adaptive (AIMD) concurrency for LLM calls.
+
+A fixed number of parallel batches is too low when the OpenAI account is
+idle and too high when it is throttled. ``AIMDLimiter`` finds the limit the
+way TCP finds a congestion window:
+
+- additive increase: a successful call that took the last free slot adds
+  ``increase / limit``, so a saturated limit grows by about ``increase`` per
+  round of calls; calls that left slots free say nothing about a higher limit
+- multiplicative decrease: a 429, 503 or timeout multiplies it by
+  ``decrease``; further overloads from calls started before that cut are
+  ignored, so one burst of rejections halves the limit once, not N times
+
+``AdaptiveConcurrencyModel`` wraps an agent's model: each call waits for a
+slot under the shared limit, and its outcome moves the limit. All wrapped
+agents share one limiter, so concurrent jobs and ``MultiBatchProcessor``
+pools adapt together (the shared pool is sized for ``LLM_CONCURRENCY_MAX``,
+so the limit, not the pool, decides how many calls run).
+
+Retries of a single call belong to the OpenAI client (``max_retries``, which
+honours ``Retry-After``); the limiter sees the call's final outcome. Whole
+batches are re-run by ``MultiBatchProcessor`` and whole stages by the
+pipeline. ``LLM_OVERLOAD_RETRIES`` (0 by default) makes the wrapper retry
+overloaded calls itself; set it only for clients built with
+``max_retries=0``, so every 429 reaches the limiter and retries don't stack.
+
+Enabled by default (``LLM_ADAPTIVE_CONCURRENCY``); the pipeline calls
+``install_adaptive_concurrency()`` on its first run. ``MAX_CONCURRENT_BATCHES``
+is the starting limit.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import openai
+from agents import Agent
+from agents.models.interface import Model, ModelProvider
+
+from app.services.cancellation import checkpoint
+from app.services.hedging import HEDGED_AGENTS
+from app.services.metrics import llm_concurrency_limit, llm_overloaded_requests
+from app.services.model_wrappers import WrappedModel, install_wrappers, wrap_agent
+
+logger = logging.getLogger(__name__)
+
+# Every agent called in batch loops shares the limit
+LIMITED_AGENTS = HEDGED_AGENTS + [
+    ("app.local_agents.scoring.subagents.broad_volume_agent", "broad_volume_agent"),
+]
+
+OVERLOAD_STATUS_CODES = (429, 503)
+
+
+@dataclass
+class AIMDConfig:
+    """Bounds and step sizes of the concurrency limit."""
+    initial: float = 3.0
+    min_limit: float = 1.0
+    max_limit: float = 16.0
+    increase: float = 1.0  # Added per round of successful calls
+    decrease: float = 0.5  # Factor applied on overload
+    overload_retries: int = 0  # Retries of an overloaded call; the client retries by default
+    retry_base_delay: float = 0.5  # Backoff before the first retry (doubles per retry)
+
+    @classmethod
+    def from_settings(cls) -> "AIMDConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        return cls(
+            initial=settings.MAX_CONCURRENT_BATCHES,
+            min_limit=settings.LLM_CONCURRENCY_MIN,
+            max_limit=settings.LLM_CONCURRENCY_MAX,
+            overload_retries=settings.LLM_OVERLOAD_RETRIES,
+        )
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """True for errors meaning "slow down": rate limits, overloaded servers and timeouts."""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, asyncio.TimeoutError, TimeoutError)):
+        return True
+    return getattr(error, "status_code", None) in OVERLOAD_STATUS_CODES
+
+
+@dataclass(frozen=True)
+class Slot:
+    """A slot held under the limit."""
+    started_at: float
+    saturated: bool  # Took the last free slot, so the limit was what held calls back
+
+
+class AIMDLimiter:
+    """Concurrency limit shared by threads and event loops."""
+
+    def __init__(self, config: Optional[AIMDConfig] = None):
+        self.config = config or AIMDConfig()
+        self._limit = min(max(self.config.initial, self.config.min_limit), self.config.max_limit)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._lock = threading.Lock()
+        llm_concurrency_limit.set(self._limit)
+
+    @property
+    def limit(self) -> float:
+        with self._lock:
+            return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        with self._lock:
+            return self._in_flight
+
+    def try_acquire(self) -> Optional[Slot]:
+        """Take a slot if one is free; returns it, or None."""
+        with self._lock:
+            if self._in_flight >= int(self._limit):
+                return None
+            self._in_flight += 1
+            return Slot(time.monotonic(), self._in_flight >= int(self._limit))
+
+    async def acquire(self, poll_seconds: float = 0.01) -> Slot:
+        """Wait for a slot (polling, so it works from any thread's event loop)."""
+        while True:
+            slot = self.try_acquire()
+            if slot is not None:
+                return slot
+            checkpoint("waiting for an LLM slot")
+            await asyncio.sleep(poll_seconds)
+
+    def release(self, slot: Slot, outcome: str = "success"):
+        """
+        Free a slot and adapt the limit to how its call went.
+
+        Args:
+            slot: Value returned by ``try_acquire``/``acquire``
+            outcome: "success" grows the limit if the slot was the last free
+                one, "overload" cuts it, anything else (other errors,
+                cancellation) leaves it unchanged
+        """
+        with self._lock:
+            self._in_flight -= 1
+            if outcome == "success":
+                if slot.saturated:
+                    self._limit = min(self.config.max_limit, self._limit + self.config.increase / self._limit)
+            elif outcome == "overload" and slot.started_at >= self._last_decrease:
+                previous = self._limit
+                self._limit = max(self.config.min_limit, self._limit * self.config.decrease)
+                self._last_decrease = time.monotonic()
+                logger.warning(f"🚦 [AIMD] Overload - concurrency limit {previous:.1f} -> {self._limit:.1f}")
+            limit = self._limit
+        llm_concurrency_limit.set(limit)
+
+
+class AdaptiveConcurrencyModel(WrappedModel):
+    """
+    ``Model`` that runs its inner model's calls under an ``AIMDLimiter``.
+
+    Streams pass through: they hold their slot for an unknown time, so they
+    are not limited.
+
+    Args:
+        agent_name: Agent name for logs and metrics
+        inner: Model instance, or model name resolved per call like the SDK does
+        limiter: Shared limiter
+        provider: Provider resolving a model name (default: the SDK's ``MultiProvider``)
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        inner: Union[str, Model, None],
+        limiter: AIMDLimiter,
+        provider: Optional[ModelProvider] = None,
+    ):
+        super().__init__(agent_name, inner, provider)
+        self.limiter = limiter
+
+    async def get_response(self, *args, **kwargs):
+        model = self._resolve()
+        config = self.limiter.config
+        for attempt in range(config.overload_retries + 1):
+            slot = await self.limiter.acquire()
+            outcome = "error"
+            try:
+                response = await model.get_response(*args, **kwargs)
+                outcome = "success"
+                return response
+            except Exception as e:
+                if not is_overload_error(e):
+                    raise
+                outcome = "overload"
+                llm_overloaded_requests.inc(agent=self.agent_name)
+                if attempt == config.overload_retries:
+                    raise
+            finally:
+                self.limiter.release(slot, outcome)
+            # Full jitter keeps retried calls from arriving together
+            await asyncio.sleep(config.retry_base_delay * 2 ** attempt * random.random())
+
+
+_limiter: Optional[AIMDLimiter] = None
+_install_lock = threading.Lock()
+
+
+def get_llm_limiter(config: Optional[AIMDConfig] = None) -> AIMDLimiter:
+    """The process-wide limiter (created from settings on first use)."""
+    global _limiter
+    with _install_lock:
+        if _limiter is None:
+            _limiter = AIMDLimiter(config or AIMDConfig.from_settings())
+        return _limiter
+
+
+def limit_agent(agent: Agent, limiter: Optional[AIMDLimiter] = None) -> AdaptiveConcurrencyModel:
+    """Run ``agent``'s calls under ``limiter`` (the process-wide one by default)."""
+    return wrap_agent(agent, AdaptiveConcurrencyModel, limiter or get_llm_limiter())
+
+
+def install_adaptive_concurrency() -> List[str]:
+    """
+    Limit the batch-loop agents if ``LLM_ADAPTIVE_CONCURRENCY`` is set (idempotent).
+
+    Install after hedging, so hedges are timed without the wait for a slot.
+
+    Returns:
+        Names of the agents now limited
+    """
+    from app.core.config import settings
+
+    if not settings.LLM_ADAPTIVE_CONCURRENCY:
+        return []
+    return install_wrappers(LIMITED_AGENTS, limit_agent)
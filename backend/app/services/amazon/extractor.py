@@ -0,0 +1,642 @@
+"""
+Single-pass Amazon product page extractor.
+
+The spider used to run dozens of independent ``response.css`` passes over the
+whole document. This module parses the page once, locates every element the
+extraction needs with a single indexing XPath, and then evaluates precompiled
+XPath expressions only inside those (small) subtrees.
+
+Every selector is compiled through parsel's CSS translator, so the matched
+nodes - and therefore the output - are identical to the previous
+selector-based implementation in ``AmazonScraperSpider.parse``.
+
+Usage:
+    from app.services.amazon.extractor import extract_product_page
+    scraped = extract_product_page(html_text, url, status)
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import json
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import urljoin
+
+from lxml import etree
+from parsel import Selector
+from parsel.csstranslator import HTMLTranslator
+from w3lib.html import get_base_url
+
+
+_translator = HTMLTranslator()
+
+
+def _xpath(css: str, prefix: str = "descendant-or-self::") -> etree.XPath:
+    """Compile a CSS query exactly the way parsel would evaluate it."""
+    return etree.XPath(_translator.css_to_xpath(css, prefix=prefix), smart_strings=False)
+
+
+def _scoped(css: str) -> etree.XPath:
+    """Compile the descendant part of a ``#id <css>`` selector, relative to the #id element."""
+    return _xpath(css, prefix="descendant::")
+
+
+# Elements located by the indexing pass (everything else is scoped under these)
+INDEXED_IDS = (
+    "productTitle",
+    "productOverview_feature_div",
+    "feature-bullets",
+    "productDescription",
+    "prodDetails",
+    "detailBullets_feature_div",
+    "aplus",
+    "landingImage",
+    "altImages",
+    "imageBlockThumbs",
+    "acrPopover",
+    "acrCustomerReviewText",
+    "cm-cr-dp-review-list",
+    "ask-btf_feature_div",
+    "apex_desktop",
+    "corePrice_feature_div",
+    "tp_price_block_total_price_ww",
+    "priceblock_ourprice",
+    "priceblock_dealprice",
+    "priceblock_saleprice",
+)
+
+_INDEXED_ID_SET = frozenset(INDEXED_IDS)
+
+# Sections produced by each extraction profile. "full" is what the main product
+# scrape has always returned; "competitor" keeps only what the research stage reads
+# per competitor (title, bullets, price and the rating/review-count highlights,
+# with the detail bullets as the rating fallback used by _parse_rating_info).
+EXTRACTION_PROFILES: Dict[str, frozenset] = {
+    "full": frozenset({
+        "productOverview_feature_div",
+        "feature-bullets",
+        "productDescription",
+        "prodDetails",
+        "detailBullets_feature_div",
+        "images",
+        "aplus",
+        "reviews",
+        "review_samples",
+        "qa_section",
+        "price",
+    }),
+    "competitor": frozenset({
+        "feature-bullets",
+        "detailBullets_feature_div",
+        "reviews",
+        "price",
+    }),
+}
+_RATING_HOOK = "rating-out-of-text"
+
+# One traversal of the document collects every anchor candidate, in document order.
+# Only attribute existence is tested here (string comparisons per node are what made
+# the old per-selector passes expensive); the exact id match happens in Python.
+_INDEX = etree.XPath("descendant-or-self::*[@id or @data-hook]", smart_strings=False)
+
+_ALL_TEXT = _xpath("::text")
+_OWN_TEXT = etree.XPath("text()", smart_strings=False)
+
+_POV_ROWS = _scoped("table tr")
+_POV_LABEL = _xpath("td:first-child ::text, th:first-child ::text, .a-text-bold::text")
+_POV_VALUE = _xpath("td:nth-child(2) ::text, td:last-child ::text, span.po-break-word::text")
+
+_FB_TEXT = _xpath("ul li .a-list-item::text, ul li span::text, ul li::text")
+_PD_TEXT = _xpath("p::text, p *::text")
+
+_TECH_ROWS = _scoped("table#productDetails_techSpec_section_1 tr")
+_ADD_ROWS = _scoped("table#productDetails_detailBullets_sections1 tr")
+_ROW_KEY = _xpath("th::text, th *::text")
+_ROW_VALUE = _xpath("td::text, td *::text")
+
+_DB_ITEMS = _xpath("li")
+_DB_LABEL = _xpath("span.a-text-bold::text")
+_DB_VALUE = _xpath("span:not(.a-text-bold)::text, a::text")
+
+_THUMB_DYNAMIC = _scoped("img::attr(data-a-dynamic-image)")
+_THUMB_HIRES = _scoped("img::attr(data-old-hires)")
+_THUMB_SRCSET = _scoped("img::attr(srcset)")
+_THUMB_SRC = _scoped("img::attr(data-src), img::attr(src)")
+
+_APLUS_HEADINGS = _xpath("h1, h2, h3, h4")
+_APLUS_PARAGRAPHS = _xpath("p")
+_APLUS_LIST_ITEMS = _xpath("li")
+_VISIBLE_TEXT = _xpath("*:not(script):not(style):not(noscript)::text")
+
+_REVIEW_TEXT = _scoped(".review-text-content span::text")
+_QA_TEXT = _xpath("span::text, a::text")
+
+_PRICE_OFFSCREEN = _scoped("span.a-price span.a-offscreen")
+# Document-wide last resort, only evaluated when no anchored price matched
+_GENERIC_OFFSCREEN = _xpath("span.a-price span.a-offscreen")
+
+# (source name, anchor id or None for the document-wide fallback, scoped query or None)
+_PRICE_CANDIDATES: List[Tuple[str, Optional[str], Optional[etree.XPath]]] = [
+    ("apex_offscreen", "apex_desktop", _PRICE_OFFSCREEN),
+    ("core_offscreen", "corePrice_feature_div", _PRICE_OFFSCREEN),
+    ("tp_total", "tp_price_block_total_price_ww", _scoped("span.a-offscreen")),
+    ("ourprice", "priceblock_ourprice", None),
+    ("dealprice", "priceblock_dealprice", None),
+    ("saleprice", "priceblock_saleprice", None),
+    ("generic_offscreen", None, None),
+]
+
+_PUNCT_ONLY_RE = re.compile(r"[*:/.()-]+")
+
+
+def _clean_text(value: Optional[str]) -> str:
+    if not value:
+        return ""
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _parse_dynamic_image_json(attr_value: Optional[str]) -> List[str]:
+    """Parse Amazon's data-a-dynamic-image JSON attr into a list of absolute/relative URLs."""
+    if not attr_value:
+        return []
+    try:
+        data = json.loads(attr_value)
+        # keys are URLs
+        return list(data.keys())
+    except Exception:
+        return []
+
+
+def _parse_srcset(attr_value: Optional[str]) -> List[str]:
+    """Parse an HTML srcset attribute into a list of URLs."""
+    if not attr_value:
+        return []
+    urls: List[str] = []
+    try:
+        parts = [p.strip() for p in attr_value.split(",")]
+        for part in parts:
+            if not part:
+                continue
+            # Format examples: "https://... 1x" or "https://... 320w"
+            first = part.split()[0]
+            if first:
+                urls.append(first)
+    except Exception:
+        pass
+    return urls
+
+
+def _normalize_image_url(url: Optional[str]) -> str:
+    """Normalize image URL for comparison/deduplication: strip querystring and whitespace."""
+    if not url:
+        return ""
+    try:
+        # Drop query params/fragments which often encode sizes or cache keys
+        base = url.split("?")[0].split("#")[0]
+        return base.strip()
+    except Exception:
+        return url.strip()
+
+
+def _upgrade_amazon_image(u: str) -> str:
+    """Upgrade Amazon thumbnail to hi-res by stripping sizing tokens like ._SS40_, ._AC_US40_, etc."""
+    try:
+        if not u:
+            return u
+        u = _normalize_image_url(u)
+        # Only process Amazon media hosts
+        if not re.search(r"\b(m\.media-amazon\.com|images-na\.ssl-images-amazon\.com)\b", u):
+            return u
+        # Example: https://m.media-amazon.com/images/I/51GKBz7WVYL._AC_US40_.jpg -> .../I/51GKBz7WVYL.jpg
+        m = re.match(r"^(https?://[^\s]+/images/[^/]+/[^./]+)(\._[^.]+_)?\.(jpg|jpeg|png|webp)$", u, re.I)
+        if m:
+            return f"{m.group(1)}.{m.group(3)}"
+        # Fallback: remove any ._TOKEN_ just before extension
+        return re.sub(r"\._[^./]+_(\.[a-zA-Z0-9]+)$", r"\\1", u)
+    except Exception:
+        return u
+
+
+def _is_product_image(u: str) -> bool:
+    """Filter out sprites/icons/overlays and non-product resources."""
+    if not u:
+        return False
+    lower = u.lower()
+    # Exclude graphics folders and overlays/icons
+    noisy_markers = [
+        "/images/g/", "/g/", "play-icon", "overlay", "sprite", "icon_", "360_icon", "placeholder",
+    ]
+    if any(marker in lower for marker in noisy_markers):
+        return False
+    # Must be an image extension
+    if not re.search(r"\.(jpg|jpeg|png|webp)$", lower):
+        return False
+    return True
+
+
+def _kv_from_rows(rows: List[Tuple[str, str]]) -> Dict[str, str]:
+    d: Dict[str, str] = {}
+    for k, v in rows:
+        if k and v:
+            d[k] = v
+    return d
+
+
+def _parse_price_value(raw: str) -> Tuple[Optional[float], Optional[str]]:
+    """Extract numeric amount and currency symbol/code from a raw price string."""
+    if not raw:
+        return None, None
+    # Common currency symbols
+    currency_match = re.search(r"([$€£¥₹]|CAD|USD|EUR|GBP|JPY|INR)", raw)
+    currency = currency_match.group(1) if currency_match else None
+    # Remove non-number separators except dot and comma then normalize
+    # Handle formats like $1,234.56 or €1.234,56 or 1 234,56
+    cleaned = raw
+    cleaned = cleaned.replace("\u00A0", " ")  # nbsp
+    # Keep digits, separators, and minus
+    cleaned = re.sub(r"[^0-9,.-]", "", cleaned)
+    # If both comma and dot exist, assume dot is decimal; remove commas
+    if "," in cleaned and "." in cleaned:
+        cleaned_num = cleaned.replace(",", "")
+    else:
+        # If only comma exists, treat comma as decimal
+        if "," in cleaned and "." not in cleaned:
+            cleaned_num = cleaned.replace(",", ".")
+        else:
+            cleaned_num = cleaned
+    num_match = re.search(r"-?[0-9]+(?:\.[0-9]+)?", cleaned_num)
+    try:
+        amount = float(num_match.group(0)) if num_match else None
+    except Exception:
+        amount = None
+    return amount, currency
+
+
+def _uniq(seq: List[str]) -> List[str]:
+    seen: set[str] = set()
+    return [x for x in seq if not (x in seen or seen.add(x))]
+
+
+def _html(el: Optional[etree._Element]) -> str:
+    """Serialize an element like parsel's ``Selector.get()``."""
+    if el is None:
+        return ""
+    return etree.tostring(el, method="html", encoding="unicode", with_tail=False)
+
+
+def _collect(roots: List[etree._Element], query: etree.XPath) -> List[Any]:
+    """Evaluate a compiled query on each root and flatten, like ``SelectorList.css``."""
+    out: List[Any] = []
+    for root in roots:
+        out.extend(query(root))
+    return out
+
+
+def _joined(roots: List[etree._Element], query: etree.XPath) -> str:
+    return _clean_text(" ".join(_collect(roots, query)))
+
+
+def _first_attr(roots: List[etree._Element], attr: str) -> Optional[str]:
+    for el in roots:
+        value = el.get(attr)
+        if value is not None:
+            return value
+    return None
+
+
+def _visible_texts(elements: List[etree._Element], limit: int) -> List[str]:
+    """Deduplicated visible text of ``elements``; stops once ``limit`` unique entries exist."""
+    out: List[str] = []
+    seen: set[str] = set()
+    for el in elements:
+        for raw in _VISIBLE_TEXT(el):
+            t = _clean_text(raw)
+            if not t or _PUNCT_ONLY_RE.fullmatch(t) or t in seen:
+                continue
+            seen.add(t)
+            out.append(t)
+            if 0 <= limit <= len(out):
+                return out
+    return out
+
+
+class _PageIndex:
+    """Anchor elements of a product page, collected in one document traversal."""
+
+    def __init__(self, root: etree._Element):
+        self.root = root
+        self.by_id: Dict[str, List[etree._Element]] = {}
+        self.rating_nodes: List[etree._Element] = []
+        for el in _INDEX(root):
+            el_id = el.get("id")
+            if el_id in _INDEXED_ID_SET:
+                self.by_id.setdefault(el_id, []).append(el)
+            if el_id == "acrPopover" or el.get("data-hook") == _RATING_HOOK:
+                self.rating_nodes.append(el)
+
+    def get(self, el_id: str) -> List[etree._Element]:
+        return self.by_id.get(el_id, [])
+
+    def rating_text(self) -> Optional[str]:
+        """First match of ``#acrPopover::attr(title), [data-hook='rating-out-of-text']::text``."""
+        for el in self.rating_nodes:
+            if el.get("id") == "acrPopover" and el.get("title") is not None:
+                return el.get("title")
+            if el.get("data-hook") == _RATING_HOOK:
+                texts = _OWN_TEXT(el)
+                if texts:
+                    return texts[0]
+        return None
+
+
+def _pick_price_text(index: _PageIndex) -> Tuple[str, str, str]:
+    """Return (source, text, html) for the first found price, else ('', '', '')."""
+    for name, anchor_id, query in _PRICE_CANDIDATES:
+        if anchor_id is None:
+            matches = _GENERIC_OFFSCREEN(index.root)
+        elif query is None:
+            matches = index.get(anchor_id)
+        else:
+            matches = _collect(index.get(anchor_id), query)
+        txt = _joined(matches, _ALL_TEXT)
+        if txt:
+            return name, txt, _html(matches[0] if matches else None)
+    return "", "", ""
+
+
+def _collect_image_urls(index: _PageIndex, html: str, url: str) -> List[str]:
+    urls: List[str] = []
+    seen: set[str] = set()
+    base_url: List[str] = []
+
+    def add(u: Optional[str]):
+        if not u:
+            return
+        if not base_url:
+            # Same base as scrapy's response.urljoin (honours <base href>)
+            base_url.append(get_base_url(html[0:4096], url))
+        abs_u = urljoin(base_url[0], u)
+        upgraded = _upgrade_amazon_image(abs_u)
+        if not _is_product_image(upgraded):
+            return
+        norm = _normalize_image_url(upgraded)
+        if norm and norm not in seen:
+            seen.add(norm)
+            urls.append(norm)
+
+    # Hero image variations
+    landing = index.get("landingImage")
+    for u in _parse_dynamic_image_json(_first_attr(landing, "data-a-dynamic-image")):
+        add(u)
+    add(_first_attr(landing, "data-old-hires"))
+    for u in _parse_srcset(_first_attr(landing, "srcset")):
+        add(u)
+
+    # Thumbnails: try dynamic JSON first for each thumb, then hi-res/srcset, then src/data-src
+    for anchor_id in ("altImages", "imageBlockThumbs"):
+        roots = index.get(anchor_id)
+        if not roots:
+            continue
+        for dyn in _collect(roots, _THUMB_DYNAMIC):
+            for u in _parse_dynamic_image_json(dyn):
+                add(u)
+        for u in _collect(roots, _THUMB_HIRES):
+            add(u)
+        for srcset in _collect(roots, _THUMB_SRCSET):
+            for u in _parse_srcset(srcset):
+                add(u)
+        for u in _collect(roots, _THUMB_SRC):
+            add(u)
+
+    return urls
+
+
+def _parse_root(html: str) -> etree._Element:
+    """Build the lxml tree exactly like scrapy's ``response.selector`` does."""
+    return Selector(text=html, type="html").root
+
+
+def extract_product_page(html: str, url: str, status: int = 200, profile: str = "full") -> Dict[str, Any]:
+    """
+    Extract product data from a product page's HTML in a single parse.
+
+    Args:
+        html: Decoded page HTML (``response.text``)
+        url: Final page URL (used for relative image URLs)
+        status: HTTP status code of the response
+        profile: Extraction profile name from ``EXTRACTION_PROFILES``
+
+    Returns:
+        ``{"success": True, "data": {...}}`` with the same structure the spider
+        has always produced (sections outside the profile are left out), or
+        ``{"success": False, ...}`` for blocked pages.
+    """
+    if profile not in EXTRACTION_PROFILES:
+        raise ValueError(f"Unknown extraction profile '{profile}'. Choose from: {sorted(EXTRACTION_PROFILES)}")
+    sections = EXTRACTION_PROFILES[profile]
+
+    html_len = len(html)
+    # A plain lowercase + substring scan is faster than a case-insensitive regex here
+    has_captcha = "captcha" in html.lower()
+    if status in (403, 503) or has_captcha or html_len < 5000:
+        return {
+            "success": False,
+            "error": "Blocked or insufficient content",
+            "blocked_reason": f"status:{status}, size:{html_len}, captcha:{has_captcha}",
+        }
+
+    include_html = os.getenv("ID_ONLY_INCLUDE_HTML", "0").lower() in {"1", "true", "yes"}
+    index = _PageIndex(_parse_root(html))
+
+    out: Dict[str, Any] = {
+        "url": url,
+        "status": status,
+        "response_size": html_len,
+        "elements": {},
+    }
+
+    # productTitle (always extracted: it also feeds the top-level "title" helper)
+    title_roots = index.get("productTitle")
+    title_text = _joined(title_roots, _ALL_TEXT)
+    elem: Dict[str, Any] = {"present": bool(title_text), "text": [title_text] if title_text else []}
+    if include_html:
+        elem["html"] = _html(title_roots[0] if title_roots else None)
+    out["elements"]["productTitle"] = elem
+
+    # productOverview_feature_div -> table rows as key/value
+    if "productOverview_feature_div" in sections:
+        pov_roots = index.get("productOverview_feature_div")
+        pov_rows: List[Tuple[str, str]] = []
+        for tr in _collect(pov_roots, _POV_ROWS):
+            # labels can be in first td or bold span
+            label = _clean_text(" ".join(_POV_LABEL(tr)))
+            value = _clean_text(" ".join(_POV_VALUE(tr)))
+            if label and value:
+                pov_rows.append((label, value))
+        elem = {
+            "present": bool(pov_rows),
+            "kv": _kv_from_rows(pov_rows),
+        }
+        if include_html:
+            elem["html"] = _html(pov_roots[0] if pov_roots else None)
+        out["elements"]["productOverview_feature_div"] = elem
+
+    # feature-bullets -> only the bullet items
+    if "feature-bullets" in sections:
+        fb_roots = index.get("feature-bullets")
+        bullets = [_clean_text(t) for t in _collect(fb_roots, _FB_TEXT)]
+        bullets = [
+            b for b in bullets
+            if b and b.lower() not in {"about this item", "see more product details"}
+        ]
+        elem = {"present": bool(bullets), "bullets": _uniq(bullets)}
+        if include_html:
+            elem["html"] = _html(fb_roots[0] if fb_roots else None)
+        out["elements"]["feature-bullets"] = elem
+
+    # productDescription -> paragraphs only
+    if "productDescription" in sections:
+        pd_roots = index.get("productDescription")
+        paragraphs = [_clean_text(p) for p in _collect(pd_roots, _PD_TEXT)]
+        paragraphs = _uniq([p for p in paragraphs if p])
+        elem = {"present": bool(paragraphs), "paragraphs": paragraphs}
+        if include_html:
+            elem["html"] = _html(pd_roots[0] if pd_roots else None)
+        out["elements"]["productDescription"] = elem
+
+    # prodDetails -> restrict to tech spec and detail bullets tables
+    if "prodDetails" in sections:
+        details_roots = index.get("prodDetails")
+
+        def _rows(query: etree.XPath) -> List[Tuple[str, str]]:
+            rows: List[Tuple[str, str]] = []
+            for tr in _collect(details_roots, query):
+                k = _clean_text(" ".join(_ROW_KEY(tr)))
+                v = _clean_text(" ".join(_ROW_VALUE(tr)))
+                if k and v:
+                    rows.append((k, v))
+            return rows
+
+        tech_rows = _rows(_TECH_ROWS)
+        add_rows = _rows(_ADD_ROWS)
+        elem = {
+            "present": bool(tech_rows or add_rows),
+            "tech_specs": _kv_from_rows(tech_rows),
+            "additional_info": _kv_from_rows(add_rows),
+        }
+        if include_html:
+            elem["html"] = _html(details_roots[0] if details_roots else None)
+        out["elements"]["prodDetails"] = elem
+
+    # detailBullets_feature_div -> bullets as key/value when possible
+    if "detailBullets_feature_div" in sections:
+        db_roots = index.get("detailBullets_feature_div")
+        db_kv: Dict[str, str] = {}
+        for li in _collect(db_roots, _DB_ITEMS):
+            label = _clean_text(" ".join(_DB_LABEL(li))).rstrip(":")
+            value = _clean_text(" ".join(_DB_VALUE(li)))
+            if label and value:
+                db_kv[label] = value
+        # Clean noisy Customer Reviews values (strip inline JS fragments and condense)
+        for k in list(db_kv.keys()):
+            if "customer reviews" in k.lower():
+                v = db_kv[k]
+                rating_match = re.search(r"([0-9.]+)\s+out of 5 stars", v, re.I)
+                count_match = re.search(r"([0-9,]+)\s+ratings?", v, re.I)
+                parts: List[str] = []
+                if rating_match:
+                    parts.append(f"{rating_match.group(1)} out of 5 stars")
+                if count_match:
+                    parts.append(f"{count_match.group(1)} ratings")
+                if parts:
+                    db_kv[k] = " ".join(parts)
+                else:
+                    db_kv[k] = _clean_text(v)[:200]
+        elem = {"present": bool(db_kv), "kv": db_kv}
+        if include_html:
+            elem["html"] = _html(db_roots[0] if db_roots else None)
+        out["elements"]["detailBullets_feature_div"] = elem
+
+    # images -> aggregate hero + all thumbnails (dynamic JSON, hires, srcset, src/data-src)
+    if "images" in sections:
+        image_urls = _collect_image_urls(index, html, url)
+        out["images"] = {
+            "present": bool(image_urls),
+            "main_image": image_urls[0] if image_urls else "",
+            "all_images": image_urls,
+            "image_count": len(image_urls),
+        }
+
+    # aplus -> only headings and paragraph/list text, capped while walking
+    if "aplus" in sections:
+        aplus_roots = index.get("aplus")
+        max_items = int(os.getenv("ID_ONLY_MAX_APLUS_ITEMS", "50"))
+        # Keep at least one item per list so "present" is still accurate when the cap is 0
+        walk_limit = max(max_items, 1) if max_items >= 0 else -1
+        headings = _visible_texts(_collect(aplus_roots, _APLUS_HEADINGS), walk_limit)
+        paras = _visible_texts(_collect(aplus_roots, _APLUS_PARAGRAPHS), walk_limit)
+        list_items = _visible_texts(_collect(aplus_roots, _APLUS_LIST_ITEMS), walk_limit)
+        elem = {
+            "present": bool(headings or paras or list_items),
+            "headings": headings[:max_items],
+            "paragraphs": paras[:max_items],
+            "list_items": list_items[:max_items],
+        }
+        if include_html:
+            elem["html"] = _html(aplus_roots[0] if aplus_roots else None)
+        out["elements"]["aplus"] = elem
+
+    # Also expose a tiny title helper for quick sanity checks
+    out["title"] = title_text
+
+    # reviews -> sample review texts + rating/highlights
+    if "reviews" in sections:
+        review_texts: List[str] = []
+        if "review_samples" in sections:
+            review_texts = [
+                _clean_text(t)
+                for t in _collect(index.get("cm-cr-dp-review-list"), _REVIEW_TEXT)[:5]
+                if _clean_text(t)
+            ]
+        rating_text = _clean_text(index.rating_text())
+        review_count = _clean_text(next(iter(_collect(index.get("acrCustomerReviewText"), _OWN_TEXT)), None))
+        out["reviews"] = {
+            "present": bool(review_texts or rating_text or review_count),
+            "sample_reviews": review_texts,
+            "review_highlights": [rating_text, review_count],
+        }
+
+    # Q&A section -> inline questions if present (no follow-up request to keep it minimal)
+    if "qa_section" in sections:
+        qa_pairs: List[Dict[str, str]] = []
+        qa_roots = index.get("ask-btf_feature_div")
+        if qa_roots:
+            qs = [
+                _clean_text(q)
+                for q in _collect(qa_roots, _QA_TEXT)[:5]
+                if _clean_text(q)
+            ]
+            qa_pairs = [{"q": q, "a": ""} for q in qs]
+        out["qa_section"] = {
+            "present": bool(qa_pairs),
+            "qa_pairs": qa_pairs,
+            "questions": [q.get("q") for q in qa_pairs],
+        }
+
+    # Extract price (lean): amount, currency, raw, source
+    if "price" in sections:
+        src, raw_price, price_html = _pick_price_text(index)
+        amount, currency = _parse_price_value(raw_price)
+        price_obj: Dict[str, Any] = {
+            "present": bool(raw_price),
+            "raw": raw_price if raw_price else "",
+            "amount": amount,
+            "currency": currency,
+            "source": src,
+        }
+        if include_html:
+            price_obj["html"] = price_html
+        out["price"] = price_obj
+
+    return {"success": True, "data": out}
@@ -13,6 +13,8 @@ from typing import Dict, Any, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv, find_dotenv
 
+from app.services.cancellation import run_subprocess
+
 load_dotenv(find_dotenv())
 
 
@@ -82,10 +84,8 @@ class AmazonSearchScraper:
             backend_dir = app_dir.parent
             scraper_script = app_dir / "services" / "amazon" / "standalone_search_scraper.py"
             
-            result = subprocess.run(
+            result = run_subprocess(
                 [sys.executable, str(scraper_script), search_url, str(max_results)],
-                capture_output=True,
-                text=True,
                 timeout=120,
                 cwd=str(backend_dir),
             )
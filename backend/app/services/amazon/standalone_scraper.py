@@ -14,13 +14,15 @@ sys.path.insert(0, str(backend_dir))
 
 def main():
     if len(sys.argv) < 2:
-        print(json.dumps({"success": False, "error": "Usage: standalone_scraper.py <url>"}))
+        print(json.dumps({"success": False, "error": "Usage: standalone_scraper.py <url> [profile]"}))
         sys.exit(1)
     url = sys.argv[1]
+    # Optional extraction profile ("full" by default, "competitor" for lean competitor fetches)
+    profile = sys.argv[2] if len(sys.argv) > 2 else "full"
     try:
         # Use the scraper as the unified backend
         from app.services.amazon.scraper import scrape_amazon_product
-        result = scrape_amazon_product(url)
+        result = scrape_amazon_product(url, profile=profile)
         # Ensure URL field is present for downstream consumers
         if isinstance(result, dict) and "data" in result and isinstance(result["data"], dict):
             result["data"].setdefault("url", url)
@@ -0,0 +1,422 @@
+"""
+Offline bulk mode - run a bulk job's LLM batches through the OpenAI Batch API.
+
+Overnight catalog refreshes don't need interactive latency. Batch API
+requests are answered within a completion window at half the price, and they
+don't count against the synchronous limits ``OpenAIRateLimiter`` paces.
+
+The pipeline is synchronous code, so an offline run replays it in rounds:
+
+1. Every item runs inside ``offline_batch_scope``. Keyword categorization,
+   intent and root relevance calls without a stored answer are queued as
+   Batch API request lines (the model raises ``BatchRequestQueued`` and the
+   runner moves on to the item's next batch); answers of the other agents
+   are stored as they are made.
+2. ``batch_barrier()`` at the end of those runners' batch loops stops an item
+   that queued requests (``BatchPending``), before later stages build on
+   fallback output.
+3. The round's queued lines go out as one batch. Once it finishes, its
+   answers are stored and the next round replays the items, answering every
+   stored call from the store, until no item queues anything.
+
+Scrapes are shared across rounds (``shared_work``), so an item's prompts are
+the same in every round and replayed calls hit the store. The store is saved
+after each round with the id of the batch in flight, so a restarted run can
+resume from the returned results instead of resubmitting. The bulk job
+endpoint keys the saved store by ``offline_run_key``: posting the same items
+and CSVs again resumes the interrupted run.
+"""
+
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.services.bulk_analysis import BulkItem, BulkItemResult, Pipeline, ProgressCallback, item_signature, upload_file
+from app.services.cancellation import checkpoint
+from app.services.metrics import llm_batch_requests
+from app.services.shared_work import SharedWorkCache, shared_work
+
+logger = logging.getLogger(__name__)
+
+# Agents whose calls are queued for the Batch API; all other agents are called directly
+BATCH_AGENTS = ("KeywordAgent", "IntentScoringSubagent", "RootRelevanceAgent")
+BATCH_ENDPOINT = "/v1/responses"
+FINISHED_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchRequestQueued(Exception):
+    """A model call was queued for the Batch API instead of being answered."""
+
+
+class BatchPending(BaseException):
+    """
+    Raised at a batch barrier while an item waits for Batch API answers.
+
+    Derives from ``BaseException`` (like ``JobCancelled``) so the pipeline's
+    ``except Exception`` fallbacks do not swallow it.
+    """
+
+
+class BatchStore:
+    """
+    Answers and queued request lines of an offline run (thread-safe).
+
+    Args:
+        path: JSON file the state is saved to after each round (None: memory only)
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.answers: Dict[str, Dict[str, Any]] = {}  # custom_id -> Responses API body
+        self.queued: Dict[str, Dict[str, Any]] = {}  # custom_id -> Batch API request line
+        self.batches: List[Dict[str, Any]] = []
+        self.in_flight: Optional[str] = None  # Batch submitted but not collected yet
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchStore":
+        """Store saved at ``path`` (empty if there is none yet)."""
+        store = cls(path)
+        if store.path.exists():
+            state = json.loads(store.path.read_text(encoding="utf-8"))
+            store.answers = state.get("answers", {})
+            store.queued = state.get("queued", {})
+            store.batches = state.get("batches", [])
+            store.in_flight = state.get("in_flight")
+        return store
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            state = {"answers": self.answers, "queued": self.queued, "batches": self.batches, "in_flight": self.in_flight}
+            data = json.dumps(state, separators=(",", ":"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(data, encoding="utf-8")
+        tmp.replace(self.path)
+
+    def delete(self):
+        """Remove the saved state once the run it belongs to is over."""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+
+    def answer(self, custom_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.answers.get(custom_id)
+
+    def store_answer(self, custom_id: str, body: Dict[str, Any]):
+        with self._lock:
+            self.answers[custom_id] = body
+
+    def queue(self, custom_id: str, line: Dict[str, Any]):
+        with self._lock:
+            self.queued[custom_id] = line
+
+    def take_queued(self) -> List[Dict[str, Any]]:
+        """Remove and return the queued request lines."""
+        with self._lock:
+            lines = list(self.queued.values())
+            self.queued.clear()
+            return lines
+
+
+@dataclass
+class OfflineBatchJob:
+    """One item's pass through the pipeline in an offline run."""
+    store: BatchStore
+    queued: int = 0  # Calls queued for the Batch API in this pass
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def queue(self, custom_id: str, line: Dict[str, Any]):
+        self.store.queue(custom_id, line)
+        with self._lock:
+            self.queued += 1
+
+
+_current_job: contextvars.ContextVar[Optional[OfflineBatchJob]] = contextvars.ContextVar(
+    "offline_batch_job", default=None
+)
+
+
+def current_batch_job() -> Optional[OfflineBatchJob]:
+    """Offline batch pass running in this context, or None for a normal (synchronous) run."""
+    return _current_job.get()
+
+
+@contextmanager
+def offline_batch_scope(job: OfflineBatchJob) -> Iterator[OfflineBatchJob]:
+    """Run the block (and threads started with a copied context) as an offline batch pass."""
+    reset = _current_job.set(job)
+    try:
+        yield job
+    finally:
+        _current_job.reset(reset)
+
+
+def batch_barrier(where: str = ""):
+    """Raise ``BatchPending`` if this pass queued Batch API requests; no-op outside an offline run."""
+    job = _current_job.get()
+    if job is not None and job.queued:
+        raise BatchPending(f"{job.queued} request(s) queued for the Batch API{f' (at {where})' if where else ''}")
+
+
+def offline_run_key(items: List[BulkItem], files: Dict[str, bytes]) -> str:
+    """
+    Key of an offline run's saved store, derived from what the run computes.
+
+    Submitting the same items and CSVs again after a restart finds the store
+    of the interrupted run and resumes it.
+    """
+    digests = {name: hashlib.sha256(content).hexdigest() for name, content in files.items()}
+    return request_digest(sorted({item_signature(item, digests) for item in items}))
+
+
+def request_agent(custom_id: str) -> str:
+    """Agent name a request's ``custom_id`` was built for (``<agent>-<digest>``)."""
+    return custom_id.rsplit("-", 1)[0]
+
+
+def request_digest(*parts: Any) -> str:
+    """Stable digest of a model call's inputs, used in its ``custom_id``."""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+class BatchAPIClient:
+    """
+    Files + Batches endpoints of the OpenAI API (blocking; call from a worker thread).
+
+    Args:
+        client: ``openai.OpenAI`` client (default: one for the configured API key;
+            ``OPENAI_BASE_URL`` points it at the mock server)
+        completion_window: Batch completion window (default from settings)
+    """
+
+    def __init__(self, client: Any = None, completion_window: Optional[str] = None):
+        from app.core.config import settings
+
+        if client is None:
+            import openai
+
+            client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = client
+        self.completion_window = completion_window or settings.BATCH_API_COMPLETION_WINDOW
+
+    def submit(self, lines: List[Dict[str, Any]], metadata: Optional[Dict[str, str]] = None) -> str:
+        """Upload ``lines`` as a JSONL file and start a batch; returns the batch id."""
+        data = "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines).encode("utf-8")
+        upload = self.client.files.create(file=("batch_requests.jsonl", data), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+            metadata=metadata,
+        )
+        return batch.id
+
+    def retrieve(self, batch_id: str) -> Any:
+        return self.client.batches.retrieve(batch_id)
+
+    def results(self, batch: Any) -> List[Dict[str, Any]]:
+        """Output and error lines of a finished batch."""
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = self.client.files.content(file_id).text
+                lines.extend(json.loads(line) for line in text.splitlines() if line.strip())
+        return lines
+
+
+def _ingest(store: BatchStore, lines: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Store the answers of a finished batch; failed lines are queued again by the next round."""
+    answered = failed = 0
+    for line in lines:
+        custom_id = line.get("custom_id") or ""
+        response = line.get("response") or {}
+        if response.get("status_code") == 200 and isinstance(response.get("body"), dict):
+            store.store_answer(custom_id, response["body"])
+            answered += 1
+            llm_batch_requests.inc(agent=request_agent(custom_id), outcome="answered")
+        else:
+            failed += 1
+            llm_batch_requests.inc(agent=request_agent(custom_id), outcome="failed")
+    return answered, failed
+
+
+async def _collect_batch(store: BatchStore, client: BatchAPIClient, batch_id: str, poll_seconds: float):
+    """Wait for ``batch_id`` to finish and store its answers."""
+    while True:
+        checkpoint("waiting for Batch API results")
+        batch = await asyncio.to_thread(client.retrieve, batch_id)
+        if batch.status in FINISHED_BATCH_STATUSES:
+            break
+        await asyncio.sleep(poll_seconds)
+
+    answered, failed = _ingest(store, await asyncio.to_thread(client.results, batch))
+    for entry in store.batches:
+        if entry["id"] == batch_id:
+            entry.update(status=batch.status, answered=answered, failed=failed)
+    store.in_flight = None
+    store.save()
+    logger.info(f"📬 [BATCH API] Batch {batch_id} {batch.status}: {answered} answered, {failed} failed")
+
+
+async def run_offline_bulk(
+    items: List[BulkItem],
+    files: Dict[str, bytes],
+    store: Optional[BatchStore] = None,
+    client: Optional[BatchAPIClient] = None,
+    pipeline: Optional[Pipeline] = None,
+    max_concurrency: int = 2,
+    poll_seconds: Optional[float] = None,
+    max_rounds: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Run a bulk analysis with its LLM batches answered by the Batch API.
+
+    Args:
+        items: Parsed bulk items (identical items run once, as in ``run_bulk_analysis``)
+        files: Uploaded CSV contents by filename
+        store: Answers of an earlier, interrupted run to resume (default: a new in-memory store)
+        client: Batch API client (default: the configured OpenAI account)
+        pipeline: Pipeline coroutine (defaults to the production endpoint)
+        max_concurrency: Pipeline runs allowed at once within a round
+        poll_seconds: Wait between batch status checks (default from settings)
+        max_rounds: Batches submitted at most; items still waiting after that fail
+        progress: Called with (finished_runs, total_runs) as items finish
+
+    Returns:
+        Same shape as ``run_bulk_analysis``; ``stats["batch_api"]`` lists the
+        rounds and batches
+    """
+    from app.core.config import settings
+
+    if pipeline is None:
+        from app.api.v1.endpoints.test_research_keywords import amazon_sales_intelligence_pipeline
+        pipeline = functools.partial(amazon_sales_intelligence_pipeline, deadline_seconds=None)
+    store = store if store is not None else BatchStore()
+    client = client or BatchAPIClient()
+    poll_seconds = settings.BATCH_API_POLL_SECONDS if poll_seconds is None else poll_seconds
+    max_rounds = max_rounds or settings.BATCH_API_MAX_ROUNDS
+
+    digests = {name: hashlib.sha256(content).hexdigest() for name, content in files.items()}
+    groups: Dict[Tuple, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(item_signature(item, digests), []).append(index)
+
+    results = [BulkItemResult(index=i, asin_or_url=item.asin_or_url) for i, item in enumerate(items)]
+    payloads: Dict[int, Dict[str, Any]] = {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    finished = 0
+    passes = 0
+
+    def settle(indexes: List[int], status: str, error: Optional[str], payload: Optional[Dict[str, Any]], duration: float):
+        nonlocal finished
+        for index in indexes:
+            entry = results[index]
+            entry.status, entry.error = status, error
+            entry.duration_seconds = round(entry.duration_seconds + duration, 3)
+            entry.shared_with = [i for i in indexes if i != index]
+            if payload is not None:
+                payloads[index] = payload
+        finished += 1
+        if progress:
+            progress(finished, len(groups))
+
+    async def run_pass(indexes: List[int]) -> bool:
+        """One pass of an item through the pipeline; True while it waits for the Batch API."""
+        nonlocal passes
+        item = items[indexes[0]]
+        job = OfflineBatchJob(store)
+        async with semaphore:
+            passes += 1
+            start = time.perf_counter()
+            try:
+                with offline_batch_scope(job):
+                    payload = await pipeline(
+                        asin_or_url=item.asin_or_url,
+                        marketplace=item.marketplace,
+                        main_keyword=item.main_keyword,
+                        revenue_csv=upload_file(item.revenue_csv, files[item.revenue_csv]),
+                        design_csv=upload_file(item.design_csv, files[item.design_csv]),
+                    )
+                status, error = "complete", None
+            except BatchPending as e:
+                for index in indexes:
+                    results[index].duration_seconds += time.perf_counter() - start
+                logger.info(f"⏸️  [BATCH API] {item.asin_or_url} waiting: {e}")
+                return True
+            except HTTPException as e:
+                payload, status, error = None, "failed", str(e.detail)
+            except Exception as e:
+                logger.error(f"❌ [BATCH API] {item.asin_or_url} failed: {e}", exc_info=True)
+                payload, status, error = None, "failed", str(e)
+        settle(indexes, status, error, payload, time.perf_counter() - start)
+        return False
+
+    logger.info(f"📦 [BATCH API] Offline run: {len(items)} items -> {len(groups)} unique pipeline runs")
+    wall_start = time.perf_counter()
+    waiting = list(groups.values())
+    rounds = 0
+    with shared_work(SharedWorkCache()) as cache:
+        if store.in_flight:
+            logger.info(f"🔁 [BATCH API] Resuming: collecting batch {store.in_flight}")
+            await _collect_batch(store, client, store.in_flight, poll_seconds)
+        while waiting:
+            rounds += 1
+            outcomes = await asyncio.gather(*(run_pass(indexes) for indexes in waiting))
+            waiting = [indexes for indexes, pending in zip(waiting, outcomes) if pending]
+            lines = store.take_queued()
+            if not waiting:
+                break
+            if len(store.batches) >= max_rounds:
+                for indexes in waiting:
+                    settle(indexes, "failed", f"Batch API answers still missing after {max_rounds} batches", None, 0.0)
+                break
+
+            batch_id = await asyncio.to_thread(client.submit, lines, {"round": str(rounds)})
+            for line in lines:
+                llm_batch_requests.inc(agent=request_agent(line["custom_id"]), outcome="submitted")
+            store.batches.append({"id": batch_id, "round": rounds, "requests": len(lines), "status": "submitted"})
+            store.in_flight = batch_id
+            store.save()
+            logger.info(f"📤 [BATCH API] Round {rounds}: {len(lines)} requests from {len(waiting)} items -> batch {batch_id}")
+            await _collect_batch(store, client, batch_id, poll_seconds)
+        shared_stats = cache.summary()
+    wall = time.perf_counter() - wall_start
+
+    stats = {
+        "items": len(items),
+        "unique_runs": len(groups),
+        "deduplicated_items": len(items) - len(groups),
+        "completed": sum(1 for r in results if r.status == "complete"),
+        "failed": sum(1 for r in results if r.status == "failed"),
+        "wall_seconds": round(wall, 3),
+        "shared_work": shared_stats,
+        "batch_api": {
+            "rounds": rounds,
+            "pipeline_passes": passes,
+            "batches": list(store.batches),
+            "requests": sum(batch["requests"] for batch in store.batches),
+            "stored_answers": len(store.answers),
+        },
+    }
+    logger.info(f"📊 [BATCH API] Done in {wall:.1f}s: {rounds} rounds, {len(store.batches)} batches")
+
+    return {
+        "items": [{**asdict(r), "result": payloads.get(r.index)} for r in results],
+        "stats": stats,
+    }
@@ -0,0 +1,146 @@
+"""
+Model wrapper for offline bulk runs (see ``app.services.batch_api``).
+
+Inside an offline pass ``BatchedModel`` answers a call from the run's store
+when it can. Otherwise it queues a Batch API request line for the batch
+agents, or calls the wrapped model and stores the answer for the others,
+so replaying the item in the next round sends the same prompts.
+Outside an offline pass calls go straight to the wrapped model.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from agents import Agent
+from agents.items import ItemHelpers, ModelResponse
+from agents.models.openai_responses import Converter
+from agents.usage import Usage
+from openai import NOT_GIVEN, Omit
+from openai.types.responses import ResponseOutputItem
+from pydantic import TypeAdapter
+
+from app.services.batch_api import (
+    BATCH_AGENTS,
+    BATCH_ENDPOINT,
+    BatchRequestQueued,
+    current_batch_job,
+    request_digest,
+)
+from app.services.circuit_breaker import BREAKER_AGENTS
+from app.services.metrics import llm_batch_requests
+from app.services.model_wrappers import WrappedModel, install_wrappers, model_name, wrap_agent
+
+DEFAULT_BATCH_MODEL = "gpt-5-mini-2025-08-07"
+
+_output_items = TypeAdapter(List[ResponseOutputItem])
+
+
+def _text_format(output_schema: Any) -> Optional[Dict[str, Any]]:
+    text = Converter.get_response_format(output_schema)
+    return None if text is NOT_GIVEN or isinstance(text, Omit) else dict(text)
+
+
+def batch_request_line(
+    custom_id: str,
+    model: str,
+    system_instructions: Optional[str],
+    input: Any,
+    model_settings: Any,
+    output_schema: Any,
+) -> Dict[str, Any]:
+    """Batch API request line for a Responses API call."""
+    body: Dict[str, Any] = {"model": model, "input": ItemHelpers.input_to_new_input_list(input)}
+    if system_instructions:
+        body["instructions"] = system_instructions
+    text = _text_format(output_schema)
+    if text:
+        body["text"] = text
+    if model_settings is not None:
+        if model_settings.reasoning is not None:
+            body["reasoning"] = model_settings.reasoning.model_dump(exclude_none=True)
+        if model_settings.temperature is not None:
+            body["temperature"] = model_settings.temperature
+        if model_settings.max_tokens is not None:
+            body["max_output_tokens"] = model_settings.max_tokens
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+
+def response_body(response: ModelResponse) -> Dict[str, Any]:
+    """Responses API body for ``response`` (how answers are stored)."""
+    usage = response.usage
+    return {
+        "id": response.response_id,
+        "output": [item.model_dump(mode="json", exclude_none=True) for item in response.output],
+        "usage": {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "total_tokens": usage.total_tokens,
+            "input_tokens_details": {"cached_tokens": usage.input_tokens_details.cached_tokens},
+        },
+    }
+
+
+def model_response(body: Dict[str, Any]) -> ModelResponse:
+    """``ModelResponse`` for a stored or Batch API Responses body."""
+    raw = body.get("usage") or {}
+    usage = Usage(
+        requests=1,
+        input_tokens=raw.get("input_tokens", 0),
+        output_tokens=raw.get("output_tokens", 0),
+        total_tokens=raw.get("total_tokens", 0),
+    )
+    cached = (raw.get("input_tokens_details") or {}).get("cached_tokens") or 0
+    usage.input_tokens_details = usage.input_tokens_details.model_copy(update={"cached_tokens": cached})
+    return ModelResponse(output=_output_items.validate_python(body.get("output") or []), usage=usage, response_id=None)
+
+
+class BatchedModel(WrappedModel):
+    """
+    ``Model`` that answers from an offline run's store or queues Batch API requests.
+
+    Args:
+        agent_name: Agent name; ``BATCH_AGENTS`` are queued, the rest called directly
+        inner: Model instance, or model name resolved per call like the SDK does
+        provider: Provider resolving a model name (default: the SDK's ``MultiProvider``)
+    """
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs):
+        job = current_batch_job()
+        if job is None:
+            return await self._resolve().get_response(
+                system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            )
+
+        model = model_name(self.inner, DEFAULT_BATCH_MODEL)
+        custom_id = f"{self.agent_name}-{request_digest(model, system_instructions, ItemHelpers.input_to_new_input_list(input), _text_format(output_schema))}"
+        stored = job.store.answer(custom_id)
+        if stored is not None:
+            return model_response(stored)
+
+        if self.agent_name in BATCH_AGENTS:
+            job.queue(custom_id, batch_request_line(custom_id, model, system_instructions, input, model_settings, output_schema))
+            llm_batch_requests.inc(agent=self.agent_name, outcome="queued")
+            raise BatchRequestQueued(f"{self.agent_name} call queued for the Batch API ({custom_id})")
+
+        response = await self._resolve().get_response(
+            system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+        )
+        job.store.store_answer(custom_id, response_body(response))
+        return response
+
+
+def batch_agent(agent: Agent) -> BatchedModel:
+    """Wrap ``agent``'s model in a ``BatchedModel`` (idempotent)."""
+    return wrap_agent(agent, BatchedModel)
+
+
+def install_batch_mode() -> List[str]:
+    """
+    Wrap every pipeline agent for offline runs (idempotent).
+
+    Install outermost: an answer from the store or a queued request needs no
+    concurrency slot and cannot trip the circuit breaker.
+
+    Returns:
+        Names of the agents now wrapped
+    """
+    return install_wrappers(BREAKER_AGENTS, batch_agent)
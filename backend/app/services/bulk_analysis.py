@@ -0,0 +1,211 @@
+"""
+Bulk Analysis - run the pipeline for many product/CSV pairs as one batch job.
+
+Work shared between items is done once:
+- items with the same ASIN, marketplace, main keyword and CSV contents run
+  the pipeline once and the result is fanned out to each of them
+- product and competitor scrapes are deduplicated across the whole batch
+  through ``shared_work`` (concurrent items wait for the in-flight scrape)
+
+Keyword categorization, intent and root prompts are conditioned on each
+product's own title/brand, so those LLM results are only shared between
+items whose inputs are identical (the first case above).
+"""
+
+import asyncio
+import functools
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from tempfile import SpooledTemporaryFile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+from app.services.shared_work import SharedWorkCache, shared_work
+
+logger = logging.getLogger(__name__)
+
+Pipeline = Callable[..., Awaitable[Dict[str, Any]]]
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class BulkItem:
+    """One product in a bulk request; CSVs are referenced by uploaded filename."""
+    asin_or_url: str
+    revenue_csv: str
+    design_csv: str
+    marketplace: str = "US"
+    main_keyword: Optional[str] = None
+
+
+@dataclass
+class BulkItemResult:
+    """Outcome for one requested item."""
+    index: int
+    asin_or_url: str
+    status: str = "pending"  # complete | failed
+    duration_seconds: float = 0.0
+    shared_with: List[int] = field(default_factory=list)  # Indexes that reused this run
+    error: Optional[str] = None
+
+
+def parse_bulk_items(items_json: str, files: Dict[str, bytes], max_items: int) -> List[BulkItem]:
+    """
+    Validate the ``items`` form field of a bulk request.
+
+    Args:
+        items_json: JSON list of objects with asin_or_url, revenue_csv,
+            design_csv and optional marketplace/main_keyword
+        files: Uploaded CSV contents by filename
+        max_items: Maximum number of items per batch
+
+    Raises:
+        ValueError: With a message suitable for a 400 response
+    """
+    try:
+        raw = json.loads(items_json)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"items must be a JSON list: {e}")
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("items must be a non-empty JSON list")
+    if len(raw) > max_items:
+        raise ValueError(f"Too many items: {len(raw)} (max {max_items})")
+
+    items = []
+    for i, entry in enumerate(raw):
+        if not isinstance(entry, dict) or not str(entry.get("asin_or_url", "")).strip():
+            raise ValueError(f"items[{i}]: asin_or_url is required")
+        for key in ("revenue_csv", "design_csv"):
+            if entry.get(key) not in files:
+                raise ValueError(f"items[{i}]: {key} must name one of the uploaded files {sorted(files)}")
+        items.append(BulkItem(
+            asin_or_url=str(entry["asin_or_url"]).strip(),
+            revenue_csv=entry["revenue_csv"],
+            design_csv=entry["design_csv"],
+            marketplace=entry.get("marketplace") or "US",
+            main_keyword=entry.get("main_keyword") or None,
+        ))
+    return items
+
+
+def item_signature(item: BulkItem, digests: Dict[str, str]) -> Tuple:
+    """Items with equal signatures produce the same pipeline result."""
+    return (
+        item.asin_or_url.lower(),
+        item.marketplace.upper(),
+        (item.main_keyword or "").strip().lower(),
+        digests[item.revenue_csv],
+        digests[item.design_csv],
+    )
+
+
+def upload_file(filename: str, content: bytes) -> UploadFile:
+    """Uploaded CSV content as the ``UploadFile`` the pipeline endpoint expects."""
+    spool = SpooledTemporaryFile(max_size=1024 * 1024 * 50)  # 50MB threshold
+    spool.write(content)
+    spool.seek(0)
+    return UploadFile(file=spool, filename=filename)
+
+
+async def run_bulk_analysis(
+    items: List[BulkItem],
+    files: Dict[str, bytes],
+    pipeline: Optional[Pipeline] = None,
+    max_concurrency: int = 2,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Run the pipeline for every item, sharing duplicated work across the batch.
+
+    Args:
+        items: Parsed bulk items
+        files: Uploaded CSV contents by filename
+        pipeline: Pipeline coroutine (defaults to the production endpoint)
+        max_concurrency: Unique pipeline runs allowed at once
+        progress: Called with (finished_runs, total_runs) after each run
+
+    Returns:
+        Dict with ``items`` (per-item status and result, in request order)
+        and ``stats`` (dedup counts, shared-work hits and estimated speedup
+        over running the items one at a time)
+    """
+    if pipeline is None:
+        from app.api.v1.endpoints.test_research_keywords import amazon_sales_intelligence_pipeline
+        # Called directly, so the endpoint's Form defaults must be given explicitly
+        pipeline = functools.partial(amazon_sales_intelligence_pipeline, deadline_seconds=None)
+
+    digests = {name: hashlib.sha256(content).hexdigest() for name, content in files.items()}
+    groups: Dict[Tuple, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(item_signature(item, digests), []).append(index)
+
+    results: List[BulkItemResult] = [BulkItemResult(index=i, asin_or_url=item.asin_or_url) for i, item in enumerate(items)]
+    payloads: Dict[int, Dict[str, Any]] = {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    finished = 0
+
+    logger.info(f"📦 [BULK] {len(items)} items -> {len(groups)} unique pipeline runs (concurrency {max_concurrency})")
+
+    async def run_group(indexes: List[int]):
+        nonlocal finished
+        item = items[indexes[0]]
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                payload = await pipeline(
+                    asin_or_url=item.asin_or_url,
+                    marketplace=item.marketplace,
+                    main_keyword=item.main_keyword,
+                    revenue_csv=upload_file(item.revenue_csv, files[item.revenue_csv]),
+                    design_csv=upload_file(item.design_csv, files[item.design_csv]),
+                )
+                status, error = "complete", None
+            except HTTPException as e:
+                payload, status, error = None, "failed", str(e.detail)
+            except Exception as e:
+                logger.error(f"❌ [BULK] {item.asin_or_url} failed: {e}", exc_info=True)
+                payload, status, error = None, "failed", str(e)
+            duration = time.perf_counter() - start
+
+        for index in indexes:
+            entry = results[index]
+            entry.status, entry.error, entry.duration_seconds = status, error, round(duration, 3)
+            entry.shared_with = [i for i in indexes if i != index]
+            if payload is not None:
+                payloads[index] = payload
+        finished += 1
+        logger.info(f"{'✅' if status == 'complete' else '❌'} [BULK] {item.asin_or_url} {status} in {duration:.1f}s ({finished}/{len(groups)})")
+        if progress:
+            progress(finished, len(groups))
+
+    wall_start = time.perf_counter()
+    with shared_work(SharedWorkCache()) as cache:
+        await asyncio.gather(*(run_group(indexes) for indexes in groups.values()))
+        shared_stats = cache.summary()
+    wall = time.perf_counter() - wall_start
+
+    # One-at-a-time estimate: every item pays for its own run, and every
+    # shared-work hit would have been recomputed.
+    saved = sum(entry["saved_seconds"] for entry in shared_stats.values())
+    sequential_estimate = sum(r.duration_seconds for r in results) + saved
+    stats = {
+        "items": len(items),
+        "unique_runs": len(groups),
+        "deduplicated_items": len(items) - len(groups),
+        "completed": sum(1 for r in results if r.status == "complete"),
+        "failed": sum(1 for r in results if r.status == "failed"),
+        "wall_seconds": round(wall, 3),
+        "shared_work": shared_stats,
+        "estimated_sequential_seconds": round(sequential_estimate, 3),
+        "estimated_speedup": round(sequential_estimate / wall, 2) if wall > 0 else None,
+    }
+    logger.info(f"📊 [BULK] Done in {wall:.1f}s (~{stats['estimated_speedup']}x vs one at a time)")
+
+    return {
+        "items": [{**asdict(r), "result": payloads.get(r.index)} for r in results],
+        "stats": stats,
+    }
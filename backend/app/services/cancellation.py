@@ -0,0 +1,181 @@
+"""
+Cancellation - cooperative cancellation for background jobs.
+
+A job runs inside ``cancellation_scope(token)``. The token travels with the
+job through a context variable (copied into executor threads with
+``contextvars.copy_context()``), so deep code can call ``checkpoint()``
+between stages and LLM batches without threading a parameter through every
+runner. Cancelling a token:
+
+- makes the next ``checkpoint()`` raise ``JobCancelled``
+- kills scraper subprocesses started through ``run_subprocess``
+- interrupts rate-limiter waits (see ``OpenAIRateLimiter.wait_for_rate_limit``)
+
+``JobCancelled`` derives from ``BaseException`` (like ``asyncio.CancelledError``)
+so the many ``except Exception`` fallbacks in the pipeline do not swallow it.
+"""
+
+import contextvars
+import logging
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+
+logger = logging.getLogger(__name__)
+
+# Longest a cancelled job keeps sleeping in a rate-limit or backoff wait
+CANCEL_CHECK_INTERVAL = 0.25
+
+
+class JobCancelled(BaseException):
+    """Raised at a checkpoint once the job's token is cancelled."""
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag that also owns the job's child processes.
+
+    A token with a ``parent`` is also cancelled when the parent is, so part
+    of a job (one stage) can be abandoned without cancelling the whole job.
+    """
+
+    def __init__(self, job_id: Optional[str] = None, parent: Optional["CancellationToken"] = None):
+        self.job_id = job_id if job_id is not None else (parent.job_id if parent else None)
+        self.parent = parent
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._processes: Set[subprocess.Popen] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def cancel(self, reason: str = "Cancelled by user") -> bool:
+        """Cancel the job; returns False if it was already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            processes = list(self._processes)
+        for proc in processes:
+            _kill(proc)
+        logger.warning(f"🛑 [CANCEL] Job {self.job_id or '-'} cancelled: {reason} ({len(processes)} subprocess(es) killed)")
+        return True
+
+    def raise_if_cancelled(self, where: str = ""):
+        if self.parent is not None:
+            self.parent.raise_if_cancelled(where)
+        if self._event.is_set():
+            raise JobCancelled(f"{self.reason}{f' (at {where})' if where else ''}")
+
+    def _add_process(self, proc: subprocess.Popen):
+        # Registered up the chain so cancelling the job also kills a stage's processes
+        if self.parent is not None:
+            self.parent._add_process(proc)
+        with self._lock:
+            if not self._event.is_set():
+                self._processes.add(proc)
+                return
+        _kill(proc)
+
+    def _discard_process(self, proc: subprocess.Popen):
+        if self.parent is not None:
+            self.parent._discard_process(proc)
+        with self._lock:
+            self._processes.discard(proc)
+
+
+def _kill(proc: subprocess.Popen):
+    try:
+        proc.kill()
+    except OSError:
+        pass  # Already exited
+
+
+_current_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar(
+    "cancellation_token", default=None
+)
+
+
+def current_token() -> Optional[CancellationToken]:
+    """Token of the job running in this context, or None outside a job."""
+    return _current_token.get()
+
+
+@contextmanager
+def cancellation_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Make ``token`` the current token for the block (and threads started with a copied context)."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+def checkpoint(where: str = ""):
+    """Raise ``JobCancelled`` if the current job was cancelled; no-op outside a job."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled(where)
+
+
+def run_subprocess(args: Sequence[str], timeout: Optional[float] = None, **kwargs) -> subprocess.CompletedProcess:
+    """
+    ``subprocess.run(args, capture_output=True, text=True, timeout=...)`` that the
+    current job's token can kill. Outside a job this is plain ``subprocess.run``.
+
+    Raises:
+        subprocess.TimeoutExpired: As ``subprocess.run`` (the process is killed)
+        JobCancelled: If the job was cancelled before or while the process ran
+    """
+    token = _current_token.get()
+    if token is None:
+        return subprocess.run(args, capture_output=True, text=True, timeout=timeout, **kwargs)
+
+    token.raise_if_cancelled("subprocess start")
+    with subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs) as proc:
+        token._add_process(proc)
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+        finally:
+            token._discard_process(proc)
+    token.raise_if_cancelled("subprocess")
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
+
+
+# ============================================================================
+# Job registry (tokens of jobs running in this process)
+# ============================================================================
+
+_job_tokens: Dict[str, CancellationToken] = {}
+_registry_lock = threading.Lock()
+
+
+def register_job(job_id: str) -> CancellationToken:
+    with _registry_lock:
+        token = _job_tokens[job_id] = CancellationToken(job_id)
+    return token
+
+
+def unregister_job(job_id: str):
+    with _registry_lock:
+        _job_tokens.pop(job_id, None)
+
+
+def cancel_job(job_id: str, reason: str = "Cancelled by user") -> bool:
+    """Cancel a job running in this process; returns False if it is not running here."""
+    with _registry_lock:
+        token = _job_tokens.get(job_id)
+    return token.cancel(reason) if token is not None else False
+
+
+def running_jobs() -> List[str]:
+    with _registry_lock:
+        return list(_job_tokens)
@@ -0,0 +1,240 @@
+"""
+Circuit breaker for LLM calls.
+
+When OpenAI is down, every agent call waits out the client's retries and
+then the pipeline's own retry loop before anything falls back, so a bad
+minute turns into a very slow job. The breaker is shared by all agents:
+
+- closed: calls go through; ``failure_threshold`` outage errors in a row
+  (connection errors, timeouts, 5xx) open it
+- open: calls fail at once with ``CircuitOpenError``, and
+  ``llm_circuit_open()`` is True, so the runners take the deterministic
+  paths they already use when the deadline has passed
+- half-open: after ``reset_timeout_seconds`` one call is let through as a
+  probe; success closes the circuit, failure opens it for another period
+
+Enabled by default (``LLM_CIRCUIT_BREAKER``); the pipeline calls
+``install_circuit_breaker()`` on its first run.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import openai
+from agents import Agent
+from agents.models.interface import Model, ModelProvider
+
+from app.services.metrics import llm_circuit_rejected, llm_circuit_state
+from app.services.model_wrappers import WrappedModel, install_wrappers, wrap_agent
+
+logger = logging.getLogger(__name__)
+
+# Every agent the pipeline calls goes through the one breaker
+BREAKER_AGENTS = [
+    ("app.local_agents.research.agent", "research_agent"),
+    ("app.local_agents.keyword.agent", "keyword_agent"),
+    ("app.local_agents.keyword.subagents.root_extraction_agent", "root_extraction_agent"),
+    ("app.local_agents.scoring.subagents.intent_agent", "intent_scoring_agent"),
+    ("app.local_agents.scoring.subagents.broad_volume_agent", "broad_volume_agent"),
+    ("app.local_agents.scoring.subagents.root_relevance_agent", "root_relevance_agent"),
+    ("app.local_agents.scoring.subagents.opportunity_agent", "opportunity_agent"),
+    ("app.local_agents.scoring.subagents.keyword_variant_agent", "keyword_variant_agent"),
+    ("app.local_agents.seo.agent", "seo_optimization_agent"),
+    ("app.local_agents.seo.subagents.amazon_compliance_agent", "amazon_compliance_agent"),
+    ("app.local_agents.seo.subagents.competitor_title_analysis_agent", "competitor_title_analysis_agent"),
+]
+
+STATE_VALUES = {"closed": 0, "open": 1, "half_open": 2}
+
+
+class CircuitOpenError(Exception):
+    """An LLM call was refused because the circuit is open."""
+
+
+@dataclass
+class CircuitConfig:
+    """When to open the circuit and how long to wait before probing."""
+    failure_threshold: int = 3  # Outage errors in a row that open the circuit
+    reset_timeout_seconds: float = 30.0  # Open time before a probe call
+
+    @classmethod
+    def from_settings(cls) -> "CircuitConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        return cls(
+            failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout_seconds=settings.LLM_CIRCUIT_RESET_SECONDS,
+        )
+
+
+def is_outage_error(error: BaseException) -> bool:
+    """True for errors meaning the service is unreachable or failing (not a bad request)."""
+    if isinstance(error, openai.APIConnectionError):  # Includes APITimeoutError
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+class CircuitBreaker:
+    """Closed / open / half-open state shared by threads and event loops."""
+
+    def __init__(self, config: Optional[CircuitConfig] = None):
+        self.config = config or CircuitConfig()
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._stats = {"opened": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning(f"🔌 [CIRCUIT] LLM circuit {self._state} -> {state}")
+        self._state = state
+        llm_circuit_state.set(STATE_VALUES[state])
+
+    def _probe_due(self) -> bool:
+        return time.monotonic() - self._opened_at >= self.config.reset_timeout_seconds
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == "open" and self._probe_due():
+                return "half_open"
+            return self._state
+
+    def is_open(self) -> bool:
+        """True while calls would be refused right now."""
+        with self._lock:
+            if self._state == "closed":
+                return False
+            return self._probing or not self._probe_due()
+
+    def allow_request(self) -> bool:
+        """Admit a call; in the half-open state only one probe at a time."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if not self._probing and self._probe_due():
+                self._probing = True
+                self._set_state("half_open")
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self._state == "closed" and self._failures >= self.config.failure_threshold):
+                self._probing = False
+                self._opened_at = time.monotonic()
+                self._stats["opened"] += 1
+                self._set_state("open")
+
+    def release_probe(self):
+        """End a probe that gave no verdict (e.g. it was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            self._set_state("closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {"state": state, "consecutive_failures": self._failures, **self._stats}
+
+
+class CircuitBreakerModel(WrappedModel):
+    """
+    ``Model`` that passes calls to its inner model only while the circuit allows.
+
+    Args:
+        agent_name: Agent name for logs and metrics
+        inner: Model instance, or model name resolved per call like the SDK does
+        breaker: Shared circuit breaker
+        provider: Provider resolving a model name (default: the SDK's ``MultiProvider``)
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        inner: Union[str, Model, None],
+        breaker: CircuitBreaker,
+        provider: Optional[ModelProvider] = None,
+    ):
+        super().__init__(agent_name, inner, provider)
+        self.breaker = breaker
+
+    async def get_response(self, *args, **kwargs):
+        if not self.breaker.allow_request():
+            llm_circuit_rejected.inc(agent=self.agent_name)
+            raise CircuitOpenError(f"LLM circuit open; {self.agent_name} call skipped")
+        model = self._resolve()
+        try:
+            response = await model.get_response(*args, **kwargs)
+        except Exception as e:
+            if is_outage_error(e):
+                self.breaker.record_failure()
+            else:
+                # The service answered; the request itself was the problem
+                self.breaker.record_success()
+            raise
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success()
+        return response
+
+
+_breaker: Optional[CircuitBreaker] = None
+_install_lock = threading.Lock()
+
+
+def get_llm_breaker(config: Optional[CircuitConfig] = None) -> CircuitBreaker:
+    """The process-wide breaker (created from settings on first use)."""
+    global _breaker
+    with _install_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(config or CircuitConfig.from_settings())
+        return _breaker
+
+
+def llm_circuit_open() -> bool:
+    """True while LLM calls are refused: callers should take their deterministic path."""
+    return _breaker is not None and _breaker.is_open()
+
+
+def guard_agent(agent: Agent, breaker: Optional[CircuitBreaker] = None) -> CircuitBreakerModel:
+    """Put ``agent``'s calls behind ``breaker`` (the process-wide one by default)."""
+    return wrap_agent(agent, CircuitBreakerModel, breaker or get_llm_breaker())
+
+
+def install_circuit_breaker() -> List[str]:
+    """
+    Put the pipeline's agents behind the breaker if ``LLM_CIRCUIT_BREAKER`` is set (idempotent).
+
+    Install last, so an open circuit refuses calls before they wait for a
+    concurrency slot.
+
+    Returns:
+        Names of the agents now guarded
+    """
+    from app.core.config import settings
+
+    if not settings.LLM_CIRCUIT_BREAKER:
+        return []
+    return install_wrappers(BREAKER_AGENTS, guard_agent)
@@ -0,0 +1,257 @@
+"""
+Deadline - "anytime" mode for the pipeline.
+
+A request with a deadline runs inside ``deadline_scope(deadline)``. Like the
+cancellation token, the deadline travels in a context variable, so the
+runners can ask ``deadline_reached()`` before each LLM batch and switch the
+work that is left to their deterministic path (default scores, rule-based
+categories, ``calculate_broad_volume_deterministic``, rule-based SEO)
+instead of waiting for the model. Every switch is recorded with
+``mark_degraded`` and returned with the response.
+
+The runners take the same paths when the LLM circuit breaker is open, with
+or without a deadline, so the record of degraded sections has its own scope
+(``degradation_scope``); a deadline brings its own record.
+
+``run_stage`` gives each pipeline stage its share of the remaining time. A
+stage that overruns is abandoned (its cancellation token is cancelled, so
+its thread stops at the next checkpoint) and run again under an expired
+deadline, which takes every deterministic path at once.
+"""
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from app.services.cancellation import CancellationToken, cancellation_scope, current_token
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class DegradedSections:
+    """Sections that took a deterministic path, with the reason for each (thread-safe)."""
+
+    def __init__(self):
+        self._sections: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, section: str, reason: str):
+        with self._lock:
+            # Keep the first reason; later ones are usually knock-on effects
+            if section not in self._sections:
+                self._sections[section] = reason
+                logger.warning(f"⏱️  [DEGRADED] {section}: {reason}")
+
+    def as_dict(self) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._sections)
+
+    def report(self) -> List[Dict[str, str]]:
+        """Degraded sections in the shape returned with the response."""
+        return [{"section": s, "reason": r} for s, r in self.as_dict().items()]
+
+
+class Deadline:
+    """
+    Point in time a request must answer by, plus the sections degraded to meet it.
+
+    ``child`` deadlines (one per stage) end no later than their parent and
+    share its record of degraded sections.
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        reserve_seconds: float = 0.0,
+        stage_weights: Optional[Dict[str, float]] = None,
+        _parent: Optional["Deadline"] = None,
+    ):
+        now = time.monotonic()
+        self.seconds = seconds
+        self.reserve_seconds = reserve_seconds
+        self.started_at = _parent.started_at if _parent else now
+        self.expires_at = now + max(0.0, seconds)
+        if _parent is not None:
+            self.expires_at = min(self.expires_at, _parent.expires_at)
+        self._stage_weights = dict(stage_weights or {})
+        self._finished_stages: List[str] = []
+        self.degraded_sections: DegradedSections = _parent.degraded_sections if _parent else DegradedSections()
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def child(self, seconds: float) -> "Deadline":
+        return Deadline(seconds, _parent=self)
+
+    def stage_budget(self, stage: str) -> float:
+        """
+        Seconds ``stage`` may spend on LLM work.
+
+        The time left (less the reserve) is split between this stage and the
+        stages after it in proportion to their weights, so a stage that
+        finishes early leaves more time for the rest.
+        """
+        pending = [name for name in self._stage_weights if name not in self._finished_stages]
+        total = sum(self._stage_weights[name] for name in pending)
+        share = self._stage_weights.get(stage, 0.0) / total if total > 0 and stage in pending else 1.0
+        return max(0.0, (self.remaining() - self.reserve_seconds) * share)
+
+    def finish_stage(self, stage: str):
+        if stage not in self._finished_stages:
+            self._finished_stages.append(stage)
+
+    def mark_degraded(self, section: str, reason: str):
+        self.degraded_sections.mark(section, reason)
+
+    @property
+    def degraded(self) -> Dict[str, str]:
+        return self.degraded_sections.as_dict()
+
+    def report(self) -> Dict[str, Any]:
+        """Summary returned with the response."""
+        elapsed = time.monotonic() - self.started_at
+        degraded = self.degraded_sections.report()
+        return {
+            "deadline_seconds": self.seconds,
+            "elapsed_seconds": round(elapsed, 3),
+            "met": elapsed <= self.seconds,
+            "complete": not degraded,
+            "degraded_sections": degraded,
+        }
+
+
+_current_deadline: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "pipeline_deadline", default=None
+)
+_current_degraded: contextvars.ContextVar[Optional[DegradedSections]] = contextvars.ContextVar(
+    "pipeline_degraded_sections", default=None
+)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the request running in this context, or None."""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` current for the block (None leaves the caller's deadline unchanged)."""
+    if deadline is None:
+        yield None
+        return
+    reset = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(reset)
+
+
+def current_degraded_sections() -> Optional[DegradedSections]:
+    """Degraded-section record of the request running in this context, or None."""
+    return _current_degraded.get()
+
+
+@contextmanager
+def degradation_scope(sections: DegradedSections) -> Iterator[DegradedSections]:
+    """Record the block's ``mark_degraded`` calls in ``sections``."""
+    reset = _current_degraded.set(sections)
+    try:
+        yield sections
+    finally:
+        _current_degraded.reset(reset)
+
+
+def deadline_reached() -> bool:
+    """True when the current deadline has passed; always False without one."""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired
+
+
+def mark_degraded(section: str, reason: str):
+    """
+    Record that ``section`` took a deterministic path.
+
+    Goes to the current ``degradation_scope``, else to the current deadline;
+    a no-op outside both.
+    """
+    sections = _current_degraded.get()
+    if sections is None:
+        deadline = _current_deadline.get()
+        sections = deadline.degraded_sections if deadline is not None else None
+    if sections is not None:
+        sections.mark(section, reason)
+
+
+def _call_in_scope(deadline: Optional[Deadline], token: Optional[CancellationToken], func: Callable[[], T]) -> T:
+    with deadline_scope(deadline):
+        if token is None:
+            return func()
+        with cancellation_scope(token):
+            return func()
+
+
+async def run_stage(stage: str, func: Callable[[], T], abandonable: bool = True) -> Tuple[bool, T]:
+    """
+    Run a blocking pipeline stage in the default executor within its share of the deadline.
+
+    Without a current deadline this is ``run_in_executor`` with the caller's
+    context (cancellation token included).
+
+    Args:
+        stage: Stage name (a key of the deadline's stage weights)
+        func: Stage body; it should check ``deadline_reached()`` between LLM batches
+        abandonable: False for stages the response cannot do without; they
+            get a stage deadline for their optional LLM calls but are never abandoned
+
+    Returns:
+        (finished_in_time, result). When the stage overran, ``result`` comes
+        from running ``func`` again under an expired deadline (its
+        deterministic path).
+    """
+    loop = asyncio.get_running_loop()
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return True, await loop.run_in_executor(None, contextvars.copy_context().run, func)
+
+    try:
+        budget = deadline.stage_budget(stage)
+        stage_deadline = deadline.child(budget)
+        if not abandonable:
+            result = await loop.run_in_executor(
+                None, contextvars.copy_context().run, _call_in_scope, stage_deadline, None, func
+            )
+            return True, result
+
+        if budget > 0:
+            token = CancellationToken(parent=current_token())
+            future = loop.run_in_executor(
+                None, contextvars.copy_context().run, _call_in_scope, stage_deadline, token, func
+            )
+            # The stage budget is a soft limit the stage checks itself; the hard
+            # limit is whatever is left of the request's deadline
+            timeout = max(budget, deadline.remaining() - deadline.reserve_seconds)
+            try:
+                return True, await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                token.cancel(f"Deadline reached during {stage}")
+                deadline.mark_degraded(stage, f"abandoned after {timeout:.1f}s; deterministic result used")
+        else:
+            deadline.mark_degraded(stage, "no time left; deterministic result used")
+
+        expired = deadline.child(0)
+        result = await loop.run_in_executor(
+            None, contextvars.copy_context().run, _call_in_scope, expired, None, func
+        )
+        return False, result
+    finally:
+        deadline.finish_stage(stage)
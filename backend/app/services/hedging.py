@@ -0,0 +1,247 @@
+"""
+Hedged LLM requests - tail-latency control for agents called in batches.
+
+A stage waits for all of its batches, so one straggler (a 60s response
+where 5s is normal) holds up the whole stage. ``HedgedModel`` wraps an
+agent's model: when a call runs longer than the agent's observed latency
+quantile (p95 by default), the same request is sent again and whichever
+answer arrives first wins; the other is cancelled.
+
+Extra calls are capped by ``HedgeBudget``: every primary call earns
+``budget_ratio`` of a hedge, so hedges never exceed that fraction of calls.
+No agent is hedged until it has ``min_samples`` latencies on record.
+
+Opt in with ``LLM_HEDGING_ENABLED=true``; the pipeline then calls
+``install_hedging()`` on its first run to wrap ``HEDGED_AGENTS``.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Union
+
+from agents import Agent
+from agents.models.interface import Model, ModelProvider
+
+from app.services.metrics import llm_hedged_requests
+from app.services.model_wrappers import WrappedModel, install_wrappers, wrap_agent
+
+logger = logging.getLogger(__name__)
+
+# (module, attribute) of the agents called in batch loops
+HEDGED_AGENTS = [
+    ("app.local_agents.keyword.agent", "keyword_agent"),
+    ("app.local_agents.scoring.subagents.intent_agent", "intent_scoring_agent"),
+    ("app.local_agents.keyword.subagents.root_extraction_agent", "root_extraction_agent"),
+    ("app.local_agents.scoring.subagents.root_relevance_agent", "root_relevance_agent"),
+    ("app.local_agents.scoring.subagents.opportunity_agent", "opportunity_agent"),
+]
+
+
+@dataclass
+class HedgeConfig:
+    """When to hedge and how many extra calls are allowed."""
+    quantile: float = 0.95  # Hedge calls slower than this latency quantile
+    min_samples: int = 20  # Latencies needed per agent before hedging it
+    window: int = 200  # Latencies kept per agent
+    min_delay_seconds: float = 2.0  # Never hedge sooner than this
+    budget_ratio: float = 0.1  # Hedges allowed per primary call
+    max_burst: float = 5.0  # Unused budget kept for bursts of stragglers
+
+    @classmethod
+    def from_settings(cls) -> "HedgeConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        return cls(
+            quantile=settings.LLM_HEDGE_QUANTILE,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+            min_delay_seconds=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+            budget_ratio=settings.LLM_HEDGE_BUDGET_RATIO,
+        )
+
+
+class LatencyTracker:
+    """Recent call latencies per agent."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def quantile(self, key: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Latency quantile ``q`` for ``key``, or None with fewer than ``min_samples`` samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+class HedgeBudget:
+    """Token bucket of hedges: each primary call adds ``ratio`` of a token."""
+
+    def __init__(self, ratio: float = 0.1, max_burst: float = 5.0):
+        self.ratio = ratio
+        self.max_burst = max_burst
+        self._tokens = 0.0
+        self._lock = threading.Lock()
+
+    def earn(self):
+        with self._lock:
+            self._tokens = min(self.max_burst, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "hedged": 0, "hedge_won": 0, "over_budget": 0})
+_stats_lock = threading.Lock()
+
+
+def _count(agent: str, field: str):
+    with _stats_lock:
+        _stats[agent][field] += 1
+
+
+def get_hedge_stats() -> Dict[str, Dict[str, int]]:
+    """Per-agent primary calls, hedges sent, hedges that won and hedges refused by the budget."""
+    with _stats_lock:
+        return {agent: dict(counts) for agent, counts in _stats.items()}
+
+
+def reset_hedge_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+class HedgedModel(WrappedModel):
+    """
+    ``Model`` that re-sends slow calls to its inner model.
+
+    Streams pass through: they are consumed as they arrive, so there is no
+    single answer to race.
+
+    Args:
+        agent_name: Key for latency tracking and stats
+        inner: Model instance, or model name resolved per call like the SDK does
+        config: Hedging thresholds and budget
+        tracker: Latency tracker (shared between models by default)
+        budget: Hedge budget (shared between models by default)
+        provider: Provider resolving a model name (default: the SDK's ``MultiProvider``)
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        inner: Union[str, Model, None],
+        config: Optional[HedgeConfig] = None,
+        tracker: Optional[LatencyTracker] = None,
+        budget: Optional[HedgeBudget] = None,
+        provider: Optional[ModelProvider] = None,
+    ):
+        super().__init__(agent_name, inner, provider)
+        self.config = config or HedgeConfig()
+        self.tracker = tracker or LatencyTracker(self.config.window)
+        self.budget = budget or HedgeBudget(self.config.budget_ratio, self.config.max_burst)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds after which a call is hedged, or None while too few latencies are known."""
+        observed = self.tracker.quantile(self.agent_name, self.config.quantile, self.config.min_samples)
+        if observed is None:
+            return None
+        return max(self.config.min_delay_seconds, observed)
+
+    async def _race(self, primary: asyncio.Future, hedge: asyncio.Future):
+        """First successful answer of ``primary`` and ``hedge``; the first error if both fail."""
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _count(self.agent_name, "hedge_won")
+                        llm_hedged_requests.inc(agent=self.agent_name, outcome="won")
+                    return task.result()
+                error = error or task.exception()
+        raise error
+
+    async def get_response(self, *args, **kwargs):
+        model = self._resolve()
+        delay = self.hedge_delay()
+        self.budget.earn()
+        _count(self.agent_name, "calls")
+
+        # One latency per call, from the primary's start to the answer: a straggler
+        # the hedge answered for still counts as slower than the hedge delay
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(model.get_response(*args, **kwargs))
+        hedge = None
+        try:
+            if delay is None:
+                response = await primary
+            else:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if done:
+                    response = primary.result()
+                elif not self.budget.try_spend():
+                    _count(self.agent_name, "over_budget")
+                    llm_hedged_requests.inc(agent=self.agent_name, outcome="over_budget")
+                    response = await primary
+                else:
+                    logger.info(f"🪁 [HEDGE] {self.agent_name} call exceeded {delay:.1f}s, sending a duplicate")
+                    _count(self.agent_name, "hedged")
+                    llm_hedged_requests.inc(agent=self.agent_name, outcome="sent")
+                    hedge = asyncio.ensure_future(model.get_response(*args, **kwargs))
+                    response = await self._race(primary, hedge)
+            self.tracker.record(self.agent_name, time.perf_counter() - start)
+            return response
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+
+_tracker: Optional[LatencyTracker] = None
+_budget: Optional[HedgeBudget] = None
+_install_lock = threading.Lock()
+
+
+def hedge_agent(agent: Agent, config: Optional[HedgeConfig] = None) -> HedgedModel:
+    """Wrap ``agent``'s model in a ``HedgedModel`` sharing the process-wide tracker and budget."""
+    global _tracker, _budget
+    config = config or HedgeConfig.from_settings()
+    with _install_lock:
+        if _tracker is None:
+            _tracker = LatencyTracker(config.window)
+            _budget = HedgeBudget(config.budget_ratio, config.max_burst)
+    return wrap_agent(agent, HedgedModel, config, _tracker, _budget)
+
+
+def install_hedging(config: Optional[HedgeConfig] = None) -> List[str]:
+    """
+    Hedge the batch-loop agents if ``LLM_HEDGING_ENABLED`` is set (idempotent).
+
+    Returns:
+        Names of the agents now hedged
+    """
+    from app.core.config import settings
+
+    if not settings.LLM_HEDGING_ENABLED:
+        return []
+    return install_wrappers(HEDGED_AGENTS, lambda agent: hedge_agent(agent, config))
@@ -5,6 +5,7 @@ Handles long-running tasks with status updates and result storage.
 Storage Strategy:
 - Primary: Redis (Upstash) for production/deployment
 - Fallback: File-based storage for local development
+- Storage is initialized on first use, so importing this module stays cheap
 """
 import json
 import uuid
@@ -13,43 +14,51 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 import logging
+import threading
 
 from app.core.config import settings
+from app.core.startup_profiler import startup_profiler
+from app.services.metrics import job_store_duration
 
 logger = logging.getLogger(__name__)
 
 # ============================================================================
-# REDIS CLIENT SETUP (Upstash)
+# STORAGE SETUP (lazy - runs on first JobManager call, not at import)
 # ============================================================================
 redis_client = None
 use_redis = False
+JOBS_DIR = Path("jobs")
+
+_storage_ready = False
+_storage_lock = threading.Lock()
+
 
-if settings.USE_REDIS_FOR_JOBS and settings.UPSTASH_REDIS_URL and settings.UPSTASH_REDIS_TOKEN:
+def _connect_redis():
+    """Connect to Upstash Redis if configured; returns the client or None."""
+    if not (settings.USE_REDIS_FOR_JOBS and settings.UPSTASH_REDIS_URL and settings.UPSTASH_REDIS_TOKEN):
+        logger.info("📁 [JOB MANAGER] Using file-based storage (Redis not configured)")
+        return None
     try:
         from upstash_redis import Redis
         
-        redis_client = Redis(
+        client = Redis(
             url=settings.UPSTASH_REDIS_URL,
             token=settings.UPSTASH_REDIS_TOKEN
         )
         
         # Test connection
-        redis_client.ping()
-        use_redis = True
+        client.ping()
         logger.info("🔴 [JOB MANAGER] Redis (Upstash) initialized successfully")
         logger.info(f"   ⏱️  Job TTL: {settings.JOB_TTL_HOURS} hours")
+        return client
     except Exception as e:
         logger.warning(f"⚠️  [JOB MANAGER] Redis connection failed: {e}")
         logger.warning(f"   📁 Falling back to file-based storage")
-        use_redis = False
-else:
-    logger.info("📁 [JOB MANAGER] Using file-based storage (Redis not configured)")
+        return None
 
-# ============================================================================
-# FILE-BASED STORAGE FALLBACK
-# ============================================================================
-JOBS_DIR = Path("jobs")
-if not use_redis:
+
+def _prepare_jobs_dir():
+    """Create the file-based storage directory (fallback)."""
     JOBS_DIR.mkdir(exist_ok=True)
     logger.info(f"📁 [JOB MANAGER] Initialized job storage directory: {JOBS_DIR.absolute()}")
     if JOBS_DIR.exists():
@@ -66,9 +75,34 @@ if not use_redis:
         logger.error(f"   ❌ Directory does not exist after mkdir()")
 
 
+def _ensure_storage() -> bool:
+    """Initialize storage once (thread-safe). Returns True when Redis is in use."""
+    global redis_client, use_redis, _storage_ready
+    if _storage_ready:
+        return use_redis
+    with _storage_lock:
+        if not _storage_ready:
+            with startup_profiler.record("job_manager.storage"):
+                redis_client = _connect_redis()
+                use_redis = redis_client is not None
+                if not use_redis:
+                    _prepare_jobs_dir()
+            _storage_ready = True
+    return use_redis
+
+
+def _backend() -> str:
+    return "redis" if _ensure_storage() else "file"
+
+
 class JobManager:
     """Manages background jobs with Redis (Upstash) or file-based storage."""
     
+    @staticmethod
+    def storage_backend() -> str:
+        """Return the active storage backend ("redis" or "file"), connecting on first call."""
+        return _backend()
+    
     @staticmethod
     def create_job() -> str:
         """
@@ -136,10 +170,43 @@ class JobManager:
             job_id: Job identifier
             results: Results dictionary
         """
-        if use_redis:
-            JobManager._save_results_redis(job_id, results)
-        else:
-            JobManager._save_results_file(job_id, results)
+        with job_store_duration.time(operation="save_results", backend=_backend()):
+            if _ensure_storage():
+                JobManager._save_results_redis(job_id, results)
+            else:
+                JobManager._save_results_file(job_id, results)
+    
+    @staticmethod
+    def save_partial_results(job_id: str, results: Dict[str, Any], phase: str, progress: int = None):
+        """
+        Save a partial result of a job that is still processing.
+        
+        The partial result takes the place of the final results until
+        ``save_results`` replaces it; the job records which phase it is.
+        
+        Args:
+            job_id: Job identifier
+            results: Partial results dictionary
+            phase: Phase of the partial result (e.g. "preview")
+            progress: Progress percentage (0-100)
+        """
+        JobManager.save_results(job_id, results)
+        
+        job_data = JobManager.get_job(job_id)
+        if not job_data:
+            logger.error(f"❌ [JOB MANAGER] Job not found: {job_id}")
+            return
+        
+        job_data["result_phase"] = phase
+        job_data["updated_at"] = datetime.now().isoformat()
+        if job_data.get("first_result_at") is None:
+            job_data["first_result_at"] = job_data["updated_at"]
+            job_data["first_result_seconds"] = (results.get("progress") or {}).get("first_result_seconds")
+        if progress is not None:
+            job_data["progress"] = progress
+        
+        JobManager._save_job(job_id, job_data)
+        logger.info(f"📊 [JOB MANAGER] Saved {phase} result for job {job_id}")
     
     @staticmethod
     def get_job(job_id: str) -> Optional[Dict[str, Any]]:
@@ -152,10 +219,11 @@ class JobManager:
         Returns:
             Job data dictionary or None if not found
         """
-        if use_redis:
-            return JobManager._get_job_redis(job_id)
-        else:
-            return JobManager._get_job_file(job_id)
+        with job_store_duration.time(operation="get_job", backend=_backend()):
+            if _ensure_storage():
+                return JobManager._get_job_redis(job_id)
+            else:
+                return JobManager._get_job_file(job_id)
     
     @staticmethod
     def get_results(job_id: str) -> Optional[Dict[str, Any]]:
@@ -168,10 +236,11 @@ class JobManager:
         Returns:
             Results dictionary or None if not found
         """
-        if use_redis:
-            return JobManager._get_results_redis(job_id)
-        else:
-            return JobManager._get_results_file(job_id)
+        with job_store_duration.time(operation="get_results", backend=_backend()):
+            if _ensure_storage():
+                return JobManager._get_results_redis(job_id)
+            else:
+                return JobManager._get_results_file(job_id)
     
     @staticmethod
     def mark_failed(job_id: str, error: str):
@@ -194,7 +263,79 @@ class JobManager:
         
         JobManager._save_job(job_id, job_data)
         logger.error(f"❌ [JOB MANAGER] Job {job_id} failed: {error}")
-    
+
+    @staticmethod
+    def request_cancel(job_id: str) -> bool:
+        """
+        Flag a job for cancellation.
+
+        The flag is stored under its own key, not in the job record, so the
+        worker running the job sees the request even when the cancel call
+        reached a different process, and no concurrent status or partial
+        result write can overwrite it.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True if the job exists and is now flagged
+        """
+        if not JobManager.get_job(job_id):
+            logger.error(f"❌ [JOB MANAGER] Job not found: {job_id}")
+            return False
+
+        with job_store_duration.time(operation="request_cancel", backend=_backend()):
+            if _ensure_storage():
+                key = f"job:{job_id}:cancel"
+                redis_client.set(key, "1")
+                redis_client.expire(key, settings.JOB_TTL_HOURS * 3600)
+            else:
+                (JOBS_DIR / f"{job_id}.cancel").touch()
+        logger.warning(f"🛑 [JOB MANAGER] Cancellation requested for job {job_id}")
+        return True
+
+    @staticmethod
+    def is_cancel_requested(job_id: str) -> bool:
+        """
+        Check whether a job has been flagged for cancellation.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            True once ``request_cancel`` has been called for the job
+        """
+        with job_store_duration.time(operation="is_cancel_requested", backend=_backend()):
+            if _ensure_storage():
+                try:
+                    return redis_client.get(f"job:{job_id}:cancel") is not None
+                except Exception as e:
+                    logger.error(f"❌ [REDIS] Failed to read cancel flag of {job_id}: {e}")
+                    return False
+            return (JOBS_DIR / f"{job_id}.cancel").exists()
+
+    @staticmethod
+    def mark_cancelled(job_id: str, reason: str):
+        """
+        Mark job as cancelled.
+
+        Args:
+            job_id: Job identifier
+            reason: Why the job stopped
+        """
+        job_data = JobManager.get_job(job_id)
+        if not job_data:
+            logger.error(f"❌ [JOB MANAGER] Job not found: {job_id}")
+            return
+
+        job_data["status"] = "cancelled"
+        job_data["message"] = reason
+        job_data["updated_at"] = datetime.now().isoformat()
+        job_data["completed_at"] = datetime.now().isoformat()
+
+        JobManager._save_job(job_id, job_data)
+        logger.warning(f"🛑 [JOB MANAGER] Job {job_id} cancelled: {reason}")
+
     # ========================================================================
     # REDIS IMPLEMENTATION
     # ========================================================================
@@ -202,10 +343,11 @@ class JobManager:
     @staticmethod
     def _save_job(job_id: str, job_data: Dict[str, Any]):
         """Save job data to Redis or file."""
-        if use_redis:
-            JobManager._save_job_redis(job_id, job_data)
-        else:
-            JobManager._save_job_file(job_id, job_data)
+        with job_store_duration.time(operation="save_job", backend=_backend()):
+            if _ensure_storage():
+                JobManager._save_job_redis(job_id, job_data)
+            else:
+                JobManager._save_job_file(job_id, job_data)
     
     @staticmethod
     def _save_job_redis(job_id: str, job_data: Dict[str, Any]):
@@ -397,7 +539,7 @@ class JobManager:
         Args:
             days: Age threshold in days
         """
-        if use_redis:
+        if _ensure_storage():
             logger.info("🔴 [JOB MANAGER] Using Redis - cleanup handled by TTL")
             return
         
@@ -412,6 +554,7 @@ class JobManager:
                     results_file = JOBS_DIR / f"{job_file.stem}_results.json"
                     if results_file.exists():
                         results_file.unlink()
+                    (JOBS_DIR / f"{job_file.stem}.cancel").unlink(missing_ok=True)
                     deleted_count += 1
                 except Exception as e:
                     logger.error(f"❌ [FILE] Failed to delete {job_file}: {e}")
@@ -0,0 +1,245 @@
+"""
+Near-duplicate keyword clustering (MinHash + LSH).
+
+Helium10 exports repeat the same search as word-order swaps ("strawberries
+freeze dried"), plurals and filler words ("dried strawberries for kids"),
+and every variant used to go through the categorization and intent agents.
+``cluster_near_duplicates`` groups those variants so that only one
+representative per cluster is sent to the model; ``expand_items`` and
+``propagate_intent`` copy the representative's labels onto the other members.
+
+Phrases are compared as sets of character trigrams over their sorted,
+singularized content words, which makes the comparison blind to word order,
+plurals and filler words while tolerating small typos. MinHash signatures
+banded into an LSH index find candidate pairs without comparing every pair;
+each candidate is then checked against the exact Jaccard similarity and
+word by word, so a phrase that adds a modifier ("... bulk") or swaps one
+word for a similar-looking one ("peaches" / "pears") stays its own cluster.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from app.services.keyword_processing.root_extraction import normalize_word
+
+logger = logging.getLogger(__name__)
+
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "for", "of", "with", "and", "in", "on", "to", "by", "from", "at", "or",
+})
+DEFAULT_THRESHOLD = 0.8  # Minimum trigram Jaccard similarity to a representative
+WORD_THRESHOLD = 0.5  # Minimum similarity of each word to its counterpart (typos, not other words)
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16  # 16 bands x 4 rows: pairs above ~0.5 similarity become candidates
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def content_words(phrase: str) -> List[str]:
+    """Sorted, singularized words of a phrase without filler words."""
+    words = _TOKEN_RE.findall(phrase.lower())
+    return sorted(normalize_word(w) for w in words if w not in FILLER_WORDS)
+
+
+def shingles(words: List[str]) -> FrozenSet[str]:
+    """Character trigrams of each word, padded so word boundaries count."""
+    grams = set()
+    for word in words:
+        padded = f"#{word}#"
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def words_align(a: List[str], b: List[str]) -> bool:
+    """True when each word of ``a`` pairs off with a word of ``b`` that is the same word or a typo of it."""
+    if len(a) != len(b):
+        return False
+    unmatched = list(b)
+    for word in a:
+        if word in unmatched:
+            unmatched.remove(word)
+            continue
+        grams = shingles([word])
+        best = max(unmatched, key=lambda other: jaccard(grams, shingles([other])))
+        if jaccard(grams, shingles([best])) < WORD_THRESHOLD:
+            return False
+        unmatched.remove(best)
+    return True
+
+
+class MinHasher:
+    """Fixed-seed MinHash over string shingles (stable across processes)."""
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._params = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)
+        ]
+
+    def signature(self, grams: FrozenSet[str]) -> Tuple[int, ...]:
+        if not grams:
+            return tuple([_MERSENNE_PRIME] * self.num_perm)
+        hashes = [zlib.crc32(g.encode("utf-8")) for g in grams]
+        return tuple(min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._params)
+
+
+@dataclass
+class NearDuplicateClusters:
+    """Keyword clusters; every keyword maps to its representative (itself for representatives)."""
+    representative_of: Dict[str, str] = field(default_factory=dict)
+    members: Dict[str, List[str]] = field(default_factory=dict)  # Representative -> other members
+
+    @property
+    def removed(self) -> int:
+        return sum(len(m) for m in self.members.values())
+
+    def representatives(self) -> List[str]:
+        return [kw for kw, rep in self.representative_of.items() if kw == rep]
+
+    def representative_scores(self, scores: Mapping[str, int]) -> Dict[str, int]:
+        """``scores`` limited to representatives, in the original order."""
+        return {kw: score for kw, score in scores.items() if self.representative_of.get(kw, kw) == kw}
+
+    def expand_items(
+        self,
+        items: List[Dict[str, Any]],
+        scores: Mapping[str, int],
+        stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Add a copy of each representative's item for every member of its cluster.
+
+        Members take the representative's labels but keep their own relevancy
+        score, and are marked with ``near_duplicate_of``. Category counts in
+        ``stats`` (the keyword agent's) are updated in place.
+        """
+        expanded: List[Dict[str, Any]] = []
+        for item in items:
+            expanded.append(item)
+            phrase = str(item.get("phrase") or "")
+            for member in self.members.get(phrase.strip().lower(), ()):
+                copy = dict(item)
+                copy["phrase"] = member
+                copy["relevancy_score"] = scores.get(member, item.get("relevancy_score", 0))
+                copy["near_duplicate_of"] = phrase
+                expanded.append(copy)
+                if stats is not None and item.get("category"):
+                    stats.setdefault(item["category"], {"count": 0, "examples": []})["count"] += 1
+        return expanded
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "keywords": len(self.representative_of),
+            "representatives": len(self.members),
+            "removed": self.removed,
+            "clusters_with_members": sum(1 for m in self.members.values() if m),
+        }
+
+
+def cluster_near_duplicates(
+    keywords: List[str],
+    volumes: Optional[Mapping[str, int]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    num_perm: int = DEFAULT_NUM_PERM,
+    bands: int = DEFAULT_BANDS,
+) -> NearDuplicateClusters:
+    """
+    Group near-identical keyword phrases.
+
+    Keywords are visited by descending search volume (ties keep input order);
+    each keyword not yet clustered becomes a representative and takes every
+    unclustered LSH candidate whose trigram similarity to it reaches
+    ``threshold`` and whose content words pair off with its own. Members are
+    therefore always close to their representative, never only to another
+    member.
+
+    Args:
+        keywords: Keyword phrases (lowercased, already exact-deduplicated)
+        volumes: Search volume per keyword, used to pick representatives
+        threshold: Minimum Jaccard similarity to a representative
+        num_perm: MinHash signature length
+        bands: LSH bands; ``num_perm`` must divide evenly into them
+
+    Returns:
+        NearDuplicateClusters over every keyword
+    """
+    if num_perm % bands:
+        raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+    volumes = volumes or {}
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm)
+
+    words = {kw: content_words(kw) for kw in keywords}
+    grams = {kw: shingles(w) for kw, w in words.items()}
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+    keyword_buckets: Dict[str, List[Tuple[int, Tuple[int, ...]]]] = {}
+    for kw in keywords:
+        signature = hasher.signature(grams[kw])
+        keys = [(band, signature[band * rows:(band + 1) * rows]) for band in range(bands)]
+        keyword_buckets[kw] = keys
+        for key in keys:
+            buckets[key].append(kw)
+
+    position = {kw: i for i, kw in enumerate(keywords)}
+    order = sorted(keywords, key=lambda kw: (-int(volumes.get(kw) or 0), position[kw]))
+    clusters = NearDuplicateClusters()
+    for kw in order:
+        if kw in clusters.representative_of:
+            continue
+        clusters.representative_of[kw] = kw
+        clusters.members[kw] = []
+        candidates = {c for key in keyword_buckets[kw] for c in buckets[key]}
+        for candidate in sorted(candidates, key=position.__getitem__):
+            if candidate in clusters.representative_of:
+                continue
+            if jaccard(grams[kw], grams[candidate]) < threshold or not words_align(words[candidate], words[kw]):
+                continue
+            clusters.representative_of[candidate] = kw
+            clusters.members[kw].append(candidate)
+
+    # Report in input order, as the scores dicts the pipeline passes around are
+    clusters.representative_of = {kw: clusters.representative_of[kw] for kw in keywords}
+    logger.info(
+        f"[NearDuplicates] {len(keywords)} keywords -> {len(clusters.members)} representatives "
+        f"({clusters.removed} near-duplicates)"
+    )
+    return clusters
+
+
+def propagate_intent(scored: List[Dict[str, Any]], members: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Give each member item its representative's intent score.
+
+    ``scored`` are the representative items as returned by intent scoring;
+    members are placed right after their representative.
+    """
+    by_phrase = {str(it.get("phrase") or "").strip().lower(): it for it in scored}
+    followers: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for member in members:
+        rep = str(member.get("near_duplicate_of") or "").strip().lower()
+        if rep in by_phrase:
+            member["intent_score"] = by_phrase[rep].get("intent_score", 1)
+        followers[rep].append(member)
+
+    result: List[Dict[str, Any]] = []
+    for item in scored:
+        result.append(item)
+        result.extend(followers.pop(str(item.get("phrase") or "").strip().lower(), ()))
+    for orphans in followers.values():
+        result.extend(orphans)
+    return result
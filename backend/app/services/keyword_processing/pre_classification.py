@@ -0,0 +1,159 @@
+"""
+Deterministic keyword pre-classification.
+
+Some categories need no model: a keyword containing the product's own brand is
+Branded, a phrase made mostly of Spanish words is Spanish, and a phrase of
+three or more words that appears verbatim in the product title is Relevant.
+``pre_classify_keywords`` resolves those cases under the thresholds below and
+returns the rest, which still go to the keyword agent.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Set
+
+from app.services.keyword_processing.root_extraction import normalize_word
+
+logger = logging.getLogger(__name__)
+
+MIN_BRAND_TOKEN_CHARS = 3  # Shorter brand tokens ("co", "s") never decide a match
+SPANISH_MIN_TOKEN_SHARE = 0.5  # Share of a phrase's words that must be Spanish
+TITLE_MATCH_MIN_WORDS = 3  # Shorter title phrases ("freeze dried") can be broad Outliers
+
+# Spanish words that are not also English words
+SPANISH_FUNCTION_WORDS = frozenset({"para", "con", "sin", "de", "del", "los", "las", "y", "sabor"})
+SPANISH_CONTENT_WORDS = frozenset({
+    "fresa", "fresas", "fruta", "frutas", "deshidratada", "deshidratadas", "deshidratado", "deshidratados",
+    "liofilizada", "liofilizadas", "liofilizado", "liofilizados", "seca", "secas", "seco", "secos",
+    "organica", "organicas", "organico", "organicos", "azucar", "ninos", "bebe", "fresco", "fresca",
+    "manzana", "manzanas", "platano", "platanos", "sandia", "frambuesa", "frambuesas", "polvo", "leche",
+})
+_ACCENTED = re.compile(r"[áéíóúñ]")  # Not "ü": brand names borrow it ("trü frü")
+_ACCENT_FOLD = str.maketrans("áéíóúñ", "aeioun")
+_TOKEN_RE = re.compile(r"[a-z0-9áéíóúñü]+")
+
+
+@dataclass
+class PreClassification:
+    """Keywords resolved locally and the ones left for the model."""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    ambiguous: Dict[str, int] = field(default_factory=dict)  # keyword -> base relevancy
+    by_rule: Dict[str, int] = field(default_factory=dict)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Category stats in the keyword agent's shape."""
+        stats: Dict[str, Dict[str, Any]] = {}
+        for item in self.items:
+            bucket = stats.setdefault(item["category"], {"count": 0, "examples": []})
+            bucket["count"] += 1
+            if len(bucket["examples"]) < 2:
+                bucket["examples"].append(item["phrase"])
+        return stats
+
+
+def _words(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def distinctive_brand_tokens(brand_tokens: Iterable[str], title: str) -> Set[str]:
+    """
+    Brand tokens that identify the brand rather than the product.
+
+    A token the title repeats after the brand ("Strawberry Co ... Strawberry
+    Slices") is a product word, and matching on it would mark every keyword
+    Branded.
+    """
+    tokens = {t.lower() for t in brand_tokens if len(t) >= MIN_BRAND_TOKEN_CHARS}
+    counts = Counter(_words(title))
+    return {t for t in tokens if counts.get(t, 0) <= 1}
+
+
+def _is_branded(words: List[str], brand: Set[str]) -> bool:
+    if not brand:
+        return False
+    # Possessive and plural spellings of the brand ("natures best") match too
+    present = set(words) | {w[:-1] for w in words if w.endswith("s")}
+    return brand <= present
+
+
+def _is_spanish(words: List[str]) -> bool:
+    content = function = 0
+    for word in words:
+        folded = word.translate(_ACCENT_FOLD)
+        if _ACCENTED.search(word) or folded in SPANISH_CONTENT_WORDS:
+            content += 1
+        elif folded in SPANISH_FUNCTION_WORDS:
+            function += 1
+    return content > 0 and (content + function) / len(words) >= SPANISH_MIN_TOKEN_SHARE
+
+
+def _in_title(words: List[str], title_words: List[str]) -> bool:
+    n = len(words)
+    if n < TITLE_MATCH_MIN_WORDS or n > len(title_words):
+        return False
+    target = [normalize_word(w) for w in words]
+    return any(title_words[i:i + n] == target for i in range(len(title_words) - n + 1))
+
+
+def pre_classify_keywords(
+    relevancy_scores: Mapping[str, int],
+    title: str = "",
+    brand_tokens: Iterable[str] = (),
+    brand: str = "",
+) -> PreClassification:
+    """
+    Resolve confident keyword categories without the model.
+
+    Rules, first match wins:
+    1. Contains every distinctive own-brand token -> Branded
+    2. At least ``SPANISH_MIN_TOKEN_SHARE`` Spanish words, one of them a
+       content word or accented -> Spanish
+    3. ``TITLE_MATCH_MIN_WORDS``+ words found verbatim in the title
+       (plurals folded) -> Relevant
+
+    Args:
+        relevancy_scores: keyword -> base relevancy, in agent order
+        title: Product title
+        brand_tokens: Own-brand tokens (e.g. ``extract_brand_tokens``)
+        brand: Own brand name from the product metadata, tokenized here
+
+    Returns:
+        PreClassification with resolved items (base relevancy kept) and the
+        ambiguous keywords
+    """
+    brand_words = distinctive_brand_tokens([*brand_tokens, *_words(brand)], title)
+    title_words = [normalize_word(w) for w in _words(title)]
+    result = PreClassification()
+
+    for keyword, score in relevancy_scores.items():
+        words = _words(keyword)
+        category = rule = None
+        if not words:
+            pass
+        elif _is_branded(words, brand_words):
+            category, rule = "Branded", "brand"
+        elif _is_spanish(words):
+            category, rule = "Spanish", "spanish"
+        elif _in_title(words, title_words):
+            category, rule = "Relevant", "title_match"
+
+        if category is None:
+            result.ambiguous[keyword] = score
+            continue
+        result.items.append({
+            "phrase": keyword,
+            "category": category,
+            "relevancy_score": score,
+            "reason": f"Pre-classified ({rule})",
+        })
+        result.by_rule[rule] = result.by_rule.get(rule, 0) + 1
+
+    logger.info(
+        f"[PreClassification] {len(result.items)} of {len(relevancy_scores)} keywords resolved locally "
+        f"{result.by_rule}, {len(result.ambiguous)} left for the model"
+    )
+    return result
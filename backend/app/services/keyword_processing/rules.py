@@ -0,0 +1,134 @@
+"""
+Deterministic keyword rules over a columnar keyword table.
+
+Score alignment (including the category overrides) and the zero-volume filter
+used to run as separate passes that each copied every keyword dict.
+``KeywordTable`` reads the columns the rules need once, and ``apply_keyword_rules``
+evaluates all of them in a single pass over the columns. Only rows whose
+scores change are written back (in place); nothing is copied.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Categories whose relevancy is capped at 2 and intent forced to 0
+OVERRIDE_CATEGORIES = frozenset({"Irrelevant", "Branded", "Spanish"})
+HIGH_VOLUME_THRESHOLD = 500  # Searches per month
+
+
+@dataclass
+class KeywordTable:
+    """Column view of keyword item dicts; ``items[i]`` is row ``i``."""
+    items: List[Dict[str, Any]]
+    category: List[Any]
+    relevancy: List[Any]
+    intent: List[Any]
+    volume: List[Any]
+    root: List[Any]
+
+    @classmethod
+    def from_items(cls, items: List[Dict[str, Any]]) -> "KeywordTable":
+        rows = items or []
+        return cls(
+            items=rows,
+            category=[it.get("category", "") for it in rows],
+            relevancy=[it.get("relevancy_score", 0) for it in rows],
+            intent=[it.get("intent_score", 0) for it in rows],
+            volume=[it.get("search_volume", 0) for it in rows],
+            root=[it.get("root", "") for it in rows],
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+@dataclass
+class KeywordRulesResult:
+    """Outcome of one rules pass; bucket lists hold the original item dicts."""
+    aligned_count: int = 0
+    relevant_keywords: List[Dict[str, Any]] = field(default_factory=list)
+    design_keywords: List[Dict[str, Any]] = field(default_factory=list)
+    branded_keywords: List[Dict[str, Any]] = field(default_factory=list)
+    high_intent_keywords: List[Dict[str, Any]] = field(default_factory=list)
+    high_volume_keywords: List[Dict[str, Any]] = field(default_factory=list)
+    root_volumes: Dict[str, int] = field(default_factory=dict)  # Keywords with volume only
+    relevant_root_volumes: Dict[str, int] = field(default_factory=dict)  # Relevant/Design-Specific only
+
+
+def apply_keyword_rules(table: KeywordTable, align_scores: bool = True) -> KeywordRulesResult:
+    """
+    Apply every deterministic keyword rule in one pass.
+
+    Alignment rules (first match wins):
+    1. Category Irrelevant/Branded/Spanish -> relevancy capped at 2, intent 0
+    2. Relevancy 8-10 with intent 0 -> intent 1
+    3. Intent 2-3 with relevancy 0-2 -> relevancy 4
+    4. Relevancy 6-7 with intent 0 -> intent 1
+
+    Zero-volume filter: keywords without search volume are left out of the
+    category, intent, volume and root buckets.
+
+    Args:
+        table: Keyword columns; aligned scores are written back to ``table.items``
+        align_scores: Apply the alignment rules (False = filter/bucket only)
+
+    Returns:
+        KeywordRulesResult with the alignment count and the filtered buckets
+    """
+    result = KeywordRulesResult()
+    root_volumes: Dict[str, int] = defaultdict(int)
+    relevant_root_volumes: Dict[str, int] = defaultdict(int)
+    buckets = {
+        "Relevant": result.relevant_keywords,
+        "Design-Specific": result.design_keywords,
+        "Branded": result.branded_keywords,
+    }
+
+    for item, category, relevancy, intent, volume, root in zip(
+        table.items, table.category, table.relevancy, table.intent, table.volume, table.root
+    ):
+        if align_scores:
+            note = None
+            if category in OVERRIDE_CATEGORIES:
+                if relevancy > 2 or intent > 0:
+                    new_relevancy = min(2, relevancy)
+                    note = f"Category {category}: relevancy {relevancy}→{new_relevancy}, intent {intent}→0"
+                    item["relevancy_score"] = relevancy = new_relevancy
+                    item["intent_score"] = intent = 0
+            elif relevancy >= 8 and intent == 0:
+                note = f"High market performance: intent {intent}→1 (relevancy {relevancy})"
+                item["intent_score"] = intent = 1
+            elif intent >= 2 and relevancy <= 2:
+                note = f"High semantic relevance: relevancy {relevancy}→4 (intent {intent})"
+                item["relevancy_score"] = relevancy = 4
+            elif relevancy >= 6 and intent == 0:
+                note = f"Moderate market performance: intent {intent}→1 (relevancy {relevancy})"
+                item["intent_score"] = intent = 1
+            if note is not None:
+                item["_alignment_applied"] = note
+                result.aligned_count += 1
+
+        volume = volume or 0
+        if volume <= 0:
+            continue
+        bucket = buckets.get(category)
+        if bucket is not None:
+            bucket.append(item)
+        if (intent or 0) >= 2:
+            result.high_intent_keywords.append(item)
+        if volume > HIGH_VOLUME_THRESHOLD:
+            result.high_volume_keywords.append(item)
+        if root:
+            root_volumes[root] += volume
+            if category in ("Relevant", "Design-Specific"):
+                relevant_root_volumes[root] += volume
+
+    result.root_volumes = dict(root_volumes)
+    result.relevant_root_volumes = dict(relevant_root_volumes)
+    return result
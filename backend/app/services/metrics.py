@@ -0,0 +1,477 @@
+"""
+Prometheus-style metrics for pipeline and LLM telemetry.
+
+A small in-process registry (no client library dependency) rendering the
+Prometheus text exposition format, served by ``GET /metrics``. Pipeline
+stages, JobManager storage calls, background jobs and the Agents SDK
+tracing hook record into the metrics defined here; ``monitor`` and
+``rate_limiter`` statistics are read at scrape time.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # bucket counts..., count, sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        series = self._values.get(self._key(labels))
+        return series[-2] if series else 0.0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = self.header()
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                bucket_labels = _labels(self.labelnames, key, 'le="%s"' % _fmt(bound))
+                lines.append(f"{self.name}_bucket{bucket_labels} {_fmt(count)}")
+            inf_labels = _labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{inf_labels} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {_fmt(series[-2])}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and scrape-time collectors, renders the exposition text."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[str]]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[str]]):
+        """Add a callable producing exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.warning(f"⚠️ [METRICS] Collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# Application metrics
+# ============================================================================
+
+registry = MetricsRegistry()
+
+stage_duration = registry.histogram(
+    "pipeline_stage_duration_seconds",
+    "Wall time of each pipeline stage",
+    ["stage"],
+)
+pipeline_requests = registry.counter(
+    "pipeline_requests_total",
+    "Pipeline runs by outcome",
+    ["outcome"],
+)
+job_store_duration = registry.histogram(
+    "job_store_operation_duration_seconds",
+    "JobManager storage read/write latency",
+    ["operation", "backend"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+jobs_in_progress = registry.gauge(
+    "pipeline_jobs_in_progress",
+    "Background analysis jobs accepted but not yet finished (queue depth)",
+)
+time_to_first_result = registry.histogram(
+    "pipeline_time_to_first_result_seconds",
+    "Time from job start to its first published (partial or complete) result",
+    ["phase"],
+)
+keyword_near_duplicates = registry.counter(
+    "keyword_near_duplicates_total",
+    "Keywords labelled from their near-duplicate cluster's representative instead of by the model",
+)
+keyword_pre_classified = registry.counter(
+    "keyword_pre_classified_total",
+    "Keywords categorized by a deterministic rule instead of the keyword agent",
+    ["rule"],
+)
+
+
+llm_call_duration = registry.histogram(
+    "llm_call_duration_seconds",
+    "Model call latency per agent, from Agents SDK response spans",
+    ["agent", "model"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120, 300),
+)
+llm_calls = registry.counter(
+    "llm_calls_total",
+    "Model calls per agent and outcome, from Agents SDK response spans",
+    ["agent", "model", "outcome"],
+)
+llm_tokens = registry.counter(
+    "llm_tokens_total",
+    "Tokens used per agent, from Agents SDK response spans (cached_input is the part of input served from the prompt cache)",
+    ["agent", "model", "kind"],
+)
+llm_hedged_requests = registry.counter(
+    "llm_hedged_requests_total",
+    "Duplicate requests for slow LLM calls: sent, won (answered first) or refused by the budget",
+    ["agent", "outcome"],
+)
+llm_overloaded_requests = registry.counter(
+    "llm_overloaded_requests_total",
+    "LLM calls rejected with a 429, 503 or timeout",
+    ["agent"],
+)
+llm_concurrency_limit = registry.gauge(
+    "llm_concurrency_limit",
+    "Current adaptive (AIMD) limit on concurrent LLM calls",
+)
+llm_circuit_state = registry.gauge(
+    "llm_circuit_state",
+    "LLM circuit breaker state (0 closed, 1 open, 2 half-open)",
+)
+llm_circuit_rejected = registry.counter(
+    "llm_circuit_rejected_total",
+    "LLM calls refused while the circuit was open",
+    ["agent"],
+)
+llm_cascade_items = registry.counter(
+    "llm_cascade_items_total",
+    "Items answered per model cascade tier (fast, or strong after escalation)",
+    ["agent", "tier"],
+)
+llm_cascade_escalations = registry.counter(
+    "llm_cascade_escalations_total",
+    "Cascaded LLM calls that reached the strong model: low_confidence, invalid or error",
+    ["agent", "reason"],
+)
+llm_batch_requests = registry.counter(
+    "llm_batch_requests_total",
+    "Offline-mode LLM calls through the Batch API: queued, submitted, answered or failed",
+    ["agent", "outcome"],
+)
+seo_listing_violations = registry.counter(
+    "seo_listing_violations_total",
+    "Amazon listing rule violations by resolution: repaired locally, rewritten by the model or replaced by the fallback",
+    ["rule", "resolution"],
+)
+
+
+def _collect_monitor_metrics() -> Iterable[str]:
+    """Per-agent latency histograms and counters for requests tracked by ``monitor``."""
+    from app.services.openai_monitor import LatencyHistogram, monitor
+
+    # Every 4th monitor bucket boundary is a power of two (1ms, 2ms, ... ~1h),
+    # so the cumulative counts below are exact rather than interpolated.
+    bounds = list(range(0, LatencyHistogram.BUCKETS + 1, 4))
+    name = "openai_monitor_request_duration_seconds"
+    lines = [f"# HELP {name} Request latency per agent (OpenAIMonitor)", f"# TYPE {name} histogram"]
+    calls = [
+        "# HELP openai_monitor_requests_total Requests per agent and outcome (OpenAIMonitor)",
+        "# TYPE openai_monitor_requests_total counter",
+    ]
+    tokens = [
+        "# HELP openai_monitor_tokens_total Tokens used per agent (OpenAIMonitor)",
+        "# TYPE openai_monitor_tokens_total counter",
+    ]
+    retries = [
+        "# HELP openai_monitor_retries_total Retries per agent (OpenAIMonitor)",
+        "# TYPE openai_monitor_retries_total counter",
+    ]
+    input_tokens = [
+        "# HELP openai_monitor_input_tokens_total Input tokens per agent, by prompt cache hit or miss (OpenAIMonitor)",
+        "# TYPE openai_monitor_input_tokens_total counter",
+    ]
+
+    with monitor.lock:
+        series = {
+            agent: (s.latency.counts[:], s.latency.count, s.latency.total, s.tokens)
+            for agent, s in monitor.agent_series.items()
+        }
+        stats = {
+            agent: (s.successful_requests, s.failed_requests, s.total_retries)
+            for agent, s in monitor.agent_stats.items()
+        }
+        usage = {agent: (u.input_tokens, u.cached_input_tokens) for agent, u in monitor.token_usage.items()}
+
+    for agent, (counts, count, total, token_sum) in sorted(series.items()):
+        cumulative = 0
+        previous = 0
+        for index in bounds:
+            cumulative += sum(counts[previous:index + 1])
+            previous = index + 1
+            bucket_labels = _labels(["agent"], [agent], 'le="%s"' % _fmt(LatencyHistogram._upper_bound(index)))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        inf_labels = _labels(["agent"], [agent], 'le="+Inf"')
+        lines.append(f"{name}_bucket{inf_labels} {count}")
+        lines.append(f"{name}_count{_labels(['agent'], [agent])} {count}")
+        lines.append(f"{name}_sum{_labels(['agent'], [agent])} {_fmt(total)}")
+        tokens.append(f"openai_monitor_tokens_total{_labels(['agent'], [agent])} {token_sum}")
+
+    for agent, (ok, failed, retried) in sorted(stats.items()):
+        calls.append(f"openai_monitor_requests_total{_labels(['agent', 'outcome'], [agent, 'success'])} {ok}")
+        calls.append(f"openai_monitor_requests_total{_labels(['agent', 'outcome'], [agent, 'error'])} {failed}")
+        retries.append(f"openai_monitor_retries_total{_labels(['agent'], [agent])} {retried}")
+    for agent, (total_input, cached) in sorted(usage.items()):
+        input_tokens.append(f"openai_monitor_input_tokens_total{_labels(['agent', 'cache'], [agent, 'hit'])} {cached}")
+        input_tokens.append(f"openai_monitor_input_tokens_total{_labels(['agent', 'cache'], [agent, 'miss'])} {total_input - cached}")
+    return lines + calls + tokens + retries + input_tokens
+
+
+def _collect_rate_limiter_metrics() -> Iterable[str]:
+    from app.services.openai_rate_limiter import rate_limiter
+
+    stats = rate_limiter.get_stats()
+    return [
+        "# HELP openai_rate_limiter_wait_seconds_total Time spent waiting in the OpenAI rate limiter",
+        "# TYPE openai_rate_limiter_wait_seconds_total counter",
+        f'openai_rate_limiter_wait_seconds_total{{reason="rate_limit"}} {_fmt(stats["total_wait_seconds"])}',
+        f'openai_rate_limiter_wait_seconds_total{{reason="backoff"}} {_fmt(stats["total_backoff_seconds"])}',
+        "# HELP openai_rate_limiter_requests_last_minute Requests admitted in the last 60s",
+        "# TYPE openai_rate_limiter_requests_last_minute gauge",
+        f"openai_rate_limiter_requests_last_minute {stats['requests_last_minute']}",
+    ]
+
+
+registry.register_collector(_collect_monitor_metrics)
+registry.register_collector(_collect_rate_limiter_metrics)
+
+
+def render_metrics() -> str:
+    """Render all metrics in Prometheus text exposition format."""
+    return registry.render()
+
+
+# ============================================================================
+# Agents SDK tracing hook
+# ============================================================================
+
+def _parse_ts(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+class AgentMetricsProcessor:
+    """
+    Agents SDK tracing processor recording every model call.
+
+    Response spans carry model, usage and timing; their parent agent span
+    gives the agent name. This covers all ``Runner.run_sync`` calls without
+    touching the individual agents.
+    """
+
+    def __init__(self):
+        self._agent_names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def on_trace_start(self, trace):
+        pass
+
+    def on_trace_end(self, trace):
+        pass
+
+    def on_span_start(self, span):
+        data = span.span_data
+        if getattr(data, "type", None) == "agent":
+            with self._lock:
+                self._agent_names[span.span_id] = data.name
+
+    def on_span_end(self, span):
+        data = span.span_data
+        kind = getattr(data, "type", None)
+        if kind == "agent":
+            with self._lock:
+                self._agent_names.pop(span.span_id, None)
+            return
+        if kind not in ("response", "generation"):
+            return
+
+        with self._lock:
+            agent = self._agent_names.get(span.parent_id, "unknown")
+
+        model, usage = None, {}
+        response = getattr(data, "response", None)
+        if response is not None:
+            model = getattr(response, "model", None)
+            raw = getattr(response, "usage", None)
+            if raw is not None:
+                usage = {
+                    "input_tokens": getattr(raw, "input_tokens", 0),
+                    "cached_input_tokens": getattr(getattr(raw, "input_tokens_details", None), "cached_tokens", 0),
+                    "output_tokens": getattr(raw, "output_tokens", 0),
+                }
+        else:
+            model = getattr(data, "model", None)
+            usage = getattr(data, "usage", None) or {}
+        model = model or "unknown"
+
+        start, end = _parse_ts(span.started_at), _parse_ts(span.ended_at)
+        if start is not None and end is not None:
+            llm_call_duration.observe(end - start, agent=agent, model=model)
+        llm_calls.inc(agent=agent, model=model, outcome="error" if span.error else "success")
+        for token_kind in ("input", "cached_input", "output"):
+            count = usage.get(f"{token_kind}_tokens") or 0
+            if count:
+                llm_tokens.inc(count, agent=agent, model=model, kind=token_kind)
+        if usage:
+            from app.services.openai_monitor import monitor
+
+            monitor.record_usage(
+                agent,
+                usage.get("input_tokens") or 0,
+                usage.get("cached_input_tokens") or 0,
+                usage.get("output_tokens") or 0,
+            )
+
+    def shutdown(self):
+        with self._lock:
+            self._agent_names.clear()
+
+    def force_flush(self):
+        pass
+
+
+_processor_installed = False
+
+
+def install_agent_metrics() -> bool:
+    """Register ``AgentMetricsProcessor`` with the Agents SDK (idempotent)."""
+    global _processor_installed
+    if _processor_installed:
+        return True
+    try:
+        from agents import add_trace_processor
+    except ImportError:
+        logger.warning("⚠️ [METRICS] agents SDK tracing unavailable - LLM metrics limited to explicit monitor calls")
+        return False
+    add_trace_processor(AgentMetricsProcessor())
+    _processor_installed = True
+    return True
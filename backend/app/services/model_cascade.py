@@ -0,0 +1,391 @@
+"""
+Model cascade for the classification-style agents.
+
+Categorizing "spanish" or "freeze dried strawberry slices" does not need the
+same model as writing a compliant title. ``CascadeModel`` wraps an agent's
+model (the strong tier) and sends each call to a cheaper, faster model first,
+asking it for a ``confidence`` per item. The strong model only sees:
+
+- the items the fast model was unsure of (confidence below
+  ``min_confidence``); their answers replace the fast ones by phrase
+- the whole call, when the fast output breaks the agent's schema or more
+  than ``max_partial_share`` of its items are unsure
+
+Agents whose output is not a list of items (root relevance) give one
+confidence for the call and escalate as a whole.
+
+Opt in with ``LLM_CASCADE_ENABLED=true``; the pipeline then calls
+``install_model_cascade()`` on its first run to wrap ``CASCADE_AGENTS``.
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from agents import Agent
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.services.metrics import llm_cascade_escalations, llm_cascade_items
+from app.services.model_wrappers import WrappedModel, install_wrappers, wrap_agent
+
+logger = logging.getLogger(__name__)
+
+# (module, attribute) of the classification-style agents
+CASCADE_AGENTS = [
+    ("app.local_agents.keyword.agent", "keyword_agent"),
+    ("app.local_agents.scoring.subagents.intent_agent", "intent_scoring_agent"),
+    ("app.local_agents.scoring.subagents.root_relevance_agent", "root_relevance_agent"),
+    ("app.local_agents.scoring.subagents.broad_volume_agent", "broad_volume_agent"),
+]
+
+ITEM_CONFIDENCE_NOTE = (
+    "\n\nAlso give every item a \"confidence\" field: a number from 0 to 1 for how sure "
+    "you are of that item's answer."
+)
+CALL_CONFIDENCE_NOTE = (
+    "\n\nAlso add a top-level \"confidence\" field: a number from 0 to 1 for how sure "
+    "you are of the whole answer."
+)
+ESCALATION_NOTE = (
+    "ONLY these items need an answer now. Return the same JSON format, containing just "
+    "these items:\n{phrases}"
+)
+
+
+@dataclass
+class CascadeConfig:
+    """Which model answers first and when its answers are trusted."""
+    fast_model: str = "gpt-5-nano-2025-08-07"
+    min_confidence: float = 0.7  # Items below this go to the strong model
+    max_partial_share: float = 0.5  # Above this share of unsure items, rerun the whole call
+
+    @classmethod
+    def from_settings(cls) -> "CascadeConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        return cls(
+            fast_model=settings.LLM_CASCADE_FAST_MODEL,
+            min_confidence=settings.LLM_CASCADE_MIN_CONFIDENCE,
+        )
+
+
+# ----------------------------------------------------------------------------
+# Output formats of the cascaded agents
+# ----------------------------------------------------------------------------
+
+KEYWORD_CATEGORIES = {"Relevant", "Design-Specific", "Irrelevant", "Branded", "Spanish", "Outlier"}
+VOLUME_CATEGORIES = ("Relevant", "Design-Specific")
+
+
+def _has_phrase(item: Dict[str, Any]) -> bool:
+    return isinstance(item.get("phrase"), str) and bool(item["phrase"])
+
+
+def _rebuild_keyword_stats(parsed: Dict[str, Any]):
+    stats: Dict[str, Dict[str, Any]] = {}
+    for item in parsed["items"]:
+        bucket = stats.setdefault(item["category"], {"count": 0, "examples": []})
+        bucket["count"] += 1
+        if len(bucket["examples"]) < 3:
+            bucket["examples"].append(item["phrase"])
+    parsed["stats"] = stats
+
+
+def _rebuild_root_volumes(parsed: Dict[str, Any]):
+    volumes: Dict[str, int] = {}
+    for item in parsed["items"]:
+        if item.get("category") in VOLUME_CATEGORIES:
+            volumes[item["root"]] = volumes.get(item["root"], 0) + (item.get("search_volume") or 0)
+    parsed["broad_search_volume_by_root"] = volumes
+
+
+@dataclass
+class CascadeFormat:
+    """How to check one agent's output and patch escalated items into it."""
+    per_item: bool = True  # False: one confidence for the whole call
+    check_item: Callable[[Dict[str, Any]], bool] = _has_phrase
+    check_output: Callable[[Any], bool] = lambda parsed: True
+    rebuild: Optional[Callable[[Any], None]] = None  # Recompute summaries after items change
+
+
+CASCADE_FORMATS: Dict[str, CascadeFormat] = {
+    "KeywordAgent": CascadeFormat(
+        check_item=lambda item: _has_phrase(item) and item.get("category") in KEYWORD_CATEGORIES,
+        rebuild=_rebuild_keyword_stats,
+    ),
+    "IntentScoringSubagent": CascadeFormat(
+        check_item=lambda item: _has_phrase(item) and item.get("intent_score") in (0, 1, 2, 3),
+    ),
+    "BroadVolumeSubagent": CascadeFormat(
+        check_item=lambda item: _has_phrase(item) and isinstance(item.get("root"), str) and bool(item["root"]),
+        check_output=lambda parsed: isinstance(parsed, dict),
+        rebuild=_rebuild_root_volumes,
+    ),
+    "RootRelevanceAgent": CascadeFormat(
+        per_item=False,
+        check_output=lambda parsed: isinstance(parsed, dict) and isinstance(parsed.get("filtered_root_volumes"), dict),
+    ),
+}
+
+
+def _items(parsed: Any) -> Optional[List[Dict[str, Any]]]:
+    """The item list of an output (a bare list, or a dict's ``items``)."""
+    items = parsed.get("items") if isinstance(parsed, dict) else parsed
+    if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+        return items
+    return None
+
+
+def _confidence(value: Dict[str, Any]) -> float:
+    """Stated confidence; a missing or malformed one counts as unsure."""
+    confidence = value.get("confidence")
+    return float(confidence) if isinstance(confidence, (int, float)) else 0.0
+
+
+def _phrase_key(item: Dict[str, Any]) -> str:
+    return item["phrase"].lower().strip()
+
+
+def response_text(response: ModelResponse) -> Optional[str]:
+    """Concatenated output text of a response, or None when it has no message."""
+    texts = [
+        part.text
+        for item in response.output if getattr(item, "type", None) == "message"
+        for part in item.content if getattr(part, "type", None) == "output_text"
+    ]
+    return "".join(texts) if texts else None
+
+
+def _parse_json(text: Optional[str]) -> Any:
+    if text is None:
+        return None
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def _with_text(response: ModelResponse, text: str, usage: Usage) -> ModelResponse:
+    """``response`` with its message text replaced and ``usage`` attached."""
+    message = ResponseOutputMessage(
+        id=next((item.id for item in response.output if getattr(item, "type", None) == "message"), "msg_cascade"),
+        content=[ResponseOutputText(annotations=[], text=text, type="output_text")],
+        role="assistant",
+        status="completed",
+        type="message",
+    )
+    output = [item for item in response.output if getattr(item, "type", None) != "message"] + [message]
+    return ModelResponse(output=output, usage=usage, response_id=response.response_id)
+
+
+def _with_note(input: Any, note: str) -> Any:
+    """Model input with ``note`` added as a last user message."""
+    if isinstance(input, str):
+        return f"{input}\n\n{note}"
+    return list(input) + [{"role": "user", "content": note}]
+
+
+def _total_usage(*responses: ModelResponse) -> Usage:
+    usage = Usage()
+    for response in responses:
+        usage.add(response.usage)
+    return usage
+
+
+# ----------------------------------------------------------------------------
+# Stats
+# ----------------------------------------------------------------------------
+
+_stats: Dict[str, Dict[str, int]] = defaultdict(
+    lambda: {"calls": 0, "items": 0, "escalated_items": 0, "escalated_calls": 0, "invalid": 0}
+)
+_stats_lock = threading.Lock()
+
+
+def _count(agent: str, **fields: int):
+    with _stats_lock:
+        for field, amount in fields.items():
+            _stats[agent][field] += amount
+
+
+def get_cascade_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-agent cascade counts.
+
+    ``items`` is what the fast model answered (calls, for per-call agents),
+    ``escalated_items`` what the strong model answered again, ``escalated_calls``
+    the calls that reached the strong model and ``invalid`` the fast answers
+    that broke the schema. ``escalation_rate`` is escalated items per item.
+    """
+    with _stats_lock:
+        stats = {agent: dict(counts) for agent, counts in _stats.items()}
+    for counts in stats.values():
+        counts["escalation_rate"] = round(counts["escalated_items"] / counts["items"], 4) if counts["items"] else 0.0
+    return stats
+
+
+def reset_cascade_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+# ----------------------------------------------------------------------------
+# Model
+# ----------------------------------------------------------------------------
+
+class CascadeModel(WrappedModel):
+    """
+    ``Model`` that answers with a fast model and escalates unsure output to its inner model.
+
+    Streams go to the inner model: streamed output cannot be checked before
+    it reaches the caller.
+
+    Args:
+        agent_name: Agent name; picks the output format from ``CASCADE_FORMATS``
+        inner: Strong model instance, or model name resolved per call like the SDK does
+        fast: Fast model instance or name
+        config: Confidence thresholds
+        provider: Provider resolving model names (default: the SDK's ``MultiProvider``)
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        inner: Union[str, Model, None],
+        fast: Union[str, Model],
+        config: Optional[CascadeConfig] = None,
+        provider: Optional[ModelProvider] = None,
+    ):
+        super().__init__(agent_name, inner, provider)
+        self.fast = fast
+        self.config = config or CascadeConfig()
+        self.format = CASCADE_FORMATS[agent_name]
+
+    def _parse(self, response: ModelResponse, output_schema) -> Any:
+        """Parsed output if it fits the agent's format, else None."""
+        text = response_text(response)
+        parsed = _parse_json(text)
+        if parsed is None or not self.format.check_output(parsed):
+            return None
+        if self.format.per_item:
+            items = _items(parsed)
+            if items is None or not all(self.format.check_item(item) for item in items):
+                return None
+        if output_schema is not None and not output_schema.is_plain_text():
+            try:
+                output_schema.validate_json(text)
+            except Exception:
+                return None
+        return parsed
+
+    async def get_response(
+        self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+    ) -> ModelResponse:
+        def call(model: Model, instructions, model_input):
+            # SDK-version-specific keywords (previous_response_id, prompt, ...) pass through unchanged
+            return model.get_response(
+                instructions, model_input, model_settings, tools, output_schema, handoffs, tracing, **kwargs
+            )
+
+        strong = self._resolve()
+        note = ITEM_CONFIDENCE_NOTE if self.format.per_item else CALL_CONFIDENCE_NOTE
+        try:
+            fast_response = await call(self._resolve(self.fast), (system_instructions or "") + note, input)
+        except Exception as e:
+            # The strong model still answers; if it fails too, its error reaches the caller
+            _count(self.agent_name, calls=1, escalated_calls=1)
+            llm_cascade_escalations.inc(agent=self.agent_name, reason="error")
+            logger.warning(f"🪜 [CASCADE] {self.agent_name} fast model failed ({type(e).__name__}), asking the strong model")
+            return await call(strong, system_instructions, input)
+        parsed = self._parse(fast_response, output_schema)
+
+        if parsed is None:
+            _count(self.agent_name, calls=1, invalid=1, escalated_calls=1)
+            llm_cascade_escalations.inc(agent=self.agent_name, reason="invalid")
+            logger.info(f"🪜 [CASCADE] {self.agent_name} fast answer broke the schema, asking the strong model")
+            strong_response = await call(strong, system_instructions, input)
+            return _with_text(strong_response, response_text(strong_response) or "", _total_usage(fast_response, strong_response))
+
+        if self.format.per_item:
+            items = _items(parsed)
+            unsure = [item for item in items if _confidence(item) < self.config.min_confidence]
+            total = len(items)
+        else:
+            items = []
+            unsure = [parsed] if _confidence(parsed) < self.config.min_confidence else []
+            total = 1
+        _count(self.agent_name, calls=1, items=total, escalated_items=len(unsure))
+        llm_cascade_items.inc(total - len(unsure), agent=self.agent_name, tier="fast")
+
+        if not unsure:
+            return self._answer(fast_response, parsed, items, _total_usage(fast_response))
+
+        _count(self.agent_name, escalated_calls=1)
+        llm_cascade_escalations.inc(agent=self.agent_name, reason="low_confidence")
+        llm_cascade_items.inc(len(unsure), agent=self.agent_name, tier="strong")
+        if not self.format.per_item or len(unsure) > self.config.max_partial_share * total:
+            logger.info(f"🪜 [CASCADE] {self.agent_name}: {len(unsure)}/{total} unsure, rerunning the call on the strong model")
+            strong_response = await call(strong, system_instructions, input)
+            return _with_text(strong_response, response_text(strong_response) or "", _total_usage(fast_response, strong_response))
+
+        logger.info(f"🪜 [CASCADE] {self.agent_name}: escalating {len(unsure)}/{total} unsure items")
+        phrases = json.dumps([item["phrase"] for item in unsure], ensure_ascii=False)
+        strong_response = await call(strong, system_instructions, _with_note(input, ESCALATION_NOTE.format(phrases=phrases)))
+        usage = _total_usage(fast_response, strong_response)
+        strong_items = _items(self._parse(strong_response, None))
+        if strong_items is None:
+            logger.warning(f"🪜 [CASCADE] {self.agent_name} escalation answer unreadable, keeping the fast answers")
+            return self._answer(fast_response, parsed, items, usage)
+
+        answers = {_phrase_key(item): item for item in strong_items}
+        unsure_keys = {_phrase_key(item) for item in unsure}
+        items[:] = [answers.get(_phrase_key(item), item) if _phrase_key(item) in unsure_keys else item for item in items]
+        return self._answer(fast_response, parsed, items, usage)
+
+    def _answer(self, response: ModelResponse, parsed: Any, items: List[Dict[str, Any]], usage: Usage) -> ModelResponse:
+        """Re-serialize the (patched) output without the confidence fields."""
+        for item in items:
+            item.pop("confidence", None)
+        if isinstance(parsed, dict):
+            parsed.pop("confidence", None)
+        if self.format.rebuild is not None:
+            self.format.rebuild(parsed)
+        return _with_text(response, json.dumps(parsed, ensure_ascii=False, separators=(",", ":")), usage)
+
+
+def cascade_agent(
+    agent: Agent,
+    fast: Union[str, Model, None] = None,
+    config: Optional[CascadeConfig] = None,
+) -> CascadeModel:
+    """Put a fast model in front of ``agent``'s model (idempotent)."""
+    config = config or CascadeConfig.from_settings()
+    return wrap_agent(agent, CascadeModel, fast or config.fast_model, config)
+
+
+def install_model_cascade(config: Optional[CascadeConfig] = None) -> List[str]:
+    """
+    Cascade the classification-style agents if ``LLM_CASCADE_ENABLED`` is set (idempotent).
+
+    Install before the other wrappers, so hedging, concurrency limits and the
+    circuit breaker see one call per batch.
+
+    Returns:
+        Names of the agents now cascaded
+    """
+    from app.core.config import settings
+
+    if not settings.LLM_CASCADE_ENABLED:
+        return []
+    return install_wrappers(CASCADE_AGENTS, lambda agent: cascade_agent(agent, config=config))
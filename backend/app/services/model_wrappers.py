@@ -0,0 +1,97 @@
+"""
+Shared plumbing of the ``Model`` wrappers around pipeline agents' models.
+
+Hedging, adaptive concurrency, the circuit breaker, the model cascade and
+offline batch mode each replace ``agent.model`` with a ``WrappedModel``
+whose ``inner`` is the previous model (a ``Model``, a model name or None).
+The base class resolves ``inner`` per call like the SDK does, passes
+streams through and forwards calls with their arguments unchanged, so a
+change in the SDK's ``get_response`` signature is handled here once.
+"""
+
+import importlib
+from typing import Any, Callable, List, Optional, Tuple, Type, TypeVar, Union
+
+from agents import Agent
+from agents.models.interface import Model, ModelProvider
+from agents.models.multi_provider import MultiProvider
+
+W = TypeVar("W", bound="WrappedModel")
+
+
+class WrappedModel(Model):
+    """
+    ``Model`` that passes calls to an inner model.
+
+    Args:
+        agent_name: Agent name for logs, stats and metrics
+        inner: Model instance, or model name resolved per call like the SDK does
+        provider: Provider resolving a model name (default: the SDK's ``MultiProvider``)
+    """
+
+    def __init__(self, agent_name: str, inner: Union[str, Model, None], provider: Optional[ModelProvider] = None):
+        self.agent_name = agent_name
+        self.inner = inner
+        self.provider = provider
+
+    def _resolve(self, model: Union[str, Model, None] = None) -> Model:
+        """``model`` (the inner model by default) as a ``Model`` instance."""
+        model = self.inner if model is None else model
+        if isinstance(model, Model):
+            return model
+        return (self.provider or MultiProvider()).get_model(model)
+
+    async def get_response(self, *args, **kwargs):
+        return await self._resolve().get_response(*args, **kwargs)
+
+    def stream_response(self, *args, **kwargs):
+        return self._resolve().stream_response(*args, **kwargs)
+
+
+def find_wrapper(model: Any, wrapper_type: type) -> Optional[Any]:
+    """``model`` or the model it wraps (following ``.inner``) that is a ``wrapper_type``, if any."""
+    while model is not None:
+        if isinstance(model, wrapper_type):
+            return model
+        model = getattr(model, "inner", None)
+    return None
+
+
+def model_name(model: Any, default: Optional[str] = None) -> Optional[str]:
+    """Name of the model ``model`` ends up calling (following wrappers' ``.inner``)."""
+    while model is not None:
+        if isinstance(model, str):
+            return model
+        name = getattr(model, "model", None)
+        if isinstance(name, str):
+            return name
+        model = getattr(model, "inner", None)
+    return default
+
+
+def wrap_agent(agent: Agent, wrapper_type: Type[W], *args, **kwargs) -> W:
+    """
+    Wrap ``agent``'s model in ``wrapper_type(agent.name, agent.model, *args, **kwargs)`` (idempotent).
+
+    Returns:
+        The new wrapper, or the one already somewhere in the agent's chain
+    """
+    wrapped = find_wrapper(agent.model, wrapper_type)
+    if wrapped is None:
+        wrapped = agent.model = wrapper_type(agent.name, agent.model, *args, **kwargs)
+    return wrapped
+
+
+def install_wrappers(agents: List[Tuple[str, str]], wrap: Callable[[Agent], Any]) -> List[str]:
+    """
+    Apply ``wrap`` to each (module, attribute) agent.
+
+    Returns:
+        Names of the agents wrapped
+    """
+    wrapped = []
+    for module_path, attr in agents:
+        agent = getattr(importlib.import_module(module_path), attr)
+        wrap(agent)
+        wrapped.append(agent.name)
+    return wrapped
@@ -1,4 +1,5 @@
 import asyncio
+import contextvars
 import time
 import logging
 from typing import List, Dict, Any, Optional, Callable, TypeVar, Generic
@@ -6,28 +7,50 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 import uuid
 
-from app.services.openai_rate_limiter import rate_limiter
+from app.services.openai_rate_limiter import estimate_tokens, rate_limiter
 from app.services.openai_monitor import monitor
+from app.services.cancellation import JobCancelled, checkpoint
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
+R = TypeVar('R')
+
+
+def _own_event_loop():
+    """Pool worker initializer: ``Runner.run_sync`` and the rate limiter run on the worker's loop."""
+    asyncio.set_event_loop(asyncio.new_event_loop())
 
 @dataclass
 class BatchConfig:
     """Configuration for batch processing"""
     batch_size: int = 25  # Small batches to prevent timeouts
-    max_concurrent_batches: int = 3  # Limit concurrent processing
+    max_concurrent_batches: int = 3  # Worker threads; the AIMD limiter caps LLM calls in flight
     timeout_per_batch: int = 120  # 2 minutes per batch
     retry_failed_batches: bool = True
     max_batch_retries: int = 2
 
+    @classmethod
+    def from_settings(cls) -> "BatchConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        workers = settings.MAX_CONCURRENT_BATCHES
+        if settings.LLM_ADAPTIVE_CONCURRENCY:
+            # The AIMD limiter decides how many calls run; the pool must not cap it below its ceiling
+            workers = max(workers, settings.LLM_CONCURRENCY_MAX)
+        return cls(
+            batch_size=settings.BATCH_SIZE,
+            max_concurrent_batches=workers,
+            timeout_per_batch=settings.BATCH_TIMEOUT,
+        )
+
 class MultiBatchProcessor(Generic[T]):
     """Advanced multi-batch processor for handling large datasets with AI agents"""
     
     def __init__(self, config: BatchConfig = None):
         self.config = config or BatchConfig()
-        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_batches)
+        self.executor = ThreadPoolExecutor(max_workers=self.config.max_concurrent_batches, initializer=_own_event_loop)
     
     def process_batches(
         self,
@@ -70,7 +93,9 @@ class MultiBatchProcessor(Generic[T]):
             future_to_batch = {}
             for i, batch in enumerate(batches):
                 batch_id = f"{agent_name}_batch_{i+1}"
+                # Copy the context so the job's cancellation token reaches the worker thread
                 future = self.executor.submit(
+                    contextvars.copy_context().run,
                     self._process_single_batch,
                     batch, batch_id, process_func, agent_name, item_name
                 )
@@ -114,6 +139,30 @@ class MultiBatchProcessor(Generic[T]):
             logger.error(f"[{agent_name}] ❌ Batch processing failed: {str(e)}")
             raise e
     
+    def map_batches(self, batches: List[List[T]], batch_func: Callable[[int, List[T]], R]) -> List[R]:
+        """
+        Run ``batch_func(index, batch)`` for every batch on the pool.
+        
+        Unlike ``process_batches`` nothing is retried or dropped: ``batch_func``
+        handles its own failures. The pool can run every batch at once, so the
+        AIMD limiter on the agent's model decides how many calls are in flight.
+        Must not be called from one of this pool's workers.
+        
+        Returns:
+            ``batch_func`` results in batch order; the first exception is raised
+            once the batches that have not started are cancelled
+        """
+        # Copied contexts carry the job's cancellation token and deadline into the workers
+        futures = [
+            self.executor.submit(contextvars.copy_context().run, batch_func, index, batch)
+            for index, batch in enumerate(batches)
+        ]
+        try:
+            return [future.result() for future in futures]
+        finally:
+            for future in futures:
+                future.cancel()
+    
     def _create_batches(self, items: List[T]) -> List[List[T]]:
         """Split items into batches"""
         batches = []
@@ -133,15 +182,15 @@ class MultiBatchProcessor(Generic[T]):
         """Process a single batch with rate limiting and monitoring"""
         request_id = f"{batch_id}_{uuid.uuid4().hex[:8]}"
         
+        # Batches of a cancelled job are dropped before they reach the API
+        checkpoint(batch_id)
+        
         try:
             # Start monitoring
             monitor.log_request_start(agent_name, request_id, len(batch_items))
             
             # Apply rate limiting
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(rate_limiter.wait_for_rate_limit())
-            loop.close()
+            asyncio.get_event_loop().run_until_complete(rate_limiter.wait_for_rate_limit(estimate_tokens(batch_items)))
             
             # Process the batch
             start_time = time.time()
@@ -155,6 +204,9 @@ class MultiBatchProcessor(Generic[T]):
             logger.info(f"[{agent_name}] Batch {batch_id} processed {len(batch_items)} {item_name} in {duration:.1f}s")
             return result
             
+        except JobCancelled:
+            monitor.log_error(agent_name, request_id, "Job cancelled")
+            raise
         except Exception as e:
             # Log error
             monitor.log_error(agent_name, request_id, str(e))
@@ -172,21 +224,20 @@ class MultiBatchProcessor(Generic[T]):
         """Retry failed batches with exponential backoff"""
         retry_results = []
         
+        def retry_batch(batch_items: List[T], batch_id: str) -> T:
+            # Wait with exponential backoff
+            asyncio.get_event_loop().run_until_complete(rate_limiter.wait_with_exponential_backoff(batch_id, 1))
+            return self._process_single_batch(batch_items, batch_id, process_func, agent_name, item_name)
+        
         for batch_index, batch_id, error in failed_batches:
             if not rate_limiter.should_retry(batch_id):
                 logger.warning(f"[{agent_name}] Skipping retry for {batch_id} (max retries exceeded)")
                 continue
             
             try:
-                # Wait with exponential backoff
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(rate_limiter.wait_with_exponential_backoff(batch_id, 1))
-                loop.close()
-                
-                # Retry the batch
+                # Retried on a worker, whose event loop the backoff and the batch run on
                 batch_items = original_batches[batch_index]
-                result = self._process_single_batch(batch_items, batch_id, process_func, agent_name, item_name)
+                result = self.executor.submit(contextvars.copy_context().run, retry_batch, batch_items, batch_id).result()
                 retry_results.append(result)
                 
                 logger.info(f"[{agent_name}] ✅ Retry successful for batch {batch_index + 1}")
@@ -264,4 +315,4 @@ class MultiBatchProcessor(Generic[T]):
             self.executor.shutdown(wait=False)
 
 # Global processor instance
-multi_batch_processor = MultiBatchProcessor()
+multi_batch_processor = MultiBatchProcessor(BatchConfig.from_settings())
@@ -1,9 +1,10 @@
+import math
 import time
 import logging
 import threading
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Optional
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +17,7 @@ class RequestMetrics:
     error_count: int = 0
     success: bool = False
     error_message: str = ""
+    model: Optional[str] = None
 
 @dataclass
 class AgentStats:
@@ -29,138 +31,365 @@ class AgentStats:
     avg_duration: float = 0
     requests_per_minute: float = 0
 
-class OpenAIMonitor:
-    """Comprehensive monitoring for OpenAI API requests and performance"""
-    
+
+@dataclass
+class TokenUsage:
+    """Token counts for an agent; cached input tokens are part of input tokens"""
+    calls: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LatencyHistogram:
+    """
+    Fixed-size streaming histogram with log-spaced buckets.
+
+    Buckets grow by 2^(1/4) (~19%) from 1ms to ~1h, so any quantile is
+    accurate to within one bucket width and memory never grows with the
+    number of observations.
+    """
+
+    MIN_VALUE = 0.001
+    GROWTH = 2 ** 0.25
+    BUCKETS = 90
+
     def __init__(self):
-        self.start_time = time.time()
+        self.counts = [0] * (self.BUCKETS + 1)  # Last bucket is overflow
+        self.count = 0
+        self.total = 0.0
+
+    @classmethod
+    def _bucket(cls, value: float) -> int:
+        if value <= cls.MIN_VALUE:
+            return 0
+        return min(cls.BUCKETS, int(math.log(value / cls.MIN_VALUE, cls.GROWTH)) + 1)
+
+    @classmethod
+    def _upper_bound(cls, index: int) -> float:
+        return cls.MIN_VALUE * cls.GROWTH ** index
+
+    def observe(self, value: float):
+        self.counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+
+    def merge(self, other: "LatencyHistogram"):
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.total += other.total
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile (0-1), interpolated linearly inside the bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lower = self._upper_bound(i - 1) if i > 0 else 0.0
+                upper = self._upper_bound(i)
+                return lower + (upper - lower) * ((rank - seen) / c)
+            seen += c
+        return self._upper_bound(self.BUCKETS)
+
+    def percentiles(self) -> Dict[str, float]:
+        return {
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+@dataclass
+class _WindowSlot:
+    """Counters for one time slice of a sliding window"""
+    start: float = 0.0
+    requests: int = 0
+    successes: int = 0
+    errors: int = 0
+    retries: int = 0
+    tokens: int = 0
+    token_calls: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+
+class _SlidingWindow:
+    """Ring of fixed time slots; old slots are recycled instead of appended."""
+
+    def __init__(self, window_seconds: float, slots: int):
+        self.slot_seconds = window_seconds / slots
+        self.slots = [_WindowSlot(start=-math.inf) for _ in range(slots)]
+
+    def slot(self, now: float) -> _WindowSlot:
+        start = now - (now % self.slot_seconds)
+        index = int(now // self.slot_seconds) % len(self.slots)
+        slot = self.slots[index]
+        if slot.start != start:
+            slot = self.slots[index] = _WindowSlot(start=start)
+        return slot
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        horizon = now - self.slot_seconds * len(self.slots)
+        merged = _WindowSlot()
+        for slot in self.slots:
+            if slot.start > horizon:
+                merged.requests += slot.requests
+                merged.successes += slot.successes
+                merged.errors += slot.errors
+                merged.retries += slot.retries
+                merged.tokens += slot.tokens
+                merged.token_calls += slot.token_calls
+                merged.latency.merge(slot.latency)
+        completed = merged.successes + merged.errors
+        return {
+            "requests": merged.requests,
+            "successes": merged.successes,
+            "errors": merged.errors,
+            "retries": merged.retries,
+            "error_rate": (merged.errors / completed * 100) if completed else 0,
+            "tokens_per_call": (merged.tokens / merged.token_calls) if merged.token_calls else 0,
+            "latency": merged.latency.percentiles(),
+        }
+
+
+class _SeriesStats:
+    """Lifetime histogram plus sliding window for one agent or model"""
+
+    def __init__(self, window_seconds: float, slots: int):
+        self.latency = LatencyHistogram()
+        self.tokens = 0
+        self.token_calls = 0
+        self.window = _SlidingWindow(window_seconds, slots)
+
+    def record(self, now: float, duration: Optional[float] = None, success: Optional[bool] = None,
+               tokens: Optional[int] = None, started: bool = False, retried: bool = False):
+        slot = self.window.slot(now)
+        if started:
+            slot.requests += 1
+        if retried:
+            slot.retries += 1
+        if success is not None:
+            if success:
+                slot.successes += 1
+            else:
+                slot.errors += 1
+        if duration is not None:
+            self.latency.observe(duration)
+            slot.latency.observe(duration)
+        if tokens is not None:
+            self.tokens += tokens
+            self.token_calls += 1
+            slot.tokens += tokens
+            slot.token_calls += 1
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        return {
+            "latency": self.latency.percentiles(),
+            "tokens_per_call": (self.tokens / self.token_calls) if self.token_calls else 0,
+            "window": self.window.summary(now),
+        }
+
+
+class OpenAIMonitor:
+    """
+    Comprehensive monitoring for OpenAI API requests and performance.
+
+    Memory stays flat however many requests are recorded: recent requests
+    live in a ring buffer, and latency is kept in fixed-size histograms per
+    agent and per model, both lifetime and over a sliding window.
+
+    Args:
+        history_size: Number of completed requests kept for ``recent_requests``
+        window_seconds: Length of the sliding window for windowed stats
+        window_slots: Number of time slots the window is divided into
+        clock: Time source (overridable for tests)
+    """
+
+    def __init__(
+        self,
+        history_size: int = 100,
+        window_seconds: float = 300.0,
+        window_slots: int = 30,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.clock = clock
+        self.start_time = clock()
+        self.window_seconds = window_seconds
+        self.window_slots = window_slots
         self.agent_stats: Dict[str, AgentStats] = defaultdict(AgentStats)
         self.active_requests: Dict[str, RequestMetrics] = {}
-        self.request_history: List[Dict[str, Any]] = []
+        self.request_history: deque = deque(maxlen=history_size)
+        self.agent_series: Dict[str, _SeriesStats] = {}
+        self.model_series: Dict[str, _SeriesStats] = {}
+        self.token_usage: Dict[str, TokenUsage] = defaultdict(TokenUsage)
         self.lock = threading.Lock()  # Use thread-safe lock instead of asyncio lock
-    
-    def log_request_start(self, agent_name: str, request_id: str, item_count: int = 0):
+
+    def _series(self, agent_name: str, model: Optional[str]) -> List[_SeriesStats]:
+        series = []
+        for key, table in ((agent_name, self.agent_series), (model, self.model_series)):
+            if key:
+                if key not in table:
+                    table[key] = _SeriesStats(self.window_seconds, self.window_slots)
+                series.append(table[key])
+        return series
+
+    def log_request_start(self, agent_name: str, request_id: str, item_count: int = 0, model: Optional[str] = None):
         """Log the start of a request"""
-        start_time = time.time()
-        self.active_requests[request_id] = RequestMetrics(start_time=start_time)
-        
+        with self.lock:
+            start_time = self.clock()
+            self.active_requests[request_id] = RequestMetrics(start_time=start_time, model=model)
+
+            # Update agent stats
+            self.agent_stats[agent_name].total_requests += 1
+            for series in self._series(agent_name, model):
+                series.record(start_time, started=True)
+
         logger.info(f"🔄 [{agent_name}] Starting request {request_id} with {item_count} items")
-        
-        # Update agent stats
-        self.agent_stats[agent_name].total_requests += 1
-    
+
     def log_retry(self, agent_name: str, request_id: str, attempt: int, delay: float, error: str = ""):
         """Log a retry attempt"""
-        if request_id in self.active_requests:
-            self.active_requests[request_id].retry_count += 1
-        
-        self.agent_stats[agent_name].total_retries += 1
-        
+        with self.lock:
+            request_metrics = self.active_requests.get(request_id)
+            if request_metrics:
+                request_metrics.retry_count += 1
+
+            self.agent_stats[agent_name].total_retries += 1
+            model = request_metrics.model if request_metrics else None
+            for series in self._series(agent_name, model):
+                series.record(self.clock(), retried=True)
+
         logger.warning(f"🔄 [{agent_name}] Retry #{attempt} for {request_id} after {delay:.1f}s delay - {error}")
-    
+
+    def _finish(self, agent_name: str, request_id: str, success: bool, item_count: int = 0,
+                tokens: Optional[int] = None, error: str = "") -> Optional[float]:
+        """Close out an active request; caller holds the lock. Returns its duration."""
+        request_metrics = self.active_requests.pop(request_id, None)
+        if request_metrics is None:
+            return None
+        end_time = self.clock()
+        request_metrics.end_time = end_time
+        request_metrics.success = success
+        duration = end_time - request_metrics.start_time
+
+        for series in self._series(agent_name, request_metrics.model):
+            series.record(end_time, duration=duration, success=success, tokens=tokens)
+
+        entry = {
+            "agent_name": agent_name,
+            "request_id": request_id,
+            "model": request_metrics.model,
+            "duration": duration,
+            "retry_count": request_metrics.retry_count,
+            "error_count": request_metrics.error_count,
+            "item_count": item_count,
+            "tokens": tokens,
+            "success": success,
+            "timestamp": end_time
+        }
+        if error:
+            entry["error"] = error
+        self.request_history.append(entry)
+        return duration
+
     def log_error(self, agent_name: str, request_id: str, error: str):
-        """Log an error"""
-        if request_id in self.active_requests:
-            self.active_requests[request_id].error_count += 1
-            self.active_requests[request_id].error_message = error
-        
-        self.agent_stats[agent_name].total_errors += 1
-        self.agent_stats[agent_name].failed_requests += 1
-        
+        """Log an error (terminal for the request)"""
+        with self.lock:
+            if request_id in self.active_requests:
+                self.active_requests[request_id].error_count += 1
+                self.active_requests[request_id].error_message = error
+
+            self.agent_stats[agent_name].total_errors += 1
+            self.agent_stats[agent_name].failed_requests += 1
+            self._finish(agent_name, request_id, success=False, error=error)
+
         logger.error(f"❌ [{agent_name}] Error in {request_id}: {error}")
-    
-    def log_success(self, agent_name: str, request_id: str, item_count: int = 0):
+
+    def log_success(self, agent_name: str, request_id: str, item_count: int = 0, tokens: Optional[int] = None):
         """Log successful completion"""
-        end_time = time.time()
-        
-        if request_id in self.active_requests:
-            request_metrics = self.active_requests[request_id]
-            request_metrics.end_time = end_time
-            request_metrics.success = True
-            
-            duration = end_time - request_metrics.start_time
-            
-            # Update agent stats
-            self.agent_stats[agent_name].successful_requests += 1
-            self.agent_stats[agent_name].total_duration += duration
-            
-            # Calculate average duration
-            if self.agent_stats[agent_name].successful_requests > 0:
-                self.agent_stats[agent_name].avg_duration = (
-                    self.agent_stats[agent_name].total_duration / 
-                    self.agent_stats[agent_name].successful_requests
-                )
-            
-            # Store in history
-            self.request_history.append({
-                "agent_name": agent_name,
-                "request_id": request_id,
-                "duration": duration,
-                "retry_count": request_metrics.retry_count,
-                "error_count": request_metrics.error_count,
-                "item_count": item_count,
-                "success": True,
-                "timestamp": end_time
-            })
-            
-            # Remove from active requests
-            del self.active_requests[request_id]
-            
+        with self.lock:
+            duration = self._finish(agent_name, request_id, success=True, item_count=item_count, tokens=tokens)
+            if duration is not None:
+                # Update agent stats
+                stats = self.agent_stats[agent_name]
+                stats.successful_requests += 1
+                stats.total_duration += duration
+                stats.avg_duration = stats.total_duration / stats.successful_requests
+
+        if duration is not None:
             logger.info(f"✅ [{agent_name}] Completed {request_id} in {duration:.1f}s ({item_count} items)")
         else:
             logger.warning(f"⚠️ [{agent_name}] Success logged for unknown request {request_id}")
-    
+
     def log_timeout(self, agent_name: str, request_id: str, timeout_duration: float):
         """Log a timeout"""
-        if request_id in self.active_requests:
-            request_metrics = self.active_requests[request_id]
-            request_metrics.end_time = time.time()
-            request_metrics.success = False
-            request_metrics.error_message = f"Timeout after {timeout_duration}s"
-            
-            duration = request_metrics.end_time - request_metrics.start_time
-            
-            # Update agent stats
-            self.agent_stats[agent_name].failed_requests += 1
-            self.agent_stats[agent_name].total_errors += 1
-            
-            # Store in history
-            self.request_history.append({
-                "agent_name": agent_name,
-                "request_id": request_id,
-                "duration": duration,
-                "retry_count": request_metrics.retry_count,
-                "error_count": request_metrics.error_count,
-                "success": False,
-                "error": "Timeout",
-                "timestamp": request_metrics.end_time
-            })
-            
-            # Remove from active requests
-            del self.active_requests[request_id]
-            
+        with self.lock:
+            if request_id in self.active_requests:
+                self.active_requests[request_id].error_message = f"Timeout after {timeout_duration}s"
+                # Update agent stats
+                self.agent_stats[agent_name].failed_requests += 1
+                self.agent_stats[agent_name].total_errors += 1
+            duration = self._finish(agent_name, request_id, success=False, error="Timeout")
+
+        if duration is not None:
             logger.error(f"⏰ [{agent_name}] Timeout for {request_id} after {duration:.1f}s")
         else:
             logger.warning(f"⚠️ [{agent_name}] Timeout logged for unknown request {request_id}")
-    
+
+    def record_usage(self, agent_name: str, input_tokens: int, cached_input_tokens: int = 0, output_tokens: int = 0):
+        """Record the token usage of one model call (``cached_input_tokens`` is part of ``input_tokens``)"""
+        with self.lock:
+            usage = self.token_usage[agent_name]
+            usage.calls += 1
+            usage.input_tokens += input_tokens
+            usage.cached_input_tokens += cached_input_tokens
+            usage.output_tokens += output_tokens
+
+    def get_prompt_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent cached vs uncached input tokens and the share served from the provider's prompt cache"""
+        with self.lock:
+            usage = {agent: TokenUsage(**vars(u)) for agent, u in self.token_usage.items()}
+        return {
+            agent: {
+                "calls": u.calls,
+                "input_tokens": u.input_tokens,
+                "cached_input_tokens": u.cached_input_tokens,
+                "uncached_input_tokens": u.input_tokens - u.cached_input_tokens,
+                "output_tokens": u.output_tokens,
+                "cache_hit_rate": (u.cached_input_tokens / u.input_tokens * 100) if u.input_tokens else 0,
+            }
+            for agent, u in usage.items()
+        }
+
     def get_agent_stats(self, agent_name: str) -> AgentStats:
         """Get statistics for a specific agent"""
         return self.agent_stats.get(agent_name, AgentStats())
-    
+
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Per-agent and per-model latency percentiles, tokens per call and windowed error rates"""
+        with self.lock:
+            now = self.clock()
+            return {
+                "window_seconds": self.window_seconds,
+                "agents": {name: series.summary(now) for name, series in self.agent_series.items()},
+                "models": {name: series.summary(now) for name, series in self.model_series.items()},
+            }
+
     def get_overall_stats(self) -> Dict[str, Any]:
         """Get overall monitoring statistics"""
-        elapsed = time.time() - self.start_time
-        
+        elapsed = self.clock() - self.start_time
+
         total_requests = sum(stats.total_requests for stats in self.agent_stats.values())
         total_successful = sum(stats.successful_requests for stats in self.agent_stats.values())
         total_failed = sum(stats.failed_requests for stats in self.agent_stats.values())
         total_retries = sum(stats.total_retries for stats in self.agent_stats.values())
         total_errors = sum(stats.total_errors for stats in self.agent_stats.values())
-        
+
         success_rate = (total_successful / total_requests * 100) if total_requests > 0 else 0
         retry_rate = (total_retries / total_requests * 100) if total_requests > 0 else 0
         error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
-        
+
         return {
             "elapsed_time": elapsed,
             "total_requests": total_requests,
@@ -175,11 +404,13 @@ class OpenAIMonitor:
             "active_requests": len(self.active_requests),
             "agent_count": len(self.agent_stats)
         }
-    
+
     def get_detailed_stats(self) -> Dict[str, Any]:
         """Get detailed statistics including per-agent breakdown"""
         overall = self.get_overall_stats()
-        
+        latency = self.get_latency_stats()
+        prompt_cache = self.get_prompt_cache_stats()
+
         agent_details = {}
         for agent_name, stats in self.agent_stats.items():
             agent_details[agent_name] = {
@@ -191,19 +422,25 @@ class OpenAIMonitor:
                 "avg_duration": stats.avg_duration,
                 "success_rate": (stats.successful_requests / stats.total_requests * 100) if stats.total_requests > 0 else 0,
                 "retry_rate": (stats.total_retries / stats.total_requests * 100) if stats.total_requests > 0 else 0,
-                "error_rate": (stats.total_errors / stats.total_requests * 100) if stats.total_requests > 0 else 0
+                "error_rate": (stats.total_errors / stats.total_requests * 100) if stats.total_requests > 0 else 0,
+                **latency["agents"].get(agent_name, {}),
             }
-        
+            if agent_name in prompt_cache:
+                agent_details[agent_name]["prompt_cache"] = prompt_cache[agent_name]
+
         return {
             "overall": overall,
             "agents": agent_details,
-            "recent_requests": self.request_history[-10:] if self.request_history else []
+            "models": latency["models"],
+            "prompt_cache": prompt_cache,
+            "recent_requests": list(self.request_history)[-10:]
         }
-    
+
     def print_summary(self):
         """Print a summary of current statistics"""
         stats = self.get_overall_stats()
-        
+        latency = self.get_latency_stats()
+
         logger.info("=" * 80)
         logger.info("📊 OPENAI API MONITORING SUMMARY")
         logger.info("=" * 80)
@@ -216,14 +453,28 @@ class OpenAIMonitor:
         logger.info(f"🚀 Requests/min: {stats['requests_per_minute']:.1f}")
         logger.info(f"🔄 Active Requests: {stats['active_requests']}")
         logger.info("=" * 80)
-        
+
         # Per-agent breakdown
         if self.agent_stats:
             logger.info("📋 PER-AGENT BREAKDOWN:")
             for agent_name, agent_stats in self.agent_stats.items():
                 success_rate = (agent_stats.successful_requests / agent_stats.total_requests * 100) if agent_stats.total_requests > 0 else 0
-                logger.info(f"  {agent_name}: {agent_stats.total_requests} req, {success_rate:.1f}% success, {agent_stats.avg_duration:.1f}s avg")
-        
+                pct = latency["agents"].get(agent_name, {}).get("latency", {})
+                logger.info(
+                    f"  {agent_name}: {agent_stats.total_requests} req, {success_rate:.1f}% success, "
+                    f"{agent_stats.avg_duration:.1f}s avg, p50 {pct.get('p50', 0):.1f}s / "
+                    f"p95 {pct.get('p95', 0):.1f}s / p99 {pct.get('p99', 0):.1f}s"
+                )
+
+        prompt_cache = self.get_prompt_cache_stats()
+        if prompt_cache:
+            logger.info("🗄️  PROMPT CACHE (input tokens):")
+            for agent_name, cache in prompt_cache.items():
+                logger.info(
+                    f"  {agent_name}: {cache['cached_input_tokens']} cached / "
+                    f"{cache['uncached_input_tokens']} uncached ({cache['cache_hit_rate']:.1f}% hit)"
+                )
+
         logger.info("=" * 80)
 
 # Global monitor instance
@@ -1,11 +1,18 @@
 import asyncio
+import json
+import os
 import time
 import random
 import logging
+import tempfile
 import threading
-from typing import Dict, Any, Optional
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 
+from app.services.cancellation import CANCEL_CHECK_INTERVAL, checkpoint
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -17,91 +24,365 @@ class RateLimitConfig:
     base_retry_delay: float = 1.0
     max_retry_delay: float = 30.0
     jitter_range: float = 0.5
+    tokens_per_minute: int = 0  # 0 = no token budget
+    window_seconds: float = 60.0  # Length of the "per minute" window
+    backend: str = "memory"  # memory | file | redis | auto
+    namespace: str = "openai"  # Key/file prefix shared by all workers
+
+    @classmethod
+    def from_settings(cls) -> "RateLimitConfig":
+        """Build the config from application settings."""
+        from app.core.config import settings
+
+        return cls(
+            requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+            requests_per_second=settings.OPENAI_REQUESTS_PER_SECOND,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            base_retry_delay=settings.OPENAI_BASE_RETRY_DELAY,
+            tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+            backend=settings.RATE_LIMIT_BACKEND,
+        )
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Rough token estimate (~4 characters per token) for budget reservations."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    return max(1, len(text) // 4)
+
+
+def _reserve(entries: List[List[float]], last_request: float, now: float, tokens: int,
+             config: RateLimitConfig) -> Tuple[float, List[List[float]], float]:
+    """
+    Sliding-window admission check shared by the local backends.
+
+    Args:
+        entries: ``[timestamp, tokens]`` pairs of admitted requests, oldest first
+        last_request: Timestamp of the last admitted request
+        now: Current time
+        tokens: Tokens the new request wants to reserve
+        config: Limits to enforce
+
+    Returns:
+        (wait_seconds, entries, last_request). ``wait_seconds`` is 0 when the
+        request was admitted and recorded; otherwise nothing is recorded.
+    """
+    window = config.window_seconds
+    entries = [e for e in entries if e[0] > now - window]
+    wait = 0.0
+
+    if len(entries) >= config.requests_per_minute:
+        wait = entries[len(entries) - config.requests_per_minute][0] + window - now
+
+    if config.tokens_per_minute and tokens:
+        used = sum(e[1] for e in entries)
+        for ts, spent in entries:
+            if used + tokens <= config.tokens_per_minute:
+                break
+            used -= spent
+            wait = max(wait, ts + window - now)
+
+    min_interval = 1.0 / config.requests_per_second if config.requests_per_second else 0.0
+    if now - last_request < min_interval:
+        wait = max(wait, last_request + min_interval - now)
+
+    if wait > 0:
+        return wait, entries, last_request
+    entries.append([now, tokens])
+    return 0.0, entries, now
+
+
+class _MemoryBackend:
+    """Per-process budget (single worker)."""
+    name = "memory"
+
+    def __init__(self, config: RateLimitConfig):
+        self.config = config
+        self.entries: List[List[float]] = []
+        self.last_request = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        with self.lock:
+            wait, self.entries, self.last_request = _reserve(
+                self.entries, self.last_request, time.time(), tokens, self.config
+            )
+            return wait
+
+    def usage(self) -> Tuple[int, int]:
+        with self.lock:
+            now = time.time()
+            recent = [e for e in self.entries if e[0] > now - self.config.window_seconds]
+            return len(recent), int(sum(e[1] for e in recent))
+
+
+class _FileBackend:
+    """Budget shared by all processes on one host via a flock-protected state file."""
+    name = "file"
+
+    def __init__(self, config: RateLimitConfig, directory: Optional[str] = None):
+        import fcntl  # POSIX only; caller falls back to memory elsewhere
+
+        self._fcntl = fcntl
+        self.config = config
+        base = Path(directory or os.getenv("RATE_LIMIT_DIR") or Path(tempfile.gettempdir()) / "amazon-sales-agent-ratelimit")
+        base.mkdir(parents=True, exist_ok=True)
+        self.state_path = base / f"{config.namespace}.json"
+        self.lock_path = base / f"{config.namespace}.lock"
+        self.thread_lock = threading.Lock()
+
+    def _locked(self, update):
+        with self.thread_lock, open(self.lock_path, "a") as lock_file:
+            self._fcntl.flock(lock_file, self._fcntl.LOCK_EX)
+            try:
+                try:
+                    state = json.loads(self.state_path.read_text() or "{}")
+                except (FileNotFoundError, ValueError):
+                    state = {}
+                result, new_state = update(state.get("entries", []), state.get("last_request", 0.0))
+                if new_state is not None:
+                    tmp = self.state_path.with_suffix(".tmp")
+                    tmp.write_text(json.dumps(new_state))
+                    os.replace(tmp, self.state_path)
+                return result
+            finally:
+                self._fcntl.flock(lock_file, self._fcntl.LOCK_UN)
+
+    def reserve(self, tokens: int) -> float:
+        def update(entries, last_request):
+            wait, entries, last_request = _reserve(entries, last_request, time.time(), tokens, self.config)
+            return wait, {"entries": entries, "last_request": last_request}
+        return self._locked(update)
+
+    def usage(self) -> Tuple[int, int]:
+        def read(entries, _last_request):
+            now = time.time()
+            recent = [e for e in entries if e[0] > now - self.config.window_seconds]
+            return (len(recent), int(sum(e[1] for e in recent))), None
+        return self._locked(read)
+
+
+# Same algorithm as _reserve, run atomically inside Redis. Uses the server
+# clock so workers on different hosts agree on the window.
+_REDIS_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+local rpm = tonumber(ARGV[2])
+local tpm = tonumber(ARGV[3])
+local tokens = tonumber(ARGV[4])
+local min_interval = tonumber(ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local entries = redis.call('ZRANGE', KEYS[1], 0, -1, 'WITHSCORES')
+local count = #entries / 2
+local wait = 0
+if count >= rpm then
+  wait = tonumber(entries[(count - rpm) * 2 + 2]) + window - now
+end
+if tpm > 0 and tokens > 0 then
+  local used = 0
+  for i = 1, #entries, 2 do used = used + tonumber(string.match(entries[i], '^(%d+):')) end
+  local i = 1
+  while used + tokens > tpm and i <= #entries do
+    used = used - tonumber(string.match(entries[i], '^(%d+):'))
+    wait = math.max(wait, tonumber(entries[i + 1]) + window - now)
+    i = i + 2
+  end
+end
+local last = tonumber(redis.call('GET', KEYS[2]) or '0')
+if now - last < min_interval then wait = math.max(wait, last + min_interval - now) end
+if wait > 0 then return tostring(wait) end
+redis.call('ZADD', KEYS[1], now, tokens .. ':' .. ARGV[6])
+redis.call('SET', KEYS[2], tostring(now))
+local ttl = math.ceil(window) + 1
+redis.call('EXPIRE', KEYS[1], ttl)
+redis.call('EXPIRE', KEYS[2], ttl)
+return '0'
+"""
+
+
+class _RedisBackend:
+    """Budget shared by every worker on every host through Upstash Redis."""
+    name = "redis"
+
+    def __init__(self, config: RateLimitConfig, client):
+        self.config = config
+        self.client = client
+        self.keys = [f"ratelimit:{config.namespace}:requests", f"ratelimit:{config.namespace}:last"]
+
+    def reserve(self, tokens: int) -> float:
+        min_interval = 1.0 / self.config.requests_per_second if self.config.requests_per_second else 0.0
+        args = [
+            str(self.config.window_seconds),
+            str(self.config.requests_per_minute),
+            str(self.config.tokens_per_minute),
+            str(int(tokens)),
+            str(min_interval),
+            uuid.uuid4().hex,
+        ]
+        return float(self.client.eval(_REDIS_RESERVE_SCRIPT, keys=self.keys, args=args))
+
+    def usage(self) -> Tuple[int, int]:
+        now = time.time()
+        members = self.client.zrangebyscore(self.keys[0], now - self.config.window_seconds, "+inf")
+        return len(members), sum(int(str(m).split(":", 1)[0]) for m in members)
+
+
+def _redis_client():
+    """Upstash client when configured and reachable, else None."""
+    from app.core.config import settings
+
+    if not (settings.UPSTASH_REDIS_URL and settings.UPSTASH_REDIS_TOKEN):
+        return None
+    try:
+        from upstash_redis import Redis
+
+        client = Redis(url=settings.UPSTASH_REDIS_URL, token=settings.UPSTASH_REDIS_TOKEN)
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning(f"⚠️ [RATE LIMITER] Redis unavailable, using local backend: {e}")
+        return None
+
+
+def _create_backend(config: RateLimitConfig, redis_client=None):
+    """Pick the storage backend for the shared request/token budget."""
+    choice = config.backend.lower()
+    if choice in ("redis", "auto"):
+        client = redis_client or _redis_client()
+        if client is not None:
+            return _RedisBackend(config, client)
+        if choice == "redis":
+            logger.warning("⚠️ [RATE LIMITER] Redis backend requested but not configured - falling back to file")
+        choice = "file"
+    if choice == "file":
+        try:
+            return _FileBackend(config)
+        except (ImportError, OSError) as e:
+            logger.warning(f"⚠️ [RATE LIMITER] File backend unavailable, using per-process limits: {e}")
+    return _MemoryBackend(config)
+
 
 class OpenAIRateLimiter:
-    """Advanced rate limiter for OpenAI API requests with exponential backoff"""
-    
-    def __init__(self, config: RateLimitConfig = None):
+    """
+    Rate limiter for OpenAI API requests with exponential backoff.
+
+    The request and token budget lives in a backend: ``memory`` (this
+    process only), ``file`` (all workers on this host) or ``redis`` (all
+    workers everywhere). ``auto`` uses Redis when configured and the file
+    backend otherwise, so uvicorn workers share one budget.
+    """
+
+    def __init__(self, config: RateLimitConfig = None, redis_client=None):
         self.config = config or RateLimitConfig()
-        self.request_times = []
-        self.last_request_time = 0
+        self._redis_client = redis_client
+        self._backend = None  # Created on first use (may connect to Redis)
+        self._backend_lock = threading.Lock()
         self.lock = threading.Lock()  # Use thread-safe lock instead of asyncio
         self.retry_counts = {}  # Track retries per request type
-    
-    async def wait_for_rate_limit(self):
-        """Wait if necessary to respect rate limits"""
-        # Use thread-safe approach for rate limiting
-        with self.lock:
-            now = time.time()
-            
-            # Clean old requests (older than 1 minute)
-            self.request_times = [t for t in self.request_times if now - t < 60]
-            
-            # Check per-minute limit
-            if len(self.request_times) >= self.config.requests_per_minute:
-                wait_time = 60 - (now - self.request_times[0])
-                if wait_time > 0:
-                    logger.info(f"Rate limit: Waiting {wait_time:.1f}s for per-minute limit")
-                    await asyncio.sleep(wait_time)
-                    now = time.time()
-            
-            # Check per-second limit
-            time_since_last = now - self.last_request_time
-            if time_since_last < (1.0 / self.config.requests_per_second):
-                wait_time = (1.0 / self.config.requests_per_second) - time_since_last
-                logger.info(f"Rate limit: Waiting {wait_time:.1f}s for per-second limit")
-                await asyncio.sleep(wait_time)
-                now = time.time()
-            
-            # Record this request
-            self.request_times.append(now)
-            self.last_request_time = now
-    
+        self.total_wait_seconds = 0.0  # Time spent throttled by the rate limit
+        self.total_backoff_seconds = 0.0  # Time spent in retry backoff
+
+    @property
+    def backend(self):
+        """Budget backend, created on first access."""
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    from app.core.startup_profiler import startup_profiler
+
+                    with startup_profiler.record("rate_limiter.backend"):
+                        self._backend = _create_backend(self.config, self._redis_client)
+        return self._backend
+
+    async def wait_for_rate_limit(self, tokens: int = 0):
+        """
+        Wait until the shared budget admits one more request.
+
+        Args:
+            tokens: Estimated tokens for the request (see ``estimate_tokens``);
+                only counted when ``tokens_per_minute`` is set
+
+        Raises:
+            JobCancelled: If the calling job is cancelled while waiting. Waiting
+                never holds budget, so a cancelled job stops competing for it
+                within ``CANCEL_CHECK_INTERVAL``.
+        """
+        while True:
+            checkpoint("rate limit")
+            wait_time = self.backend.reserve(tokens)
+            if wait_time <= 0:
+                return
+            logger.info(f"Rate limit: Waiting {wait_time:.1f}s ({self.backend.name} budget)")
+            await self._sleep(wait_time)
+            with self.lock:
+                self.total_wait_seconds += wait_time
+
+    @staticmethod
+    async def _sleep(seconds: float):
+        """Sleep in short slices so a cancelled job wakes up promptly."""
+        deadline = time.monotonic() + seconds
+        while True:
+            checkpoint("rate limit wait")
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, CANCEL_CHECK_INTERVAL))
+
     async def wait_with_exponential_backoff(self, request_id: str, attempt: int):
         """Wait with exponential backoff for retries"""
         if attempt == 0:
             return
-        
+
         # Track retry count for this request
         with self.lock:
             if request_id not in self.retry_counts:
                 self.retry_counts[request_id] = 0
             self.retry_counts[request_id] += 1
-        
+
         # Exponential backoff with jitter
         delay = self.config.base_retry_delay * (2 ** attempt)
         jitter = random.uniform(-self.config.jitter_range, self.config.jitter_range)
         delay = max(0, delay + jitter)
-        
+
         # Cap at max delay
         delay = min(delay, self.config.max_retry_delay)
-        
+
         logger.warning(f"Exponential backoff: Waiting {delay:.1f}s before retry {attempt} for {request_id}")
-        await asyncio.sleep(delay)
-    
+        await self._sleep(delay)
+        with self.lock:
+            self.total_backoff_seconds += delay
+
     def should_retry(self, request_id: str) -> bool:
         """Check if we should retry based on retry count"""
         with self.lock:
             retry_count = self.retry_counts.get(request_id, 0)
             return retry_count < self.config.max_retries
-    
+
     def reset_retry_count(self, request_id: str):
         """Reset retry count for successful request"""
         with self.lock:
             if request_id in self.retry_counts:
                 del self.retry_counts[request_id]
-    
+
     def get_stats(self) -> Dict[str, Any]:
         """Get rate limiter statistics"""
+        try:
+            recent_requests, recent_tokens = self.backend.usage()
+        except Exception as e:
+            logger.warning(f"⚠️ [RATE LIMITER] Could not read {self.backend.name} usage: {e}")
+            recent_requests, recent_tokens = 0, 0
         with self.lock:
-            now = time.time()
-            recent_requests = [t for t in self.request_times if now - t < 60]
             return {
-                "requests_last_minute": len(recent_requests),
+                "backend": self.backend.name,
+                "requests_last_minute": recent_requests,
+                "tokens_last_minute": recent_tokens,
                 "max_requests_per_minute": self.config.requests_per_minute,
+                "max_tokens_per_minute": self.config.tokens_per_minute,
                 "active_retries": len(self.retry_counts),
-                "total_retry_attempts": sum(self.retry_counts.values())
+                "total_retry_attempts": sum(self.retry_counts.values()),
+                "total_wait_seconds": self.total_wait_seconds,
+                "total_backoff_seconds": self.total_backoff_seconds
             }
 
-# Global rate limiter instance
-rate_limiter = OpenAIRateLimiter()
\ No newline at end of file
+# Global rate limiter instance (shared across uvicorn workers, see RATE_LIMIT_BACKEND)
+rate_limiter = OpenAIRateLimiter(RateLimitConfig.from_settings())
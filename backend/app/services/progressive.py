@@ -0,0 +1,130 @@
+"""
+Progressive results - partial pipeline results published while a job runs.
+
+Relevancy scores, CSV metrics, root grouping and current-listing coverage
+need no model, so a background job can show a deterministic preview seconds
+after it starts and refine it as the LLM stages finish:
+
+- ``preview``: research math only; every keyword provisionally Relevant
+- ``categorized``: keyword categories from the KeywordAgent
+- ``scored``: intent scores and broad volume
+- ``complete``: the final result, with SEO rewrites
+
+The publisher travels in a context variable like the cancellation token, so
+the pipeline calls ``publish_result`` and only pays for building a partial
+result when a job is listening.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.services.metrics import time_to_first_result
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("preview", "categorized", "scored", "complete")
+
+# Sections still provisional in each phase's result
+PENDING_SECTIONS = {
+    "preview": ["keyword_categorization", "intent_scoring", "broad_volume", "seo_optimization"],
+    "categorized": ["intent_scoring", "broad_volume", "seo_optimization"],
+    "scored": ["seo_optimization"],
+    "complete": [],
+}
+
+
+class ResultPublisher:
+    """
+    Collects one job's partial results and times them.
+
+    ``on_publish(phase, result)`` stores a partial result; a failure there is
+    logged and never fails the job.
+    """
+
+    def __init__(self, on_publish: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.started_at = time.perf_counter()
+        self.phases: List[Dict[str, Any]] = []
+        self._on_publish = on_publish
+        self._lock = threading.Lock()
+
+    @property
+    def first_result_seconds(self) -> Optional[float]:
+        with self._lock:
+            return self.phases[0]["seconds"] if self.phases else None
+
+    def _record(self, phase: str) -> Dict[str, Any]:
+        seconds = round(time.perf_counter() - self.started_at, 3)
+        with self._lock:
+            first = not self.phases
+            self.phases.append({"phase": phase, "seconds": seconds})
+        if first:
+            time_to_first_result.observe(seconds, phase=phase)
+            logger.info(f"⚡ [PROGRESSIVE] First result ({phase}) after {seconds:.2f}s")
+        return self.progress(phase)
+
+    def progress(self, phase: str) -> Dict[str, Any]:
+        """``progress`` block attached to a result of ``phase``."""
+        with self._lock:
+            phases = list(self.phases)
+        return {
+            "phase": phase,
+            "final": phase == "complete",
+            "pending_sections": list(PENDING_SECTIONS.get(phase, [])),
+            "first_result_seconds": phases[0]["seconds"] if phases else None,
+            "phases": phases,
+        }
+
+    def publish(self, phase: str, result: Dict[str, Any]):
+        """Attach the progress block to ``result`` and hand it to ``on_publish``."""
+        result["progress"] = self._record(phase)
+        if self._on_publish is None:
+            return
+        try:
+            self._on_publish(phase, result)
+        except Exception as e:
+            logger.warning(f"⚠️  [PROGRESSIVE] Could not store {phase} result: {e}")
+
+    def finish(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark ``result`` as the complete result (stored by the caller) and return it."""
+        result["progress"] = self._record("complete")
+        return result
+
+
+_current_publisher: contextvars.ContextVar[Optional[ResultPublisher]] = contextvars.ContextVar(
+    "result_publisher", default=None
+)
+
+
+def current_publisher() -> Optional[ResultPublisher]:
+    """Publisher of the job running in this context, or None."""
+    return _current_publisher.get()
+
+
+@contextmanager
+def publishing_scope(publisher: ResultPublisher) -> Iterator[ResultPublisher]:
+    """Make ``publisher`` current for the block (and threads started with a copied context)."""
+    reset = _current_publisher.set(publisher)
+    try:
+        yield publisher
+    finally:
+        _current_publisher.reset(reset)
+
+
+def publish_result(phase: str, build: Callable[[], Dict[str, Any]]):
+    """
+    Publish the partial result ``build()`` for ``phase``; no-op (``build`` is not
+    called) without a publisher. Build errors are logged, never raised.
+    """
+    publisher = _current_publisher.get()
+    if publisher is None:
+        return
+    try:
+        result = build()
+    except Exception as e:
+        logger.warning(f"⚠️  [PROGRESSIVE] Could not build {phase} result: {e}")
+        return
+    publisher.publish(phase, result)
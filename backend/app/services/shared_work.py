@@ -0,0 +1,118 @@
+"""
+Shared Work - single-flight memoization of work shared between jobs of a batch.
+
+While a ``shared_work()`` block is active, ``shared_call`` computes each
+(namespace, key) once: concurrent callers wait for the in-flight call and
+later callers get a copy of the cached result. Outside a block it simply
+calls through, so single-ASIN requests behave exactly as before.
+"""
+
+import contextvars
+import copy
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SharedWorkCache:
+    """Thread-safe single-flight cache with hit/miss/saved-time accounting."""
+
+    def __init__(self):
+        self._results: Dict[Tuple[str, Hashable], Tuple[Any, float]] = {}
+        self._inflight: Dict[Tuple[str, Hashable], threading.Event] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, namespace: str, field: str, amount: float = 1):
+        entry = self.stats.setdefault(namespace, {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+        entry[field] += amount
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: Hashable,
+        compute: Callable[[], Any],
+        cache_if: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """
+        Return the cached result for ``(namespace, key)`` or compute it once.
+
+        Args:
+            namespace: Kind of work (e.g. "scrape"), used for stats
+            key: Hashable identity of the work within the namespace
+            compute: Zero-argument callable doing the work
+            cache_if: Predicate deciding whether a result may be shared
+                (e.g. only successful scrapes); defaults to always
+        """
+        full_key = (namespace, key)
+        while True:
+            with self._lock:
+                if full_key in self._results:
+                    value, cost = self._results[full_key]
+                    self._count(namespace, "hits")
+                    self._count(namespace, "saved_seconds", cost)
+                    return copy.deepcopy(value)
+                event = self._inflight.get(full_key)
+                if event is None:
+                    event = self._inflight[full_key] = threading.Event()
+                    break
+            # Someone else is computing it; wait, then re-check the cache
+            event.wait()
+
+        start = time.perf_counter()
+        value = None
+        try:
+            value = compute()
+            return value
+        finally:
+            cost = time.perf_counter() - start
+            with self._lock:
+                self._count(namespace, "misses")
+                if value is not None and (cache_if is None or cache_if(value)):
+                    self._results[full_key] = (copy.deepcopy(value), cost)
+                self._inflight.pop(full_key).set()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {ns: {**entry, "saved_seconds": round(entry["saved_seconds"], 3)} for ns, entry in self.stats.items()}
+
+
+_active_cache: contextvars.ContextVar[Optional[SharedWorkCache]] = contextvars.ContextVar(
+    "shared_work_cache", default=None
+)
+
+
+@contextmanager
+def shared_work(cache: Optional[SharedWorkCache] = None) -> Iterator[SharedWorkCache]:
+    """
+    Activate a shared work cache for the duration of the block.
+
+    Like the cancellation token, the cache travels in a context variable:
+    pipeline stages started with a copied context (``run_stage``,
+    ``asyncio.to_thread``, ``MultiBatchProcessor``) see it, and two bulk jobs
+    running at once each keep their own. A nested block without a ``cache``
+    joins the one already active.
+    """
+    active = cache or _active_cache.get() or SharedWorkCache()
+    reset = _active_cache.set(active)
+    try:
+        yield active
+    finally:
+        _active_cache.reset(reset)
+
+
+def shared_call(
+    namespace: str,
+    key: Hashable,
+    compute: Callable[[], Any],
+    cache_if: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """Run ``compute`` through the active shared work cache, or directly if none."""
+    cache = _active_cache.get()
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(namespace, key, compute, cache_if)
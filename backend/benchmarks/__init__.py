@@ -0,0 +1,6 @@
+"""
+Offline benchmark tooling for the Amazon Sales Intelligence pipeline.
+
+Nothing in this package talks to OpenAI or Amazon: LLM calls are answered by
+deterministic stub models and product pages come from saved HTML.
+"""
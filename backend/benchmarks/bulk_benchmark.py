@@ -0,0 +1,231 @@
+"""
+Offline benchmark: bulk multi-ASIN analysis vs one job per ASIN.
+
+Runs the same catalog through ``amazon_sales_intelligence_pipeline`` one
+item at a time, then through ``run_bulk_analysis``, with the stub LLM and
+saved product HTML from ``pipeline_benchmark``. Every item shares the same
+CSVs (a product line), so their competitor sets overlap completely.
+
+``--offline`` also runs the catalog through ``run_offline_bulk``, with the
+mock OpenAI server answering the Batch API submissions.
+
+Usage (from ``backend/``):
+    python -m benchmarks.bulk_benchmark
+    python -m benchmarks.bulk_benchmark --products 6 --duplicates 2 --scrape-latency 1.0
+    python -m benchmarks.bulk_benchmark --offline
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any, Dict, List, Optional
+
+from benchmarks.pipeline_benchmark import (
+    DEFAULT_DESIGN_CSV,
+    DEFAULT_HTML,
+    DEFAULT_REVENUE_CSV,
+    SCRAPER_MODULES,
+    _offline_settings,
+    _patched,
+    _resolve,
+    _working_directory,
+    saved_page_scraper,
+)
+from benchmarks.stub_llm import StubLLM
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkBenchmarkConfig:
+    """Inputs for one bulk benchmark run."""
+    products: int = 4
+    duplicates: int = 1  # Extra items repeating the first product
+    revenue_csv: Path = DEFAULT_REVENUE_CSV
+    design_csv: Path = DEFAULT_DESIGN_CSV
+    html_path: Path = DEFAULT_HTML
+    max_rows: Optional[int] = 60
+    latency: float = 0.0
+    scrape_latency: float = 0.2
+    concurrency: int = 2
+    offline: bool = False  # Also run the catalog in offline (Batch API) mode
+    batch_delay: float = 0.05  # Mock Batch API turnaround per batch
+    output_dir: Path = field(default_factory=lambda: Path(gettempdir()) / "bulk_benchmark")
+
+
+def _csv_bytes(path: Path, max_rows: Optional[int]) -> bytes:
+    from benchmarks.pipeline_benchmark import _upload
+
+    upload = _upload(Path(path), max_rows)
+    upload.file.seek(0)
+    return upload.file.read()
+
+
+def _catalog(config: BulkBenchmarkConfig):
+    from app.services.bulk_analysis import BulkItem
+
+    files = {
+        "revenue.csv": _csv_bytes(config.revenue_csv, config.max_rows),
+        "design.csv": _csv_bytes(config.design_csv, config.max_rows),
+    }
+    asins = [f"B0BULK{i:04d}" for i in range(config.products)]
+    asins += [asins[0]] * config.duplicates
+    items = [BulkItem(asin_or_url=asin, revenue_csv="revenue.csv", design_csv="design.csv") for asin in asins]
+    return items, files
+
+
+def run_bulk_benchmark(config: BulkBenchmarkConfig) -> Dict[str, Any]:
+    """
+    Time the catalog one item at a time and as one bulk job.
+
+    Returns:
+        Report with wall time, scrape counts and LLM calls for both modes,
+        the measured speedup and the bulk job's own speedup estimate
+    """
+    from app.api.v1.endpoints.test_research_keywords import amazon_sales_intelligence_pipeline
+    from app.services.bulk_analysis import run_bulk_analysis, upload_file
+
+    html = Path(config.html_path).read_text(encoding="utf-8")
+    output_dir = Path(config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    items, files = _catalog(config)
+
+    llm = StubLLM(latency=config.latency)
+    scrapes: Dict[str, int] = {}
+    report: Dict[str, Any] = {"config": {k: str(v) if isinstance(v, Path) else v for k, v in asdict(config).items()}}
+
+    with ExitStack() as stack:
+        stack.enter_context(llm.install())
+        stack.enter_context(_offline_settings())
+        scraper = saved_page_scraper(html, scrapes, latency=config.scrape_latency)
+        for module_path in SCRAPER_MODULES:
+            owner, name = _resolve(module_path, "scrape_amazon_listing")
+            stack.enter_context(_patched(owner, name, scraper))
+        stack.enter_context(_working_directory(output_dir))
+
+        # One job per ASIN
+        start = time.perf_counter()
+        for item in items:
+            asyncio.run(amazon_sales_intelligence_pipeline(
+                asin_or_url=item.asin_or_url,
+                marketplace=item.marketplace,
+                main_keyword=item.main_keyword,
+                revenue_csv=upload_file(item.revenue_csv, files[item.revenue_csv]),
+                design_csv=upload_file(item.design_csv, files[item.design_csv]),
+                deadline_seconds=None,
+            ))
+        report["sequential"] = {
+            "wall_s": round(time.perf_counter() - start, 3),
+            "scrapes": dict(scrapes),
+            "llm_calls": sum(e["calls"] for e in llm.stats().values()),
+        }
+
+        # One bulk job
+        scrapes.clear()
+        llm.reset()
+        start = time.perf_counter()
+        bulk = asyncio.run(run_bulk_analysis(items, files, max_concurrency=config.concurrency))
+        report["bulk"] = {
+            "wall_s": round(time.perf_counter() - start, 3),
+            "scrapes": dict(scrapes),
+            "llm_calls": sum(e["calls"] for e in llm.stats().values()),
+            "stats": bulk["stats"],
+        }
+
+        if config.offline:
+            report["offline"] = _run_offline(config, items, files, llm, scrapes)
+
+    report["speedup"] = round(report["sequential"]["wall_s"] / report["bulk"]["wall_s"], 2)
+    return report
+
+
+def _run_offline(config: BulkBenchmarkConfig, items, files, llm: StubLLM, scrapes: Dict[str, int]) -> Dict[str, Any]:
+    """The catalog as an offline bulk job, its batches answered by the mock server."""
+    import openai
+
+    from app.services.batch_api import BatchAPIClient, run_offline_bulk
+    from benchmarks.mock_openai_server import FaultConfig, MockOpenAIServer
+
+    scrapes.clear()
+    llm.reset()
+    server = MockOpenAIServer(faults=FaultConfig(batch_delay=config.batch_delay), llm=StubLLM())
+    with server.run_in_thread():
+        client = BatchAPIClient(openai.OpenAI(base_url=server.base_url, api_key="sk-mock", max_retries=0))
+        start = time.perf_counter()
+        offline = asyncio.run(run_offline_bulk(
+            items, files, client=client, max_concurrency=config.concurrency, poll_seconds=config.batch_delay / 2,
+        ))
+        wall = time.perf_counter() - start
+        batch_requests = server.get_stats()["batch_requests"]
+    result_path = Path(config.output_dir) / "offline_bulk_result.json"
+    result_path.write_text(json.dumps(offline, indent=2, default=str), encoding="utf-8")
+    return {
+        "wall_s": round(wall, 3),
+        "scrapes": dict(scrapes),
+        "llm_calls": sum(e["calls"] for e in llm.stats().values()),
+        "llm_calls_by_agent": {agent: e["calls"] for agent, e in llm.stats().items()},
+        "batch_requests": batch_requests,
+        "stats": offline["stats"],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    seq, bulk = report["sequential"], report["bulk"]
+    stats = bulk["stats"]
+    return "\n".join([
+        f"{'mode':<12}{'wall s':>10}{'scrapes':>10}{'llm calls':>12}",
+        "-" * 44,
+        f"{'one-by-one':<12}{seq['wall_s']:>10.2f}{sum(seq['scrapes'].values()):>10}{seq['llm_calls']:>12}",
+        f"{'bulk':<12}{bulk['wall_s']:>10.2f}{sum(bulk['scrapes'].values()):>10}{bulk['llm_calls']:>12}",
+        "-" * 44,
+        f"measured speedup: {report['speedup']}x "
+        f"(bulk job estimate: {stats['estimated_speedup']}x, "
+        f"{stats['unique_runs']} runs for {stats['items']} items, shared work {stats['shared_work']})",
+    ] + ([
+        f"offline: {report['offline']['llm_calls']} synchronous llm calls, "
+        f"{report['offline']['batch_requests']} Batch API requests in "
+        f"{len(report['offline']['stats']['batch_api']['batches'])} batches, "
+        f"{report['offline']['wall_s']:.2f}s",
+    ] if "offline" in report else []))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk multi-ASIN analysis vs one job per ASIN (offline)")
+    parser.add_argument("--products", type=int, default=4, help="Distinct ASINs sharing the same CSVs")
+    parser.add_argument("--duplicates", type=int, default=1, help="Extra items repeating the first ASIN")
+    parser.add_argument("--max-rows", type=int, default=60, help="Only use the first N rows of each CSV")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every LLM call")
+    parser.add_argument("--scrape-latency", type=float, default=0.2, help="Seconds per simulated scrape")
+    parser.add_argument("--concurrency", type=int, default=2, help="Bulk pipeline runs at once")
+    parser.add_argument("--offline", action="store_true", help="Also run the catalog through the Batch API (mock server)")
+    parser.add_argument("--output-dir", type=Path, default=BulkBenchmarkConfig().output_dir)
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline INFO logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    config = BulkBenchmarkConfig(
+        products=args.products,
+        duplicates=args.duplicates,
+        max_rows=args.max_rows,
+        latency=args.latency,
+        scrape_latency=args.scrape_latency,
+        concurrency=args.concurrency,
+        offline=args.offline,
+        output_dir=args.output_dir,
+    )
+    report = run_bulk_benchmark(config)
+    report_path = Path(config.output_dir) / "bulk_benchmark.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_report(report))
+    print(f"\n💾 Report saved to: {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
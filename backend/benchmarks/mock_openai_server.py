@@ -0,0 +1,602 @@
+"""
+Local OpenAI-compatible mock server with fault and latency injection.
+
+Serves ``POST /v1/responses`` (what the Agents SDK uses by default) and
+``POST /v1/chat/completions``. Each request is matched to one of our agents by
+its instructions and answered from recorded responses when available,
+otherwise by the deterministic ``StubLLM`` responders. Faults are injected at
+configurable rates so ``OpenAIRateLimiter``, the pipeline retry loops and
+``MultiBatchProcessor`` can be exercised under controlled failure:
+
+- 429 rate limits (with ``Retry-After``), at random or beyond a
+  concurrency limit like a throttled account
+- 500 server errors
+- TCP connection resets (RST, no response)
+- slow token generation (per-token delay)
+- malformed JSON in the model output
+
+It also mocks the Batch API (``POST /v1/files``, ``POST /v1/batches``,
+``GET /v1/batches/{id}``, ``GET /v1/files/{id}/content``): a batch stays in
+progress for ``batch_delay`` seconds, then every line is answered like a
+``/v1/responses`` call. With ``server_error_rate`` set, that share of lines
+fails and goes to the batch's error file.
+
+Point the backend at it with the standard OpenAI client variable:
+
+    python -m benchmarks.mock_openai_server --port 8787 --rate-limit 0.1 --reset 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 OPENAI_API_KEY=sk-mock uv run start
+"""
+
+import argparse
+import asyncio
+import email.parser
+import email.policy
+import itertools
+import json
+import logging
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from benchmarks.stub_llm import BYTES_PER_TOKEN, StubLLM, discover_agents, input_text
+
+logger = logging.getLogger(__name__)
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 429: "Too Many Requests", 500: "Internal Server Error"}
+BATCH_ENDPOINTS = ("/v1/responses", "/v1/chat/completions")
+
+
+@dataclass
+class FaultConfig:
+    """Fault and latency injection settings. Rates are per-request probabilities (0-1)."""
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    reset_rate: float = 0.0
+    malformed_rate: float = 0.0
+    slow_rate: float = 0.0
+    latency: float = 0.0  # Seconds added to every successful response
+    token_delay: float = 0.02  # Seconds per output token on slow responses
+    retry_after: float = 1.0  # Retry-After header sent with 429s
+    max_concurrency: int = 0  # Requests served at once; more get a 429 (0 = unlimited)
+    batch_delay: float = 0.0  # Seconds a Batch API batch stays in progress
+    seed: Optional[int] = 0
+
+
+def load_recordings(path: Path) -> Dict[str, List[str]]:
+    """
+    Load recorded agent outputs from a JSONL file.
+
+    Each line is ``{"agent": "<Agent.name>", "output": <text or JSON value>}``.
+    Outputs are replayed round-robin per agent.
+    """
+    recordings: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            output = entry["output"]
+            text = output if isinstance(output, str) else json.dumps(output, separators=(",", ":"))
+            recordings.setdefault(entry["agent"], []).append(text)
+    return recordings
+
+
+class MockOpenAIServer:
+    """
+    Minimal asyncio HTTP/1.1 server speaking the OpenAI wire format.
+
+    A raw socket server (rather than FastAPI) is used so connection resets can
+    be injected as real TCP RSTs.
+
+    Args:
+        faults: Fault and latency injection settings
+        recordings: Recorded outputs per agent name (see ``load_recordings``)
+        llm: Responder used when an agent has no recordings
+    """
+
+    def __init__(
+        self,
+        faults: Optional[FaultConfig] = None,
+        recordings: Optional[Dict[str, List[str]]] = None,
+        llm: Optional[StubLLM] = None,
+    ):
+        self.faults = faults or FaultConfig()
+        self.llm = llm or StubLLM()
+        self._replay = {agent: itertools.cycle(outputs) for agent, outputs in (recordings or {}).items() if outputs}
+        self._rng = random.Random(self.faults.seed)
+        self._agents_by_instructions: Optional[Dict[str, str]] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+        self._ids = itertools.count(1)
+        self.files: Dict[str, Tuple[str, bytes]] = {}  # Batch API files: id -> (purpose, content)
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._batch_tasks: set = set()
+        self.stats: Counter = Counter()
+        self.agent_calls: Counter = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.host = "127.0.0.1"
+        self.port = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self.host, self.port = self._server.sockets[0].getsockname()[:2]
+        logger.info(f"🧪 [MockOpenAI] Listening on {self.base_url}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise block wait_closed()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @contextmanager
+    def run_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> Iterator["MockOpenAIServer"]:
+        """Run the server on a background event loop for the duration of the block."""
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def serve():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start(host, port))
+            ready.set()
+            loop.run_forever()
+
+        thread = threading.Thread(target=serve, name="mock-openai-server", daemon=True)
+        thread.start()
+        ready.wait()
+        try:
+            yield self
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.stats["requests"],
+            "faults": {k: v for k, v in self.stats.items() if k not in ("requests", "batch_requests")},
+            "batch_requests": self.stats["batch_requests"],
+            "agents": dict(self.agent_calls),
+            "peak_in_flight": self.peak_in_flight,
+            "batches": {batch_id: batch["status"] for batch_id, batch in self.batches.items()},
+            "config": asdict(self.faults),
+        }
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                reset = await self._dispatch(method, path, body, writer, keep_alive, headers)
+                if reset or not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            if not writer.is_closing():
+                writer.close()
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, path, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0) or 0)
+        body = await reader.readexactly(length) if length else b""
+        return method, path.split("?", 1)[0], headers, body
+
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool, extra: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8") if not isinstance(payload, bytes) else payload
+        headers = {
+            "Content-Type": "application/json" if not isinstance(payload, bytes) else "application/octet-stream",
+            "Content-Length": str(len(data)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **(extra or {}),
+        }
+        head = f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + data)
+        await writer.drain()
+
+    @staticmethod
+    def _reset(writer: asyncio.StreamWriter) -> None:
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            # SO_LINGER with zero timeout makes close() send RST instead of FIN
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        writer.transport.abort()
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    async def _dispatch(
+        self,
+        method: str,
+        path: str,
+        body: bytes,
+        writer: asyncio.StreamWriter,
+        keep_alive: bool,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """Handle one request. Returns True when the connection was reset."""
+        if path.startswith(("/v1/files", "/v1/batches")):
+            status, payload = self._batch_api(method, path, body, headers or {})
+            await self._write(writer, status, payload, keep_alive)
+            return False
+        if method == "GET" and path == "/stats":
+            await self._write(writer, 200, self.get_stats(), keep_alive)
+            return False
+        if method == "GET" and path == "/v1/models":
+            await self._write(writer, 200, {"object": "list", "data": [{"id": "mock", "object": "model"}]}, keep_alive)
+            return False
+        if method != "POST" or path not in ("/v1/responses", "/v1/chat/completions"):
+            await self._write(writer, 404, _error(f"Unknown route {method} {path}", "invalid_request_error"), keep_alive)
+            return False
+
+        self.stats["requests"] += 1
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            await self._write(writer, 400, _error("Request body is not valid JSON", "invalid_request_error"), keep_alive)
+            return False
+        if request.get("stream"):
+            await self._write(writer, 400, _error("Streaming is not supported by the mock server", "invalid_request_error"), keep_alive)
+            return False
+
+        fault = self._pick_fault()
+        if fault == "reset":
+            self.stats["reset"] += 1
+            self._reset(writer)
+            return True
+        if fault == "rate_limit":
+            self.stats["rate_limit"] += 1
+            await self._write(
+                writer, 429, _error("Rate limit reached (mock)", "requests", "rate_limit_exceeded"), keep_alive,
+                {"Retry-After": f"{self.faults.retry_after:g}", "x-ratelimit-remaining-requests": "0"},
+            )
+            return False
+        if fault == "server_error":
+            self.stats["server_error"] += 1
+            await self._write(writer, 500, _error("The server had an error (mock)", "server_error"), keep_alive)
+            return False
+        if self.faults.max_concurrency and self.in_flight >= self.faults.max_concurrency:
+            self.stats["concurrency_limit"] += 1
+            await self._write(
+                writer, 429, _error("Too many concurrent requests (mock)", "requests", "rate_limit_exceeded"), keep_alive,
+                {"Retry-After": f"{self.faults.retry_after:g}"},
+            )
+            return False
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await self._respond(path, request, writer, keep_alive)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, path: str, request: Dict[str, Any], writer: asyncio.StreamWriter, keep_alive: bool) -> bool:
+        chat = path.endswith("/chat/completions")
+        agent, prompt, instructions, schema = self._parse_request(request, chat)
+        text = self._output_for(agent, prompt, schema)
+        if self._roll(self.faults.malformed_rate):
+            self.stats["malformed"] += 1
+            text = text[: max(1, len(text) // 2)]
+
+        output_tokens = max(1, len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+        delay = self.faults.latency
+        if self._roll(self.faults.slow_rate):
+            self.stats["slow"] += 1
+            delay += output_tokens * self.faults.token_delay
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        input_tokens = (len(prompt.encode("utf-8")) + len(instructions.encode("utf-8"))) // BYTES_PER_TOKEN
+        model = request.get("model", "mock")
+        payload = _chat_payload(next(self._ids), model, text, input_tokens, output_tokens) if chat \
+            else _responses_payload(next(self._ids), model, text, input_tokens, output_tokens)
+        await self._write(writer, 200, payload, keep_alive)
+        return False
+
+    def _answer(self, path: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Response body for a request answered without fault injection (Batch API lines)."""
+        chat = path.endswith("/chat/completions")
+        agent, prompt, instructions, schema = self._parse_request(request, chat)
+        text = self._output_for(agent, prompt, schema)
+        output_tokens = max(1, len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+        input_tokens = (len(prompt.encode("utf-8")) + len(instructions.encode("utf-8"))) // BYTES_PER_TOKEN
+        model = request.get("model", "mock")
+        return _chat_payload(next(self._ids), model, text, input_tokens, output_tokens) if chat \
+            else _responses_payload(next(self._ids), model, text, input_tokens, output_tokens)
+
+    def _roll(self, rate: float) -> bool:
+        return rate > 0 and self._rng.random() < rate
+
+    def _pick_fault(self) -> Optional[str]:
+        for name, rate in (
+            ("reset", self.faults.reset_rate),
+            ("rate_limit", self.faults.rate_limit_rate),
+            ("server_error", self.faults.server_error_rate),
+        ):
+            if self._roll(rate):
+                return name
+        return None
+
+    def _parse_request(self, request: Dict[str, Any], chat: bool) -> Tuple[str, str, str, Optional[Dict[str, Any]]]:
+        if chat:
+            messages = request.get("messages", [])
+            instructions = "\n".join(
+                str(m.get("content", "")) for m in messages if m.get("role") in ("system", "developer")
+            )
+            prompt = input_text([m for m in messages if m.get("role") not in ("system", "developer")])
+            fmt = request.get("response_format") or {}
+            schema = (fmt.get("json_schema") or {}).get("schema") if fmt.get("type") == "json_schema" else None
+        else:
+            instructions = request.get("instructions") or ""
+            prompt = input_text(request.get("input", ""))
+            fmt = (request.get("text") or {}).get("format") or {}
+            schema = fmt.get("schema") if fmt.get("type") == "json_schema" else None
+        return self._agent_for(instructions), prompt, instructions, schema
+
+    def _agent_for(self, instructions: str) -> str:
+        if self._agents_by_instructions is None:
+            self._agents_by_instructions = {
+                agent.instructions: agent.name
+                for agent in discover_agents("app.local_agents")
+                if isinstance(agent.instructions, str)
+            }
+        return self._agents_by_instructions.get(instructions, "unknown")
+
+    def _output_for(self, agent: str, prompt: str, schema: Optional[Dict[str, Any]]) -> str:
+        self.agent_calls[agent] += 1
+        if agent in self._replay:
+            return next(self._replay[agent])
+        return self.llm.respond(agent, prompt, schema)
+
+
+    # ------------------------------------------------------------------
+    # Batch API
+    # ------------------------------------------------------------------
+
+    def _batch_api(self, method: str, path: str, body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        parts = path.strip("/").split("/")  # v1, files|batches, [id], [content|cancel]
+        if method == "POST" and parts == ["v1", "files"]:
+            fields = _multipart_fields(headers.get("content-type", ""), body)
+            if "file" not in fields:
+                return 400, _error("file is required", "invalid_request_error")
+            file_id = f"file-mock-{next(self._ids)}"
+            purpose = fields.get("purpose", b"batch").decode()
+            self.files[file_id] = (purpose, fields["file"])
+            return 200, _file_object(file_id, purpose, fields["file"])
+        if method == "GET" and len(parts) == 4 and parts[1] == "files" and parts[3] == "content":
+            if parts[2] not in self.files:
+                return 404, _error(f"No such File object: {parts[2]}", "invalid_request_error")
+            return 200, self.files[parts[2]][1]
+        if method == "POST" and parts == ["v1", "batches"]:
+            request = json.loads(body or b"{}")
+            if request.get("input_file_id") not in self.files:
+                return 400, _error("input_file_id does not name an uploaded file", "invalid_request_error")
+            if request.get("endpoint") not in BATCH_ENDPOINTS:
+                return 400, _error(f"Unsupported batch endpoint {request.get('endpoint')}", "invalid_request_error")
+            batch = _batch_object(f"batch_mock_{next(self._ids)}", request)
+            self.batches[batch["id"]] = batch
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+            return 200, batch
+        if method == "GET" and len(parts) == 3 and parts[1] == "batches":
+            if parts[2] not in self.batches:
+                return 404, _error(f"No such Batch object: {parts[2]}", "invalid_request_error")
+            return 200, self.batches[parts[2]]
+        return 404, _error(f"Unknown route {method} {path}", "invalid_request_error")
+
+    async def _run_batch(self, batch: Dict[str, Any]) -> None:
+        lines = [json.loads(line) for line in self.files[batch["input_file_id"]][1].decode("utf-8").splitlines() if line.strip()]
+        batch["status"] = "in_progress"
+        batch["in_progress_at"] = int(time.time())
+        batch["request_counts"]["total"] = len(lines)
+        if self.faults.batch_delay > 0:
+            await asyncio.sleep(self.faults.batch_delay)
+
+        outputs, errors = [], []
+        for line in lines:
+            self.stats["batch_requests"] += 1
+            entry = {"id": f"batch_req_mock_{next(self._ids)}", "custom_id": line.get("custom_id")}
+            if self._roll(self.faults.server_error_rate):
+                self.stats["batch_server_error"] += 1
+                errors.append({**entry, "response": {"status_code": 500, "request_id": entry["id"],
+                               "body": _error("The server had an error (mock)", "server_error")}, "error": None})
+                continue
+            body = self._answer(line.get("url", batch["endpoint"]), line.get("body") or {})
+            outputs.append({**entry, "response": {"status_code": 200, "request_id": entry["id"], "body": body}, "error": None})
+
+        for key, entries in (("output_file_id", outputs), ("error_file_id", errors)):
+            if entries:
+                file_id = f"file-mock-{next(self._ids)}"
+                self.files[file_id] = ("batch_output", "".join(json.dumps(e) + "\n" for e in entries).encode("utf-8"))
+                batch[key] = file_id
+        batch["request_counts"].update(completed=len(outputs), failed=len(errors))
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+
+def _multipart_fields(content_type: str, body: bytes) -> Dict[str, bytes]:
+    """Form fields of a multipart/form-data body by name."""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    if not message.is_multipart():
+        return {}
+    return {
+        part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+        for part in message.iter_parts()
+    }
+
+
+def _file_object(file_id: str, purpose: str, content: bytes) -> Dict[str, Any]:
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(content),
+        "created_at": int(time.time()),
+        "filename": f"{file_id}.jsonl",
+        "purpose": purpose,
+        "status": "processed",
+    }
+
+
+def _batch_object(batch_id: str, request: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": request["endpoint"],
+        "errors": None,
+        "input_file_id": request["input_file_id"],
+        "completion_window": request.get("completion_window", "24h"),
+        "status": "validating",
+        "output_file_id": None,
+        "error_file_id": None,
+        "created_at": int(time.time()),
+        "in_progress_at": None,
+        "completed_at": None,
+        "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        "metadata": request.get("metadata") or {},
+    }
+
+
+def _error(message: str, error_type: str, code: Optional[str] = None) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+
+
+def _responses_payload(n: int, model: str, text: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"resp_mock_{n}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": "completed",
+        "error": None,
+        "incomplete_details": None,
+        "instructions": None,
+        "metadata": {},
+        "parallel_tool_calls": True,
+        "temperature": None,
+        "tool_choice": "auto",
+        "tools": [],
+        "top_p": None,
+        "output": [{
+            "id": f"msg_mock_{n}",
+            "type": "message",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def _chat_payload(n: int, model: str, text: str, input_tokens: int, output_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-mock-{n}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": input_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock server with fault injection")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--recordings", type=Path, help="JSONL of {agent, output} to replay")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--server-error", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--reset", type=float, default=0.0, help="Fraction of connections reset without a response")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Fraction of outputs truncated to invalid JSON")
+    parser.add_argument("--slow", type=float, default=0.0, help="Fraction of responses generated slowly")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds per output token when slow")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--max-concurrency", type=int, default=0, help="Requests served at once; more get a 429")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Seconds a Batch API batch stays in progress")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = MockOpenAIServer(
+        faults=FaultConfig(
+            rate_limit_rate=args.rate_limit,
+            server_error_rate=args.server_error,
+            reset_rate=args.reset,
+            malformed_rate=args.malformed,
+            slow_rate=args.slow,
+            latency=args.latency,
+            token_delay=args.token_delay,
+            retry_after=args.retry_after,
+            max_concurrency=args.max_concurrency,
+            batch_delay=args.batch_delay,
+            seed=args.seed,
+        ),
+        recordings=load_recordings(args.recordings) if args.recordings else None,
+    )
+
+    async def serve():
+        await server.start(args.host, args.port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        logger.info(f"📊 [MockOpenAI] {json.dumps(server.get_stats())}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
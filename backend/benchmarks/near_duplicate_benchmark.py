@@ -0,0 +1,175 @@
+"""
+Offline report for near-duplicate keyword clustering.
+
+Clusters every keyword of the sample CSVs, then runs the pipeline benchmark
+twice (every keyword through the agents, then one representative per
+cluster) and reports the keywords and prompt tokens the agents no longer
+see, and how often a propagated category or intent score differs from the
+label the full run gave that keyword.
+
+The stub agents label from the relevancy score alone, so disagreements here
+come from members whose own relevancy differs from their representative's;
+re-run against the real model for its disagreement rate.
+
+Usage (from ``backend/``):
+    python -m benchmarks.near_duplicate_benchmark
+    python -m benchmarks.near_duplicate_benchmark --max-rows 100 --threshold 0.85
+"""
+
+import argparse
+import csv
+import json
+import logging
+from pathlib import Path
+from tempfile import gettempdir
+from typing import Any, Dict, List, Optional
+
+from benchmarks.pipeline_benchmark import DEFAULT_DESIGN_CSV, DEFAULT_REVENUE_CSV, BenchmarkConfig, run_benchmark
+from benchmarks.stub_llm import BYTES_PER_TOKEN
+
+# Agents that see one representative per cluster
+LABEL_AGENTS = ("KeywordAgent", "IntentScoringSubagent")
+
+
+def csv_keywords(paths: List[Path], max_rows: Optional[int] = None) -> Dict[str, int]:
+    """Unique lowercased keyword phrases of the CSVs with their highest search volume."""
+    volumes: Dict[str, int] = {}
+    for path in paths:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                if max_rows is not None and i >= max_rows:
+                    break
+                phrase = (row.get("Keyword Phrase") or "").strip().lower()
+                if not phrase:
+                    continue
+                try:
+                    volume = int(float(str(row.get("Search Volume") or "0").replace(",", "")))
+                except ValueError:
+                    volume = 0
+                volumes[phrase] = max(volumes.get(phrase, 0), volume)
+    return volumes
+
+
+def _items(output_dir: Path) -> Dict[str, Dict[str, Any]]:
+    result = json.loads((output_dir / "complete_pipeline_result.json").read_text(encoding="utf-8"))
+    items = ((result.get("ai_analysis_keywords") or {}).get("structured_data") or {}).get("items") or []
+    return {str(it.get("phrase") or "").strip().lower(): it for it in items}
+
+
+def _agent_tokens(report: Dict[str, Any]) -> int:
+    return sum(report["agents"].get(agent, {}).get("prompt_bytes", 0) for agent in LABEL_AGENTS) // BYTES_PER_TOKEN
+
+
+def run_report(config: BenchmarkConfig, threshold: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Cluster the sample CSVs and compare a full pipeline run with a clustered one.
+
+    Returns:
+        Report dict: CSV clustering summary, agent calls and prompt tokens per
+        run, and label disagreements of propagated members
+    """
+    from app.core.config import settings
+    from app.services.keyword_processing.near_duplicates import cluster_near_duplicates
+
+    threshold = settings.KEYWORD_NEAR_DUP_THRESHOLD if threshold is None else threshold
+    volumes = csv_keywords([Path(config.revenue_csv), Path(config.design_csv)], config.max_rows)
+    clusters = cluster_near_duplicates(list(volumes), volumes, threshold=threshold)
+
+    base_dir = Path(config.output_dir)
+    runs: Dict[str, Dict[str, Any]] = {}
+    items: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    saved_threshold = settings.KEYWORD_NEAR_DUP_THRESHOLD
+    settings.KEYWORD_NEAR_DUP_THRESHOLD = threshold
+    try:
+        for name, enabled in (("full", False), ("clustered", True)):
+            output_dir = base_dir / name
+            report = run_benchmark(BenchmarkConfig(**{
+                **config.__dict__, "near_duplicates": enabled, "output_dir": output_dir,
+            }))
+            runs[name] = {
+                "agent_calls": sum(report["agents"].get(agent, {}).get("calls", 0) for agent in LABEL_AGENTS),
+                "agent_prompt_tokens": _agent_tokens(report),
+                "total_prompt_tokens": report["total"]["prompt_bytes"] // BYTES_PER_TOKEN,
+                "llm_cost_usd": report["total"]["llm_cost_usd"],
+            }
+            items[name] = _items(output_dir)
+    finally:
+        settings.KEYWORD_NEAR_DUP_THRESHOLD = saved_threshold
+
+    propagated = [phrase for phrase, it in items["clustered"].items() if it.get("near_duplicate_of")]
+    disagreements = {"category": [], "intent_score": []}
+    for phrase in propagated:
+        full_item = items["full"].get(phrase)
+        if full_item is None:
+            continue
+        for label in disagreements:
+            if items["clustered"][phrase].get(label) != full_item.get(label):
+                disagreements[label].append(phrase)
+
+    return {
+        "threshold": threshold,
+        "csv": clusters.summary(),
+        "runs": runs,
+        "pipeline_keywords": len(items["full"]),
+        "propagated": len(propagated),
+        "disagreements": {
+            label: {
+                "count": len(phrases),
+                "rate": round(len(phrases) / len(propagated), 4) if propagated else 0.0,
+                "examples": phrases[:10],
+            }
+            for label, phrases in disagreements.items()
+        },
+        "tokens_removed": runs["full"]["agent_prompt_tokens"] - runs["clustered"]["agent_prompt_tokens"],
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    csv_summary, runs = report["csv"], report["runs"]
+    lines = [
+        f"sample CSVs: {csv_summary['removed']} of {csv_summary['keywords']} keywords are near-duplicates "
+        f"({csv_summary['clusters_with_members']} clusters, threshold {report['threshold']})",
+        f"{'run':<12}{'agent calls':>13}{'agent tokens':>14}{'all tokens':>12}{'cost $':>10}",
+        "-" * 61,
+    ]
+    for name, run in runs.items():
+        lines.append(
+            f"{name:<12}{run['agent_calls']:>13}{run['agent_prompt_tokens']:>14}"
+            f"{run['total_prompt_tokens']:>12}{run['llm_cost_usd']:>10.4f}"
+        )
+    lines.append("-" * 61)
+    lines.append(
+        f"pipeline: {report['propagated']} of {report['pipeline_keywords']} keywords labelled by propagation, "
+        f"{report['tokens_removed']} agent prompt tokens removed"
+    )
+    for label, entry in report["disagreements"].items():
+        lines.append(f"{label} differs from the full run: {entry['count']} ({entry['rate']:.1%})")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Near-duplicate clustering savings and label agreement (stub LLM)")
+    parser.add_argument("--revenue-csv", type=Path, default=DEFAULT_REVENUE_CSV)
+    parser.add_argument("--design-csv", type=Path, default=DEFAULT_DESIGN_CSV)
+    parser.add_argument("--max-rows", type=int, default=None, help="Only use the first N rows of each CSV")
+    parser.add_argument("--threshold", type=float, default=None, help="Similarity threshold (default: settings)")
+    parser.add_argument("--output-dir", type=Path, default=Path(gettempdir()) / "near_duplicate_benchmark")
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline INFO logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    config = BenchmarkConfig(
+        revenue_csv=args.revenue_csv,
+        design_csv=args.design_csv,
+        max_rows=args.max_rows,
+        output_dir=args.output_dir,
+    )
+    report = run_report(config, threshold=args.threshold)
+    report_path = Path(args.output_dir) / "near_duplicate_benchmark.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
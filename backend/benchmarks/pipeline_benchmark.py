@@ -0,0 +1,460 @@
+"""
+Offline end-to-end benchmark for ``amazon_sales_intelligence_pipeline``.
+
+Runs the real pipeline endpoint against the sample CSVs in ``backend/csv``
+with product pages served from saved HTML and every agent answered by
+``StubLLM``, then reports wall and CPU time, LLM call counts and payload
+sizes per stage.
+
+Usage (from ``backend/``):
+    python -m benchmarks.pipeline_benchmark
+    python -m benchmarks.pipeline_benchmark --latency 0.8 --max-rows 100
+    python -m benchmarks.pipeline_benchmark --latency 0.8 --cascade --unsure-rate 0.1
+    python -m benchmarks.pipeline_benchmark --near-duplicates
+"""
+
+import argparse
+import asyncio
+import csv
+import importlib
+import inspect
+import io
+import json
+import logging
+import os
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from tempfile import SpooledTemporaryFile, gettempdir
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from fastapi import UploadFile
+
+from benchmarks.stub_llm import StubLLM
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_REVENUE_CSV = BACKEND_DIR / "csv" / "Freeze dried strawberry top revenue.csv"
+DEFAULT_DESIGN_CSV = BACKEND_DIR / "csv" / "freeze dried strawberry relevant designs.csv"
+DEFAULT_HTML = BACKEND_DIR / "tests" / "services" / "amazon" / "fixtures" / "product_page.html"
+
+# (stage name, import path, attribute) — wrapped in pipeline order
+STAGES = [
+    ("research", "app.local_agents.research.runner", "ResearchRunner.run_research"),
+    ("categorization", "app.local_agents.keyword.runner", "KeywordRunner.run_keyword_categorization"),
+    ("scoring", "app.local_agents.scoring.runner", "ScoringRunner.score_and_enrich"),
+    ("root_filtering", "app.local_agents.scoring.subagents.root_relevance_agent", "apply_root_filtering_ai"),
+    ("seo", "app.local_agents.seo.runner", "SEORunner.run_seo_analysis"),
+]
+
+# USD per 1M (input, cached input, output) tokens: agents' own model (gpt-5-mini)
+# and the cascade's fast model (gpt-5-nano)
+TIER_PRICES = {
+    "strong": (0.25, 0.025, 2.00),
+    "fast": (0.05, 0.005, 0.40),
+}
+
+SCRAPER_MODULES = [
+    "app.local_agents.research.helper_methods",
+    "app.local_agents.research.runner",
+]
+
+
+@dataclass
+class BenchmarkConfig:
+    """Inputs for one benchmark run."""
+    revenue_csv: Path = DEFAULT_REVENUE_CSV
+    design_csv: Path = DEFAULT_DESIGN_CSV
+    html_path: Path = DEFAULT_HTML
+    asin: str = "B08KT2Z93D"
+    marketplace: str = "US"
+    latency: float = 0.0
+    seconds_per_1k_output_tokens: float = 0.0
+    seconds_per_1k_input_tokens: float = 0.0  # Charged for uncached input only
+    max_rows: Optional[int] = None
+    deadline_seconds: Optional[float] = None
+    outage: bool = False  # Every LLM call fails with a connection error
+    cascade: bool = False  # Classification agents answer with a fast stub model first
+    unsure_rate: float = 0.1  # Share of items the fast model is unsure of (cascade only)
+    near_duplicates: bool = False  # Label near-duplicate keywords from one representative per cluster
+    output_dir: Path = field(default_factory=lambda: Path(gettempdir()) / "pipeline_benchmark")
+
+
+@dataclass
+class StageResult:
+    """Timing and LLM accounting for one pipeline stage."""
+    name: str
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    invocations: int = 0
+    llm_calls: int = 0
+    prompt_bytes: int = 0
+    response_bytes: int = 0
+    agents: Dict[str, int] = field(default_factory=dict)
+
+
+def _resolve(module_path: str, attr_path: str):
+    owner = importlib.import_module(module_path)
+    parts = attr_path.split(".")
+    for part in parts[:-1]:
+        owner = getattr(owner, part)
+    return owner, parts[-1]
+
+
+def _llm_totals(llm: StubLLM) -> Dict[str, Dict[str, Any]]:
+    return {agent: dict(entry) for agent, entry in llm.stats().items()}
+
+
+def _diff_llm(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    delta: Dict[str, Dict[str, int]] = {}
+    for agent, entry in after.items():
+        prev = before.get(agent, {})
+        calls = entry["calls"] - prev.get("calls", 0)
+        if calls:
+            delta[agent] = {
+                "calls": calls,
+                "prompt_bytes": entry["prompt_bytes"] - prev.get("prompt_bytes", 0),
+                "response_bytes": entry["response_bytes"] - prev.get("response_bytes", 0),
+            }
+    return delta
+
+
+def _timed(stage: StageResult, llm: StubLLM, fn: Callable, active: List[StageResult]) -> Callable:
+    """Wrap a stage entry point; nested stages are charged to the innermost one."""
+    def wrapper(*args, **kwargs):
+        outer = active[-1] if active else None
+        active.append(stage)
+        before = _llm_totals(llm)
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            active.pop()
+            stage.wall_s += wall
+            stage.cpu_s += cpu
+            stage.invocations += 1
+            for agent, entry in _diff_llm(before, _llm_totals(llm)).items():
+                stage.llm_calls += entry["calls"]
+                stage.prompt_bytes += entry["prompt_bytes"]
+                stage.response_bytes += entry["response_bytes"]
+                stage.agents[agent] = stage.agents.get(agent, 0) + entry["calls"]
+                if outer is not None:
+                    outer.llm_calls -= entry["calls"]
+                    outer.prompt_bytes -= entry["prompt_bytes"]
+                    outer.response_bytes -= entry["response_bytes"]
+                    outer.agents[agent] = outer.agents.get(agent, 0) - entry["calls"]
+            if outer is not None:
+                outer.wall_s -= wall
+                outer.cpu_s -= cpu
+    return wrapper
+
+
+@contextmanager
+def _patched(owner: Any, name: str, value: Any) -> Iterator[None]:
+    original = inspect.getattr_static(owner, name)
+    if isinstance(original, staticmethod):
+        value = staticmethod(value)
+    setattr(owner, name, value)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+
+def saved_page_scraper(html: str, counter: Dict[str, int], latency: float = 0.0) -> Callable[..., Dict[str, Any]]:
+    """
+    Drop-in for ``scrape_amazon_listing`` that parses saved HTML instead of fetching.
+
+    ``latency`` simulates the per-scrape cost of the real Scrapy subprocess.
+    """
+    from app.services.amazon.extractor import extract_product_page
+
+    def scrape_amazon_listing(asin_or_url: str, marketplace: str = "US", profile: str = "full") -> Dict[str, Any]:
+        counter[profile] = counter.get(profile, 0) + 1
+        if latency:
+            time.sleep(latency)
+        url = asin_or_url if asin_or_url.startswith("http") else f"https://www.amazon.com/dp/{asin_or_url}"
+        return extract_product_page(html, url, 200, profile=profile)
+
+    return scrape_amazon_listing
+
+
+def llm_cost(tier_stats: Dict[str, Dict[str, int]]) -> float:
+    """Estimated USD cost of the calls in ``StubLLM.tier_stats()``."""
+    cost = 0.0
+    for tier, entry in tier_stats.items():
+        input_price, cached_price, output_price = TIER_PRICES[tier]
+        uncached = entry["input_tokens"] - entry["cached_input_tokens"]
+        cost += (
+            uncached * input_price + entry["cached_input_tokens"] * cached_price + entry["output_tokens"] * output_price
+        ) / 1_000_000
+    return cost
+
+
+def _upload(path: Path, max_rows: Optional[int]) -> UploadFile:
+    data = path.read_bytes()
+    if max_rows is not None:
+        rows = list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))[: max_rows + 1]
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        data = buffer.getvalue().encode("utf-8")
+    spool = SpooledTemporaryFile(max_size=1024 * 1024 * 50)
+    spool.write(data)
+    spool.seek(0)
+    return UploadFile(file=spool, filename=path.name)
+
+
+@contextmanager
+def _working_directory(path: Path) -> Iterator[None]:
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+@contextmanager
+def _offline_settings() -> Iterator[None]:
+    """Satisfy the pipeline's OpenAI configuration checks without a real key."""
+    from app.core.config import settings
+
+    saved = (settings.OPENAI_API_KEY, settings.USE_AI_AGENTS)
+    if not settings.openai_configured:
+        settings.OPENAI_API_KEY = "sk-offline-benchmark"
+    settings.USE_AI_AGENTS = True
+    try:
+        yield
+    finally:
+        settings.OPENAI_API_KEY, settings.USE_AI_AGENTS = saved
+
+
+@contextmanager
+def _setting(name: str, value: Any) -> Iterator[None]:
+    from app.core.config import settings
+
+    saved = getattr(settings, name)
+    setattr(settings, name, value)
+    try:
+        yield
+    finally:
+        setattr(settings, name, saved)
+
+
+def run_benchmark(config: BenchmarkConfig, llm: Optional[StubLLM] = None) -> Dict[str, Any]:
+    """
+    Run the pipeline once with stubbed LLM and saved HTML.
+
+    Args:
+        config: Benchmark inputs
+        llm: Stub to answer with, e.g. one whose prompt cache is warm from an
+            earlier run (default: a new stub built from ``config``; its call
+            counts are reset either way)
+
+    Returns:
+        Report dict with per-stage timings, LLM call counts and payload sizes
+    """
+    from app.api.v1.endpoints.test_research_keywords import amazon_sales_intelligence_pipeline
+    from app.services.progressive import ResultPublisher, publishing_scope
+
+    html = Path(config.html_path).read_text(encoding="utf-8")
+    output_dir = Path(config.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if llm is None:
+        llm = StubLLM(
+            latency=config.latency,
+            seconds_per_1k_output_tokens=config.seconds_per_1k_output_tokens,
+            seconds_per_1k_input_tokens=config.seconds_per_1k_input_tokens,
+            outage=config.outage,
+            unsure_rate=config.unsure_rate,
+        )
+    llm.reset()
+    stages = {name: StageResult(name) for name, _, _ in STAGES}
+    scrapes: Dict[str, int] = {}
+    active: List[StageResult] = []
+
+    with ExitStack() as stack:
+        stack.enter_context(llm.install())
+        if config.cascade:
+            from app.services.model_cascade import CASCADE_AGENTS, CascadeConfig, cascade_agent, reset_cascade_stats
+
+            reset_cascade_stats()
+            for module_path, attr in CASCADE_AGENTS:
+                agent = getattr(importlib.import_module(module_path), attr)
+                cascade_agent(agent, fast=llm.fast_model(agent.name), config=CascadeConfig())
+        stack.enter_context(_offline_settings())
+        stack.enter_context(_setting("KEYWORD_NEAR_DUP_ENABLED", config.near_duplicates))
+        scraper = saved_page_scraper(html, scrapes)
+        for module_path in SCRAPER_MODULES:
+            owner, name = _resolve(module_path, "scrape_amazon_listing")
+            stack.enter_context(_patched(owner, name, scraper))
+        for name, module_path, attr_path in STAGES:
+            owner, attr = _resolve(module_path, attr_path)
+            stack.enter_context(_patched(owner, attr, _timed(stages[name], llm, getattr(owner, attr), active)))
+        stack.enter_context(_working_directory(output_dir))
+        # Records when each partial result would reach a background job's client
+        publisher = stack.enter_context(publishing_scope(ResultPublisher()))
+
+        logger.info(f"🧪 [BENCHMARK] Running pipeline offline (latency={config.latency}s)")
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        response = asyncio.run(amazon_sales_intelligence_pipeline(
+            asin_or_url=config.asin,
+            marketplace=config.marketplace,
+            main_keyword=None,
+            revenue_csv=_upload(Path(config.revenue_csv), config.max_rows),
+            design_csv=_upload(Path(config.design_csv), config.max_rows),
+            deadline_seconds=config.deadline_seconds,
+        ))
+        total_wall = time.perf_counter() - wall_start
+        total_cpu = time.process_time() - cpu_start
+
+    llm_stats = llm.stats()
+    tier_stats = llm.tier_stats()
+    stage_wall = sum(s.wall_s for s in stages.values())
+    stage_cpu = sum(s.cpu_s for s in stages.values())
+    report = {
+        "config": {k: str(v) if isinstance(v, Path) else v for k, v in asdict(config).items()},
+        "total": {
+            "wall_s": round(total_wall, 4),
+            "cpu_s": round(total_cpu, 4),
+            "unattributed_wall_s": round(total_wall - stage_wall, 4),
+            "unattributed_cpu_s": round(total_cpu - stage_cpu, 4),
+            "llm_calls": sum(e["calls"] for e in llm_stats.values()),
+            "prompt_bytes": sum(e["prompt_bytes"] for e in llm_stats.values()),
+            "cached_prompt_bytes": sum(e["cached_prompt_bytes"] for e in llm_stats.values()),
+            "response_bytes": sum(e["response_bytes"] for e in llm_stats.values()),
+            "llm_cost_usd": round(llm_cost(tier_stats), 6),
+            "result_bytes": len(json.dumps(response, default=str).encode("utf-8")),
+            "scrapes": scrapes,
+            "first_result_s": publisher.first_result_seconds,
+            "partial_results": publisher.phases,
+        },
+        "stages": {
+            name: {**asdict(stage), "wall_s": round(stage.wall_s, 4), "cpu_s": round(stage.cpu_s, 4)}
+            for name, stage in stages.items()
+        },
+        "agents": llm_stats,
+        "tiers": tier_stats,
+    }
+    keyword_result = response.get("ai_analysis_keywords") or {}
+    for key in ("pre_classification", "near_duplicates"):
+        if keyword_result.get(key):
+            report[key] = keyword_result[key]
+    if config.cascade:
+        from app.services.model_cascade import get_cascade_stats
+
+        report["cascade"] = get_cascade_stats()
+    if "deadline" in response:
+        report["deadline"] = response["deadline"]
+    for stage in report["stages"].values():
+        stage.pop("name")
+        stage["agents"] = {agent: calls for agent, calls in stage["agents"].items() if calls}
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a fixed-width table."""
+    lines = [
+        f"{'stage':<16}{'wall s':>10}{'cpu s':>10}{'calls':>8}{'prompt KB':>12}{'resp KB':>10}",
+        "-" * 66,
+    ]
+    for name, stage in report["stages"].items():
+        lines.append(
+            f"{name:<16}{stage['wall_s']:>10.3f}{stage['cpu_s']:>10.3f}{stage['llm_calls']:>8}"
+            f"{stage['prompt_bytes'] / 1024:>12.1f}{stage['response_bytes'] / 1024:>10.1f}"
+        )
+    total = report["total"]
+    lines.append("-" * 66)
+    lines.append(
+        f"{'total':<16}{total['wall_s']:>10.3f}{total['cpu_s']:>10.3f}{total['llm_calls']:>8}"
+        f"{total['prompt_bytes'] / 1024:>12.1f}{total['response_bytes'] / 1024:>10.1f}"
+    )
+    lines.append(f"unattributed: wall {total['unattributed_wall_s']:.3f}s, cpu {total['unattributed_cpu_s']:.3f}s")
+    lines.append(f"result payload: {total['result_bytes'] / 1024:.1f} KB, scrapes: {total['scrapes']}")
+    lines.append(f"estimated LLM cost: ${total['llm_cost_usd']:.4f}")
+    if total["prompt_bytes"]:
+        lines.append(
+            f"prompt cache: {total['cached_prompt_bytes'] / 1024:.1f} of {total['prompt_bytes'] / 1024:.1f} KB "
+            f"({total['cached_prompt_bytes'] / total['prompt_bytes']:.0%})"
+        )
+    for agent, counts in report.get("cascade", {}).items():
+        lines.append(
+            f"cascade {agent}: {counts['escalated_items']}/{counts['items']} escalated "
+            f"({counts['escalation_rate']:.1%}), {counts['invalid']} invalid"
+        )
+    if total.get("partial_results"):
+        phases = ", ".join(f"{p['phase']} {p['seconds']:.2f}s" for p in total["partial_results"])
+        lines.append(f"time to first result: {total['first_result_s']:.2f}s of {total['wall_s']:.2f}s ({phases})")
+    pre_classification = report.get("pre_classification")
+    if pre_classification:
+        lines.append(
+            f"pre-classification: {pre_classification['resolved']} keywords labelled by rule "
+            f"{pre_classification['by_rule']}, keyword agent batches "
+            f"{pre_classification['llm_batches']} (was {pre_classification['llm_batches_without']})"
+        )
+    near_duplicates = report.get("near_duplicates")
+    if near_duplicates:
+        lines.append(
+            f"near-duplicates: {near_duplicates['removed']} of {near_duplicates['keywords']} keywords "
+            f"labelled from {near_duplicates['clusters_with_members']} cluster representatives"
+        )
+    deadline = report.get("deadline")
+    if deadline:
+        lines.append(
+            f"deadline: {deadline['elapsed_seconds']:.2f}s of {deadline['deadline_seconds']}s "
+            f"(met: {deadline['met']}, degraded: {[d['section'] for d in deadline['degraded_sections']] or 'none'})"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline end-to-end pipeline benchmark (stub LLM, saved HTML)")
+    parser.add_argument("--revenue-csv", type=Path, default=DEFAULT_REVENUE_CSV)
+    parser.add_argument("--design-csv", type=Path, default=DEFAULT_DESIGN_CSV)
+    parser.add_argument("--html", type=Path, default=DEFAULT_HTML, help="Saved product page served for every scrape")
+    parser.add_argument("--asin", default="B08KT2Z93D")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every LLM call")
+    parser.add_argument("--per-1k-tokens", type=float, default=0.0, help="Extra seconds per 1k output tokens")
+    parser.add_argument("--per-1k-input-tokens", type=float, default=0.0, help="Extra seconds per 1k uncached input tokens")
+    parser.add_argument("--max-rows", type=int, default=None, help="Only use the first N rows of each CSV")
+    parser.add_argument("--deadline", type=float, default=None, help="Run in deadline mode with this many seconds")
+    parser.add_argument("--outage", action="store_true", help="Fail every LLM call with a connection error")
+    parser.add_argument("--cascade", action="store_true", help="Answer classification agents with a fast model first")
+    parser.add_argument("--unsure-rate", type=float, default=0.1, help="Share of items the fast model is unsure of")
+    parser.add_argument("--near-duplicates", action="store_true", help="Label near-duplicate keywords from one per cluster")
+    parser.add_argument("--output-dir", type=Path, default=BenchmarkConfig().output_dir)
+    parser.add_argument("--verbose", action="store_true", help="Show pipeline INFO logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    config = BenchmarkConfig(
+        revenue_csv=args.revenue_csv,
+        design_csv=args.design_csv,
+        html_path=args.html,
+        asin=args.asin,
+        latency=args.latency,
+        seconds_per_1k_output_tokens=args.per_1k_tokens,
+        seconds_per_1k_input_tokens=args.per_1k_input_tokens,
+        max_rows=args.max_rows,
+        deadline_seconds=args.deadline,
+        outage=args.outage,
+        cascade=args.cascade,
+        unsure_rate=args.unsure_rate,
+        near_duplicates=args.near_duplicates,
+        output_dir=args.output_dir,
+    )
+    report = run_benchmark(config)
+    report_path = Path(config.output_dir) / "pipeline_benchmark.json"
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(format_report(report))
+    print(f"\n💾 Report saved to: {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,181 @@
+"""
+Micro-benchmark: SEO before/after comparison metrics.
+
+Compares the previous implementation (one regex scan of the whole listing per
+keyword per content version via ``extract_keywords_from_content``, and a new
+``set(...)`` of the found list per phrase in every comprehension) with
+``comparison_engine.calculate_comparison_metrics`` on a synthetic keyword set.
+
+Usage (from ``backend/``):
+    python -m benchmarks.seo_comparison_benchmark
+    python -m benchmarks.seo_comparison_benchmark --keywords 5000 --repeat 5
+"""
+
+import argparse
+import json
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.local_agents.seo.comparison_engine import calculate_comparison_metrics
+from app.local_agents.seo.helper_methods import extract_keywords_from_content
+
+logger = logging.getLogger(__name__)
+
+WORDS = (
+    "makeup sponge sponges blender beauty foundation latex free soft blending puff powder "
+    "liquid cream concealer applicator egg set pack pink black reusable washable travel "
+    "case holder face cosmetic tool kit women girls professional wet dry flawless finish "
+    "contour highlighter primer setting mini large teardrop hourglass microfiber velvet"
+).split()
+
+
+@dataclass
+class ComparisonBenchmarkConfig:
+    """Inputs for one micro-benchmark run."""
+    keywords: int = 2000
+    high_intent_share: float = 0.2
+    repeat: int = 3
+    seed: int = 7
+
+
+def synthetic_inputs(config: ComparisonBenchmarkConfig) -> Tuple[Tuple, Tuple, Dict[str, Any]]:
+    """Listing content before/after and keyword data with ``config.keywords`` phrases."""
+    rng = random.Random(config.seed)
+    phrases, seen = [], set()
+    while len(phrases) < config.keywords:
+        phrase = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        if rng.random() < 0.05:
+            phrase = phrase.replace(" ", "-", 1)
+        if phrase not in seen:
+            seen.add(phrase)
+            phrases.append(phrase)
+
+    items = [{"phrase": p, "search_volume": rng.randint(10, 20000), "intent_score": rng.randint(0, 3)} for p in phrases]
+    high_intent = [it for it in items if rng.random() < config.high_intent_share]
+    keyword_data = {
+        "relevant_keywords": items[: len(items) // 2],
+        "design_keywords": items[len(items) // 2:],
+        "high_intent_keywords": high_intent,
+    }
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(n))
+
+    current = (sentence(25).title(), [sentence(40) + "." for _ in range(5)], sentence(30).split())
+    optimized = (sentence(30).title(), [sentence(45) + ", " + sentence(5) for _ in range(5)], sentence(35).split())
+    return current, optimized, keyword_data
+
+
+def legacy_comparison_metrics(current: Tuple, optimized: Tuple, keyword_data: Dict[str, Any]) -> Dict[str, Any]:
+    """The metrics as ``SEORunner._calculate_comparison_metrics`` computed them before the engine."""
+    all_keywords = keyword_data.get("relevant_keywords", []) + keyword_data.get("design_keywords", [])
+    phrases = [kw.get("phrase", "") for kw in all_keywords if kw.get("phrase")]
+    phrase_to_volume = {kw.get("phrase", ""): (kw.get("search_volume") or 0) for kw in all_keywords}
+    high_intent_phrases = [kw.get("phrase", "") for kw in keyword_data.get("high_intent_keywords", []) if kw.get("phrase")]
+
+    current_text = " ".join([current[0]] + current[1] + [" ".join(current[2])])
+    opt_text = " ".join([optimized[0]] + optimized[1] + [" ".join(optimized[2])])
+    current_found, _ = extract_keywords_from_content(current_text, phrases)
+    opt_found, _ = extract_keywords_from_content(opt_text, phrases)
+
+    total_kw = len(phrases)
+    before_pct = round((len(set(current_found)) / total_kw * 100), 2) if total_kw else 0.0
+    after_pct = round((len(set(opt_found)) / total_kw * 100), 2) if total_kw else 0.0
+    new_added = [p for p in set(opt_found) if p not in set(current_found)]
+    return {
+        "before_covered": len(set(current_found)),
+        "after_covered": len(set(opt_found)),
+        "before_coverage_pct": before_pct,
+        "after_coverage_pct": after_pct,
+        "new_keywords_added": sorted(new_added)[:20],
+        "before_hi_intent": len([p for p in high_intent_phrases if p in set(current_found)]),
+        "after_hi_intent": len([p for p in high_intent_phrases if p in set(opt_found)]),
+        "before_vol": sum(phrase_to_volume.get(p, 0) for p in set(current_found)),
+        "after_vol": sum(phrase_to_volume.get(p, 0) for p in set(opt_found)),
+    }
+
+
+def _engine_summary(current: Tuple, optimized: Tuple, keyword_data: Dict[str, Any]) -> Dict[str, Any]:
+    comparison = calculate_comparison_metrics(current, optimized, keyword_data)
+    coverage, intent, volume = comparison.coverage_improvement, comparison.intent_improvement, comparison.volume_improvement
+    return {
+        "before_covered": coverage["before_covered"],
+        "after_covered": coverage["after_covered"],
+        "before_coverage_pct": coverage["before_coverage_pct"],
+        "after_coverage_pct": coverage["after_coverage_pct"],
+        "new_keywords_added": coverage["new_keywords_added"],
+        "before_hi_intent": intent["before_covered"],
+        "after_hi_intent": intent["after_covered"],
+        "before_vol": volume["estimated_volume_before"],
+        "after_vol": volume["estimated_volume_after"],
+    }
+
+
+def _best_of(repeat: int, func, *args) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_comparison_benchmark(config: ComparisonBenchmarkConfig) -> Dict[str, Any]:
+    """
+    Time both implementations on the same inputs.
+
+    Returns:
+        Report with best-of-N seconds for each, the speedup and whether
+        both produced the same metrics
+    """
+    current, optimized, keyword_data = synthetic_inputs(config)
+
+    # extract_keywords_from_content logs every call at INFO; keep it out of the timings
+    extraction_logger = logging.getLogger("app.local_agents.seo.helper_methods")
+    saved_level = extraction_logger.level
+    extraction_logger.setLevel(logging.WARNING)
+    try:
+        legacy_s, legacy = _best_of(config.repeat, legacy_comparison_metrics, current, optimized, keyword_data)
+        engine_s, engine = _best_of(config.repeat, _engine_summary, current, optimized, keyword_data)
+    finally:
+        extraction_logger.setLevel(saved_level)
+
+    return {
+        "config": asdict(config),
+        "legacy_s": round(legacy_s, 4),
+        "engine_s": round(engine_s, 4),
+        "speedup": round(legacy_s / engine_s, 1) if engine_s > 0 else None,
+        "identical": legacy == engine,
+        "metrics": engine,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    metrics = report["metrics"]
+    return "\n".join([
+        f"keywords: {report['config']['keywords']}  "
+        f"(covered before/after: {metrics['before_covered']}/{metrics['after_covered']})",
+        f"{'legacy':<10}{report['legacy_s'] * 1000:>10.1f} ms",
+        f"{'engine':<10}{report['engine_s'] * 1000:>10.1f} ms",
+        f"speedup: {report['speedup']}x, identical metrics: {report['identical']}",
+    ])
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="SEO comparison metrics: legacy vs set-based engine")
+    parser.add_argument("--keywords", type=int, default=2000, help="Number of keyword phrases")
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run_comparison_benchmark(ComparisonBenchmarkConfig(keywords=args.keywords, repeat=args.repeat, seed=args.seed))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
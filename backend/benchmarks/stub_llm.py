@@ -0,0 +1,562 @@
+"""
+Deterministic stub LLM for offline pipeline runs.
+
+The pipeline's agents are module-level ``Agent`` objects bound to a model
+name and are run through ``Runner.run_sync`` deep inside the runners, so
+there is no ``RunConfig`` to hand a custom model provider to. Instead,
+``StubLLM.install()`` temporarily swaps every agent's ``model`` for a
+``StubModel`` (the public ``agents.models.interface.Model`` interface), which
+answers each call with a canned, schema-valid response built from the
+prompt itself and records call counts and payload sizes.
+
+Like the provider, the stub caches prompt prefixes: a prompt whose first
+1024+ tokens (system instructions, then input) match an earlier call's is
+billed those tokens as cached, in 128-token steps.
+"""
+
+import asyncio
+import hashlib
+import importlib
+import json
+import logging
+import random
+import re
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+import httpx
+import openai
+from agents import Agent, set_tracing_disabled
+from agents.items import ModelResponse
+from agents.models.interface import Model, ModelProvider
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+logger = logging.getLogger(__name__)
+
+# Rough bytes-per-token ratio used for usage accounting and simulated decode time
+BYTES_PER_TOKEN = 4
+
+# Provider prompt caching: prefixes from this many tokens, matched in blocks of this size
+PREFIX_CACHE_MIN_TOKENS = 1024
+PREFIX_CACHE_BLOCK_TOKENS = 128
+
+Responder = Callable[[str, Optional[Dict[str, Any]]], Any]
+
+
+@dataclass
+class StubCall:
+    """One model call (calls failed by an outage have no response bytes)."""
+    agent: str
+    prompt_bytes: int
+    response_bytes: int
+    delay_s: float
+    tier: str = "strong"  # "fast" for the cheap model of a cascade
+    cached_bytes: int = 0  # Prompt bytes served from the prefix cache
+
+
+# ----------------------------------------------------------------------------
+# Prompt helpers
+# ----------------------------------------------------------------------------
+
+def json_after(prompt: str, marker: str) -> Any:
+    """Decode the first JSON value that follows ``marker`` in ``prompt``."""
+    idx = prompt.find(marker)
+    if idx < 0:
+        return None
+    text = prompt[idx + len(marker):].lstrip()
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text)
+    except ValueError:
+        return None
+    return value
+
+
+def _line_value(prompt: str, pattern: str) -> str:
+    match = re.search(pattern, prompt)
+    return match.group(1).strip() if match else ""
+
+
+def example_from_schema(schema: Dict[str, Any], defs: Optional[Dict[str, Any]] = None) -> Any:
+    """Build the smallest instance that validates against a JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return example_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return example_from_schema(options[0], defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return {name: example_from_schema(props[name], defs) for name in schema.get("required", []) if name in props}
+    if kind == "array":
+        return []
+    if kind == "string":
+        return "stub"
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 0)
+    if kind == "boolean":
+        return False
+    return None
+
+
+# ----------------------------------------------------------------------------
+# Per-agent responders (keyed by Agent.name)
+# ----------------------------------------------------------------------------
+
+def _category_for_score(score: int) -> str:
+    if score >= 6:
+        return "Relevant"
+    if score >= 3:
+        return "Design-Specific"
+    return "Irrelevant"
+
+
+def _keyword_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    scores = json_after(prompt, "keyword->score (filtered to exclude score 0):") or {}
+    items: List[Dict[str, Any]] = []
+    stats: Dict[str, Dict[str, Any]] = {}
+    for phrase, score in scores.items():
+        category = _category_for_score(int(score or 0))
+        items.append({"phrase": phrase, "category": category, "relevancy_score": int(score or 0)})
+        bucket = stats.setdefault(category, {"count": 0, "examples": []})
+        bucket["count"] += 1
+        if len(bucket["examples"]) < 3:
+            bucket["examples"].append(phrase)
+    return {"product_context": {}, "items": items, "stats": stats}
+
+
+def _intent_scoring_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    items = json_after(prompt, "ITEMS (preserve order):") or []
+    scored = []
+    for item in items:
+        relevancy = int(item.get("relevancy_score") or 0)
+        scored.append({
+            "phrase": item.get("phrase", ""),
+            "category": item.get("category", ""),
+            "relevancy_score": relevancy,
+            "intent_score": min(3, relevancy // 3),
+        })
+    return scored
+
+
+def _root_extraction_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    from app.local_agents.keyword.subagents.root_extraction_agent import _create_fallback_root_analysis
+
+    keywords = json_after(prompt, "KEYWORDS TO ANALYZE:") or []
+    return _create_fallback_root_analysis(keywords)
+
+
+def _root_relevance_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    from app.local_agents.scoring.subagents.root_relevance_agent import _create_fallback_analysis
+
+    keywords = json_after(prompt, "KEYWORDS WITH ROOTS:") or []
+    return _create_fallback_analysis(keywords)
+
+
+def _broad_volume_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    from app.local_agents.scoring.subagents.broad_volume_agent import calculate_broad_volume_deterministic
+
+    items = json_after(prompt, "KEYWORDS:") or []
+    return calculate_broad_volume_deterministic(items)
+
+
+def _competitor_title_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    from app.local_agents.seo.subagents.competitor_title_analysis_agent import _create_fallback_analysis
+
+    product = json_after(prompt, "CURRENT PRODUCT:") or {}
+    competitors = json_after(prompt, "COMPETITOR ANALYSIS DATA:") or {}
+    return _create_fallback_analysis(
+        {"title": product.get("current_title", ""), **(product.get("product_context") or {})},
+        competitors.get("competitor_titles", []),
+        product.get("main_keyword_root") or "",
+        product.get("design_keyword_root") or "",
+    )
+
+
+def _amazon_compliance_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    product = json_after(prompt, "PRODUCT INFORMATION:") or {}
+    title = _line_value(prompt, r"CURRENT TITLE: ([^\n]*)") or product.get("current_title", "")
+    main_root = product.get("main_keyword_root", "")
+    design_root = product.get("design_keyword_root", "")
+    bullets = [b for b in product.get("current_bullets", []) if b] or [f"{main_root} {design_root}".strip()]
+    number = _line_value(prompt, r"BULLET NUMBER: (\d+)")
+    if number:  # Per-section prompt: one bullet, built from its own keywords
+        keywords = [kw.get("phrase", "") for kw in json_after(prompt, "KEYWORD DATA (THIS BULLET'S KEYWORDS):") or []]
+        base = bullets[(int(number) - 1) % len(bullets)]
+        content = f"{base} - {', '.join(keywords)}" if keywords else base
+        return {
+            "content": content,
+            "character_count": len(content),
+            "primary_benefit": _line_value(prompt, r"BULLET FOCUS: ([^\n]*)"),
+            "keywords_included": keywords,
+            "guideline_compliance": "PASS",
+        }
+    optimized_title = {
+        "content": title,
+        "first_80_chars": title[:80],
+        "main_root_included": bool(main_root) and main_root.lower() in title.lower(),
+        "design_root_included": bool(design_root) and design_root.lower() in title.lower(),
+        "key_benefit_included": True,
+        "character_count": len(title),
+        "keywords_included": [k for k in (main_root, design_root) if k],
+    }
+    if "KEYWORD DATA (TITLE KEYWORDS" in prompt:  # Per-section prompt: the title only, with its top 3 keywords added
+        for kw in (json_after(prompt, "KEYWORD DATA (TITLE KEYWORDS, SORTED BY VOLUME):") or [])[:3]:
+            phrase = kw.get("phrase", "").title()
+            if phrase and phrase.lower() not in title.lower() and len(title) + len(phrase) + 3 <= 200:
+                title = f"{title} | {phrase}"
+        optimized_title.update(content=title, first_80_chars=title[:80], character_count=len(title))
+        return {"optimized_title": optimized_title}
+    return {
+        "optimized_title": optimized_title,
+        "optimized_bullets": [
+            {
+                "content": bullet,
+                "character_count": len(bullet),
+                "primary_benefit": "",
+                "keywords_included": [k for k in (main_root, design_root) if k],
+                "guideline_compliance": "PASS",
+            }
+            for bullet in bullets
+        ],
+        "strategy": {
+            "first_80_optimization": "Replayed current listing",
+            "keyword_integration": "Unchanged",
+            "compliance_approach": "Offline stub response",
+        },
+    }
+
+
+def _opportunity_agent(prompt: str, schema: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    payload = json_after(prompt, "") or {}
+    flags = [
+        {"phrase": it["phrase"], "opportunity_decision": "Opportunity", "opportunity_reason": "Zero title density"}
+        for it in payload.get("items", [])
+        if it.get("title_density") == 0 and (it.get("search_volume") or 0) >= 100
+    ]
+    return {"items": flags}
+
+
+DEFAULT_RESPONDERS: Dict[str, Responder] = {
+    "KeywordAgent": _keyword_agent,
+    "IntentScoringSubagent": _intent_scoring_agent,
+    "RootExtractionAgent": _root_extraction_agent,
+    "RootRelevanceAgent": _root_relevance_agent,
+    "BroadVolumeSubagent": _broad_volume_agent,
+    "CompetitorTitleAnalysisAgent": _competitor_title_agent,
+    "AmazonComplianceAgent": _amazon_compliance_agent,
+    "OpportunitySubagent": _opportunity_agent,
+}
+
+
+# ----------------------------------------------------------------------------
+# Model + provider
+# ----------------------------------------------------------------------------
+
+class StubLLM:
+    """
+    Deterministic LLM stand-in shared by every stubbed agent.
+
+    Args:
+        latency: Fixed seconds added to every call (simulated time to first token)
+        seconds_per_1k_output_tokens: Extra seconds per 1k estimated output tokens
+        responders: Overrides/additions to ``DEFAULT_RESPONDERS`` keyed by agent name
+        straggler_rate: Share of calls that take ``straggler_latency`` extra seconds
+        straggler_latency: Extra seconds for a straggler call
+        seed: Seed for picking stragglers
+        outage: Fail every call with a connection error after ``latency``, like
+            an unreachable API
+        fast_latency_factor: Latency of a ``fast_model()`` call relative to a normal one
+        unsure_rate: Share of items (or calls) a ``fast_model()`` answers with low confidence
+        seconds_per_1k_input_tokens: Extra seconds per 1k uncached input tokens (prefill)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        seconds_per_1k_output_tokens: float = 0.0,
+        responders: Optional[Dict[str, Responder]] = None,
+        straggler_rate: float = 0.0,
+        straggler_latency: float = 0.0,
+        seed: Optional[int] = 0,
+        outage: bool = False,
+        fast_latency_factor: float = 0.4,
+        unsure_rate: float = 0.0,
+        seconds_per_1k_input_tokens: float = 0.0,
+    ):
+        self.latency = latency
+        self.seconds_per_1k_output_tokens = seconds_per_1k_output_tokens
+        self.responders = {**DEFAULT_RESPONDERS, **(responders or {})}
+        self.straggler_rate = straggler_rate
+        self.straggler_latency = straggler_latency
+        self._random = random.Random(seed)
+        self.outage = outage
+        self.fast_latency_factor = fast_latency_factor
+        self.unsure_rate = unsure_rate
+        self.seconds_per_1k_input_tokens = seconds_per_1k_input_tokens
+        self._prefixes: set = set()
+        self.calls: List[StubCall] = []
+        self._lock = threading.Lock()
+
+    def respond(self, agent_name: str, prompt: str, output_schema: Optional[Dict[str, Any]], tier: str = "strong") -> str:
+        """Produce the response text for one call (no latency, no accounting)."""
+        responder = self.responders.get(agent_name)
+        if responder is not None:
+            payload = responder(prompt, output_schema)
+        elif output_schema is not None:
+            payload = example_from_schema(output_schema)
+        else:
+            payload = {}
+        only = json_after(prompt, "containing just these items:")
+        if isinstance(only, list):
+            # A cascade escalating some items asks only for those
+            self._keep_items(payload, set(only))
+        if tier == "fast":
+            self._add_confidence(payload, prompt)
+        return payload if isinstance(payload, str) else json.dumps(payload, separators=(",", ":"))
+
+    @staticmethod
+    def _keep_items(payload: Any, phrases: set) -> None:
+        items = payload.get("items") if isinstance(payload, dict) else payload
+        if isinstance(items, list):
+            items[:] = [item for item in items if isinstance(item, dict) and item.get("phrase") in phrases]
+
+    def _unsure(self, key: str) -> bool:
+        # Hash-based, so the same item is unsure in every run
+        return zlib.crc32(key.encode("utf-8")) / 2 ** 32 < self.unsure_rate
+
+    def _add_confidence(self, payload: Any, prompt: str) -> None:
+        """Mark each item (or the whole answer) with the confidence a cascade asks for."""
+        items = payload.get("items") if isinstance(payload, dict) else payload
+        if isinstance(items, list):
+            for item in items:
+                if isinstance(item, dict):
+                    item["confidence"] = 0.3 if self._unsure(str(item.get("phrase", ""))) else 0.95
+        elif isinstance(payload, dict):
+            payload["confidence"] = 0.3 if self._unsure(prompt) else 0.95
+
+    def fast_model(self, agent_name: str) -> "StubModel":
+        """Cheap-tier model for ``agent_name``: same answers, with confidences, at lower latency."""
+        return StubModel(self, agent_name, tier="fast")
+
+    def cached_prefix_bytes(self, key: str, prompt: bytes) -> int:
+        """Bytes of ``prompt`` served from the prefix cache of ``key``; caches the prompt's prefixes."""
+        block = PREFIX_CACHE_BLOCK_TOKENS * BYTES_PER_TOKEN
+        minimum = PREFIX_CACHE_MIN_TOKENS * BYTES_PER_TOKEN
+        digest = hashlib.sha1(key.encode("utf-8"))
+        cached = 0
+        prefixes = []
+        for end in range(block, len(prompt) + 1, block):
+            digest.update(prompt[end - block:end])
+            if end >= minimum:
+                prefixes.append((end, digest.hexdigest()))
+        with self._lock:
+            for end, prefix in prefixes:
+                if prefix in self._prefixes:
+                    cached = end
+            self._prefixes.update(prefix for _, prefix in prefixes)
+        return cached
+
+    def delay_for(self, response_text: str, tier: str = "strong", uncached_input_tokens: int = 0) -> float:
+        output_tokens = len(response_text.encode("utf-8")) / BYTES_PER_TOKEN
+        delay = self.latency + self.seconds_per_1k_output_tokens * output_tokens / 1000
+        delay += self.seconds_per_1k_input_tokens * uncached_input_tokens / 1000
+        if tier == "fast":
+            delay *= self.fast_latency_factor
+        if self.straggler_rate > 0:
+            with self._lock:
+                straggler = self._random.random() < self.straggler_rate
+            if straggler:
+                delay += self.straggler_latency
+        return delay
+
+    def record(self, call: StubCall) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-agent call counts and payload sizes."""
+        with self._lock:
+            calls = list(self.calls)
+        per_agent: Dict[str, Dict[str, Any]] = defaultdict(
+            lambda: {"calls": 0, "prompt_bytes": 0, "cached_prompt_bytes": 0, "response_bytes": 0, "simulated_latency_s": 0.0}
+        )
+        for call in calls:
+            entry = per_agent[call.agent]
+            entry["calls"] += 1
+            entry["prompt_bytes"] += call.prompt_bytes
+            entry["cached_prompt_bytes"] += call.cached_bytes
+            entry["response_bytes"] += call.response_bytes
+            entry["simulated_latency_s"] = round(entry["simulated_latency_s"] + call.delay_s, 6)
+        return dict(per_agent)
+
+    def tier_stats(self) -> Dict[str, Dict[str, int]]:
+        """Call and estimated token counts per model tier."""
+        with self._lock:
+            calls = list(self.calls)
+        per_tier: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"calls": 0, "input_tokens": 0, "cached_input_tokens": 0, "output_tokens": 0}
+        )
+        for call in calls:
+            entry = per_tier[call.tier]
+            entry["calls"] += 1
+            entry["input_tokens"] += call.prompt_bytes // BYTES_PER_TOKEN
+            entry["cached_input_tokens"] += call.cached_bytes // BYTES_PER_TOKEN
+            entry["output_tokens"] += call.response_bytes // BYTES_PER_TOKEN
+        return dict(per_tier)
+
+    @contextmanager
+    def install(self, package: str = "app.local_agents") -> Iterator["StubLLM"]:
+        """
+        Point every module-level ``Agent`` under ``package`` at this stub.
+
+        Tracing is disabled for the duration so nothing is exported to OpenAI.
+        """
+        swapped = []
+        for agent in discover_agents(package):
+            swapped.append((agent, agent.model))
+            agent.model = StubModel(self, agent.name)
+        set_tracing_disabled(True)
+        logger.info(f"🧪 [StubLLM] Installed stub model on {len(swapped)} agents")
+        try:
+            yield self
+        finally:
+            for agent, model in swapped:
+                agent.model = model
+            set_tracing_disabled(False)
+
+
+class StubModel(Model):
+    """``Model`` implementation that answers through a ``StubLLM``."""
+
+    def __init__(self, llm: StubLLM, agent_name: str, tier: str = "strong"):
+        self.llm = llm
+        self.agent_name = agent_name
+        self.tier = tier
+
+    async def get_response(
+        self,
+        system_instructions,
+        input,
+        model_settings,
+        tools,
+        output_schema,
+        handoffs,
+        tracing,
+        *,
+        previous_response_id=None,
+        conversation_id=None,
+        prompt=None,
+    ) -> ModelResponse:
+        prompt_text = input_text(input)
+        if self.llm.outage:
+            if self.llm.latency > 0:
+                await asyncio.sleep(self.llm.latency)
+            self.llm.record(StubCall(self.agent_name, len(prompt_text.encode("utf-8")), 0, self.llm.latency, self.tier))
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/responses"))
+        schema = None
+        if output_schema is not None and not output_schema.is_plain_text():
+            schema = output_schema.json_schema()
+        text = self.llm.respond(self.agent_name, prompt_text, schema, self.tier)
+
+        prompt = (system_instructions or "").encode("utf-8") + prompt_text.encode("utf-8")
+        prompt_bytes = len(prompt)
+        cached_bytes = self.llm.cached_prefix_bytes(self.tier, prompt)
+        response_bytes = len(text.encode("utf-8"))
+        delay = self.llm.delay_for(text, self.tier, (prompt_bytes - cached_bytes) // BYTES_PER_TOKEN)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.llm.record(StubCall(self.agent_name, prompt_bytes, response_bytes, delay, self.tier, cached_bytes))
+
+        input_tokens = prompt_bytes // BYTES_PER_TOKEN
+        output_tokens = response_bytes // BYTES_PER_TOKEN
+        message = ResponseOutputMessage(
+            id=f"msg_stub_{len(self.llm.calls)}",
+            content=[ResponseOutputText(annotations=[], text=text, type="output_text")],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+        usage = Usage(
+            requests=1,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=input_tokens + output_tokens,
+        )
+        usage.input_tokens_details = usage.input_tokens_details.model_copy(
+            update={"cached_tokens": cached_bytes // BYTES_PER_TOKEN}
+        )
+        return ModelResponse(output=[message], usage=usage, response_id=None)
+
+    def stream_response(self, *args, **kwargs) -> AsyncIterator[Any]:
+        raise NotImplementedError("StubModel does not support streaming")
+
+
+class StubModelProvider(ModelProvider):
+    """``ModelProvider`` for callers that can pass a ``RunConfig``."""
+
+    def __init__(self, llm: StubLLM):
+        self.llm = llm
+
+    def get_model(self, model_name: Optional[str]) -> Model:
+        return StubModel(self.llm, model_name or "default")
+
+
+def input_text(input: Any) -> str:
+    """Flatten SDK input items back into the prompt text the runner passed in."""
+    if isinstance(input, str):
+        return input
+    parts = []
+    for item in input:
+        content = item.get("content") if isinstance(item, dict) else None
+        if isinstance(content, str):
+            parts.append(content)
+        elif isinstance(content, list):
+            parts.extend(c.get("text", "") for c in content if isinstance(c, dict))
+        else:
+            parts.append(json.dumps(item, default=str))
+    return "\n".join(parts)
+
+
+def discover_agents(package: str) -> List[Agent]:
+    """Import every module under ``package`` and collect module-level agents."""
+    root = importlib.import_module(package)
+    modules = [root]
+    # Walk the filesystem rather than pkgutil: some subagent folders have no __init__.py
+    for base in root.__path__:
+        for path in sorted(Path(base).rglob("*.py")):
+            rel = path.relative_to(base).with_suffix("")
+            if "__pycache__" in rel.parts or rel.name == "__init__" and not rel.parent.parts:
+                continue
+            parts = rel.parent.parts if rel.name == "__init__" else rel.parts
+            name = ".".join((package, *parts))
+            try:
+                modules.append(importlib.import_module(name))
+            except Exception as e:
+                logger.debug(f"[StubLLM] Skipping {name}: {e}")
+
+    seen: Dict[int, Agent] = {}
+    for module in modules:
+        for value in vars(module).values():
+            if isinstance(value, Agent):
+                seen.setdefault(id(value), value)
+    return list(seen.values())
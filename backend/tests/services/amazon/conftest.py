@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+PRODUCT_URL = "https://www.amazon.com/dp/B08KT2Z93D"
+
+# Recommendation carousel card, repeated to bring the saved page up to the size of a live
+# product page (~1.5 MB, ~30k nodes) without committing a multi-megabyte fixture.
+_CAROUSEL_CARD = (
+    '<div class="a-carousel-card"><div class="p13n-sc-uncoverable-faceout">'
+    '<a class="a-link-normal" href="/dp/B0{i:08d}"><img alt="Related item {i}" '
+    'src="https://m.media-amazon.com/images/I/41abc{i}._AC_SR160_.jpg">'
+    '<span class="a-size-small">Related snack product number {i} with a long descriptive title</span></a>'
+    '<div class="a-row"><i class="a-icon a-icon-star-small"><span class="a-icon-alt">4.4 out of 5 stars</span></i>'
+    '<span class="a-size-small">2,345</span></div>'
+    '<span class="a-price"><span class="a-offscreen">$12.{cents:02d}</span></span></div></div>'
+    '<script>P.when("A").execute(function(){{ var x{i} = {{"k":"{i}"}}; }});</script>\n'
+)
+
+
+@pytest.fixture(scope="session")
+def product_html() -> str:
+    """Saved product detail page covering every section the scraper extracts."""
+    return (FIXTURES_DIR / "product_page.html").read_text(encoding="utf-8")
+
+
+@pytest.fixture(scope="session")
+def large_product_html(product_html: str) -> str:
+    """The saved page padded with recommendation carousels to live-page size."""
+    padding = "".join(_CAROUSEL_CARD.format(i=i, cents=i % 100) for i in range(2500))
+    return product_html.replace('<div id="navFooter">', padding + '<div id="navFooter">')
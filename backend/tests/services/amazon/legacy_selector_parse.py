@@ -0,0 +1,341 @@
+"""
+Reference copy of the selector-based ``AmazonScraperSpider.parse``.
+
+Kept only for tests: the equivalence test checks that
+``app.services.amazon.extractor`` produces field-for-field identical output,
+and the benchmark uses it as the "before" measurement.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from typing import Optional, Dict, Any, List, Tuple
+
+import scrapy
+
+from app.services.amazon.extractor import (
+    _clean_text,
+    _kv_from_rows,
+    _normalize_image_url,
+    _parse_dynamic_image_json,
+    _parse_price_value,
+    _parse_srcset,
+)
+
+
+def _texts(sel: scrapy.SelectorList) -> List[str]:
+    """Extract visible text only (skip script/style/noscript)."""
+    raw = sel.css("*:not(script):not(style):not(noscript)::text").getall()
+    cleaned = [_clean_text(t) for t in raw]
+    # Drop empties and lone punctuation/markers
+    cleaned = [t for t in cleaned if t and not re.fullmatch(r"[*:/.()-]+", t)]
+    return cleaned
+
+
+def _pick_price_text(response: scrapy.http.Response) -> Tuple[str, str, str]:
+    """Return (source, text, html) for the first found price, else ('', '', '')."""
+    candidates = [
+        ("apex_offscreen", "#apex_desktop span.a-price span.a-offscreen"),
+        ("core_offscreen", "#corePrice_feature_div span.a-price span.a-offscreen"),
+        ("tp_total", "#tp_price_block_total_price_ww span.a-offscreen"),
+        ("ourprice", "#priceblock_ourprice"),
+        ("dealprice", "#priceblock_dealprice"),
+        ("saleprice", "#priceblock_saleprice"),
+        ("generic_offscreen", "span.a-price span.a-offscreen"),
+    ]
+    for name, css in candidates:
+        sel = response.css(css)
+        txt = _clean_text(" ".join(sel.css("::text").getall()))
+        if txt:
+            return name, txt, sel.get() or ""
+    return "", "", ""
+
+
+def legacy_parse(response: scrapy.http.Response) -> Dict[str, Any]:
+    """The pre-extractor ``AmazonScraperSpider.parse``, returning ``scraped`` instead of storing it."""
+    html_len = len(response.text)
+    has_captcha = "captcha" in response.text.lower()
+    if response.status in (403, 503) or has_captcha or html_len < 5000:
+        return {
+            "success": False,
+            "error": "Blocked or insufficient content",
+            "blocked_reason": f"status:{response.status}, size:{html_len}, captcha:{has_captcha}",
+        }
+
+    include_html = os.getenv("ID_ONLY_INCLUDE_HTML", "0").lower() in {"1", "true", "yes"}
+
+    out: Dict[str, Any] = {
+        "url": response.url,
+        "status": response.status,
+        "response_size": html_len,
+        "elements": {},
+    }
+
+    # productTitle
+    title_sel = response.css("#productTitle")
+    title_text = _clean_text(" ".join(title_sel.css("::text").getall()))
+    elem: Dict[str, Any] = {"present": bool(title_text), "text": [title_text] if title_text else []}
+    if include_html:
+        elem["html"] = title_sel.get() or ""
+    out["elements"]["productTitle"] = elem
+
+    # productOverview_feature_div -> table rows as key/value
+    pov_rows: List[Tuple[str, str]] = []
+    for tr in response.css("#productOverview_feature_div table tr"):
+        # labels can be in first td or bold span
+        label = _clean_text(" ".join(tr.css("td:first-child ::text, th:first-child ::text, .a-text-bold::text").getall()))
+        value = _clean_text(" ".join(tr.css("td:nth-child(2) ::text, td:last-child ::text, span.po-break-word::text").getall()))
+        if label and value:
+            pov_rows.append((label, value))
+    # Avoid duplicating the same data as both kv and rows; keep kv only
+    elem = {
+        "present": bool(pov_rows),
+        "kv": _kv_from_rows(pov_rows),
+    }
+    if include_html:
+        elem["html"] = response.css("#productOverview_feature_div").get() or ""
+    out["elements"]["productOverview_feature_div"] = elem
+
+    # feature-bullets -> only the bullet items
+    fb_sel = response.css("#feature-bullets")
+    bullets = [
+        _clean_text(t)
+        for t in fb_sel.css("ul li .a-list-item::text, ul li span::text, ul li::text").getall()
+    ]
+    bullets = [
+        b for b in bullets
+        if b and b.lower() not in {"about this item", "see more product details"}
+    ]
+    # Dedupe while preserving order
+    seen_fb = set()
+    bullets = [x for x in bullets if not (x in seen_fb or seen_fb.add(x))]
+    elem = {"present": bool(bullets), "bullets": bullets}
+    if include_html:
+        elem["html"] = fb_sel.get() or ""
+    out["elements"]["feature-bullets"] = elem
+
+    # productDescription -> paragraphs only
+    pd_sel = response.css("#productDescription")
+    paragraphs = [_clean_text(p) for p in pd_sel.css("p::text, p *::text").getall()]
+    paragraphs = [p for p in paragraphs if p]
+    # Deduplicate while preserving order
+    seen = set()
+    paragraphs = [x for x in paragraphs if not (x in seen or seen.add(x))]
+    elem = {"present": bool(paragraphs), "paragraphs": paragraphs}
+    if include_html:
+        elem["html"] = pd_sel.get() or ""
+    out["elements"]["productDescription"] = elem
+
+    # prodDetails -> restrict to tech spec and detail bullets tables
+    tech_rows: List[Tuple[str, str]] = []
+    for tr in response.css("#prodDetails table#productDetails_techSpec_section_1 tr"):
+        k = _clean_text(" ".join(tr.css("th::text, th *::text").getall()))
+        v = _clean_text(" ".join(tr.css("td::text, td *::text").getall()))
+        if k and v:
+            tech_rows.append((k, v))
+
+    add_rows: List[Tuple[str, str]] = []
+    for tr in response.css("#prodDetails table#productDetails_detailBullets_sections1 tr"):
+        k = _clean_text(" ".join(tr.css("th::text, th *::text").getall()))
+        v = _clean_text(" ".join(tr.css("td::text, td *::text").getall()))
+        if k and v:
+            add_rows.append((k, v))
+
+    elem = {
+        "present": bool(tech_rows or add_rows),
+        "tech_specs": _kv_from_rows(tech_rows),
+        "additional_info": _kv_from_rows(add_rows),
+    }
+    if include_html:
+        elem["html"] = response.css("#prodDetails").get() or ""
+    out["elements"]["prodDetails"] = elem
+
+    # detailBullets_feature_div -> bullets as key/value when possible
+    db_sel = response.css("#detailBullets_feature_div")
+    db_kv: Dict[str, str] = {}
+    for li in db_sel.css("li"):
+        label = _clean_text(" ".join(li.css("span.a-text-bold::text").getall())).rstrip(":")
+        value = _clean_text(" ".join(li.css("span:not(.a-text-bold)::text, a::text").getall()))
+        if label and value:
+            db_kv[label] = value
+    # Clean noisy Customer Reviews values (strip inline JS fragments and condense)
+    for k in list(db_kv.keys()):
+        if "customer reviews" in k.lower():
+            v = db_kv[k]
+            rating_match = re.search(r"([0-9.]+)\s+out of 5 stars", v, re.I)
+            count_match = re.search(r"([0-9,]+)\s+ratings?", v, re.I)
+            parts: List[str] = []
+            if rating_match:
+                parts.append(f"{rating_match.group(1)} out of 5 stars")
+            if count_match:
+                parts.append(f"{count_match.group(1)} ratings")
+            if parts:
+                db_kv[k] = " ".join(parts)
+            else:
+                db_kv[k] = _clean_text(v)[:200]
+    elem = {"present": bool(db_kv), "kv": db_kv}
+    if include_html:
+        elem["html"] = db_sel.get() or ""
+    out["elements"]["detailBullets_feature_div"] = elem
+
+    # images -> aggregate hero + all thumbnails (dynamic JSON, hires, srcset, src/data-src)
+    def _collect_image_urls(resp: scrapy.http.Response) -> List[str]:
+        urls: List[str] = []
+        seen: set[str] = set()
+
+        def _upgrade_amazon_image(u: str) -> str:
+            """Upgrade Amazon thumbnail to hi-res by stripping sizing tokens like ._SS40_, ._AC_US40_, etc."""
+            try:
+                if not u:
+                    return u
+                u = _normalize_image_url(u)
+                # Only process Amazon media hosts
+                if not re.search(r"\b(m\.media-amazon\.com|images-na\.ssl-images-amazon\.com)\b", u):
+                    return u
+                # Example: https://m.media-amazon.com/images/I/51GKBz7WVYL._AC_US40_.jpg -> .../I/51GKBz7WVYL.jpg
+                m = re.match(r"^(https?://[^\s]+/images/[^/]+/[^./]+)(\._[^.]+_)?\.(jpg|jpeg|png|webp)$", u, re.I)
+                if m:
+                    return f"{m.group(1)}.{m.group(3)}"
+                # Fallback: remove any ._TOKEN_ just before extension
+                return re.sub(r"\._[^./]+_(\.[a-zA-Z0-9]+)$", r"\\1", u)
+            except Exception:
+                return u
+
+        def _is_product_image(u: str) -> bool:
+            """Filter out sprites/icons/overlays and non-product resources."""
+            if not u:
+                return False
+            lower = u.lower()
+            # Exclude graphics folders and overlays/icons
+            noisy_markers = [
+                "/images/g/", "/g/", "play-icon", "overlay", "sprite", "icon_", "360_icon", "placeholder",
+            ]
+            if any(marker in lower for marker in noisy_markers):
+                return False
+            # Must be an image extension
+            if not re.search(r"\.(jpg|jpeg|png|webp)$", lower):
+                return False
+            return True
+
+        def add(u: Optional[str]):
+            if not u:
+                return
+            abs_u = resp.urljoin(u)
+            upgraded = _upgrade_amazon_image(abs_u)
+            if not _is_product_image(upgraded):
+                return
+            norm = _normalize_image_url(upgraded)
+            if norm and norm not in seen:
+                seen.add(norm)
+                urls.append(norm)
+
+        # Hero image variations
+        for u in _parse_dynamic_image_json(resp.css("#landingImage::attr(data-a-dynamic-image)").get()):
+            add(u)
+        add(resp.css("#landingImage::attr(data-old-hires)").get())
+        for u in _parse_srcset(resp.css("#landingImage::attr(srcset)").get()):
+            add(u)
+
+        # Thumbnails: try dynamic JSON first for each thumb, then hi-res/srcset, then src/data-src
+        thumb_selectors = ["#altImages img", "#imageBlockThumbs img"]
+        for sel in thumb_selectors:
+            # data-a-dynamic-image can contain multiple size URLs for each thumb
+            for dyn in resp.css(f"{sel}::attr(data-a-dynamic-image)").getall():
+                for u in _parse_dynamic_image_json(dyn):
+                    add(u)
+            # data-old-hires on some thumbs
+            for u in resp.css(f"{sel}::attr(data-old-hires)").getall():
+                add(u)
+            # srcset for thumbs
+            for srcset in resp.css(f"{sel}::attr(srcset)").getall():
+                for u in _parse_srcset(srcset):
+                    add(u)
+            # fallback to src/data-src (may be small, but better than missing)
+            for u in resp.css(f"{sel}::attr(data-src), {sel}::attr(src)").getall():
+                add(u)
+
+        return urls
+
+    image_urls = _collect_image_urls(response)
+    out["images"] = {
+        "present": bool(image_urls),
+        "main_image": image_urls[0] if image_urls else "",
+        "all_images": image_urls,
+        "image_count": len(image_urls),
+    }
+
+    # aplus -> only headings and paragraph/list text
+    aplus_sel = response.css("#aplus")
+    headings = _texts(aplus_sel.css("h1, h2, h3, h4"))
+    paras = _texts(aplus_sel.css("p"))
+    list_items = _texts(aplus_sel.css("li"))
+    # Dedupe while preserving order
+    def _uniq(seq: List[str]) -> List[str]:
+        seen: set[str] = set()
+        return [x for x in seq if not (x in seen or seen.add(x))]
+    headings = _uniq(headings)
+    paras = _uniq(paras)
+    list_items = _uniq(list_items)
+    # Limit sizes to avoid bloat
+    max_items = int(os.getenv("ID_ONLY_MAX_APLUS_ITEMS", "50"))
+    elem = {
+        "present": bool(headings or paras or list_items),
+        "headings": headings[:max_items],
+        "paragraphs": paras[:max_items],
+        "list_items": list_items[:max_items],
+    }
+    if include_html:
+        elem["html"] = aplus_sel.get() or ""
+    out["elements"]["aplus"] = elem
+
+    # Also expose a tiny title helper for quick sanity checks
+    out["title"] = title_text
+
+    # reviews -> sample review texts + rating/highlights
+    review_texts = [
+        _clean_text(t)
+        for t in response.css("#cm-cr-dp-review-list .review-text-content span::text").getall()[:5]
+        if _clean_text(t)
+    ]
+    rating_text = _clean_text(
+        response.css("#acrPopover::attr(title), [data-hook='rating-out-of-text']::text").get()
+    )
+    review_count = _clean_text(response.css("#acrCustomerReviewText::text").get())
+    out["reviews"] = {
+        "present": bool(review_texts or rating_text or review_count),
+        "sample_reviews": review_texts,
+        "review_highlights": [rating_text, review_count],
+    }
+
+    # Q&A section -> inline questions if present (no follow-up request to keep it minimal)
+    qa_pairs: List[Dict[str, str]] = []
+    qa_block = response.css("#ask-btf_feature_div")
+    if qa_block:
+        qs = [
+            _clean_text(q)
+            for q in qa_block.css("span::text, a::text").getall()[:5]
+            if _clean_text(q)
+        ]
+        qa_pairs = [{"q": q, "a": ""} for q in qs]
+    out["qa_section"] = {
+        "present": bool(qa_pairs),
+        "qa_pairs": qa_pairs,
+        "questions": [q.get("q") for q in qa_pairs],
+    }
+
+    # Extract price (lean): amount, currency, raw, source
+    src, raw_price, price_html = _pick_price_text(response)
+    amount, currency = _parse_price_value(raw_price)
+    price_obj: Dict[str, Any] = {
+        "present": bool(raw_price),
+        "raw": raw_price if raw_price else "",
+        "amount": amount,
+        "currency": currency,
+        "source": src,
+    }
+    if include_html:
+        price_obj["html"] = price_html
+    out["price"] = price_obj
+
+    return {"success": True, "data": out}
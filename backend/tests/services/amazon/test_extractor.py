@@ -0,0 +1,98 @@
+import pytest
+from scrapy.http import HtmlResponse
+
+from app.services.amazon.extractor import extract_product_page
+from app.services.amazon.scraper import AmazonScraperSpider
+from tests.services.amazon.conftest import PRODUCT_URL
+from tests.services.amazon.legacy_selector_parse import legacy_parse
+
+
+def _response(html: str, status: int = 200) -> HtmlResponse:
+    return HtmlResponse(url=PRODUCT_URL, body=html.encode("utf-8"), encoding="utf-8", status=status)
+
+
+def _assert_same_as_selector_parse(html: str, status: int = 200):
+    expected = legacy_parse(_response(html, status))
+    actual = extract_product_page(_response(html, status).text, PRODUCT_URL, status)
+    assert actual == expected
+    return actual
+
+
+@pytest.mark.parametrize("include_html", ["0", "1"])
+def test_extractor_matches_selector_parse(product_html, monkeypatch, include_html):
+    monkeypatch.setenv("ID_ONLY_INCLUDE_HTML", include_html)
+    result = _assert_same_as_selector_parse(product_html)
+    data = result["data"]
+    assert data["title"].startswith("BREWER Bulk Freeze Dried Strawberries")
+    assert len(data["elements"]["feature-bullets"]["bullets"]) == 4
+    assert data["images"]["main_image"] == "https://m.media-amazon.com/images/I/71Xr0wCz4TL.jpg"
+    assert data["price"]["source"] == "apex_offscreen"
+    assert data["reviews"]["review_highlights"] == ["4.5 out of 5 stars", "1,234 ratings"]
+
+
+def test_extractor_matches_on_live_size_page(large_product_html):
+    _assert_same_as_selector_parse(large_product_html)
+
+
+def test_extractor_price_falls_back_to_generic_offscreen(product_html):
+    html = product_html.replace('id="apex_desktop"', 'id="apex_removed"')
+    result = _assert_same_as_selector_parse(html)
+    assert result["data"]["price"]["source"] == "generic_offscreen"
+
+
+def test_extractor_rating_from_data_hook(product_html):
+    html = product_html.replace('title="4.5 out of 5 stars"', "")
+    result = _assert_same_as_selector_parse(html)
+    assert result["data"]["reviews"]["review_highlights"][0] == "4.5 out of 5"
+
+
+@pytest.mark.parametrize("max_items", ["0", "1", "2", "-1"])
+def test_extractor_aplus_cap(product_html, monkeypatch, max_items):
+    monkeypatch.setenv("ID_ONLY_MAX_APLUS_ITEMS", max_items)
+    _assert_same_as_selector_parse(product_html)
+
+
+@pytest.mark.parametrize(
+    "mutate, status",
+    [
+        (lambda html: html.replace("</body>", "<p>Enter the characters you see below (CAPTCHA)</p></body>"), 200),
+        (lambda html: html, 503),
+        (lambda html: html[:4000], 200),
+    ],
+)
+def test_extractor_blocked_pages(product_html, mutate, status):
+    result = _assert_same_as_selector_parse(mutate(product_html), status)
+    assert result["success"] is False
+
+
+def test_spider_parse_uses_extractor(product_html):
+    spider = AmazonScraperSpider(url=PRODUCT_URL)
+    spider.parse(_response(product_html))
+    assert spider.scraped == extract_product_page(product_html, PRODUCT_URL, 200)
+
+
+def test_competitor_profile_keeps_only_research_fields(product_html):
+    full = extract_product_page(product_html, PRODUCT_URL, 200)["data"]
+    lean = extract_product_page(product_html, PRODUCT_URL, 200, profile="competitor")["data"]
+
+    assert set(lean["elements"]) == {"productTitle", "feature-bullets", "detailBullets_feature_div"}
+    assert "images" not in lean and "qa_section" not in lean
+    assert lean["title"] == full["title"]
+    assert lean["price"] == full["price"]
+    assert lean["reviews"]["review_highlights"] == full["reviews"]["review_highlights"]
+    assert lean["reviews"]["sample_reviews"] == []
+    for name in lean["elements"]:
+        assert lean["elements"][name] == full["elements"][name]
+
+
+def test_competitor_profile_feeds_rating_parser(product_html):
+    from app.local_agents.research.helper_methods import _parse_rating_info
+
+    full = extract_product_page(product_html, PRODUCT_URL, 200)["data"]
+    lean = extract_product_page(product_html, PRODUCT_URL, 200, profile="competitor")["data"]
+    assert _parse_rating_info(lean) == _parse_rating_info(full) == (4.5, 1234)
+
+
+def test_unknown_profile_rejected(product_html):
+    with pytest.raises(ValueError):
+        extract_product_page(product_html, PRODUCT_URL, 200, profile="everything")
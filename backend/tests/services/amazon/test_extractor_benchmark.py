@@ -0,0 +1,46 @@
+"""
+Per-page CPU time of the product page extraction, before and after the single-pass extractor.
+
+Run just these with:
+    pytest tests/services/amazon/test_extractor_benchmark.py --benchmark-group-by=group
+"""
+
+import json
+
+import pytest
+from scrapy.http import HtmlResponse
+
+from app.services.amazon.extractor import extract_product_page
+from tests.services.amazon.conftest import PRODUCT_URL
+from tests.services.amazon.legacy_selector_parse import legacy_parse
+
+pytest.importorskip("pytest_benchmark")
+
+
+def _selector_parse(html: str):
+    return legacy_parse(HtmlResponse(url=PRODUCT_URL, body=html.encode("utf-8"), encoding="utf-8"))
+
+
+def _single_pass(html: str):
+    response = HtmlResponse(url=PRODUCT_URL, body=html.encode("utf-8"), encoding="utf-8")
+    return extract_product_page(response.text, PRODUCT_URL, response.status)
+
+
+@pytest.mark.parametrize("page", ["product_html", "large_product_html"])
+@pytest.mark.parametrize("impl", [_selector_parse, _single_pass], ids=["selector_parse", "single_pass"])
+def test_benchmark_product_page_extraction(benchmark, request, page, impl):
+    html = request.getfixturevalue(page)
+    benchmark.group = f"extract:{page}"
+    result = benchmark(impl, html)
+    assert result["success"] is True
+
+
+@pytest.mark.parametrize("page", ["product_html", "large_product_html"])
+@pytest.mark.parametrize("profile", ["full", "competitor"])
+def test_benchmark_extraction_profiles(benchmark, request, page, profile):
+    html = request.getfixturevalue(page)
+    benchmark.group = f"profile:{page}"
+    result = benchmark(extract_product_page, html, PRODUCT_URL, 200, profile)
+    # Serialized size is what the standalone scraper process prints back per competitor
+    benchmark.extra_info["payload_bytes"] = len(json.dumps(result))
+    assert result["success"] is True
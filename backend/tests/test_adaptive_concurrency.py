@@ -0,0 +1,254 @@
+"""
+Tests for adaptive (AIMD) LLM concurrency.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+import pytest
+from agents import RunConfig, Runner
+from agents.models.interface import Model, ModelProvider
+from agents.models.openai_responses import OpenAIResponsesModel
+
+from app.local_agents.keyword.agent import keyword_agent
+from app.local_agents.scoring.runner import ScoringRunner
+from app.local_agents.scoring.subagents.intent_agent import intent_scoring_agent
+from app.services.adaptive_concurrency import (
+    AdaptiveConcurrencyModel,
+    AIMDConfig,
+    AIMDLimiter,
+    is_overload_error,
+    limit_agent,
+)
+from app.services.hedging import HedgedModel, hedge_agent
+from benchmarks.mock_openai_server import FaultConfig, MockOpenAIServer
+from benchmarks.stub_llm import StubLLM
+
+PROMPT = 'BASE RELEVANCY (1-10) — keyword->score (filtered to exclude score 0):\n{"strawberry slices":8}\n'
+
+
+class MockServerProvider(ModelProvider):
+    """A client per thread: each thread's ``Runner.run_sync`` calls share an event loop."""
+
+    def __init__(self, server: MockOpenAIServer):
+        self.server = server
+        self._local = threading.local()
+
+    def get_model(self, model_name):
+        if not hasattr(self._local, "client"):
+            self._local.client = openai.AsyncOpenAI(base_url=self.server.base_url, api_key="sk-mock", max_retries=0)
+        return OpenAIResponsesModel(model_name or "gpt-5-mini", self._local.client)
+
+
+def _busy_calls(limiter: AIMDLimiter, calls: int):
+    """Successful calls with every slot kept busy: freed and new slots are taken at once."""
+    slots = []
+    for _ in range(calls):
+        while (slot := limiter.try_acquire()) is not None:
+            slots.append(slot)
+        limiter.release(slots.pop(0), "success")
+    for slot in slots:
+        limiter.release(slot, "cancelled")
+
+
+def test_limit_grows_additively_and_halves_once_per_overload_burst():
+    limiter = AIMDLimiter(AIMDConfig(initial=4, min_limit=1, max_limit=6))
+
+    slots = [limiter.try_acquire() for _ in range(5)]
+    assert None not in slots[:4] and slots[4] is None  # Only 4 slots at limit 4
+    assert [slot.saturated for slot in slots[:4]] == [False, False, False, True]
+    for slot in slots[:4]:
+        limiter.release(slot, "success")
+    assert limiter.limit == 4.25  # Only the call that filled the limit counts
+
+    _busy_calls(limiter, 8)  # Calls 4-8 each took the last free slot
+    assert 5.2 < limiter.limit < 5.4  # About +1 per round of saturated calls
+
+    burst = [limiter.try_acquire() for _ in range(3)]
+    for slot in burst:
+        limiter.release(slot, "overload")
+    # Calls started before the cut add no further cuts
+    assert 2.5 < limiter.limit < 2.7
+
+    for _ in range(3):
+        limiter.release(limiter.try_acquire(), "error")
+    assert 2.5 < limiter.limit < 2.7
+    _busy_calls(limiter, 50)
+    assert limiter.limit == 6
+
+
+def test_limit_does_not_grow_while_slots_stay_free():
+    limiter = AIMDLimiter(AIMDConfig(initial=4, max_limit=16))
+
+    # Two calls at a time never reach a limit of 4, however many succeed
+    for _ in range(100):
+        pair = [limiter.try_acquire(), limiter.try_acquire()]
+        for slot in pair:
+            limiter.release(slot, "success")
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+
+
+def test_shared_batch_pool_is_sized_for_the_limiter_ceiling(monkeypatch):
+    from app.core.config import settings
+    from app.services.multi_batch_processor import BatchConfig
+
+    monkeypatch.setattr(settings, "MAX_CONCURRENT_BATCHES", 3)
+    monkeypatch.setattr(settings, "LLM_CONCURRENCY_MAX", 16)
+    monkeypatch.setattr(settings, "LLM_ADAPTIVE_CONCURRENCY", True)
+    assert BatchConfig.from_settings().max_concurrent_batches == 16
+
+    monkeypatch.setattr(settings, "LLM_ADAPTIVE_CONCURRENCY", False)
+    assert BatchConfig.from_settings().max_concurrent_batches == 3
+
+
+def test_overload_errors():
+    class Status(Exception):
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+    assert is_overload_error(TimeoutError())
+    assert is_overload_error(Status(429)) and is_overload_error(Status(503))
+    assert not is_overload_error(Status(500)) and not is_overload_error(ValueError())
+
+
+def test_overloaded_call_is_left_to_the_client_to_retry():
+    class Overloaded(Model):
+        calls = 0
+
+        async def get_response(self, *args, **kwargs):
+            self.calls += 1
+            raise TimeoutError()
+
+        def stream_response(self, *args, **kwargs):
+            raise NotImplementedError
+
+    inner = Overloaded()
+    limiter = AIMDLimiter(AIMDConfig(initial=4))
+    model = AdaptiveConcurrencyModel("KeywordAgent", inner, limiter)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(model.get_response())
+
+    # One attempt by default: the client below already retried it
+    assert inner.calls == 1
+    assert limiter.limit == 2 and limiter.in_flight == 0
+
+
+def test_wrappers_are_installed_once_in_either_order():
+    class Inner(Model):
+        async def get_response(self, *args, **kwargs):
+            return "ok"
+
+        def stream_response(self, *args, **kwargs):
+            raise NotImplementedError
+
+    agent = keyword_agent.clone(model=Inner())
+    limiter = AIMDLimiter()
+    hedge_agent(agent)
+    limit_agent(agent, limiter)
+    limited = agent.model
+    hedge_agent(agent)
+    limit_agent(agent, limiter)
+
+    assert agent.model is limited
+    assert isinstance(limited, AdaptiveConcurrencyModel) and isinstance(limited.inner, HedgedModel)
+    assert asyncio.run(agent.model.get_response()) == "ok"
+    assert limiter.in_flight == 0
+
+
+def _run_burst(server: MockOpenAIServer, limiter=None, calls: int = 120, workers: int = 16):
+    provider = MockServerProvider(server)
+    model = AdaptiveConcurrencyModel("KeywordAgent", None, limiter, provider) if limiter else None
+    agent = keyword_agent.clone(model=model)
+    run_config = RunConfig(model_provider=provider, tracing_disabled=True)
+    limits = []
+
+    def call(_):
+        try:
+            Runner.run_sync(agent, PROMPT, run_config=run_config)
+            return True
+        except openai.RateLimitError:
+            return False
+        finally:
+            if limiter:
+                limits.append(limiter.limit)
+
+    loops = []
+
+    def new_loop():
+        loops.append(asyncio.new_event_loop())
+        asyncio.set_event_loop(loops[-1])
+
+    with ThreadPoolExecutor(max_workers=workers, initializer=new_loop) as pool:
+        results = list(pool.map(call, range(calls)))
+    for loop in loops:
+        loop.close()
+    return results, limits
+
+
+def test_limiter_finds_sustainable_concurrency_of_throttled_server():
+    faults = FaultConfig(max_concurrency=4, latency=0.05)
+
+    with MockOpenAIServer(faults=faults).run_in_thread() as server:
+        fixed, _ = _run_burst(server)
+    fixed_rejected = server.stats["concurrency_limit"]
+
+    # The mock client does not retry, so the limiter owns the retries
+    limiter = AIMDLimiter(AIMDConfig(initial=1, max_limit=16, overload_retries=3, retry_base_delay=0.05))
+    with MockOpenAIServer(faults=faults).run_in_thread() as server:
+        adaptive, limits = _run_burst(server, limiter)
+    adaptive_rejected = server.stats["concurrency_limit"]
+
+    # 16 fixed workers overrun a server that serves 4 at a time
+    assert fixed.count(False) > len(fixed) / 3
+    # The limiter settles around what the server sustains and retries the rest
+    assert all(adaptive)
+    settled = limits[len(limits) // 2:]
+    assert 2 <= sum(settled) / len(settled) <= 6
+    assert max(limits) < 8
+    assert adaptive_rejected < fixed_rejected / 3
+    assert adaptive_rejected / server.stats["requests"] < 0.2
+
+
+class InFlightModel(Model):
+    """Counts the calls in flight (across threads) when each call starts."""
+
+    def __init__(self, inner: Model):
+        self.inner = inner
+        self.in_flight = 0
+        self.seen = []
+        self._lock = threading.Lock()
+
+    async def get_response(self, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.seen.append(self.in_flight)
+        try:
+            return await self.inner.get_response(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def test_batches_of_one_job_overlap_as_the_limit_grows():
+    items = [{"phrase": f"freeze dried fruit {i}"} for i in range(16 * 75)]  # 16 intent batches
+    limiter = AIMDLimiter(AIMDConfig(initial=1, max_limit=6))
+
+    with StubLLM(latency=0.05).install():
+        probe = InFlightModel(intent_scoring_agent.model)
+        intent_scoring_agent.model = probe
+        limit_agent(intent_scoring_agent, limiter)
+        scored = ScoringRunner.append_intent_scores(items, {"title": "Freeze dried strawberries"})
+
+    assert len(scored) == len(items)
+    assert len(probe.seen) == 16
+    # The first call runs alone; later batches overlap as the limit grows, never above it
+    assert probe.seen[0] == 1
+    assert 3 <= max(probe.seen) <= 6
+    assert limiter.limit > 3 and limiter.in_flight == 0
@@ -0,0 +1,176 @@
+"""
+Tests for offline bulk mode (OpenAI Batch API).
+"""
+
+import asyncio
+import json
+
+import openai
+import pytest
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.services.batch_api import (
+    BATCH_AGENTS,
+    BatchAPIClient,
+    BatchPending,
+    BatchRequestQueued,
+    BatchStore,
+    OfflineBatchJob,
+    batch_barrier,
+    offline_batch_scope,
+    offline_run_key,
+    run_offline_bulk,
+)
+from app.services.batch_model import BatchedModel, model_response, response_body
+from app.services.bulk_analysis import BulkItem
+from benchmarks.bulk_benchmark import BulkBenchmarkConfig, run_bulk_benchmark
+from benchmarks.mock_openai_server import MockOpenAIServer
+
+
+class EchoModel(Model):
+    """Answers every call with its input and counts the calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        self.calls += 1
+        message = ResponseOutputMessage(
+            id="msg_echo",
+            content=[ResponseOutputText(annotations=[], text=f"echo: {input}", type="output_text")],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15), response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def _ask(model: BatchedModel, prompt: str):
+    return asyncio.run(model.get_response("Answer.", prompt, None, [], None, [], None))
+
+
+def _text(response: ModelResponse) -> str:
+    return response.output[0].content[0].text
+
+
+def test_batch_agents_queue_and_others_are_stored_for_replay():
+    store = BatchStore()
+    echo = EchoModel()
+    keyword = BatchedModel("KeywordAgent", echo)
+    seo = BatchedModel("AmazonComplianceAgent", echo)
+
+    assert _text(_ask(keyword, "outside a run")) == "echo: outside a run"  # Passes straight through
+
+    job = OfflineBatchJob(store)
+    with offline_batch_scope(job):
+        with pytest.raises(BatchRequestQueued):
+            _ask(keyword, "categorize")
+        with pytest.raises(BatchPending, match=r"1 request\(s\) queued"):
+            batch_barrier("keywords")
+        assert _text(_ask(seo, "title")) == "echo: title"
+
+    (line,) = store.take_queued()
+    assert line["url"] == "/v1/responses" and line["custom_id"].startswith("KeywordAgent-")
+    assert line["body"]["instructions"] == "Answer." and line["body"]["model"] == "gpt-5-mini-2025-08-07"
+
+    # Next round: the batch answered the keyword call, the SEO answer was stored
+    store.store_answer(line["custom_id"], response_body(_ask(keyword, "batch answer")))
+    calls = echo.calls
+    with offline_batch_scope(OfflineBatchJob(store)) as replay:
+        assert _text(_ask(keyword, "categorize")) == "echo: batch answer"
+        assert _text(_ask(seo, "title")) == "echo: title"
+        batch_barrier("keywords")  # Nothing queued: no-op
+    assert echo.calls == calls and replay.queued == 0
+
+
+def test_response_body_round_trips():
+    original = asyncio.run(EchoModel().get_response(None, "hi"))
+    restored = model_response(response_body(original))
+    assert _text(restored) == "echo: hi"
+    assert (restored.usage.input_tokens, restored.usage.output_tokens) == (10, 5)
+
+
+def test_interrupted_run_resumes_from_batch_in_flight(tmp_path):
+    path = tmp_path / "job.json"
+    line = {"custom_id": "KeywordAgent-abc", "method": "POST", "url": "/v1/responses",
+            "body": {"model": "gpt-5-mini", "input": "Categorize these keywords"}}
+    with MockOpenAIServer().run_in_thread() as server:
+        client = BatchAPIClient(openai.OpenAI(base_url=server.base_url, api_key="sk-mock", max_retries=0))
+        store = BatchStore(path)
+        store.in_flight = client.submit([line])
+        store.batches.append({"id": store.in_flight, "round": 1, "requests": 1, "status": "submitted"})
+        store.save()
+
+        # The process restarts: the saved batch is collected, not submitted again
+        resumed = BatchStore.load(path)
+        asyncio.run(run_offline_bulk([], {}, store=resumed, client=client, poll_seconds=0.01))
+        assert server.get_stats()["batch_requests"] == 1
+
+    saved = BatchStore.load(path)
+    assert saved.in_flight is None and "KeywordAgent-abc" in saved.answers
+    assert saved.batches[0]["status"] == "completed" and saved.batches[0]["answered"] == 1
+
+
+def test_reposted_offline_job_resumes_its_store_and_removes_it_when_done(monkeypatch, tmp_path):
+    from app.api.v1.endpoints import background_jobs
+    from app.core.config import settings
+    from app.services import job_manager
+    from app.services.job_manager import JobManager
+
+    monkeypatch.setattr(job_manager, "JOBS_DIR", tmp_path)
+    monkeypatch.setattr(job_manager, "use_redis", False)
+    monkeypatch.setattr(job_manager, "_storage_ready", True)
+    monkeypatch.setattr(settings, "BATCH_API_STATE_DIR", str(tmp_path / "batch_runs"))
+
+    items = [BulkItem("B0TEST0001", "rev.csv", "des.csv"), BulkItem("B0TEST0002", "rev.csv", "des.csv")]
+    files = {"rev.csv": b"rev", "des.csv": b"des"}
+    run_key = offline_run_key(items, files)
+    assert run_key == offline_run_key(items[::-1] + items[:1], files)  # Order and duplicates don't matter
+    assert run_key != offline_run_key(items, {**files, "rev.csv": b"other"})
+
+    # An earlier job with the same items stopped with a batch in flight
+    path = tmp_path / "batch_runs" / f"{run_key}.json"
+    interrupted = BatchStore(path)
+    interrupted.in_flight = "batch_1"
+    interrupted.save()
+
+    resumed = []
+
+    async def fake_offline_bulk(items, files, store, **kwargs):
+        resumed.append(store.in_flight)
+        return {"items": [], "stats": {"completed": len(items), "items": len(items)}}
+
+    monkeypatch.setattr(background_jobs, "run_offline_bulk", fake_offline_bulk)
+    job_id = JobManager.create_job()
+    background_jobs.jobs_in_progress.inc()
+    asyncio.run(background_jobs.run_bulk_pipeline_in_background(job_id, items, files, offline=True))
+
+    assert resumed == ["batch_1"]
+    assert JobManager.get_job(job_id)["status"] == "complete"
+    assert not path.exists()
+
+
+def test_offline_bulk_answers_classification_through_batches(tmp_path):
+    report = run_bulk_benchmark(BulkBenchmarkConfig(
+        products=2, duplicates=1, max_rows=40, scrape_latency=0.0, offline=True, batch_delay=0.02, output_dir=tmp_path,
+    ))
+    offline = report["offline"]
+    stats = offline["stats"]
+
+    assert stats["completed"] == 3 and stats["failed"] == 0
+    # Keyword, intent and root relevance each waited for one batch
+    assert stats["batch_api"]["rounds"] == 4 and len(stats["batch_api"]["batches"]) == 3
+    assert offline["batch_requests"] == stats["batch_api"]["requests"] > 0
+    assert not set(offline["llm_calls_by_agent"]) & set(BATCH_AGENTS)
+    assert offline["llm_calls"] < report["bulk"]["llm_calls"]
+
+    # The keywords were categorized by the batch answers, not by the rule-based fallback
+    result = json.loads((tmp_path / "offline_bulk_result.json").read_text())["items"][0]["result"]
+    categories = {item["category"] for item in result["ai_analysis_keywords"]["structured_data"]["items"]}
+    assert len(categories) > 1
@@ -0,0 +1,142 @@
+"""
+Tests for bulk multi-ASIN analysis and batch-shared work.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.bulk_analysis import BulkItem, parse_bulk_items, run_bulk_analysis
+from app.services.shared_work import SharedWorkCache, shared_call, shared_work
+
+
+def test_shared_work_is_single_flight():
+    cache = SharedWorkCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"asin": "B0TEST0001", "success": True}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("scrape", "B0TEST0001", compute)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(r["success"] for r in results)
+    assert cache.summary()["scrape"]["hits"] == 7
+    # Callers get copies, so mutating one result cannot leak into another item
+    results[0]["asin"] = "changed"
+    assert cache.get_or_compute("scrape", "B0TEST0001", compute)["asin"] == "B0TEST0001"
+
+
+def test_shared_call_outside_batch_and_uncached_failures():
+    calls = []
+
+    def failing():
+        calls.append(1)
+        return {"success": False}
+
+    shared_call("scrape", "x", failing)
+    shared_call("scrape", "x", failing)
+    assert len(calls) == 2  # No active cache: plain call-through
+
+    with shared_work() as cache:
+        shared_call("scrape", "x", failing, cache_if=lambda r: r["success"])
+        shared_call("scrape", "x", failing, cache_if=lambda r: r["success"])
+    assert len(calls) == 4  # Failures are never shared
+    assert cache.summary()["scrape"] == {"hits": 0, "misses": 2, "saved_seconds": 0.0}
+
+
+def test_concurrent_batches_keep_their_own_cache():
+    calls = []
+
+    async def batch(name):
+        with shared_work() as cache:
+            await asyncio.sleep(0.01)  # Both blocks are open at once
+            await asyncio.to_thread(shared_call, "scrape", "B0COMP0001", lambda: calls.append(name) or {"ok": True})
+            return cache
+
+    async def both():
+        return await asyncio.gather(batch("a"), batch("b"))
+
+    first, second = asyncio.run(both())
+    assert first is not second
+    assert sorted(calls) == ["a", "b"]
+    shared_call("scrape", "B0COMP0001", lambda: calls.append("outside"))
+    assert calls[-1] == "outside"  # Nothing leaks out of the blocks
+
+
+def test_parse_bulk_items_validation():
+    files = {"rev.csv": b"a", "des.csv": b"b"}
+    items = parse_bulk_items('[{"asin_or_url": " B0TEST0001 ", "revenue_csv": "rev.csv", "design_csv": "des.csv"}]', files, 5)
+    assert items == [BulkItem(asin_or_url="B0TEST0001", revenue_csv="rev.csv", design_csv="des.csv")]
+
+    with pytest.raises(ValueError, match="must name one of the uploaded files"):
+        parse_bulk_items('[{"asin_or_url": "B0TEST0001", "revenue_csv": "missing.csv", "design_csv": "des.csv"}]', files, 5)
+    with pytest.raises(ValueError, match="Too many items"):
+        parse_bulk_items('[{"asin_or_url": "a"}, {"asin_or_url": "b"}]', files, 1)
+
+
+def test_bulk_run_dedupes_items_and_competitor_scrapes():
+    scrapes = []
+    runs = []
+
+    async def fake_pipeline(asin_or_url, marketplace, main_keyword, revenue_csv, design_csv):
+        runs.append(asin_or_url)
+        if asin_or_url == "B0FAIL0001":
+            raise HTTPException(status_code=400, detail="Scraping failed")
+        assert await revenue_csv.read() == b"shared revenue"
+        for competitor in ("B0COMP0001", "B0COMP0002"):
+            await asyncio.to_thread(
+                shared_call, "scrape", competitor, lambda c=competitor: scrapes.append(c) or {"success": True}
+            )
+        return {"success": True, "asin": asin_or_url}
+
+    files = {"rev.csv": b"shared revenue", "des.csv": b"shared design"}
+    items = [
+        BulkItem("B0TEST0001", "rev.csv", "des.csv"),
+        BulkItem("B0TEST0002", "rev.csv", "des.csv"),
+        BulkItem("b0test0001", "rev.csv", "des.csv"),  # Same product again
+        BulkItem("B0FAIL0001", "rev.csv", "des.csv"),
+    ]
+    progress = []
+    result = asyncio.run(run_bulk_analysis(items, files, pipeline=fake_pipeline, progress=lambda d, t: progress.append((d, t))))
+
+    assert sorted(runs) == ["B0FAIL0001", "B0TEST0001", "B0TEST0002"]
+    assert sorted(scrapes) == ["B0COMP0001", "B0COMP0002"]
+    assert progress[-1] == (3, 3)
+
+    out = result["items"]
+    assert [i["status"] for i in out] == ["complete", "complete", "complete", "failed"]
+    assert out[2]["result"] == {"success": True, "asin": "B0TEST0001"}
+    assert out[0]["shared_with"] == [2]
+    assert out[3]["error"] == "Scraping failed" and out[3]["result"] is None
+
+    stats = result["stats"]
+    assert stats["unique_runs"] == 3 and stats["deduplicated_items"] == 1
+    assert stats["shared_work"]["scrape"]["hits"] == 2
+
+
+def test_bulk_benchmark_beats_one_by_one(tmp_path):
+    from benchmarks.bulk_benchmark import BulkBenchmarkConfig, run_bulk_benchmark
+
+    report = run_bulk_benchmark(BulkBenchmarkConfig(
+        products=2, duplicates=1, max_rows=20, scrape_latency=0.05, output_dir=tmp_path
+    ))
+
+    assert report["bulk"]["stats"]["unique_runs"] == 2
+    assert report["bulk"]["stats"]["completed"] == 3
+    assert sum(report["bulk"]["scrapes"].values()) < sum(report["sequential"]["scrapes"].values())
+    assert report["bulk"]["llm_calls"] < report["sequential"]["llm_calls"]
+    assert report["speedup"] > 1
@@ -0,0 +1,125 @@
+"""
+Tests for the LLM circuit breaker.
+"""
+
+import asyncio
+import json
+import time
+
+import httpx
+import openai
+import pytest
+from agents.models.interface import Model
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerModel,
+    CircuitConfig,
+    CircuitOpenError,
+    llm_circuit_open,
+)
+from benchmarks.pipeline_benchmark import BenchmarkConfig, run_benchmark
+
+
+@pytest.fixture(autouse=True)
+def fresh_breaker(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breaker", None)
+
+
+class FailingModel(Model):
+    """Inner model raising ``error`` (or answering "ok" when it is None)."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return "ok"
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def _connection_error():
+    return openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/responses"))
+
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(CircuitConfig(failure_threshold=3, reset_timeout_seconds=0.05))
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow_request()
+    breaker.record_success()  # A success resets the count
+    for _ in range(3):
+        breaker.record_failure()
+
+    assert breaker.state == "open" and breaker.is_open()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open" and not breaker.is_open()
+    assert breaker.allow_request()  # The probe
+    assert not breaker.allow_request() and breaker.is_open()
+    breaker.record_failure()  # A failed probe opens the circuit again
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.get_stats() == {"state": "closed", "consecutive_failures": 0, "opened": 2, "rejected": 2}
+
+
+def test_model_fails_fast_once_open_and_ignores_request_errors():
+    breaker = CircuitBreaker(CircuitConfig(failure_threshold=2, reset_timeout_seconds=60))
+    bad_request = FailingModel(ValueError("bad schema"))
+    down = FailingModel(_connection_error())
+
+    async def call(model):
+        return await CircuitBreakerModel("Agent", model, breaker).get_response()
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            asyncio.run(call(bad_request))
+    assert breaker.state == "closed"
+
+    for _ in range(2):
+        with pytest.raises(openai.APIConnectionError):
+            asyncio.run(call(down))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call(down))
+    assert down.calls == 2
+
+
+def test_llm_circuit_open_follows_the_shared_breaker():
+    assert not llm_circuit_open()  # No breaker installed yet
+    breaker = circuit_breaker.get_llm_breaker(CircuitConfig(failure_threshold=1, reset_timeout_seconds=60))
+    breaker.record_failure()
+    assert llm_circuit_open()
+
+
+def test_offline_pipeline_finishes_quickly_during_outage(tmp_path):
+    latency = 0.2
+    report = run_benchmark(BenchmarkConfig(max_rows=40, latency=latency, outage=True, output_dir=tmp_path))
+
+    # Only the calls that opened the circuit reach the dead API
+    assert report["total"]["llm_calls"] == circuit_breaker.CircuitConfig().failure_threshold
+    assert report["total"]["wall_s"] < 10 * latency
+    assert circuit_breaker.get_llm_breaker().state == "open"
+
+    result = json.loads((tmp_path / "complete_pipeline_result.json").read_text())
+    assert result["success"] is True
+    items = result["ai_analysis_keywords"]["structured_data"]["items"]
+    # Keywords the pre-classifier did not resolve get the rule-based category
+    assert items and all(
+        item["category"] == "Relevant" for item in items if not item.get("reason", "").startswith("Pre-classified")
+    )
+    assert result["seo_analysis"]["summary"]["method"] == "rule_based"
+    # No deadline, but the response still says which sections fell back
+    degraded = {entry["section"] for entry in result["degraded_sections"]}
+    assert {"keyword_categorization", "seo_optimization"} <= degraded
+    assert "deadline" not in result
@@ -0,0 +1,100 @@
+"""
+Tests for the concurrent title/bullet sections of the compliance optimizer.
+"""
+
+import asyncio
+import time
+
+from app.local_agents.seo.subagents.amazon_compliance_agent import _reconcile_sections, _run_section, apply_amazon_compliance_ai
+from benchmarks.stub_llm import StubLLM
+
+TITLE_KEYWORDS = [{"phrase": "freeze dried strawberries", "search_volume": 5000}, {"phrase": "strawberry slices", "search_volume": 900}]
+BULLET_KEYWORDS = [
+    {"phrase": "healthy snack", "search_volume": 800},
+    {"phrase": "dried fruit", "search_volume": 700},
+    {"phrase": "no sugar added", "search_volume": 600},
+    {"phrase": "kids lunch", "search_volume": 500},
+]
+BACKEND_KEYWORDS = [{"phrase": "fruit powder", "search_volume": 300}]
+
+CURRENT_CONTENT = {
+    "title": "BREWER Freeze Dried Strawberries Slices, Pack of 4",
+    "bullets": ["Crunchy slices", "Made from fresh berries"],
+    "backend_keywords": [],
+}
+
+
+def _optimize(target_bullet_count=2):
+    return apply_amazon_compliance_ai(
+        current_content=dict(CURRENT_CONTENT),
+        keyword_data={"relevant_keywords": TITLE_KEYWORDS + BULLET_KEYWORDS, "design_keywords": []},
+        product_context={"brand": "BREWER", "category": "Food"},
+        title_keywords=TITLE_KEYWORDS,
+        bullet_keywords=BULLET_KEYWORDS,
+        backend_keywords=BACKEND_KEYWORDS,
+        target_bullet_count=target_bullet_count,
+    )
+
+
+def test_sections_run_concurrently_with_their_own_keywords():
+    latency = 0.3
+    llm = StubLLM(latency=latency)
+    with llm.install():
+        start = time.perf_counter()
+        result = _optimize(target_bullet_count=2)
+        elapsed = time.perf_counter() - start
+
+    assert llm.stats()["AmazonComplianceAgent"]["calls"] == 3  # Title + 2 bullets
+    assert elapsed < 2 * latency
+
+    bullets = result["optimized_bullets"]
+    # Keywords are dealt round-robin by volume, so each bullet leads with a different one
+    assert sorted(bullets[0]["keywords_included"]) == ["healthy snack", "no sugar added"]
+    assert sorted(bullets[1]["keywords_included"]) == ["dried fruit", "kids lunch"]
+    # Both title keywords made it into the title, so only the backend allocation is left
+    assert result["backend_keywords"] == ["fruit powder"]
+
+
+def test_failed_section_falls_back_alone():
+    def compliance(prompt, schema):
+        if "BULLET NUMBER: 2 of" in prompt:
+            return "not json"
+        return StubLLM().respond("AmazonComplianceAgent", prompt, schema)
+
+    llm = StubLLM(responders={"AmazonComplianceAgent": compliance})
+    with llm.install():
+        result = _optimize(target_bullet_count=2)
+
+    first, second = result["optimized_bullets"]
+    assert first["content"].startswith("Crunchy slices")  # The model's bullet is kept
+    assert second["content"].endswith("for optimal results") and sorted(second["keywords_included"]) == ["dried fruit", "kids lunch"]
+
+
+def test_section_call_keeps_the_callers_event_loop():
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        with StubLLM().install():
+            assert _run_section("TITLE", "Title") is not None
+            _optimize(target_bullet_count=1)
+
+        assert asyncio.get_event_loop() is loop and not loop.is_closed()
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def test_reconciliation_derives_keywords_from_text():
+    title = {"content": "BREWER Freeze Dried Strawberries - Strawberry Slices", "keywords_included": []}
+    bullets = [
+        {"content": "A healthy snack of dried fruit", "keywords_included": ["kids lunch"]},
+        {"content": "No sugar added, made for the kids lunch box", "keywords_included": []},
+    ]
+
+    result = _reconcile_sections(title, bullets, TITLE_KEYWORDS, BULLET_KEYWORDS, BACKEND_KEYWORDS)
+
+    assert sorted(result["optimized_title"]["keywords_included"]) == ["freeze dried strawberries", "strawberry slices"]
+    first, second = result["optimized_bullets"]
+    assert sorted(first["keywords_included"]) == ["dried fruit", "healthy snack"]
+    assert sorted(second["keywords_included"]) == ["kids lunch", "no sugar added"]
+    assert result["backend_keywords"] == ["fruit powder"]
@@ -0,0 +1,128 @@
+"""
+Tests for the pipeline's deadline ("anytime") mode.
+"""
+
+import asyncio
+import json
+import time
+
+from app.local_agents.keyword.runner import KeywordRunner
+from app.services.cancellation import checkpoint
+from app.services.deadline import (
+    Deadline,
+    DegradedSections,
+    deadline_reached,
+    deadline_scope,
+    degradation_scope,
+    mark_degraded,
+    run_stage,
+)
+from benchmarks.pipeline_benchmark import BenchmarkConfig, run_benchmark
+from benchmarks.stub_llm import StubLLM
+
+
+def test_stage_budget_splits_remaining_time_by_weight():
+    deadline = Deadline(10.0, reserve_seconds=2.0, stage_weights={"a": 1.0, "b": 3.0})
+
+    assert 1.9 < deadline.stage_budget("a") <= 2.0
+    deadline.finish_stage("a")
+    # With "a" done, "b" gets everything but the reserve
+    assert 7.9 < deadline.stage_budget("b") <= 8.0
+
+    child = deadline.child(60.0)
+    assert child.expires_at == deadline.expires_at
+    assert deadline.child(0).expired
+
+
+def test_degraded_sections_are_shared_and_reported():
+    deadline = Deadline(5.0)
+    with deadline_scope(deadline):
+        assert not deadline_reached()
+        with deadline_scope(deadline.child(0)):
+            assert deadline_reached()
+            mark_degraded("seo", "rule-based")
+            mark_degraded("seo", "later reason")
+        assert not deadline_reached()
+
+    report = deadline.report()
+    assert report["met"] is True and report["complete"] is False
+    assert report["degraded_sections"] == [{"section": "seo", "reason": "rule-based"}]
+
+    # Outside a deadline the helpers do nothing
+    mark_degraded("seo", "ignored")
+    assert not deadline_reached()
+
+
+def test_degraded_sections_are_recorded_without_a_deadline():
+    sections = DegradedSections()
+    with degradation_scope(sections):
+        assert not deadline_reached()
+        mark_degraded("intent_scoring", "LLM unavailable")
+
+    assert sections.report() == [{"section": "intent_scoring", "reason": "LLM unavailable"}]
+
+
+def test_keyword_runner_uses_rule_items_once_deadline_passed():
+    scores = {f"keyword {i}": 7 for i in range(12)}
+    deadline = Deadline(0.0)
+    llm = StubLLM()
+    with llm.install(), deadline_scope(deadline):
+        result = KeywordRunner().run_keyword_categorization(
+            scraped_product={"title": "Freeze dried strawberries"},
+            base_relevancy_scores=scores,
+        )
+
+    assert "KeywordAgent" not in llm.stats()
+    items = result["structured_data"]["items"]
+    assert sorted(item["phrase"] for item in items) == sorted(scores)
+    assert all(item["category"] == "Relevant" for item in items)
+    assert "keyword_categorization" in deadline.degraded
+
+
+def test_run_stage_abandons_overrunning_stage():
+    calls = []
+
+    def stage():
+        calls.append(deadline_reached())
+        if deadline_reached():
+            return "deterministic"
+        while True:
+            checkpoint("slow stage")
+            time.sleep(0.02)
+
+    async def scenario():
+        with deadline_scope(Deadline(0.5, stage_weights={"slow": 1.0})) as deadline:
+            start = time.perf_counter()
+            finished, result = await run_stage("slow", stage)
+            return finished, result, time.perf_counter() - start, deadline
+
+    finished, result, elapsed, deadline = asyncio.run(scenario())
+
+    assert (finished, result) == (False, "deterministic")
+    assert elapsed < 1.0
+    assert calls == [False, True]
+    assert "abandoned" in deadline.degraded["slow"]
+
+
+def test_run_stage_without_deadline_runs_stage_once():
+    async def scenario():
+        return await run_stage("any", lambda: "done")
+
+    assert asyncio.run(scenario()) == (True, "done")
+
+
+def test_offline_pipeline_meets_deadline_with_degraded_sections(tmp_path):
+    deadline_seconds = 3.0
+    report = run_benchmark(BenchmarkConfig(
+        max_rows=40, latency=0.5, output_dir=tmp_path, deadline_seconds=deadline_seconds,
+    ))
+
+    deadline = report["deadline"]
+    assert deadline["met"] is True
+    assert report["total"]["wall_s"] <= deadline_seconds
+    assert deadline["degraded_sections"]
+
+    result = json.loads((tmp_path / "complete_pipeline_result.json").read_text())
+    assert result["success"] is True
+    assert result["seo_analysis"]["success"] is True
+    assert result["seo_analysis"]["summary"]["method"] == "rule_based"
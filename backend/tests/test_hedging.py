@@ -0,0 +1,179 @@
+"""
+Tests for hedged LLM requests.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from agents.models.interface import Model
+
+from app.local_agents.keyword.agent import keyword_agent
+from app.local_agents.keyword.runner import KeywordRunner
+from app.services import hedging
+from app.services.hedging import HedgeBudget, HedgeConfig, HedgedModel, LatencyTracker, get_hedge_stats, hedge_agent
+from benchmarks.stub_llm import StubLLM
+
+
+@pytest.fixture(autouse=True)
+def fresh_hedging_state(monkeypatch):
+    monkeypatch.setattr(hedging, "_tracker", None)
+    monkeypatch.setattr(hedging, "_budget", None)
+    hedging.reset_hedge_stats()
+    yield
+    hedging.reset_hedge_stats()
+
+
+class SlowOnceModel(Model):
+    """Inner model whose first call hangs; later calls answer at once."""
+
+    def __init__(self):
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return f"answer {self.calls}"
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def test_latency_tracker_needs_min_samples():
+    tracker = LatencyTracker(window=10)
+    for seconds in range(1, 21):
+        tracker.record("agent", float(seconds))
+
+    # Only the last 10 samples (11..20) are kept
+    assert tracker.quantile("agent", 0.5, min_samples=10) == 16.0
+    assert tracker.quantile("agent", 0.95, min_samples=11) is None
+    assert tracker.quantile("other", 0.95) is None
+
+
+def test_hedge_budget_caps_extra_calls():
+    budget = HedgeBudget(ratio=0.1, max_burst=2.0)
+    assert not budget.try_spend()
+
+    for _ in range(100):
+        budget.earn()
+    # Unused budget is capped at max_burst
+    assert [budget.try_spend() for _ in range(3)] == [True, True, False]
+
+
+def test_hedge_wins_over_hanging_call():
+    inner = SlowOnceModel()
+    tracker = LatencyTracker()
+    for _ in range(5):
+        tracker.record("agent", 0.01)
+    model = HedgedModel(
+        "agent", inner,
+        HedgeConfig(min_samples=5, min_delay_seconds=0.05),
+        tracker=tracker, budget=HedgeBudget(ratio=1.0),
+    )
+
+    async def call():
+        start = time.perf_counter()
+        response = await model.get_response()
+        await asyncio.sleep(0)  # Let the losing call see its cancellation
+        return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(call())
+
+    assert response == "answer 2"
+    assert elapsed < 1.0
+    assert inner.cancelled == 1
+    assert get_hedge_stats()["agent"] == {"calls": 1, "hedged": 1, "hedge_won": 1, "over_budget": 0}
+
+
+class AlternatingModel(Model):
+    """Inner model whose odd calls hang until cancelled; even calls answer at once."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls % 2:
+            await asyncio.Event().wait()
+        return f"answer {self.calls}"
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def test_stragglers_do_not_lower_the_hedge_delay():
+    tracker = LatencyTracker(window=20)
+    for _ in range(20):
+        tracker.record("agent", 0.05)
+    model = HedgedModel(
+        "agent", AlternatingModel(),
+        HedgeConfig(min_samples=5, min_delay_seconds=0.01, window=20),
+        tracker=tracker, budget=HedgeBudget(ratio=1.0),
+    )
+    before = model.hedge_delay()
+
+    async def calls():
+        # Every primary straggles and its hedge answers; the window fills with these calls alone
+        return [await model.get_response() for _ in range(20)]
+
+    responses = asyncio.run(calls())
+
+    assert responses == [f"answer {2 * i}" for i in range(1, 21)]
+    assert get_hedge_stats()["agent"]["hedge_won"] == 20
+    assert model.hedge_delay() >= before
+
+
+class StragglerModel(Model):
+    """Inner model whose ``hang_calls`` (1-based) never answer; they end only when cancelled."""
+
+    def __init__(self, inner: Model, hang_calls):
+        self.inner = inner
+        self.hang_calls = set(hang_calls)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def get_response(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls in self.hang_calls:
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return await self.inner.get_response(*args, **kwargs)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def test_hedges_answer_for_hanging_stage_calls_within_budget():
+    scores = {f"freeze dried fruit {i}": 7 for i in range(150)}  # 2 KeywordAgent batches
+    stages = 10
+    with StubLLM().install():
+        straggler = StragglerModel(keyword_agent.model, hang_calls={8, 16})
+        keyword_agent.model = straggler
+        hedge_agent(keyword_agent, HedgeConfig(min_samples=5, min_delay_seconds=0.05, budget_ratio=0.25))
+        for _ in range(5):
+            hedging._tracker.record("KeywordAgent", 0.01)
+
+        results = [
+            KeywordRunner().run_keyword_categorization(
+                scraped_product={"title": "Freeze dried strawberries"},
+                base_relevancy_scores=scores,
+            )
+            for _ in range(stages)
+        ]
+
+    # Every stage finished with the hedges' answers; the hanging calls were cancelled
+    assert all(len(result["structured_data"]["items"]) == len(scores) for result in results)
+    assert straggler.cancelled == 2
+    assert straggler.calls == 2 * stages + 2
+    # Extra calls stay within the budget: one per 4 primary calls
+    assert get_hedge_stats()["KeywordAgent"] == {"calls": 2 * stages, "hedged": 2, "hedge_won": 2, "over_budget": 0}
@@ -0,0 +1,201 @@
+"""
+Tests for cooperative job cancellation.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+
+import pytest
+
+from app.local_agents.scoring.subagents.opportunity_agent import detect_opportunities
+from app.services.cancellation import (
+    CANCEL_CHECK_INTERVAL,
+    CancellationToken,
+    JobCancelled,
+    cancel_job,
+    cancellation_scope,
+    checkpoint,
+    register_job,
+    run_subprocess,
+    unregister_job,
+)
+from app.services.openai_rate_limiter import OpenAIRateLimiter, RateLimitConfig, rate_limiter
+from benchmarks.stub_llm import StubLLM
+
+
+def _run_in_thread(token, func):
+    """Run ``func`` inside ``token``'s scope on a worker thread; returns (thread, outcome)."""
+    outcome = {}
+
+    def target():
+        start = time.perf_counter()
+        try:
+            with cancellation_scope(token):
+                outcome["result"] = func()
+        except BaseException as e:
+            outcome["error"] = e
+        outcome["finished_at"] = time.perf_counter()
+        outcome["elapsed"] = outcome["finished_at"] - start
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread, outcome
+
+
+def test_checkpoint_is_a_noop_outside_a_job():
+    checkpoint("anywhere")
+
+    token = CancellationToken("job")
+    with cancellation_scope(token):
+        checkpoint("before cancel")
+        assert token.cancel("stop") is True
+        assert token.cancel("again") is False
+        with pytest.raises(JobCancelled, match="stop"):
+            checkpoint("after cancel")
+    checkpoint("outside again")
+
+
+def test_cancel_stops_slow_llm_batches(monkeypatch):
+    async def no_wait(tokens=0):
+        return None
+    monkeypatch.setattr(rate_limiter, "wait_for_rate_limit", no_wait)
+
+    items = [
+        {"phrase": f"keyword {i}", "category": "Relevant", "search_volume": 500, "title_density": 0, "root": "r"}
+        for i in range(40)
+    ]
+    token = CancellationToken("slow-job")
+    llm = StubLLM(latency=0.3)
+    with llm.install():
+        thread, outcome = _run_in_thread(
+            token, lambda: detect_opportunities(items, chunk_size=2, max_concurrency=2)
+        )
+        time.sleep(0.45)
+        cancelled_at = time.perf_counter()
+        token.cancel("test")
+        thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert isinstance(outcome.get("error"), JobCancelled)
+    # Only the batches already in flight finish their call
+    assert outcome["finished_at"] - cancelled_at < 0.3 + 0.2
+    calls = llm.stats()["OpportunitySubagent"]["calls"]
+    assert calls < 10, f"{calls} of 20 batches reached the model after cancellation"
+
+
+def test_cancel_kills_running_subprocess():
+    token = CancellationToken("scrape-job")
+    thread, outcome = _run_in_thread(
+        token, lambda: run_subprocess([sys.executable, "-c", "import time; time.sleep(30)"], timeout=60)
+    )
+    time.sleep(0.5)
+    token.cancel("test")
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert isinstance(outcome.get("error"), JobCancelled)
+    assert outcome["elapsed"] < 5
+
+
+def test_cancelled_waiter_leaves_rate_limit_budget_promptly():
+    limiter = OpenAIRateLimiter(RateLimitConfig(
+        requests_per_minute=1, requests_per_second=1000, window_seconds=30.0, backend="memory",
+    ))
+    token = CancellationToken("waiting-job")
+
+    async def scenario():
+        await limiter.wait_for_rate_limit()  # Uses the whole budget
+
+        async def waiter():
+            with cancellation_scope(token):
+                await limiter.wait_for_rate_limit()
+
+        task = asyncio.create_task(waiter())
+        await asyncio.sleep(0.2)
+        start = time.perf_counter()
+        token.cancel("test")
+        with pytest.raises(JobCancelled):
+            await task
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed <= CANCEL_CHECK_INTERVAL + 0.2
+    # The abandoned wait reserved nothing: one admission in the window, as before
+    assert limiter.backend.reserve(0) > 0
+
+
+def test_registry_cancels_only_running_jobs():
+    token = register_job("registered")
+    try:
+        assert cancel_job("registered", "by test") is True
+        assert token.cancelled and token.reason == "by test"
+        assert cancel_job("unknown") is False
+    finally:
+        unregister_job("registered")
+    assert cancel_job("registered") is False
+
+
+def test_cancel_endpoint_stops_background_job(monkeypatch, tmp_path):
+    from fastapi import HTTPException
+
+    from app.api.v1.endpoints import background_jobs
+    from app.services import job_manager
+    from app.services.job_manager import JobManager
+
+    monkeypatch.setattr(job_manager, "JOBS_DIR", tmp_path)
+    monkeypatch.setattr(job_manager, "use_redis", False)
+    monkeypatch.setattr(job_manager, "_storage_ready", True)
+    monkeypatch.setattr(background_jobs, "CANCEL_POLL_SECONDS", 0.05)
+
+    async def slow_pipeline(**kwargs):
+        while True:
+            checkpoint("stub stage")
+            await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(background_jobs, "amazon_sales_intelligence_pipeline", slow_pipeline)
+
+    async def scenario():
+        job_id = JobManager.create_job()
+        background_jobs.jobs_in_progress.inc()
+        job = asyncio.create_task(background_jobs.run_pipeline_in_background(
+            job_id, "B000TEST", "US", None, b"a,b\n", "rev.csv", b"a,b\n", "design.csv",
+        ))
+        await asyncio.sleep(0.2)
+
+        # Persisting the request alone is enough: the job's watcher picks it up
+        JobManager.request_cancel(job_id)
+        await asyncio.wait_for(job, timeout=2)
+        return job_id
+
+    job_id = asyncio.run(scenario())
+    assert JobManager.get_job(job_id)["status"] == "cancelled"
+
+    async def cancel_again():
+        return await background_jobs.cancel_background_job(job_id)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(cancel_again())
+    assert exc.value.status_code == 409
+
+
+def test_cancel_request_survives_concurrent_job_writes(monkeypatch, tmp_path):
+    from app.services import job_manager
+    from app.services.job_manager import JobManager
+
+    monkeypatch.setattr(job_manager, "JOBS_DIR", tmp_path)
+    monkeypatch.setattr(job_manager, "use_redis", False)
+    monkeypatch.setattr(job_manager, "_storage_ready", True)
+
+    job_id = JobManager.create_job()
+    stale = JobManager.get_job(job_id)  # A worker read the job before the cancel...
+    assert JobManager.request_cancel(job_id) is True
+    stale["progress"] = 40
+    JobManager._save_job(job_id, stale)  # ...and writes it back afterwards
+    JobManager.update_status(job_id, "processing", progress=50)
+    JobManager.save_partial_results(job_id, {"progress": {}}, "preview")
+
+    assert JobManager.is_cancel_requested(job_id)
+    assert not JobManager.is_cancel_requested("other-job")
+    assert JobManager.request_cancel("missing-job") is False
@@ -0,0 +1,73 @@
+"""
+Tests for the rule-based keyword pre-classifier ahead of the keyword agent.
+"""
+
+from app.local_agents.keyword.runner import KeywordRunner
+from app.services.keyword_processing.pre_classification import pre_classify_keywords
+from benchmarks.stub_llm import StubLLM, json_after
+
+TITLE = "BREWER Bulk Freeze Dried Strawberries Slices - Pack of 4 Organic Freeze Dried Strawberries No Sugar Added"
+
+
+def _categories(result):
+    return {item["phrase"]: item["category"] for item in result.items}
+
+
+def test_confident_cases_are_resolved_and_the_rest_left_for_the_model():
+    scores = {
+        "brewer strawberries": 6,
+        "fresas deshidratadas": 3,
+        "fresas freeze dried": 3,  # Mixed: the model decides
+        "trü frü strawberries": 4,  # A brand, not Spanish
+        "organic freeze dried strawberry": 9,  # Title phrase, plural folded
+        "freeze dried": 8,  # Too short to trust a title match
+        "strawberry powder": 5,
+    }
+
+    result = pre_classify_keywords(scores, title=TITLE, brand="BREWER")
+
+    assert _categories(result) == {
+        "brewer strawberries": "Branded",
+        "fresas deshidratadas": "Spanish",
+        "organic freeze dried strawberry": "Relevant",
+    }
+    assert result.by_rule == {"brand": 1, "spanish": 1, "title_match": 1}
+    assert list(result.ambiguous) == ["fresas freeze dried", "trü frü strawberries", "freeze dried", "strawberry powder"]
+    assert all(item["relevancy_score"] == scores[item["phrase"]] for item in result.items)
+
+
+def test_brand_tokens_that_name_the_product_are_ignored():
+    title = "Strawberry Co Freeze Dried Strawberry Slices"
+    result = pre_classify_keywords({"strawberry slices": 8, "strawberry co snacks": 5}, title=title, brand="Strawberry Co")
+
+    assert result.items == []  # "strawberry" is the product, and "co" is too short to decide
+
+
+def test_keyword_agent_sees_only_ambiguous_keywords():
+    prompts = []
+
+    def keyword_agent(prompt, schema):
+        prompts.append(json_after(prompt, "keyword->score (filtered to exclude score 0):"))
+        return StubLLM().respond("KeywordAgent", prompt, schema)
+
+    scores = {f"fresas {i}": 3 for i in range(10)}
+    scores.update({f"strawberry gift {i}": 7 for i in range(70)})
+    scores["freeze dried strawberries slices"] = 8
+    scraped = {"title": TITLE, "elements": {"productOverview_feature_div": {"present": True, "kv": {"Brand": "BREWER"}}}}
+
+    llm = StubLLM(responders={"KeywordAgent": keyword_agent})
+    with llm.install():
+        result = KeywordRunner().run_keyword_categorization(scraped_product=scraped, base_relevancy_scores=scores)
+
+    assert llm.stats()["KeywordAgent"]["calls"] == 1
+    assert set(prompts[0]) == {f"strawberry gift {i}" for i in range(70)}
+    items = result["structured_data"]["items"]
+    assert [item["phrase"] for item in items] == list(scores)  # Input order
+    assert result["structured_data"]["stats"]["Spanish"]["count"] == 10
+    assert result["pre_classification"] == {
+        "resolved": 11,
+        "by_rule": {"spanish": 10, "title_match": 1},
+        "llm_keywords": 70,
+        "llm_batches": 1,
+        "llm_batches_without": 2,
+    }
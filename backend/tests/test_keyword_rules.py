@@ -0,0 +1,145 @@
+"""
+Tests for the fused keyword rules pass: output must match the separate
+alignment and zero-volume passes it replaced, on the sample CSVs.
+"""
+
+import copy
+import csv
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+from app.local_agents.scoring.runner import ScoringRunner
+from app.local_agents.seo import helper_methods
+from app.services.keyword_processing.rules import KeywordTable, apply_keyword_rules
+
+CSV_DIR = Path(__file__).resolve().parents[1] / "csv"
+CATEGORIES = ["Relevant", "Design-Specific", "Irrelevant", "Branded", "Spanish", "Outlier"]
+
+
+def _sample_items():
+    """Keyword items from both sample CSVs with scores covering every rule branch."""
+    items = []
+    for path in sorted(CSV_DIR.glob("*.csv")):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                volume = (row.get("Search Volume") or "").replace(",", "")
+                item = {
+                    "phrase": row["Keyword Phrase"],
+                    "category": CATEGORIES[i % len(CATEGORIES)],
+                    "relevancy_score": (i * 7) % 11,
+                    "intent_score": (i * 5) % 4,
+                    "search_volume": int(volume) if volume.isdigit() else None,
+                    "root": row["Keyword Phrase"].split()[-1] if i % 9 else "",
+                }
+                if i % 13 == 0:
+                    del item["relevancy_score"]
+                items.append(item)
+    return items
+
+
+def _legacy_align(keyword_items):
+    """Previous ScoringRunner.align_relevancy_and_intent_scores (copying pass)."""
+    aligned_items = []
+    for keyword in keyword_items:
+        original_relevancy = keyword.get('relevancy_score', 0)
+        original_intent = keyword.get('intent_score', 0)
+        category = keyword.get('category', '')
+        aligned_keyword = keyword.copy()
+        if category in ['Irrelevant', 'Branded', 'Spanish']:
+            if original_relevancy > 2 or original_intent > 0:
+                aligned_keyword['relevancy_score'] = min(2, original_relevancy)
+                aligned_keyword['intent_score'] = 0
+                aligned_keyword['_alignment_applied'] = f"Category {category}: relevancy {original_relevancy}→{aligned_keyword['relevancy_score']}, intent {original_intent}→0"
+        elif original_relevancy >= 8 and original_intent == 0:
+            aligned_keyword['intent_score'] = 1
+            aligned_keyword['_alignment_applied'] = f"High market performance: intent {original_intent}→1 (relevancy {original_relevancy})"
+        elif original_intent >= 2 and original_relevancy <= 2:
+            aligned_keyword['relevancy_score'] = 4
+            aligned_keyword['_alignment_applied'] = f"High semantic relevance: relevancy {original_relevancy}→4 (intent {original_intent})"
+        elif original_relevancy >= 6 and original_intent == 0:
+            aligned_keyword['intent_score'] = 1
+            aligned_keyword['_alignment_applied'] = f"Moderate market performance: intent {original_intent}→1 (relevancy {original_relevancy})"
+        aligned_items.append(aligned_keyword)
+    return aligned_items
+
+
+def _legacy_buckets(keyword_items):
+    """Previous zero-volume filter and bucketing in prepare_keyword_data_for_analysis."""
+    out = defaultdict(list)
+    fallback_roots = {}
+    for item in keyword_items:
+        category = item.get("category", "")
+        intent_score = item.get("intent_score", 0) or 0
+        search_volume = item.get("search_volume", 0) or 0
+        root = item.get("root", "")
+        if search_volume > 0:
+            if category == "Relevant":
+                out["relevant_keywords"].append(item)
+            elif category == "Design-Specific":
+                out["design_keywords"].append(item)
+            elif category == "Branded":
+                out["branded_keywords"].append(item)
+            if intent_score >= 2:
+                out["high_intent_keywords"].append(item)
+            if search_volume > 500:
+                out["high_volume_keywords"].append(item)
+            if root and category in ["Relevant", "Design-Specific"]:
+                fallback_roots[root] = fallback_roots.get(root, 0) + search_volume
+    return out, fallback_roots
+
+
+def test_alignment_matches_previous_pass_on_sample_csvs():
+    items = _sample_items()
+    assert len(items) > 500
+    expected = _legacy_align(copy.deepcopy(items))
+
+    aligned = ScoringRunner.align_relevancy_and_intent_scores(items)
+
+    assert aligned is items  # Updated in place, no copies
+    assert aligned == expected
+    assert sum("_alignment_applied" in it for it in aligned) > 100
+
+
+def test_prepare_keyword_data_matches_previous_pass_on_sample_csvs(monkeypatch):
+    items = _legacy_align(_sample_items())
+    expected, fallback_roots = _legacy_buckets(items)
+
+    # Force the programmatic root fallback (no LLM in tests)
+    from app.local_agents.scoring.subagents import root_relevance_agent
+    def fail(_items):
+        raise RuntimeError("offline")
+    monkeypatch.setattr(root_relevance_agent, "apply_root_filtering_ai", fail)
+
+    data = helper_methods.prepare_keyword_data_for_analysis(items)
+
+    for key in ("relevant_keywords", "design_keywords", "branded_keywords", "high_intent_keywords", "high_volume_keywords"):
+        assert data[key] == expected[key], key
+        assert all(a is b for a, b in zip(data[key], expected[key]))
+    assert data["root_volumes"] == fallback_roots
+    assert data["total_keywords"] == len(items)
+
+
+def test_single_pass_alignment_and_filter():
+    items = [
+        {"phrase": "a", "category": "Branded", "relevancy_score": 9, "intent_score": 3, "search_volume": 800, "root": "a"},
+        {"phrase": "b", "category": "Relevant", "relevancy_score": 9, "intent_score": 0, "search_volume": 0, "root": "b"},
+        {"phrase": "c", "category": "Relevant", "relevancy_score": 1, "intent_score": 2, "search_volume": 600, "root": "c"},
+    ]
+    result = apply_keyword_rules(KeywordTable.from_items(items))
+
+    assert result.aligned_count == 3
+    assert [it["intent_score"] for it in items] == [0, 1, 2]
+    assert items[2]["relevancy_score"] == 4
+    # Buckets use the aligned scores; zero-volume "b" is filtered out
+    assert result.branded_keywords == [items[0]]
+    assert result.high_intent_keywords == [items[2]]
+    assert result.high_volume_keywords == [items[0], items[2]]
+    assert result.root_volumes == {"a": 800, "c": 600}
+    assert result.relevant_root_volumes == {"c": 600}
+
+
+def test_missing_scores_raise_like_before():
+    with pytest.raises(TypeError):
+        ScoringRunner.align_relevancy_and_intent_scores([{"category": "Relevant", "relevancy_score": None}])
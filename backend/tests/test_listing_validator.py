@@ -0,0 +1,147 @@
+"""
+Tests for the local listing validator/repair engine and the rewrites it asks for.
+"""
+
+import json
+import re
+
+from app.local_agents.seo.listing_validator import BACKEND_MAX_BYTES, BULLET_MAX_CHARS, TITLE_MAX_CHARS, ListingValidator
+from app.local_agents.seo.subagents.amazon_compliance_agent import apply_amazon_compliance_ai
+from benchmarks.stub_llm import StubLLM
+
+TITLE_KEYWORDS = [{"phrase": "freeze dried strawberries", "search_volume": 5000}, {"phrase": "strawberry slices", "search_volume": 900}]
+BULLET_KEYWORDS = [
+    {"phrase": "healthy snack", "search_volume": 800},
+    {"phrase": "dried fruit", "search_volume": 700},
+    {"phrase": "no sugar added", "search_volume": 600},
+    {"phrase": "kids lunch", "search_volume": 500},
+]
+BACKEND_KEYWORDS = [{"phrase": f"strawberry keyword {i:02d}", "search_volume": 100} for i in range(20)]
+
+
+def _validator():
+    return ListingValidator(
+        brand="Nature's Best",
+        title_keywords=TITLE_KEYWORDS,
+        bullet_keywords=BULLET_KEYWORDS,
+        backend_keywords=BACKEND_KEYWORDS,
+        bullet_count=2,
+    )
+
+
+def test_local_repairs_need_no_rewrite():
+    listing = {
+        "optimized_title": {
+            "content": "Amazing Strawberry Slices! Best Crunchy Snack for Lunch Boxes, " + "Resealable Family Size Bag " * 6,
+            "keywords_included": ["strawberry slices", "organic snack"],
+        },
+        "optimized_bullets": [
+            {"content": "GREAT TASTE: A healthy snack of dried fruit. " + "Crunchy and light. " * 15},
+            {"content": "No sugar added - perfect for a kids lunch on the go"},
+            {"content": "An extra bullet"},
+        ],
+        "backend_keywords": ["made up keyword", "strawberry slices", "healthy snack"] + [kw["phrase"] for kw in BACKEND_KEYWORDS],
+    }
+
+    report = _validator().validate_and_repair(listing)
+
+    assert report.unresolved == []
+    rules = {(v.section, v.rule) for v in report.repaired}
+    assert {("title", "brand_missing"), ("title", "top_keyword_missing"), ("title", "too_long"), ("title", "prohibited_characters"),
+            ("title", "promotional_language"), ("title", "unsupported_keywords"), ("bullet", "too_long"), ("bullet", "promotional_language"),
+            ("bullets", "too_many"), ("backend", "unsupported_keywords"), ("backend", "already_in_copy"), ("backend", "too_long")} <= rules
+
+    title = listing["optimized_title"]["content"]
+    assert title.startswith("Nature's Best Freeze Dried Strawberries - ") and len(title) <= TITLE_MAX_CHARS
+    assert "!" not in title and "Amazing" not in title and "Best Crunchy" not in title  # The brand keeps its "Best"
+    assert sorted(listing["optimized_title"]["keywords_included"]) == ["freeze dried strawberries", "strawberry slices"]
+
+    first, second = listing["optimized_bullets"]
+    assert len(first["content"]) <= BULLET_MAX_CHARS and first["content"].startswith("TASTE: A healthy snack")
+    assert sorted(second["keywords_included"]) == ["kids lunch", "no sugar added"]
+
+    backend = listing["backend_keywords"]
+    assert "made up keyword" not in backend and "healthy snack" not in backend and "strawberry slices" not in backend
+    assert len(" ".join(backend).encode("utf-8")) <= BACKEND_MAX_BYTES
+
+
+def test_only_sections_needing_new_copy_are_unresolved():
+    listing = {
+        "optimized_title": {"content": "Nature's Best Freeze Dried Strawberries - Strawberry Slices"},
+        "optimized_bullets": [{"content": "A healthy snack of dried fruit"}, {"content": "a  HEALTHY snack of dried fruit"}],
+    }
+
+    report = _validator().validate_and_repair(listing)
+
+    assert not report.title_needs_rewrite()
+    assert report.bullets_needing_rewrite() == [1]
+    assert [v.rule for v in report.unresolved] == ["repeated"]
+
+
+def _optimize():
+    return apply_amazon_compliance_ai(
+        current_content={"title": "BREWER Freeze Dried Strawberries Slices", "bullets": ["Crunchy slices", "Made from fresh berries"], "backend_keywords": []},
+        keyword_data={"relevant_keywords": TITLE_KEYWORDS + BULLET_KEYWORDS, "design_keywords": []},
+        product_context={"brand": "BREWER", "category": "Food"},
+        title_keywords=TITLE_KEYWORDS,
+        bullet_keywords=BULLET_KEYWORDS,
+        backend_keywords=BACKEND_KEYWORDS[:2],
+        target_bullet_count=2,
+    )
+
+
+def test_model_is_recalled_only_for_the_unrepairable_bullet():
+    prompts = []
+
+    def compliance(prompt, schema):
+        prompts.append(prompt)
+        if "BULLET NUMBER: 2 of" in prompt and "BROKE THESE RULES" not in prompt:
+            return {"optimized_bullets": [{"content": "Crunchy and light."}]}  # No keywords: needs new copy
+        return StubLLM().respond("AmazonComplianceAgent", prompt, schema)
+
+    llm = StubLLM(responders={"AmazonComplianceAgent": compliance})
+    with llm.install():
+        result = _optimize()
+
+    assert llm.stats()["AmazonComplianceAgent"]["calls"] == 4  # Title + 2 bullets + 1 rewrite
+    assert "too few keywords" in prompts[-1] and "BULLET NUMBER: 2 of" in prompts[-1]
+    assert sorted(result["optimized_bullets"][1]["keywords_included"]) == ["dried fruit", "kids lunch"]
+    assert result["listing_validation"]["rewritten_by_model"] == 1 and result["listing_validation"]["fallback_sections"] == 0
+
+
+def test_section_still_broken_after_rewrite_falls_back():
+    def compliance(prompt, schema):
+        if "BULLET NUMBER: 2 of" in prompt:
+            return {"optimized_bullets": [{"content": "Crunchy and light."}]}
+        return StubLLM().respond("AmazonComplianceAgent", prompt, schema)
+
+    llm = StubLLM(responders={"AmazonComplianceAgent": compliance})
+    with llm.install():
+        result = _optimize()
+
+    assert llm.stats()["AmazonComplianceAgent"]["calls"] == 4  # Rewritten once, never looped
+    assert result["optimized_bullets"][1]["content"].endswith("for optimal results")
+    assert result["listing_validation"]["fallback_sections"] == 1
+
+
+def test_each_unrepairable_bullet_is_rewritten_by_a_real_call():
+    rewrites = []
+
+    def compliance(prompt, schema):
+        number = re.search(r"BULLET NUMBER: (\d+) of", prompt)
+        if number and "BROKE THESE RULES" not in prompt:
+            return {"optimized_bullets": [{"content": "Crunchy and light."}]}  # No keywords: needs new copy
+        output = json.loads(StubLLM().respond("AmazonComplianceAgent", prompt, schema))
+        if number:
+            rewrites.append(int(number.group(1)))
+            output["content"] = f"REWRITTEN {output['content']}"
+        return output
+
+    llm = StubLLM(responders={"AmazonComplianceAgent": compliance})
+    with llm.install():
+        result = _optimize()
+
+    assert sorted(rewrites) == [1, 2]
+    assert llm.stats()["AmazonComplianceAgent"]["calls"] == 5  # Title + 2 bullets + 2 rewrites
+    assert all(bullet["content"].startswith("REWRITTEN ") for bullet in result["optimized_bullets"])
+    assert result["listing_validation"]["rewritten_by_model"] == 2 and result["listing_validation"]["fallback_sections"] == 0
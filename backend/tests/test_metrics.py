@@ -0,0 +1,75 @@
+"""
+Tests for the Prometheus-style /metrics endpoint and registry.
+"""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from app.services.metrics import AgentMetricsProcessor, MetricsRegistry, llm_call_duration, llm_tokens
+
+
+def test_registry_renders_exposition_format():
+    registry = MetricsRegistry()
+    hist = registry.histogram("stage_seconds", "Stage time", ["stage"], buckets=(1, 5))
+    hist.observe(0.5, stage="research")
+    hist.observe(3, stage="research")
+    registry.counter("calls_total", "Calls", ["agent"]).inc(2, agent='Key"word')
+    registry.gauge("queue_depth", "Depth").set(4)
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="research",le="1"} 1' in text
+    assert 'stage_seconds_bucket{stage="research",le="5"} 2' in text
+    assert 'stage_seconds_bucket{stage="research",le="+Inf"} 2' in text
+    assert 'stage_seconds_sum{stage="research"} 3.5' in text
+    assert 'calls_total{agent="Key\\"word"} 2' in text
+    assert "queue_depth 4" in text
+
+
+def test_agent_processor_attributes_response_spans_to_agent():
+    from app.services.openai_monitor import monitor
+
+    processor = AgentMetricsProcessor()
+    agent_span = SimpleNamespace(span_id="a1", parent_id=None, span_data=SimpleNamespace(type="agent", name="MetricsTestAgent"))
+    usage = SimpleNamespace(input_tokens=120, output_tokens=30, input_tokens_details=SimpleNamespace(cached_tokens=96))
+    response_span = SimpleNamespace(
+        span_id="r1",
+        parent_id="a1",
+        error=None,
+        started_at="2025-01-01T00:00:00+00:00",
+        ended_at="2025-01-01T00:00:02.500000+00:00",
+        span_data=SimpleNamespace(type="response", response=SimpleNamespace(model="gpt-5-mini", usage=usage)),
+    )
+
+    processor.on_span_start(agent_span)
+    processor.on_span_start(response_span)
+    processor.on_span_end(response_span)
+    processor.on_span_end(agent_span)
+
+    assert llm_call_duration.count(agent="MetricsTestAgent", model="gpt-5-mini") == 1
+    assert llm_tokens.value(agent="MetricsTestAgent", model="gpt-5-mini", kind="input") == 120
+    assert llm_tokens.value(agent="MetricsTestAgent", model="gpt-5-mini", kind="cached_input") == 96
+    assert monitor.get_prompt_cache_stats()["MetricsTestAgent"]["uncached_input_tokens"] == 24
+    assert processor._agent_names == {}
+
+
+def test_metrics_endpoint_exposes_monitor_rate_limiter_and_jobs():
+    from app.main import app
+    from app.services.job_manager import JobManager
+    from app.services.openai_monitor import monitor
+
+    monitor.log_request_start("MetricsEndpointAgent", "metrics-req", 1, model="gpt-5-mini")
+    monitor.log_success("MetricsEndpointAgent", "metrics-req", 1, tokens=42)
+    JobManager.get_job("does-not-exist")
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'openai_monitor_request_duration_seconds_count{agent="MetricsEndpointAgent"} 1' in body
+    assert 'openai_monitor_tokens_total{agent="MetricsEndpointAgent"} 42' in body
+    assert 'openai_rate_limiter_wait_seconds_total{reason="rate_limit"}' in body
+    assert 'job_store_operation_duration_seconds_count{operation="get_job"' in body
+    assert "pipeline_jobs_in_progress" in body
@@ -0,0 +1,106 @@
+"""
+Tests for the OpenAI-compatible mock server used for fault-injection load tests.
+"""
+
+import asyncio
+import json
+
+import openai
+import pytest
+
+from benchmarks.mock_openai_server import FaultConfig, MockOpenAIServer, load_recordings
+
+
+def _client(server: MockOpenAIServer) -> openai.OpenAI:
+    return openai.OpenAI(base_url=server.base_url, api_key="sk-mock", max_retries=0, timeout=10)
+
+
+@pytest.fixture
+def run_sync_event_loop():
+    """A current event loop for ``Runner.run_sync`` in the test's thread (openai-agents 0.2 needs one)."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.mark.usefixtures("run_sync_event_loop")
+def test_agents_sdk_runs_against_mock_server():
+    from agents import RunConfig, Runner
+    from agents.models.openai_provider import OpenAIProvider
+    from app.local_agents.keyword.agent import keyword_agent
+
+    prompt = 'BASE RELEVANCY (1-10) — keyword->score (filtered to exclude score 0):\n{"strawberry slices":8}\n'
+    with MockOpenAIServer().run_in_thread() as server:
+        provider = OpenAIProvider(base_url=server.base_url, api_key="sk-mock", use_responses=True)
+        result = Runner.run_sync(keyword_agent, prompt, run_config=RunConfig(model_provider=provider, tracing_disabled=True))
+
+    assert result.final_output.items[0].phrase == "strawberry slices"
+    assert server.agent_calls["KeywordAgent"] == 1
+
+
+def test_chat_completions_replays_recordings(tmp_path):
+    from app.local_agents.scoring.subagents.intent_agent import INTENT_SCORING_INSTRUCTIONS
+
+    recordings = tmp_path / "recordings.jsonl"
+    recordings.write_text(
+        json.dumps({"agent": "IntentScoringSubagent", "output": [{"phrase": "a", "intent_score": 3}]}) + "\n"
+    )
+    with MockOpenAIServer(recordings=load_recordings(recordings)).run_in_thread() as server:
+        response = _client(server).chat.completions.create(
+            model="gpt-5-mini",
+            messages=[{"role": "system", "content": INTENT_SCORING_INSTRUCTIONS}, {"role": "user", "content": "ITEMS"}],
+        )
+
+    assert json.loads(response.choices[0].message.content) == [{"phrase": "a", "intent_score": 3}]
+
+
+@pytest.mark.parametrize(
+    "faults, error",
+    [
+        (FaultConfig(rate_limit_rate=1.0), openai.RateLimitError),
+        (FaultConfig(server_error_rate=1.0), openai.InternalServerError),
+        (FaultConfig(reset_rate=1.0), openai.APIConnectionError),
+    ],
+)
+def test_injected_faults_surface_as_openai_errors(faults, error):
+    with MockOpenAIServer(faults=faults).run_in_thread() as server:
+        with pytest.raises(error):
+            _client(server).responses.create(model="gpt-5-mini", input="hello")
+    assert server.stats["requests"] == 1
+
+
+def test_malformed_and_slow_outputs():
+    faults = FaultConfig(malformed_rate=1.0, slow_rate=1.0, token_delay=0.0)
+    with MockOpenAIServer(faults=faults).run_in_thread() as server:
+        response = _client(server).responses.create(model="gpt-5-mini", input="hello")
+
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(response.output_text)
+    assert server.get_stats()["faults"] == {"malformed": 1, "slow": 1}
+
+
+def test_batch_api_answers_every_line_and_splits_failures():
+    from app.local_agents.scoring.subagents.intent_agent import INTENT_SCORING_INSTRUCTIONS
+
+    lines = [
+        {"custom_id": f"req-{i}", "method": "POST", "url": "/v1/responses",
+         "body": {"model": "gpt-5-mini", "instructions": INTENT_SCORING_INSTRUCTIONS,
+                  "input": f'ITEMS (preserve order):\n[{{"phrase": "kw {i}"}}]'}}
+        for i in range(20)
+    ]
+    with MockOpenAIServer(faults=FaultConfig(server_error_rate=0.3, seed=1)).run_in_thread() as server:
+        client = _client(server)
+        upload = client.files.create(file=("requests.jsonl", "".join(json.dumps(line) + "\n" for line in lines).encode()), purpose="batch")
+        batch = client.batches.create(input_file_id=upload.id, endpoint="/v1/responses", completion_window="24h")
+        while batch.status != "completed":
+            batch = client.batches.retrieve(batch.id)
+        outputs = [json.loads(line) for line in client.files.content(batch.output_file_id).text.splitlines()]
+        errors = [json.loads(line) for line in client.files.content(batch.error_file_id).text.splitlines()]
+
+    assert batch.request_counts.completed == len(outputs) and batch.request_counts.failed == len(errors) > 0
+    assert sorted(e["custom_id"] for e in outputs + errors) == sorted(line["custom_id"] for line in lines)
+    answer = outputs[0]["response"]["body"]["output"][0]["content"][0]["text"]
+    assert json.loads(answer)[0]["phrase"].startswith("kw ")
+    assert server.get_stats()["batch_requests"] == 20
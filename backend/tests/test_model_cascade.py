@@ -0,0 +1,146 @@
+"""
+Tests for the fast/strong model cascade.
+"""
+
+import asyncio
+import json
+
+import openai
+import pytest
+from agents import RunConfig, Runner
+from agents.items import ModelResponse
+from agents.models.interface import Model
+from agents.models.openai_responses import OpenAIResponsesModel
+from agents.usage import Usage
+from openai.types.responses import ResponseOutputMessage, ResponseOutputText
+
+from app.local_agents.scoring.subagents.intent_agent import intent_scoring_agent
+from app.services import model_cascade
+from app.services.model_cascade import CascadeConfig, CascadeModel, cascade_agent, get_cascade_stats, response_text
+from benchmarks.mock_openai_server import MockOpenAIServer
+from benchmarks.pipeline_benchmark import BenchmarkConfig, run_benchmark
+
+
+@pytest.fixture(autouse=True)
+def fresh_cascade_stats():
+    model_cascade.reset_cascade_stats()
+    yield
+    model_cascade.reset_cascade_stats()
+
+
+class CannedModel(Model):
+    """Answers every call with ``payload`` and records the inputs it saw."""
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.inputs = []
+
+    async def get_response(self, system_instructions, input, *args, **kwargs):
+        self.inputs.append(input)
+        text = self.payload if isinstance(self.payload, str) else json.dumps(self.payload)
+        message = ResponseOutputMessage(
+            id="msg_canned",
+            content=[ResponseOutputText(annotations=[], text=text, type="output_text")],
+            role="assistant",
+            status="completed",
+            type="message",
+        )
+        return ModelResponse(output=[message], usage=Usage(requests=1, input_tokens=10, output_tokens=5), response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+def _ask(model: CascadeModel, prompt: str = "ITEMS (preserve order): [...]"):
+    response = asyncio.run(model.get_response("Score intent.", prompt, None, [], None, [], None))
+    return response, json.loads(response_text(response))
+
+
+def test_only_unsure_items_reach_the_strong_model():
+    fast = CannedModel([
+        {"phrase": "strawberry slices", "intent_score": 3, "confidence": 0.9},
+        {"phrase": "fruit gift", "intent_score": 1, "confidence": 0.4},
+    ])
+    strong = CannedModel([{"phrase": "fruit gift", "intent_score": 2}])
+    model = CascadeModel("IntentScoringSubagent", strong, fast, CascadeConfig(min_confidence=0.7))
+
+    response, answer = _ask(model)
+
+    assert answer == [
+        {"phrase": "strawberry slices", "intent_score": 3},
+        {"phrase": "fruit gift", "intent_score": 2},
+    ]
+    assert '["fruit gift"]' in strong.inputs[0]
+    assert response.usage.requests == 2 and response.usage.output_tokens == 10
+    stats = get_cascade_stats()["IntentScoringSubagent"]
+    assert stats["items"] == 2 and stats["escalated_items"] == 1 and stats["escalation_rate"] == 0.5
+
+
+def test_whole_call_escalates_on_schema_break_or_unsure_call():
+    strong_items = [{"phrase": "fruit gift", "intent_score": 2}]
+    broken = CascadeModel("IntentScoringSubagent", CannedModel(strong_items), CannedModel([{"phrase": "fruit gift", "intent_score": 7}]))
+    assert _ask(broken)[1] == strong_items
+
+    strong = CannedModel({"filtered_root_volumes": {"strawberry": 900}})
+    unsure = CascadeModel("RootRelevanceAgent", strong, CannedModel({"filtered_root_volumes": {}, "confidence": 0.2}))
+    assert _ask(unsure)[1] == {"filtered_root_volumes": {"strawberry": 900}}
+    assert strong.inputs == ["ITEMS (preserve order): [...]"]  # The original request, unchanged
+
+    sure = CascadeModel("RootRelevanceAgent", strong, CannedModel({"filtered_root_volumes": {}, "confidence": 0.9}))
+    assert _ask(sure)[1] == {"filtered_root_volumes": {}}
+
+    stats = get_cascade_stats()
+    assert stats["IntentScoringSubagent"]["invalid"] == 1
+    assert stats["RootRelevanceAgent"]["escalated_calls"] == 1 and stats["RootRelevanceAgent"]["calls"] == 2
+
+
+def test_cascade_passes_sdk_call_arguments_to_real_models():
+    # CannedModel takes any arguments; a real Responses model only takes the ones this SDK version sends
+    prompt = 'ITEMS (preserve order): [{"phrase":"strawberry slices","category":"Relevant","relevancy_score":9}]'
+
+    async def run(server: MockOpenAIServer):
+        client = openai.AsyncOpenAI(base_url=server.base_url, api_key="sk-mock", max_retries=0)
+        model = CascadeModel(
+            "IntentScoringSubagent",
+            OpenAIResponsesModel("gpt-5-mini", client),
+            OpenAIResponsesModel("gpt-5-nano", client),
+        )
+        return await Runner.run(intent_scoring_agent.clone(model=model), prompt, run_config=RunConfig(tracing_disabled=True))
+
+    with MockOpenAIServer().run_in_thread() as server:
+        result = asyncio.run(run(server))
+
+    # The fast answer carries no confidence, so the strong model answers the whole call
+    assert json.loads(result.final_output) == [
+        {"phrase": "strawberry slices", "category": "Relevant", "relevancy_score": 9, "intent_score": 3}
+    ]
+    assert server.stats["requests"] == 2 and server.agent_calls["IntentScoringSubagent"] == 1
+    assert get_cascade_stats()["IntentScoringSubagent"]["escalated_calls"] == 1
+
+
+def test_cascade_is_installed_once():
+    agent = intent_scoring_agent.clone()
+    cascaded = cascade_agent(agent, fast="gpt-5-nano", config=CascadeConfig())
+
+    assert cascade_agent(agent, fast="other") is cascaded
+    assert cascaded.inner == intent_scoring_agent.model and cascaded.fast == "gpt-5-nano"
+
+
+def test_cascade_cuts_pipeline_cost_on_fixtures(tmp_path):
+    config = dict(max_rows=40, latency=0.02, seconds_per_1k_output_tokens=0.5, unsure_rate=0.1)
+    baseline = run_benchmark(BenchmarkConfig(**config, output_dir=tmp_path / "baseline"))
+    cascaded = run_benchmark(BenchmarkConfig(**config, cascade=True, output_dir=tmp_path / "cascade"))
+
+    assert cascaded["total"]["llm_cost_usd"] < 0.8 * baseline["total"]["llm_cost_usd"]
+    assert cascaded["tiers"]["fast"]["calls"] > 0
+    for agent in ("KeywordAgent", "IntentScoringSubagent"):
+        stats = cascaded["cascade"][agent]
+        assert stats["invalid"] == 0
+        assert 0 < stats["escalation_rate"] < 0.3
+
+    # Escalated answers are merged back: the same keywords come out categorized the same way
+    def categories(run):
+        result = json.loads((tmp_path / run / "complete_pipeline_result.json").read_text())
+        return {item["phrase"]: item["category"] for item in result["ai_analysis_keywords"]["structured_data"]["items"]}
+
+    assert categories("cascade") == categories("baseline")
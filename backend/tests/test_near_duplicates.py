@@ -0,0 +1,78 @@
+"""
+Tests for near-duplicate keyword clustering and label propagation.
+"""
+
+from app.local_agents.scoring.runner import ScoringRunner
+from app.services.keyword_processing.near_duplicates import cluster_near_duplicates
+from benchmarks.stub_llm import StubLLM, json_after
+
+KEYWORDS = {
+    "freeze dried strawberries": 5000,
+    "strawberries freeze dried": 900,
+    "freeze dried strawberry": 800,
+    "freeze-dried strawberries for kids": 50,
+    "freeze dried strawberries kids": 60,
+    "freeze dried strawberries bulk": 400,
+    "dried peaches no sugar added": 300,
+    "dried pears no sugar added": 200,
+    "dried strawberrries": 30,
+    "dried strawberries": 700,
+}
+
+
+def test_variants_cluster_around_the_highest_volume_phrase():
+    clusters = cluster_near_duplicates(list(KEYWORDS), KEYWORDS)
+
+    assert clusters.members["freeze dried strawberries"] == ["strawberries freeze dried", "freeze dried strawberry"]
+    assert clusters.members["freeze dried strawberries kids"] == ["freeze-dried strawberries for kids"]  # Filler word
+    assert clusters.members["dried strawberries"] == ["dried strawberrries"]  # Typo
+    # A modifier, or a different word that looks alike, keeps its own cluster
+    assert clusters.members["freeze dried strawberries bulk"] == []
+    assert clusters.members["dried pears no sugar added"] == []
+    assert clusters.removed == 4
+    assert list(clusters.representative_of) == list(KEYWORDS)  # Input order
+
+
+def test_labels_propagate_to_members_with_their_own_relevancy():
+    scores = {kw: 8 for kw in KEYWORDS}
+    scores["strawberries freeze dried"] = 5
+    clusters = cluster_near_duplicates(list(KEYWORDS), KEYWORDS)
+    stats = {"Relevant": {"count": 1, "examples": []}}
+
+    items = clusters.expand_items(
+        [{"phrase": "freeze dried strawberries", "category": "Relevant", "relevancy_score": 8}], scores, stats
+    )
+
+    assert [(it["phrase"], it["category"], it["relevancy_score"]) for it in items] == [
+        ("freeze dried strawberries", "Relevant", 8),
+        ("strawberries freeze dried", "Relevant", 5),
+        ("freeze dried strawberry", "Relevant", 8),
+    ]
+    assert items[1]["near_duplicate_of"] == "freeze dried strawberries"
+    assert stats["Relevant"]["count"] == 3
+
+
+def test_intent_agent_only_scores_representatives():
+    prompts = []
+
+    def intent(prompt, schema):
+        prompts.append(prompt)
+        return [dict(it, intent_score=3) for it in json_after(prompt, "ITEMS (preserve order):")]
+
+    items = [
+        {"phrase": "freeze dried strawberries", "category": "Relevant", "relevancy_score": 8},
+        {"phrase": "strawberries freeze dried", "category": "Relevant", "relevancy_score": 5,
+         "near_duplicate_of": "freeze dried strawberries"},
+        {"phrase": "strawberry slices", "category": "Relevant", "relevancy_score": 7},
+    ]
+    llm = StubLLM(responders={"IntentScoringSubagent": intent})
+    with llm.install():
+        scored = ScoringRunner.score_and_enrich(items, scraped_product={}, include_broad_volume=False)
+
+    assert llm.stats()["IntentScoringSubagent"]["calls"] == 1
+    assert "strawberries freeze dried" not in prompts[0]
+    assert [(it["phrase"], it["intent_score"]) for it in scored] == [
+        ("freeze dried strawberries", 3),
+        ("strawberries freeze dried", 3),
+        ("strawberry slices", 3),
+    ]
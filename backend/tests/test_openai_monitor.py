@@ -0,0 +1,115 @@
+"""
+Tests for the bounded, percentile-aware OpenAI monitor.
+"""
+
+import pytest
+
+from app.local_agents.scoring.subagents.broad_volume_agent import broad_volume_agent
+from app.services.adaptive_concurrency import AIMDLimiter, limit_agent
+from app.services.circuit_breaker import CircuitBreaker, guard_agent
+from app.services.model_wrappers import model_name
+from app.services.openai_monitor import LatencyHistogram, OpenAIMonitor
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _request(monitor, clock, request_id, duration, agent="KeywordAgent", model="gpt-5-mini", ok=True, tokens=None):
+    monitor.log_request_start(agent, request_id, 10, model=model)
+    clock.now += duration
+    if ok:
+        monitor.log_success(agent, request_id, 10, tokens=tokens)
+    else:
+        monitor.log_error(agent, request_id, "boom")
+
+
+def test_histogram_percentiles_within_one_bucket():
+    hist = LatencyHistogram()
+    for i in range(1, 1001):
+        hist.observe(i / 100)  # 0.01s .. 10s uniform
+
+    pct = hist.percentiles()
+    assert pct["p50"] == pytest.approx(5.0, rel=0.2)
+    assert pct["p95"] == pytest.approx(9.5, rel=0.2)
+    assert pct["p99"] == pytest.approx(9.9, rel=0.2)
+
+
+def test_memory_stays_flat_under_load():
+    clock = FakeClock()
+    monitor = OpenAIMonitor(history_size=50, clock=clock)
+    for i in range(5_000):
+        _request(monitor, clock, f"r{i}", 0.5, ok=i % 10 != 0, tokens=100)
+
+    assert len(monitor.request_history) == 50
+    assert monitor.active_requests == {}
+    assert len(monitor.agent_series["KeywordAgent"].window.slots) == monitor.window_slots
+    assert len(monitor.agent_series["KeywordAgent"].latency.counts) == LatencyHistogram.BUCKETS + 1
+    assert monitor.get_overall_stats()["total_requests"] == 5_000
+
+
+def test_per_agent_and_model_percentiles_tokens_and_error_rate():
+    clock = FakeClock()
+    monitor = OpenAIMonitor(clock=clock)
+    for i in range(99):
+        _request(monitor, clock, f"fast{i}", 1.0, tokens=200)
+    _request(monitor, clock, "slow", 30.0, tokens=400)
+    _request(monitor, clock, "bad", 2.0, ok=False)
+
+    stats = monitor.get_latency_stats()
+    agent = stats["agents"]["KeywordAgent"]
+    assert agent["latency"]["p50"] == pytest.approx(1.0, rel=0.2)
+    assert agent["latency"]["p99"] >= 1.0
+    assert agent["tokens_per_call"] == pytest.approx(202.0)
+    assert agent["window"]["error_rate"] == pytest.approx(100 / 101)
+    assert set(stats["models"]) == {"gpt-5-mini"}
+
+    detailed = monitor.get_detailed_stats()
+    assert "latency" in detailed["agents"]["KeywordAgent"]
+    assert len(detailed["recent_requests"]) == 10
+
+
+def test_sliding_window_forgets_old_requests():
+    clock = FakeClock()
+    monitor = OpenAIMonitor(window_seconds=60, window_slots=6, clock=clock)
+    _request(monitor, clock, "old", 5.0, ok=False)
+    clock.now += 120
+    _request(monitor, clock, "new", 1.0)
+
+    window = monitor.get_latency_stats()["agents"]["KeywordAgent"]["window"]
+    assert window["requests"] == 1
+    assert window["errors"] == 0
+    # Lifetime totals still include both requests
+    assert monitor.get_agent_stats("KeywordAgent").total_requests == 2
+
+
+def test_prompt_cache_stats_split_cached_and_uncached_input():
+    monitor = OpenAIMonitor(clock=FakeClock())
+    monitor.record_usage("AmazonComplianceAgent", 12_000, cached_input_tokens=9_000, output_tokens=800)
+    monitor.record_usage("AmazonComplianceAgent", 12_000, cached_input_tokens=11_000, output_tokens=700)
+    monitor.record_usage("ResearchAgent", 5_000)
+
+    stats = monitor.get_prompt_cache_stats()
+    compliance = stats["AmazonComplianceAgent"]
+    assert compliance["calls"] == 2
+    assert compliance["cached_input_tokens"] == 20_000 and compliance["uncached_input_tokens"] == 4_000
+    assert compliance["cache_hit_rate"] == pytest.approx(100 * 20_000 / 24_000)
+    assert stats["ResearchAgent"]["cache_hit_rate"] == 0
+    assert monitor.get_detailed_stats()["prompt_cache"]["AmazonComplianceAgent"] == compliance
+
+
+
+def test_wrapped_agents_are_keyed_by_the_model_they_call():
+    agent = broad_volume_agent.clone()
+    guard_agent(agent, CircuitBreaker())
+    limit_agent(agent, AIMDLimiter())
+    clock = FakeClock()
+    monitor = OpenAIMonitor(clock=clock)
+
+    _request(monitor, clock, "wrapped", 1.0, agent="BroadVolumeAgent", model=model_name(agent.model))
+
+    assert set(monitor.get_latency_stats()["models"]) == {"gpt-5-mini-2025-08-07"}
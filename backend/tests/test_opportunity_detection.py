@@ -0,0 +1,78 @@
+"""
+Tests for chunked, delta-only opportunity detection.
+"""
+
+import time
+
+import pytest
+
+from app.local_agents.scoring.subagents.opportunity_agent import (
+    apply_opportunity_flags,
+    detect_opportunities,
+    project_for_opportunity,
+)
+from app.services.openai_rate_limiter import rate_limiter
+from benchmarks.stub_llm import StubLLM
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    async def no_wait(tokens=0):
+        return None
+    monkeypatch.setattr(rate_limiter, "wait_for_rate_limit", no_wait)
+
+
+def _items(n):
+    return [
+        {
+            "phrase": f"keyword {i}",
+            "category": "Relevant",
+            "search_volume": 500,
+            "title_density": i % 5,  # 0..4: a fifth are zero-density opportunities
+            "root": f"root {i % 7}",
+            "relevancy_score": 7,
+            "intent_score": 2,
+            "cpr": 8,
+        }
+        for i in range(n)
+    ]
+
+
+def test_projection_drops_ignored_items_and_extra_fields():
+    item = _items(1)[0]
+    assert project_for_opportunity(item) == {
+        "phrase": "keyword 0", "category": "Relevant", "search_volume": 500, "title_density": 0, "root": "root 0",
+    }
+    assert project_for_opportunity({**item, "category": "Branded"}) is None
+    assert project_for_opportunity({**item, "title_density": 9}) is None
+    assert project_for_opportunity({**item, "title_density": None}) is not None
+
+
+def test_only_flagged_phrases_are_merged():
+    items = _items(10)
+    llm = StubLLM()
+    with llm.install():
+        flags = detect_opportunities(items, chunk_size=4)
+    assert sorted(flags) == ["keyword 0", "keyword 5"]
+
+    assert apply_opportunity_flags(items, {**flags, "invented phrase": {"opportunity_decision": "Opportunity"}}) == 2
+    assert items[0]["opportunity_decision"] == "Opportunity"
+    assert "opportunity_decision" not in items[1]
+    # Items with title_density 3/4 never reach the model
+    assert llm.stats()["OpportunitySubagent"]["calls"] == 2
+
+
+def test_latency_stays_flat_as_keywords_grow():
+    def timed(n):
+        llm = StubLLM(latency=0.2, seconds_per_1k_output_tokens=0.5)
+        with llm.install():
+            start = time.perf_counter()
+            flags = detect_opportunities(_items(n), chunk_size=150, max_concurrency=8)
+            return time.perf_counter() - start, flags
+
+    small, small_flags = timed(100)
+    large, large_flags = timed(2000)
+
+    assert len(small_flags) == 20 and len(large_flags) == 400
+    # 20x the keywords, one extra round of concurrent chunks at most
+    assert large < small * 3
@@ -0,0 +1,64 @@
+"""
+Tests for the offline pipeline benchmark harness (stub LLM + saved HTML).
+"""
+
+import json
+
+from benchmarks.pipeline_benchmark import BenchmarkConfig, format_report, run_benchmark
+from benchmarks.stub_llm import StubLLM, example_from_schema
+
+
+def test_stub_llm_answers_keyword_agent_from_prompt():
+    llm = StubLLM()
+    prompt = 'BASE RELEVANCY (1-10) — keyword->score (filtered to exclude score 0):\n{"strawberry slices":8,"fruit snack":4}\n'
+    result = json.loads(llm.respond("KeywordAgent", prompt, None))
+
+    assert [item["phrase"] for item in result["items"]] == ["strawberry slices", "fruit snack"]
+    assert [item["category"] for item in result["items"]] == ["Relevant", "Design-Specific"]
+
+
+def test_example_from_schema_builds_valid_research_output():
+    from app.local_agents.research.schemas import ResearchOutput
+
+    example = example_from_schema(ResearchOutput.model_json_schema())
+    assert ResearchOutput.model_validate(example)
+
+
+def test_offline_pipeline_benchmark_reports_every_stage(tmp_path):
+    from app.local_agents.keyword.agent import keyword_agent
+    from app.core.config import settings
+
+    original_model = keyword_agent.model
+    original_key = settings.OPENAI_API_KEY
+
+    report = run_benchmark(BenchmarkConfig(max_rows=40, latency=0.001, output_dir=tmp_path))
+
+    assert set(report["stages"]) == {"research", "categorization", "scoring", "root_filtering", "seo"}
+    for name in ("research", "categorization", "scoring", "seo"):
+        stage = report["stages"][name]
+        assert stage["invocations"] == 1
+        assert stage["llm_calls"] > 0
+        assert stage["prompt_bytes"] > 0
+        assert stage["wall_s"] >= stage["llm_calls"] * 0.001
+    assert report["agents"]["KeywordAgent"]["calls"] >= 1
+    assert report["total"]["llm_calls"] == sum(a["calls"] for a in report["agents"].values())
+    assert report["total"]["scrapes"]["full"] >= 1
+    assert (tmp_path / "complete_pipeline_result.json").exists()
+    assert "categorization" in format_report(report)
+
+    # Agents and settings are restored once the run finishes
+    assert keyword_agent.model == original_model
+    assert settings.OPENAI_API_KEY == original_key
+
+
+def test_near_duplicate_run_sends_fewer_keywords_to_the_agents(tmp_path):
+    full = run_benchmark(BenchmarkConfig(max_rows=60, output_dir=tmp_path / "full"))
+    clustered = run_benchmark(BenchmarkConfig(max_rows=60, near_duplicates=True, output_dir=tmp_path / "clustered"))
+
+    summary = clustered["near_duplicates"]
+    assert summary["removed"] > 0 and "near_duplicates" not in full
+    for agent in ("KeywordAgent", "IntentScoringSubagent"):
+        assert clustered["agents"][agent]["prompt_bytes"] < full["agents"][agent]["prompt_bytes"]
+    result = json.loads((tmp_path / "clustered" / "complete_pipeline_result.json").read_text())
+    items = result["ai_analysis_keywords"]["structured_data"]["items"]
+    assert sum(1 for it in items if it.get("near_duplicate_of")) == summary["removed"]
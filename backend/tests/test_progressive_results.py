@@ -0,0 +1,109 @@
+"""
+Tests for progressive (partial) pipeline results.
+"""
+
+import asyncio
+import json
+
+from app.services import progressive
+from app.services.progressive import ResultPublisher, publish_result, publishing_scope
+from benchmarks.pipeline_benchmark import BenchmarkConfig, run_benchmark
+
+
+def test_publish_is_a_noop_without_publisher():
+    def build():
+        raise AssertionError("built without a publisher")
+
+    publish_result("preview", build)
+
+
+def test_publisher_records_phases_and_survives_store_errors():
+    stored = []
+
+    def on_publish(phase, result):
+        stored.append(phase)
+        raise RuntimeError("store down")
+
+    publisher = ResultPublisher(on_publish=on_publish)
+    with publishing_scope(publisher):
+        publish_result("preview", lambda: {"success": True})
+        publish_result("categorized", lambda: 1 / 0)  # Build errors are logged, not raised
+        publish_result("scored", lambda: {"success": True})
+    final = publisher.finish({"success": True})
+
+    assert stored == ["preview", "scored"]
+    assert [p["phase"] for p in publisher.phases] == ["preview", "scored", "complete"]
+    assert publisher.first_result_seconds == publisher.phases[0]["seconds"]
+    assert final["progress"]["final"] is True and final["progress"]["pending_sections"] == []
+
+
+def test_background_job_serves_partial_result_while_processing(monkeypatch, tmp_path):
+    from app.api.v1.endpoints import background_jobs
+    from app.services import job_manager
+    from app.services.job_manager import JobManager
+
+    monkeypatch.setattr(job_manager, "JOBS_DIR", tmp_path)
+    monkeypatch.setattr(job_manager, "use_redis", False)
+    monkeypatch.setattr(job_manager, "_storage_ready", True)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def staged_pipeline(**kwargs):
+            publish_result("preview", lambda: {"success": True, "stage": "preview"})
+            await release.wait()
+            return {"success": True, "stage": "final"}
+
+        monkeypatch.setattr(background_jobs, "amazon_sales_intelligence_pipeline", staged_pipeline)
+        job_id = JobManager.create_job()
+        background_jobs.jobs_in_progress.inc()
+        job = asyncio.create_task(background_jobs.run_pipeline_in_background(
+            job_id, "B000TEST", "US", None, b"a,b\n", "rev.csv", b"a,b\n", "design.csv",
+        ))
+        await asyncio.sleep(0.1)
+
+        partial = await background_jobs.get_job_results(job_id)
+        status = JobManager.get_job(job_id)
+        release.set()
+        await asyncio.wait_for(job, timeout=2)
+        final = await background_jobs.get_job_results(job_id)
+        return partial, status, final, JobManager.get_job(job_id)
+
+    partial, status, final, finished = asyncio.run(scenario())
+
+    assert partial["stage"] == "preview"
+    assert partial["progress"]["phase"] == "preview" and not partial["progress"]["final"]
+    assert status["status"] == "processing" and status["result_phase"] == "preview"
+    assert status["progress"] == background_jobs.PHASE_PROGRESS["preview"]
+    assert finished["first_result_seconds"] == partial["progress"]["first_result_seconds"]
+
+    assert final["stage"] == "final"
+    assert [p["phase"] for p in final["progress"]["phases"]] == ["preview", "complete"]
+
+
+def test_offline_pipeline_publishes_deterministic_preview_first(monkeypatch, tmp_path):
+    published = {}
+
+    class CapturingPublisher(ResultPublisher):
+        def __init__(self):
+            super().__init__(on_publish=lambda phase, result: published.setdefault(
+                phase, json.loads(json.dumps(result, default=str))
+            ))
+
+    monkeypatch.setattr(progressive, "ResultPublisher", CapturingPublisher)
+    report = run_benchmark(BenchmarkConfig(max_rows=40, latency=0.2, output_dir=tmp_path))
+
+    phases = [p["phase"] for p in report["total"]["partial_results"]]
+    assert phases == ["preview", "categorized", "scored"]
+    # The preview arrives before the first model call of the keyword stage
+    assert report["total"]["first_result_s"] < report["stages"]["categorization"]["wall_s"]
+
+    preview = published["preview"]
+    items = preview["ai_analysis_keywords"]["structured_data"]["items"]
+    assert items and all(item["category"] == "Relevant" for item in items)
+    assert any(item.get("search_volume") for item in items)  # CSV metrics merged
+    assert preview["keyword_root_optimization"]["priority_roots"]
+    assert preview["seo_analysis"]["analysis"]["current_seo"]["keyword_coverage"]["total_keywords"] > 0
+    assert preview["progress"]["pending_sections"][0] == "keyword_categorization"
+
+    assert "intent_score" in published["scored"]["ai_analysis_keywords"]["structured_data"]["items"][0]
@@ -0,0 +1,72 @@
+"""
+Tests that agent prompts put their stable part first, so provider-side
+prompt caching can reuse it across batches and jobs.
+"""
+
+import os
+
+from app.local_agents.keyword.prompts import KEYWORD_BATCH_PROMPT_KEYWORDS, KEYWORD_BATCH_PROMPT_PREFIX
+from app.local_agents.seo.subagents import amazon_compliance_agent, competitor_title_analysis_agent
+from benchmarks.pipeline_benchmark import DEFAULT_HTML, BenchmarkConfig, run_benchmark
+from benchmarks.stub_llm import StubLLM
+
+STRAWBERRIES = dict(product_json='{"title": "BREWER Freeze Dried Strawberries"}', current_title="BREWER Freeze Dried Strawberries", brand="BREWER")
+APPLES = dict(product_json='{"title": "ORCHARD Apple Chips, Pack of 6"}', current_title="ORCHARD Apple Chips, Pack of 6", brand="ORCHARD")
+
+
+def _shared_prefix(a: str, b: str) -> str:
+    return a[:len(os.path.commonprefix([a, b]))]
+
+
+def test_keyword_batches_share_everything_but_their_keywords():
+    def prompt(product, batch):
+        prefix = KEYWORD_BATCH_PROMPT_PREFIX.format(
+            title=product["current_title"],
+            brand=product["brand"],
+            base_form="slices",
+            marketplace="US",
+            asin_or_url="B000000000",
+            scraped_product=product["product_json"],
+        )
+        return prefix + KEYWORD_BATCH_PROMPT_KEYWORDS.format(batch_scores=batch)
+
+    first, second = prompt(STRAWBERRIES, '{"strawberry slices":8}'), prompt(STRAWBERRIES, '{"fruit snack":4}')
+    assert _shared_prefix(first, second).endswith('keyword->score (filtered to exclude score 0):\n{"')
+
+    # Across products only the product context differs: the rules come before it
+    other_job = prompt(APPLES, '{"strawberry slices":8}')
+    shared = _shared_prefix(first, other_job)
+    assert "BRAND DETECTION" in shared and shared.rstrip().endswith("- Title:")
+
+
+def test_seo_prompts_keep_job_data_after_the_rules():
+    def compliance(product):
+        return amazon_compliance_agent.USER_PROMPT_TEMPLATE.format(
+            main_root="freeze dried strawberry", design_root="slices", keywords_json="[]",
+            bullet_count=5, current_length=60, **product,
+        )
+
+    shared = _shared_prefix(compliance(STRAWBERRIES), compliance(APPLES))
+    assert "TASK 4 - BULLET POINT RULES" in shared and shared.endswith("PRODUCT INFORMATION:\n{\"title\": \"")
+    assert len(shared) > 8_000
+
+    def competitor(product):
+        return competitor_title_analysis_agent.USER_PROMPT_TEMPLATE.format(
+            product_json=product["product_json"], competitor_data_json="{}",
+        )
+
+    shared = _shared_prefix(competitor(STRAWBERRIES), competitor(APPLES))
+    assert "TASK 6 REQUIREMENTS" in shared and shared.endswith("CURRENT PRODUCT:\n{\"title\": \"")
+
+
+def test_second_job_reads_compliance_rules_from_prompt_cache(tmp_path):
+    other = tmp_path / "other_product.html"
+    other.write_text(DEFAULT_HTML.read_text().replace("BREWER", "ORCHARD").replace("Pack of 4", "Pack of 6"))
+    llm = StubLLM(latency=0.001)
+    run_benchmark(BenchmarkConfig(max_rows=40, latency=0.001, output_dir=tmp_path / "first"), llm=llm)
+    report = run_benchmark(BenchmarkConfig(max_rows=40, latency=0.001, html_path=other, output_dir=tmp_path / "second"), llm=llm)
+
+    compliance = report["agents"]["AmazonComplianceAgent"]
+    instructions = len(amazon_compliance_agent.AMAZON_COMPLIANCE_INSTRUCTIONS.encode())
+    # More than the agent instructions come from the cache: the rules in the prompt too
+    assert compliance["cached_prompt_bytes"] > instructions + 8_000
@@ -0,0 +1,73 @@
+"""
+Tests for the OpenAI rate limiter and its cross-process shared budget.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from app.services.openai_rate_limiter import OpenAIRateLimiter, RateLimitConfig, _reserve
+
+WINDOW = 1.0
+REQUESTS_PER_WINDOW = 5
+
+
+def _limiter_config(namespace: str) -> RateLimitConfig:
+    return RateLimitConfig(
+        requests_per_minute=REQUESTS_PER_WINDOW,
+        requests_per_second=1000,
+        window_seconds=WINDOW,
+        backend="file",
+        namespace=namespace,
+    )
+
+
+def _worker(directory: str, namespace: str, requests: int):
+    os.environ["RATE_LIMIT_DIR"] = directory
+    limiter = OpenAIRateLimiter(_limiter_config(namespace))
+
+    async def run():
+        admitted = []
+        for _ in range(requests):
+            await limiter.wait_for_rate_limit()
+            admitted.append(time.time())
+        return admitted
+
+    return asyncio.run(run())
+
+
+def test_reserve_enforces_request_and_token_budget():
+    config = RateLimitConfig(requests_per_minute=2, requests_per_second=1000, tokens_per_minute=100, window_seconds=10)
+    entries, last = [], 0.0
+
+    wait, entries, last = _reserve(entries, last, 100.0, 60, config)
+    assert wait == 0
+    # Token budget: 60 + 60 > 100 until the first reservation leaves the window
+    wait, entries, last = _reserve(entries, last, 101.0, 60, config)
+    assert wait == 9.0
+    wait, entries, last = _reserve(entries, last, 101.0, 30, config)
+    assert wait == 0
+    # Request budget: two requests already in the window
+    wait, entries, last = _reserve(entries, last, 102.0, 0, config)
+    assert wait == 8.0
+    wait, entries, last = _reserve(entries, last, 110.5, 0, config)
+    assert wait == 0
+
+
+def test_workers_share_one_budget(tmp_path):
+    workers, per_worker = 4, REQUESTS_PER_WINDOW
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(_worker, str(tmp_path), "shared-test", per_worker) for _ in range(workers)]
+        admitted = sorted(t for f in futures for t in f.result(timeout=120))
+
+    assert len(admitted) == workers * per_worker
+    # Aggregate rate never exceeds the configured budget in any window
+    # (small slack for the gap between admission and the worker's timestamp)
+    for i, start in enumerate(admitted):
+        in_window = sum(1 for t in admitted[i:] if t < start + WINDOW - 0.05)
+        assert in_window <= REQUESTS_PER_WINDOW
+    # Four workers with private limiters would finish in one window
+    assert admitted[-1] - admitted[0] >= (workers - 1) * WINDOW - 0.1
@@ -0,0 +1,71 @@
+"""
+Tests for the set-based SEO comparison engine.
+"""
+
+from app.local_agents.seo.comparison_engine import (
+    ContentIndex,
+    calculate_comparison_metrics,
+    compile_keywords,
+    find_keywords,
+)
+from app.local_agents.seo.helper_methods import extract_keywords_from_content
+
+CONTENT = (
+    "Makeup Sponges for Foundation, beauty blender sponges; latex-free puff\n"
+    "Anti slip  mat  | women's kit - 3-pack BRUSHES, baby's berries set_one"
+)
+KEYWORDS = [
+    "makeup sponge",          # adjacent plural
+    "beauty sponges",         # word in between -> no
+    "sponges foundation",     # punctuation/word between -> no
+    "sponge for foundation",  # variant + exact
+    "foundation beauty",      # comma between -> no
+    "latex free puff",        # hyphen in content, not keyword
+    "latex-free puff",        # exact hyphen
+    "anti-slip mat",          # hyphen variant (substring rule)
+    "anti slip mat",          # multiple spaces between
+    "women's kit",            # apostrophe -> fallback
+    "brush",                  # single token: no plural rule
+    "brushes",
+    "baby berry",             # ies/y variants
+    "set",                    # part of set_one -> no
+    "Makeup Sponge",          # case duplicate
+    "",
+]
+
+
+def test_engine_matches_regex_extraction():
+    expected, _ = extract_keywords_from_content(CONTENT, KEYWORDS)
+    found = find_keywords(ContentIndex(CONTENT), compile_keywords(KEYWORDS))
+    assert found == expected
+    assert find_keywords(ContentIndex(""), compile_keywords(KEYWORDS)) == []
+
+
+def test_comparison_metrics():
+    keyword_data = {
+        "relevant_keywords": [
+            {"phrase": "makeup sponge", "search_volume": 1000},
+            {"phrase": "beauty blender", "search_volume": 500},
+        ],
+        "design_keywords": [{"phrase": "pink puff", "search_volume": None}],
+        "high_intent_keywords": [{"phrase": "beauty blender"}],
+    }
+    current = ("Makeup Sponges", ["soft"], [])
+    optimized = ("Makeup Sponge Beauty Blender", ["pink puff for travel"], ["latex", "free"])
+
+    comparison = calculate_comparison_metrics(current, optimized, keyword_data)
+
+    assert comparison.coverage_improvement["before_covered"] == 1
+    assert comparison.coverage_improvement["after_covered"] == 3
+    assert comparison.coverage_improvement["new_keywords_added"] == ["beauty blender", "pink puff"]
+    assert comparison.intent_improvement == {"high_intent_total": 1, "before_covered": 0, "after_covered": 1, "delta": 1}
+    assert comparison.volume_improvement["delta_volume"] == 500
+    assert comparison.character_efficiency["backend_after"] == len("latex free")
+
+
+def test_benchmark_is_identical_and_faster():
+    from benchmarks.seo_comparison_benchmark import ComparisonBenchmarkConfig, run_comparison_benchmark
+
+    report = run_comparison_benchmark(ComparisonBenchmarkConfig(keywords=2000, repeat=1))
+    assert report["identical"]
+    assert report["speedup"] > 3